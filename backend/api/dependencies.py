@@ -15,13 +15,16 @@ from pydantic import BaseModel, Field # Added Field for aliasing namespaced clai
 # from dotenv import load_dotenv # Added to load env vars
 
 # Assuming FastAPI and related libraries are installed
-from fastapi import Depends, HTTPException, status, Path
+from fastapi import Depends, HTTPException, status, Path, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials # Use HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import necessary services, models, and session dependency
 from backend.core.session import get_db_session
-from backend.services import user_service
+from backend.services import exposure_service, user_service
+from backend.services.market_data_interface import MarketDataServiceInterface
+from backend.services.market_data_service import MarketDataService
+from backend.services.portfolio_stream_service import PortfolioStreamHub
 from backend.models import User, ClubMembership
 from backend.models.enums import ClubRole
 from backend.crud import club_membership as crud_membership
@@ -49,6 +52,10 @@ if not AUTH0_AUDIENCE:
     log.error("AUTH0_AUDIENCE environment variable not set")
     raise RuntimeError("AUTH0_AUDIENCE environment variable not set")
 
+# --- Platform Administration ---
+# Users (by email) allowed to run cross-club jobs such as batch NAV; empty = nobody
+PLATFORM_ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("PLATFORM_ADMIN_EMAILS", "").split(",") if email.strip()}
+
 # --- JWKS Caching ---
 jwks_cache: Dict[str, Any] = {}
 jwks_last_updated: Optional[datetime] = None
@@ -368,3 +375,61 @@ async def require_club_member(
     log.debug(f"User {current_user.id} confirmed as member of club {club_id}")
     return membership
 
+
+
+# --- Platform Admin Dependency ---
+async def require_platform_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Dependency to ensure the user is listed in PLATFORM_ADMIN_EMAILS (jobs spanning all clubs)."""
+    if (current_user.email or "").lower() not in PLATFORM_ADMIN_EMAILS:
+        log.warning(f"User {current_user.id} is not a platform admin.")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User does not have platform ADMIN privileges."
+        )
+    return current_user
+
+
+# --- Market Data Dependency ---
+def get_market_data_service(request: Request) -> MarketDataService:
+    """
+    Returns the app-scoped MarketDataService created in main.lifespan, so every request
+    shares one provider and its pooled HTTP client. If the lifespan did not run
+    (e.g. a TestClient used without a context manager), one is created and stored lazily.
+    """
+    service = getattr(request.app.state, "market_data_service", None)
+    if service is None:
+        try:
+            service = MarketDataService()
+        except ValueError as e:
+            log.error(f"Market data provider is not configured: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Market data provider is not configured."
+            )
+        request.app.state.market_data_service = service
+    return service
+
+
+def get_etf_holdings_provider(request: Request) -> Optional[MarketDataServiceInterface]:
+    """
+    Returns the app-scoped ETF holdings provider resolved in main.lifespan (None if it
+    is not configured; exposure reports then use stored holdings). Resolved and stored
+    lazily if the lifespan did not run.
+    """
+    state = request.app.state
+    if not hasattr(state, "etf_holdings_provider"):
+        state.etf_holdings_provider = exposure_service.resolve_holdings_provider(getattr(state, "market_data_service", None))
+    return state.etf_holdings_provider
+
+
+# --- Portfolio Stream Dependency ---
+def get_portfolio_stream_hub(request: Request) -> PortfolioStreamHub:
+    """
+    Returns the app-scoped PortfolioStreamHub created in main.lifespan, so every SSE
+    client shares its pollers. Created and stored lazily if the lifespan did not run.
+    """
+    hub = getattr(request.app.state, "portfolio_stream_hub", None)
+    if hub is None:
+        hub = PortfolioStreamHub()
+        request.app.state.portfolio_stream_hub = hub
+    return hub
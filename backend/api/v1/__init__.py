@@ -5,6 +5,7 @@ from fastapi import APIRouter
 # Import endpoint routers
 from .endpoints import users, clubs, assets, transactions # Add others as they are created
 from .endpoints import market_data # <--- NEW: Import the market_data router
+from .endpoints import admin
 
 # Create the v1 router
 api_router = APIRouter()
@@ -18,4 +19,6 @@ api_router.include_router(transactions.router, prefix="/clubs/{club_id}/transact
 # Include the new market_data router
 api_router.include_router(market_data.router, prefix="/market", tags=["Market Data"]) # <--- NEW: Include the router
 
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
+
 # Include other routers here (e.g., transactions, members if separated)
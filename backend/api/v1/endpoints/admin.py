@@ -0,0 +1,34 @@
+# backend/api/v1/endpoints/admin.py
+
+import logging
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, status
+
+from backend.api.dependencies import require_platform_admin
+from backend.models import User
+from backend.schemas import NavBatchRequest, NavBatchRun
+from backend.services import nav_batch_service
+
+# Configure logging
+log = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter()
+
+
+# --- Batch NAV Endpoints ---
+
+@router.post("/nav-runs", response_model=NavBatchRun, status_code=status.HTTP_202_ACCEPTED, summary="Start Batch NAV Run", description="Calculates and stores NAV for every club (or the given clubs) in the background. Poll the returned run for per-club progress.")
+async def start_nav_run(run_request: NavBatchRequest = Body(...), current_user: User = Depends(require_platform_admin)):
+    log.info(f"Received request to run batch NAV for {run_request.valuation_date} by platform admin {current_user.id}")
+    run = await nav_batch_service.start_nav_batch(run_request.valuation_date, club_ids=run_request.club_ids, replace=run_request.replace)
+    log.info(f"Started NAV run {run['run_id']}")
+    return run
+
+
+@router.get("/nav-runs/{run_id}", response_model=NavBatchRun, summary="Get Batch NAV Run", description="Progress, totals and per-club results of a batch NAV run (stored, so any worker can answer).", dependencies=[Depends(require_platform_admin)])
+async def get_nav_run(run_id: str = Path(...)):
+    run = await nav_batch_service.get_nav_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"NAV run {run_id} not found.")
+    return run
@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import dependencies, schemas, services, models
 from backend.api.dependencies import get_db_session, get_current_active_user
-from backend.schemas import AssetRead, AssetCreateStock, AssetCreateOption # Import asset schemas
-from backend.services import asset_service # Import the relevant service
+from backend.schemas import AssetRead, AssetCreateStock, AssetCreateOption, SymbolSearchResult # Import asset schemas
+from backend.services import asset_service, symbol_index_service # Import the relevant services
 from backend.models import User, Asset # Import User and Asset models
 
 
@@ -82,6 +82,24 @@ async def get_or_create_option(
         )
 
 
+@router.get(
+    "/search",
+    response_model=List[SymbolSearchResult],
+    summary="Search Symbols",
+    description="Prefix and fuzzy search on ticker symbols and company names from the local symbol index (no upstream call). Existing assets rank first. Accessible by any authenticated user.",
+)
+async def search_symbols(
+    q: str = Query(..., min_length=1, max_length=64, description="Symbol or company name prefix"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_active_user) # Ensure user is authenticated
+):
+    """
+    API endpoint for symbol autocomplete.
+    """
+    return await symbol_index_service.search_symbols(db=db, query=q, limit=limit)
+
+
 @router.get(
     "",
     response_model=List[AssetRead],
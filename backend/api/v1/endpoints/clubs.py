@@ -6,14 +6,15 @@ from typing import List, Any, Sequence, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, Field, conlist
 
 # Import dependencies, schemas, services, models
 from backend.api.dependencies import (
     get_db_session, get_current_active_user,
-    require_club_admin, require_club_member
+    require_club_admin, require_club_member, get_portfolio_stream_hub, get_etf_holdings_provider
 )
 from backend.schemas import (
     ClubCreate, ClubRead, ClubReadBasic, ClubPortfolio, ClubUpdate,
@@ -22,14 +23,18 @@ from backend.schemas import (
     UnitValueHistoryRead,
     FundCreate, FundRead, FundReadBasic, FundUpdate, FundReadDetailed,
     FundSplitRead, FundSplitItem,
-    FundPerformanceHistoryResponse
+    FundPerformanceHistoryResponse,
+    ClubExposureReport
 )
 from backend.services.reporting_service import ClubPerformanceData, MemberStatementData
 from backend.schemas.activity import ActivityFeedItem
 from backend.services import (
     club_service, reporting_service, accounting_service,
-    fund_service, fund_split_service, activity_service # Added activity_service
+    fund_service, fund_split_service, activity_service, # Added activity_service
+    portfolio_stream_service, exposure_service
 )
+from backend.services.portfolio_stream_service import PortfolioStreamHub
+from backend.services.market_data_interface import MarketDataServiceInterface
 from backend.models import User, Club, ClubMembership, MemberTransaction, UnitValueHistory, Fund, FundSplit
 from backend.models.enums import MemberTransactionType, ClubRole
 # Import specific CRUD needed
@@ -135,6 +140,22 @@ async def get_club_portfolio(club_id: uuid.UUID = Path(...), valuation_date: dat
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An internal server error occurred while generating the portfolio report.")
 
 
+@router.get(
+    "/{club_id}/portfolio/stream",
+    summary="Stream Club Portfolio Value",
+    description="Server-Sent Events stream of the club's portfolio totals and per-position market values, pushed whenever fresh quotes change them.",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_club_member)]
+)
+async def stream_club_portfolio(request: Request, club_id: uuid.UUID = Path(...), db: AsyncSession = Depends(get_db_session), hub: PortfolioStreamHub = Depends(get_portfolio_stream_hub)):
+    subscriber = await hub.subscribe(db, club_id)
+    log.info(f"Opened portfolio stream for club {club_id}")
+    return StreamingResponse(
+        portfolio_stream_service.sse_events(hub, subscriber, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{club_id}/performance", response_model=ClubPerformanceData, summary="Get Club Performance Report", description="Retrieves the Holding Period Return (HPR)...", dependencies=[Depends(require_club_member)])
 async def get_club_performance_report(club_id: uuid.UUID = Path(...), start_date: date = Query(...), end_date: date = Query(...), db: AsyncSession = Depends(get_db_session)):
     log.info(f"Received request for performance report for club {club_id} from {start_date} to {end_date}")
@@ -147,6 +168,18 @@ async def get_club_performance_report(club_id: uuid.UUID = Path(...), start_date
         log.exception(f"Unexpected error generating performance report for club {club_id}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An internal server error occurred while generating the performance report.")
 
+@router.get("/{club_id}/exposure", response_model=ClubExposureReport, summary="Get Club Look-Through Exposure", description="Aggregates the club's market value by ticker and sector, expanding ETF positions into their constituents.", dependencies=[Depends(require_club_member)])
+async def get_club_exposure(club_id: uuid.UUID = Path(...), valuation_date: date = Query(default_factory=date.today), db: AsyncSession = Depends(get_db_session), holdings_provider: Optional[MarketDataServiceInterface] = Depends(get_etf_holdings_provider)):
+    log.info(f"Received request for exposure report for club {club_id} on {valuation_date}")
+    try:
+        report_data = await exposure_service.get_club_exposure_report(db=db, club_id=club_id, valuation_date=valuation_date, provider=holdings_provider)
+        log.info(f"Successfully generated exposure report for club {club_id}")
+        return report_data
+    except HTTPException as e: raise e
+    except Exception as e:
+        log.exception(f"Unexpected error generating exposure report for club {club_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An internal server error occurred while generating the exposure report.")
+
 
 # --- Club Membership Endpoints ---
 
@@ -19,6 +19,7 @@ from backend.schemas.market_data import (
     ETFHoldingResponse
 )
 from backend.services.market_data_service import MarketDataService
+from backend.api.dependencies import get_market_data_service
 
 router = APIRouter(prefix="/market-data", tags=["market-data"])
 
@@ -26,7 +27,7 @@ router = APIRouter(prefix="/market-data", tags=["market-data"])
 @router.get("/stocks/{symbol}", response_model=StockQuoteResponse)
 async def get_stock_quote(
     symbol: str,
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """Get current stock quote for a symbol"""
     quote = await market_data_service.get_stock_quote(symbol)
@@ -40,7 +41,7 @@ async def get_stock_historical_data(
     symbol: str,
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """Get historical stock data for a symbol"""
     data = await market_data_service.get_stock_historical_data(
@@ -56,7 +57,7 @@ async def get_stock_historical_data(
 @router.get("/indices/{symbol}", response_model=IndexQuoteResponse)
 async def get_index_quote(
     symbol: str,
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """Get current quote for a market index"""
     quote = await market_data_service.get_index_quote(symbol)
@@ -69,7 +70,7 @@ async def get_index_quote(
 async def get_forex_rate(
     base: str,
     quote: str,
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """Get current forex exchange rate"""
     rate = await market_data_service.get_forex_rate(base, quote)
@@ -84,7 +85,7 @@ async def get_forex_rate(
 @router.get("/commodities/{commodity_name}", response_model=CommodityPriceResponse)
 async def get_commodity_price(
     commodity_name: str,
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get current commodity price
@@ -106,7 +107,7 @@ async def get_historical_commodity_prices(
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
     frequency: Optional[str] = Query(None, description="Data frequency (daily, weekly, monthly)"),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get historical commodity prices
@@ -130,7 +131,7 @@ async def get_company_ratings(
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
     rated: Optional[str] = Query(None, description="Filter by rating (buy, sell, hold)"),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get company analyst ratings
@@ -152,7 +153,7 @@ async def get_company_ratings(
 async def list_stock_market_indexes(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get a list of all available stock market indexes/benchmarks
@@ -168,7 +169,7 @@ async def list_stock_market_indexes(
 async def list_bond_countries(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get a list of bond-issuing countries
@@ -182,7 +183,7 @@ async def list_bond_countries(
 @router.get("/bonds/{country}", response_model=BondInfoResponse)
 async def get_bond_info(
     country: str,
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get specific bond info for a country
@@ -202,7 +203,7 @@ async def get_bond_info(
 async def list_etfs(
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get a list of ETFs
@@ -218,7 +219,7 @@ async def get_etf_holdings(
     ticker: str,
     from_date: Optional[date] = Query(None, alias="from"),
     to_date: Optional[date] = Query(None, alias="to"),
-    market_data_service: MarketDataService = Depends(lambda: MarketDataService()),
+    market_data_service: MarketDataService = Depends(get_market_data_service),
 ):
     """
     Get detailed ETF holdings
@@ -0,0 +1,128 @@
+# backend/core/exposure.py
+
+"""
+Look-through exposure: fund positions expanded into their constituents.
+
+- A fund's breakdown is its holdings and sector weights normalized once into
+  fractions of its value (provider percentages are detected and scaled). The
+  share the listed holdings do not cover goes to OTHER_HOLDINGS and
+  UNCLASSIFIED_SECTOR, so expanded values add back up to the position's value.
+- look_through() lays out one row per (position, ticker) and (position, sector)
+  pair and sums all rows per key in one pass: with NumPy the position values
+  are spread with np.repeat and summed with np.bincount, without it a plain
+  loop is used.
+- Positions without a breakdown (plain stocks, options) count as direct
+  exposure to their own symbol, in UNCLASSIFIED_SECTOR.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try: # Optional dependency
+    import numpy as np
+except ImportError:
+    np = None
+
+OTHER_HOLDINGS = "(other holdings)"
+UNCLASSIFIED_SECTOR = "Unclassified"
+# Weights summing past this are percentages (e.g. 7.1 for 7.1%)
+PERCENT_WEIGHT_THRESHOLD = 1.5
+# Uncovered shares smaller than this are rounding noise, not a residual
+RESIDUAL_EPSILON = 1e-6
+
+# (tickers, ticker weights, sectors, sector weights); weights are fractions summing to 1
+Breakdown = Tuple[Tuple[str, ...], Tuple[float, ...], Tuple[str, ...], Tuple[float, ...]]
+
+
+def _fractions(pairs: Sequence[Tuple[str, float]], residual_key: str) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    """Merges repeated keys, scales weights to fractions and adds the uncovered share under `residual_key`."""
+    merged: Dict[str, float] = {}
+    for key, weight in pairs:
+        key = (key or "").strip()
+        if not key or weight is None or not math.isfinite(weight) or weight <= 0:
+            continue
+        merged[key] = merged.get(key, 0.0) + float(weight)
+    total = sum(merged.values())
+    scale = 0.01 if total > PERCENT_WEIGHT_THRESHOLD else 1.0
+    if total * scale > 1.0:
+        scale = 1.0 / total # Over-reported (rounding, leverage): cap at the position's value
+    keys = list(merged)
+    weights = [merged[key] * scale for key in keys]
+    residual = 1.0 - sum(weights)
+    if residual > RESIDUAL_EPSILON:
+        keys.append(residual_key)
+        weights.append(residual)
+    return tuple(keys), tuple(weights)
+
+
+def make_breakdown(holdings: Sequence[Tuple[str, float]], sector_weights: Sequence[Tuple[str, float]]) -> Optional[Breakdown]:
+    """
+    Breakdown of a fund from (ticker, weight) holdings and (sector, weight) pairs,
+    or None if it lists no holdings (not a fund, or nothing known about it).
+    """
+    tickers, ticker_weights = _fractions([((ticker or "").upper(), weight) for ticker, weight in holdings], OTHER_HOLDINGS)
+    if not tickers or tickers == (OTHER_HOLDINGS,):
+        return None
+    sectors, weights = _fractions(sector_weights, UNCLASSIFIED_SECTOR)
+    return tickers, ticker_weights, sectors, weights
+
+
+def look_through(
+    positions: Sequence[Tuple[str, float]],
+    breakdowns: Dict[str, Breakdown],
+    use_numpy: Optional[bool] = None
+) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, float]]:
+    """
+    Aggregates (symbol, market value) positions by ticker and by sector, expanding
+    positions whose symbol has a breakdown. Returns ({ticker: (direct value,
+    value through funds)}, {sector: value}). `use_numpy` defaults to whether NumPy
+    is installed.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    # Row layout: for each position, its ticker rows then its sector rows
+    codes: Dict[Tuple[bool, str], int] = {} # (is_sector, key) -> code
+    row_codes: List[int] = []
+    row_weights: List[float] = []
+    row_direct: List[bool] = []
+    row_counts: List[int] = []
+    for symbol, _ in positions:
+        breakdown = breakdowns.get(symbol)
+        if breakdown is None:
+            rows = [((False, symbol), 1.0, True), ((True, UNCLASSIFIED_SECTOR), 1.0, False)]
+        else:
+            tickers, ticker_weights, sectors, sector_weights = breakdown
+            rows = [((False, ticker), weight, False) for ticker, weight in zip(tickers, ticker_weights)]
+            rows += [((True, sector), weight, False) for sector, weight in zip(sectors, sector_weights)]
+        for key, weight, direct in rows:
+            row_codes.append(codes.setdefault(key, len(codes)))
+            row_weights.append(weight)
+            row_direct.append(direct)
+        row_counts.append(len(rows))
+
+    if use_numpy:
+        values = np.repeat(np.asarray([value for _, value in positions], dtype=np.float64), row_counts)
+        amounts = values * np.asarray(row_weights, dtype=np.float64)
+        code_array = np.asarray(row_codes, dtype=np.intp)
+        totals = np.bincount(code_array, weights=amounts, minlength=len(codes)).tolist()
+        direct_totals = np.bincount(code_array, weights=np.where(np.asarray(row_direct, dtype=bool), amounts, 0.0), minlength=len(codes)).tolist()
+    else:
+        totals = [0.0] * len(codes)
+        direct_totals = [0.0] * len(codes)
+        row = 0
+        for (_, value), count in zip(positions, row_counts):
+            for code, weight, direct in zip(row_codes[row:row + count], row_weights[row:row + count], row_direct[row:row + count]):
+                amount = value * weight
+                totals[code] += amount
+                if direct:
+                    direct_totals[code] += amount
+            row += count
+
+    by_ticker: Dict[str, Tuple[float, float]] = {}
+    by_sector: Dict[str, float] = {}
+    for (is_sector, key), code in codes.items():
+        if is_sector:
+            by_sector[key] = totals[code]
+        else:
+            by_ticker[key] = (direct_totals[code], totals[code] - direct_totals[code])
+    return by_ticker, by_sector
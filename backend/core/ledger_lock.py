@@ -0,0 +1,84 @@
+# backend/core/ledger_lock.py
+
+"""
+Per-club serialization of ledger writes (unit issuance and cash movements).
+
+- lock_club_ledger() takes a Postgres transaction-level advisory lock keyed by
+  the club, so every read-check-write on a club's units and balances runs one
+  at a time across all workers, until the caller's transaction commits or
+  rolls back. Different clubs use different keys and never wait on each other.
+- Within one worker, callers for the same club first queue on an asyncio.Lock
+  that is released together with the advisory lock. Waiters then do not hold
+  a Postgres backend blocked on the lock, and a session that already holds a
+  club's lock does not ask Postgres for it again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+import weakref
+from typing import Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+
+log = logging.getLogger(__name__)
+
+# --- Ledger Lock Configuration ---
+# Queue same-club writers of one worker in-process before they reach Postgres (0 disables)
+LEDGER_LOCAL_LOCKS = os.getenv("LEDGER_LOCAL_LOCKS", "1").lower() not in ("0", "false", "no")
+
+# session.info key: club_id -> local lock (or None) held until the transaction ends
+_HELD_KEY = "club_ledger_locks"
+
+# club_id -> asyncio.Lock, alive while a session holds it or a caller waits on it
+_local_locks: "weakref.WeakValueDictionary[uuid.UUID, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def advisory_lock_key(club_id: uuid.UUID) -> int:
+    """Signed 64-bit advisory lock key for a club, namespaced away from other advisory lock users."""
+    digest = hashlib.blake2b(b"club-ledger:" + club_id.bytes, digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _release_held(session: Session, transaction: SessionTransaction) -> None:
+    # Postgres drops xact locks when the outermost transaction ends; savepoints keep them
+    if transaction.parent is not None:
+        return
+    held: Dict[uuid.UUID, Optional[asyncio.Lock]] = session.info.pop(_HELD_KEY, {})
+    for local_lock in held.values():
+        if local_lock is not None:
+            local_lock.release()
+
+
+async def lock_club_ledger(db: AsyncSession, club_id: uuid.UUID) -> None:
+    """
+    Serializes the club's ledger until the current transaction of `db` ends.
+
+    Call before reading the balances a write depends on. Re-entrant within one
+    transaction; callers must commit or roll back (closing the session does).
+    """
+    sync_session = db.sync_session
+    held = sync_session.info.get(_HELD_KEY)
+    if held is not None and club_id in held:
+        return
+    if not event.contains(sync_session, "after_transaction_end", _release_held):
+        event.listen(sync_session, "after_transaction_end", _release_held)
+
+    local_lock = None
+    if LEDGER_LOCAL_LOCKS:
+        local_lock = _local_locks.get(club_id)
+        if local_lock is None:
+            local_lock = _local_locks[club_id] = asyncio.Lock()
+        await local_lock.acquire()
+    try:
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_lock_key(club_id)})
+    except BaseException:
+        if local_lock is not None:
+            local_lock.release()
+        raise
+    sync_session.info.setdefault(_HELD_KEY, {})[club_id] = local_lock
+    log.debug(f"Acquired ledger lock for club {club_id}")
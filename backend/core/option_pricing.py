@@ -0,0 +1,247 @@
+# backend/core/option_pricing.py
+
+"""
+Batch European option pricing (Black-Scholes and Black-76).
+
+- Every function takes parallel sequences (one entry per contract) and prices the
+  whole batch in one pass: with NumPy the formulas run as array expressions,
+  without it a plain loop over math.erf/math.exp is used.
+- The NumPy kernel's normal CDF is scipy.special.ndtr when SciPy is installed,
+  otherwise W. J. Cody's rational erf/erfc approximations evaluated on arrays
+  (relative error near machine precision, like math.erf).
+- Black-Scholes (spot, continuous dividend yield) is priced as Black-76 on the
+  forward F = S * exp((r - q) * T); both share one kernel.
+- Contracts that cannot be priced by the model (expired, no volatility, no
+  underlying price) get their intrinsic value instead; see model_priced_mask().
+- Prices are per share of underlying; apply the contract multiplier in the caller.
+"""
+
+import math
+from typing import List, Optional, Sequence
+
+try: # Optional dependency
+    import numpy as np
+except ImportError:
+    np = None
+
+try: # Optional dependency: array normal CDF for the NumPy kernel
+    from scipy.special import ndtr as _scipy_ndtr
+except ImportError:
+    _scipy_ndtr = None
+
+SQRT_2 = math.sqrt(2.0)
+
+
+def _model_inputs_valid(spot: Optional[float], strike: float, years: float, volatility: Optional[float]) -> bool:
+    return (
+        spot is not None and spot > 0
+        and strike > 0
+        and years > 0
+        and volatility is not None and volatility > 0
+    )
+
+
+def model_priced_mask(
+    spots: Sequence[Optional[float]],
+    strikes: Sequence[float],
+    years: Sequence[float],
+    volatilities: Sequence[Optional[float]]
+) -> List[bool]:
+    """True where the model is used, False where the intrinsic value fallback applies."""
+    return [_model_inputs_valid(s, k, t, v) for s, k, t, v in zip(spots, strikes, years, volatilities)]
+
+
+def _intrinsic(underlying: Optional[float], strike: float, is_call: bool) -> float:
+    if underlying is None:
+        return 0.0
+    return max(underlying - strike, 0.0) if is_call else max(strike - underlying, 0.0)
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / SQRT_2))
+
+
+def _black76_python(forwards, strikes, years, volatilities, rates, is_call) -> List[float]:
+    prices = []
+    for f, k, t, v, r, call in zip(forwards, strikes, years, volatilities, rates, is_call):
+        if not _model_inputs_valid(f, k, t, v):
+            prices.append(_intrinsic(f, k, call) * (math.exp(-r * t) if t > 0 else 1.0))
+            continue
+        vol_sqrt_t = v * math.sqrt(t)
+        d1 = (math.log(f / k) + 0.5 * vol_sqrt_t * vol_sqrt_t) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
+        discount = math.exp(-r * t)
+        if call:
+            prices.append(discount * (f * _norm_cdf(d1) - k * _norm_cdf(d2)))
+        else:
+            prices.append(discount * (k * _norm_cdf(-d2) - f * _norm_cdf(-d1)))
+    return prices
+
+
+# W. J. Cody, "Rational Chebyshev approximations for the error function" (1969),
+# coefficients as in his CALERF routine (netlib specfun)
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02, 3.20937758913846947e03, 1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03, 2.84423683343917062e03)
+_ERFC_C = (
+    5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01, 2.98635138197400131e02,
+    8.81952221241769090e02, 1.71204761263407058e03, 2.05107837782607147e03, 1.23033935479799725e03, 2.15311535474403846e-8
+)
+_ERFC_D = (
+    1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02, 1.62138957456669019e03,
+    3.29079923573345963e03, 4.36261909014324716e03, 3.43936767414372164e03, 1.23033935480374942e03
+)
+_ERFC_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1, 1.60837851487422766e-2, 6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERFC_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1, 6.05183413124413191e-2, 2.33520497626869185e-3)
+_ERF_THRESHOLD = 0.46875
+_INV_SQRT_PI = 5.6418958354775628695e-1
+
+
+def _erf_small(x):
+    """erf(x) for |x| <= 0.46875."""
+    y = x * x
+    numerator, denominator = _ERF_A[4] * y, y
+    for a, b in zip(_ERF_A[:3], _ERF_B[:3]):
+        numerator, denominator = (numerator + a) * y, (denominator + b) * y
+    return x * (numerator + _ERF_A[3]) / (denominator + _ERF_B[3])
+
+
+def _erfc_large(y):
+    """erfc(y) for y > 0.46875."""
+    result = np.empty_like(y)
+    mid = y <= 4.0
+    y_mid = y[mid]
+    numerator, denominator = _ERFC_C[8] * y_mid, y_mid
+    for c, d in zip(_ERFC_C[:7], _ERFC_D[:7]):
+        numerator, denominator = (numerator + c) * y_mid, (denominator + d) * y_mid
+    result[mid] = (numerator + _ERFC_C[7]) / (denominator + _ERFC_D[7])
+
+    tail = ~mid
+    y_tail = y[tail]
+    z = 1.0 / (y_tail * y_tail)
+    numerator, denominator = _ERFC_P[5] * z, z
+    for p, q in zip(_ERFC_P[:4], _ERFC_Q[:4]):
+        numerator, denominator = (numerator + p) * z, (denominator + q) * z
+    result[tail] = (_INV_SQRT_PI - z * (numerator + _ERFC_P[4]) / (denominator + _ERFC_Q[4])) / y_tail
+
+    # exp(-y^2) split as exp(-r^2) * exp(-(y - r)(y + r)) with r = y rounded down to 1/16, to limit rounding
+    rounded = np.trunc(y * 16.0) / 16.0
+    return np.exp(-rounded * rounded) * np.exp(-(y - rounded) * (y + rounded)) * result
+
+
+def _ndtr_cody(x):
+    """Standard normal CDF of an array, from Cody's erf/erfc (no SciPy needed)."""
+    z = np.asarray(x, dtype=np.float64) / SQRT_2
+    result = np.empty_like(z)
+    small = np.abs(z) <= _ERF_THRESHOLD
+    result[small] = 0.5 * (1.0 + _erf_small(z[small]))
+    large = ~small
+    z_large = z[large]
+    tail = 0.5 * _erfc_large(np.abs(z_large)) # Upper tail beyond |z|
+    result[large] = np.where(z_large > 0, 1.0 - tail, tail)
+    return result
+
+
+def _norm_cdf_numpy(x):
+    return _scipy_ndtr(x) if _scipy_ndtr is not None else _ndtr_cody(x)
+
+
+def _floats(values):
+    return np.asarray(values, dtype=np.float64) # None -> NaN
+
+
+def _black76_numpy(forwards, strikes, years, volatilities, rates, is_call):
+    """Array version of _black76_python; returns an ndarray."""
+    f, k, t, v, r = _floats(forwards), _floats(strikes), _floats(years), _floats(volatilities), _floats(rates)
+    call = np.asarray(is_call, dtype=bool)
+
+    valid = (f > 0) & (k > 0) & (t > 0) & (v > 0) # NaN compares False
+    discount = np.exp(-r * np.maximum(t, 0.0))
+    f_known = np.nan_to_num(f, nan=0.0)
+    intrinsic = np.where(call, np.maximum(f_known - k, 0.0), np.maximum(k - f_known, 0.0)) * discount
+
+    # Evaluate the model on safe placeholder inputs where it does not apply, then mask
+    safe_f = np.where(valid, f, 1.0)
+    safe_k = np.where(valid, k, 1.0)
+    vol_sqrt_t = np.where(valid, v * np.sqrt(np.where(valid, t, 1.0)), 1.0)
+    d1 = (np.log(safe_f / safe_k) + 0.5 * vol_sqrt_t * vol_sqrt_t) / vol_sqrt_t
+    d2 = d1 - vol_sqrt_t
+    # Call: D * (F N(d1) - K N(d2)); put: D * (K N(-d2) - F N(-d1)) = -D * (F N(-d1) - K N(-d2))
+    sign = np.where(call, 1.0, -1.0)
+    model_prices = sign * discount * (safe_f * _norm_cdf_numpy(sign * d1) - safe_k * _norm_cdf_numpy(sign * d2))
+    return np.where(valid, model_prices, intrinsic)
+
+
+def black76_prices(
+    forwards: Sequence[Optional[float]],
+    strikes: Sequence[float],
+    years: Sequence[float],
+    volatilities: Sequence[Optional[float]],
+    rates: Sequence[float],
+    is_call: Sequence[bool],
+    use_numpy: Optional[bool] = None
+) -> List[float]:
+    """
+    Black-76 prices for a batch of European options on forwards.
+
+    `years` is the time to expiry in years, `volatilities` and `rates` are annual
+    (continuously compounded). Entries the model cannot price get the discounted
+    intrinsic value (0 when the forward is unknown). `use_numpy` defaults to
+    NumPy when it is installed.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("numpy is not installed")
+    if use_numpy:
+        return _black76_numpy(forwards, strikes, years, volatilities, rates, is_call).tolist()
+    return _black76_python(forwards, strikes, years, volatilities, rates, is_call)
+
+
+def black_scholes_prices(
+    spots: Sequence[Optional[float]],
+    strikes: Sequence[float],
+    years: Sequence[float],
+    volatilities: Sequence[Optional[float]],
+    rates: Sequence[float],
+    is_call: Sequence[bool],
+    dividend_yields: Optional[Sequence[float]] = None,
+    use_numpy: Optional[bool] = None
+) -> List[float]:
+    """
+    Black-Scholes(-Merton) prices for a batch of European options on a spot price.
+
+    Entries the model cannot price (expired, no volatility, no spot) get the
+    undiscounted intrinsic value max(S - K, 0) / max(K - S, 0).
+    """
+    dividend_yields = dividend_yields if dividend_yields is not None else [0.0] * len(strikes)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        s, k, t, v, r, q = (_floats(x) for x in (spots, strikes, years, volatilities, rates, dividend_yields))
+        call = np.asarray(is_call, dtype=bool)
+        forwards = np.where(t > 0, s * np.exp((r - q) * np.maximum(t, 0.0)), s)
+        valid = (s > 0) & (k > 0) & (t > 0) & (v > 0) # NaN compares False
+        s_known = np.nan_to_num(s, nan=0.0)
+        intrinsic = np.where(call, np.maximum(s_known - k, 0.0), np.maximum(k - s_known, 0.0))
+        return np.where(valid, _black76_numpy(forwards, k, t, v, r, call), intrinsic).tolist()
+    forwards = [
+        None if s is None else (s * math.exp((r - q) * t) if t > 0 else s)
+        for s, t, r, q in zip(spots, years, rates, dividend_yields)
+    ]
+    prices = _black76_python(forwards, strikes, years, volatilities, rates, is_call)
+    # Fallback entries must be plain intrinsic value on the spot (no forward/discounting)
+    for i, priced in enumerate(model_priced_mask(spots, strikes, years, volatilities)):
+        if not priced:
+            prices[i] = _intrinsic(spots[i], strikes[i], is_call[i])
+    return prices
+
+
+def intrinsic_values(
+    underlyings: Sequence[Optional[float]],
+    strikes: Sequence[float],
+    is_call: Sequence[bool]
+) -> List[float]:
+    """max(S - K, 0) for calls, max(K - S, 0) for puts; 0 when the underlying price is unknown."""
+    return [_intrinsic(s, k, call) for s, k, call in zip(underlyings, strikes, is_call)]
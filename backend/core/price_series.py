@@ -0,0 +1,189 @@
+# backend/core/price_series.py
+
+"""
+Columnar daily price series for analytics and charting.
+
+- PriceSeries keeps one symbol's EOD rows as typed arrays: dates as int32 day
+  ordinals (date.toordinal()), prices as float64 and volumes as int64.
+- parse_eod_records() fills series straight from MarketStack /eod JSON records,
+  without building a HistoricalPricePoint per row.
+- NumPy is optional: to_numpy() returns zero-copy views when it is installed.
+- Pydantic models are only built at the API edge (to_points()).
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try: # Optional dependency
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.schemas.market_data import HistoricalPricePoint
+
+# Column name -> array typecode ('d' float64, 'q' int64)
+PRICE_COLUMNS: Dict[str, str] = {
+    "open": "d",
+    "high": "d",
+    "low": "d",
+    "close": "d",
+    "volume": "q",
+    "adj_open": "d",
+    "adj_high": "d",
+    "adj_low": "d",
+    "adj_close": "d",
+    "adj_volume": "q",
+    "split_factor": "d",
+    "dividend": "d",
+}
+_DEFAULTS = {"split_factor": 1.0}
+
+
+def _day_ordinal(value: str) -> int:
+    """'2024-03-15T00:00:00+0000' (or '2024-03-15') -> date ordinal, without full datetime parsing."""
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal()
+
+
+class PriceSeries:
+    """One symbol's daily prices, stored column-wise."""
+
+    __slots__ = ("symbol", "exchange", "name", "asset_type", "price_currency", "dates", "columns")
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: str = "",
+        name: str = "",
+        asset_type: str = "Stock",
+        price_currency: str = "usd"
+    ):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.name = name
+        self.asset_type = asset_type
+        self.price_currency = price_currency
+        self.dates = array("i")
+        self.columns: Dict[str, array] = {column: array(code) for column, code in PRICE_COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getattr__(self, column: str) -> array:
+        # series.close, series.adj_close, ... (only called for names not in __slots__)
+        if column == "columns":
+            raise AttributeError(column)
+        try:
+            return self.columns[column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def __repr__(self) -> str:
+        return f"<PriceSeries(symbol='{self.symbol}', rows={len(self)})>"
+
+    # --- Building ---
+
+    def append_record(self, record: Dict[str, Any]) -> None:
+        """Appends one MarketStack EOD record (a dict from the JSON payload)."""
+        self.dates.append(_day_ordinal(record["date"]))
+        for column, values in self.columns.items():
+            value = record.get(column)
+            if value is None:
+                value = _DEFAULTS.get(column, 0)
+            values.append(float(value) if values.typecode == "d" else int(value))
+
+    def sort(self) -> None:
+        """Sorts rows by date if they are not already in order (pages can arrive out of order)."""
+        dates = self.dates
+        if all(dates[i] <= dates[i + 1] for i in range(len(dates) - 1)):
+            return
+        order = sorted(range(len(dates)), key=dates.__getitem__)
+        self.dates = array("i", (dates[i] for i in order))
+        for column, values in self.columns.items():
+            self.columns[column] = array(values.typecode, (values[i] for i in order))
+
+    @classmethod
+    def from_points(cls, symbol: str, points: Sequence[HistoricalPricePoint]) -> "PriceSeries":
+        """Builds a series from existing HistoricalPricePoint models (for providers without a raw parser)."""
+        first = points[0] if points else None
+        series = cls(
+            symbol,
+            exchange=first.exchange if first else "",
+            name=first.name if first else "",
+            asset_type=first.asset_type if first else "Stock",
+            price_currency=first.price_currency if first else "usd"
+        )
+        for point in points:
+            series.dates.append(point.date.date().toordinal())
+            for column, values in series.columns.items():
+                values.append(getattr(point, column))
+        series.sort()
+        return series
+
+    # --- Reading ---
+
+    def iter_dates(self) -> Iterator[date]:
+        return (date.fromordinal(ordinal) for ordinal in self.dates)
+
+    def between(self, from_date: date, to_date: date) -> "PriceSeries":
+        """Rows with from_date <= date <= to_date (the series must be sorted)."""
+        start = bisect_left(self.dates, from_date.toordinal())
+        stop = bisect_right(self.dates, to_date.toordinal())
+        sliced = PriceSeries(self.symbol, self.exchange, self.name, self.asset_type, self.price_currency)
+        sliced.dates = self.dates[start:stop]
+        sliced.columns = {column: values[start:stop] for column, values in self.columns.items()}
+        return sliced
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Zero-copy NumPy views of the dates and every column. Requires numpy."""
+        if np is None:
+            raise RuntimeError("numpy is not installed; use the array columns directly")
+        views = {"dates": np.frombuffer(self.dates, dtype=np.int32)}
+        for column, values in self.columns.items():
+            views[column] = np.frombuffer(values, dtype=np.float64 if values.typecode == "d" else np.int64)
+        return views
+
+    def to_points(self) -> List[HistoricalPricePoint]:
+        """Builds HistoricalPricePoint models; meant for API responses only."""
+        points = []
+        for i, ordinal in enumerate(self.dates):
+            day = date.fromordinal(ordinal)
+            row = {column: values[i] for column, values in self.columns.items()}
+            points.append(HistoricalPricePoint(
+                date=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+                symbol=self.symbol,
+                exchange=self.exchange,
+                name=self.name,
+                asset_type=self.asset_type,
+                price_currency=self.price_currency,
+                **row
+            ))
+        return points
+
+
+def parse_eod_records(
+    records: Iterable[Dict[str, Any]],
+    series_by_symbol: Optional[Dict[str, PriceSeries]] = None
+) -> Dict[str, PriceSeries]:
+    """
+    Appends MarketStack /eod records to per-symbol series (created on first sight;
+    pass pre-created empty series to get an entry even for symbols without data).
+
+    Pass the same dict for every page of a paginated response, then call sort()
+    on each series once all pages are in.
+    """
+    series_by_symbol = {} if series_by_symbol is None else series_by_symbol
+    for record in records:
+        symbol = (record.get("symbol") or "").upper()
+        series = series_by_symbol.get(symbol)
+        if series is None:
+            series = series_by_symbol[symbol] = PriceSeries(symbol)
+        if not series:
+            # Metadata comes from the first record (series may be pre-created empty)
+            series.exchange = record.get("exchange") or ""
+            series.name = record.get("name") or ""
+            series.asset_type = record.get("asset_type") or "Stock"
+            series.price_currency = record.get("price_currency") or "usd"
+        series.append_record(record)
+    return series_by_symbol
@@ -0,0 +1,78 @@
+# backend/core/rate_limit.py
+
+"""
+Client-side rate limiting primitives shared by the market data code paths.
+
+- TokenBucket: async token bucket used to keep outbound API calls within a
+  provider's quota. Callers `acquire()` a token before each upstream request.
+- Does NOT perform any I/O itself; it only paces the caller.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at `rate` tokens per second up to `capacity`.
+    `acquire()` waits until a token is available, or gives up after `timeout`
+    seconds and returns False so the caller can report the request as rate limited.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, calls_per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        """Builds a bucket from a calls-per-minute quota (the unit most vendors publish)."""
+        return cls(rate=calls_per_minute / 60.0, capacity=burst if burst is not None else max(calls_per_minute / 60.0, 1.0))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    @property
+    def available_tokens(self) -> float:
+        """Current (refilled) token count. Mainly useful for logging and tests."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Takes `tokens` from the bucket, waiting for refill if needed.
+
+        Returns True once the tokens were taken, or False if they could not be
+        obtained within `timeout` seconds (None waits indefinitely).
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # The lock serializes waiters so tokens are handed out in FIFO order.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait_for = (tokens - self._tokens) / self.rate
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or wait_for > remaining:
+                        log.debug(f"TokenBucket: could not acquire {tokens} token(s) within {timeout}s.")
+                        return False
+                await asyncio.sleep(wait_for)
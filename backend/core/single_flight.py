@@ -0,0 +1,160 @@
+# backend/core/single_flight.py
+
+"""
+Request coalescing ("single-flight") for identical concurrent upstream calls.
+
+- SingleFlight: within one process, concurrent callers with the same key await a
+  single execution and share its result or its exception.
+- RedisSingleFlight: additionally coordinates workers through a Redis lock; the
+  worker holding the lock publishes its JSON result for the others to pick up.
+- Callers decide what a key is (e.g. endpoint + normalized params).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import HTTPException
+
+try: # Optional dependency: only needed for cross-worker coalescing
+    from redis.exceptions import RedisError
+except ImportError: # pragma: no cover - redis is in requirements.txt
+    RedisError = OSError
+
+log = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """In-process single-flight group. `coalesced` counts callers that did not execute."""
+
+    def __init__(self):
+        # key -> {"task": the shared call, "waiters": callers still awaiting it}
+        self._inflight: Dict[Hashable, Dict[str, Any]] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+    def _forget(self, key: Hashable, call: Dict[str, Any]) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `fn` unless a call with the same key is already in flight, in which case its outcome is shared.
+
+        The call runs in its own task, so a cancelled caller (the one that started
+        it included) only stops waiting; the call is cancelled once no caller waits.
+        """
+        call = self._inflight.get(key)
+        if call is None:
+            task = asyncio.ensure_future(self._execute(key, fn))
+            call = self._inflight[key] = {"task": task, "waiters": 0}
+            task.add_done_callback(lambda done, key=key, call=call: self._done(key, call, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        call["waiters"] += 1
+        try:
+            # shield: a cancelled caller must not cancel the call the others wait on
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                self._forget(key, call)
+                call["task"].cancel()
+
+    def _done(self, key: Hashable, call: Dict[str, Any], task: asyncio.Task) -> None:
+        self._forget(key, call)
+        if not task.cancelled():
+            task.exception() # Mark retrieved so a call whose callers all left does not log "never retrieved"
+
+    async def _execute(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await fn()
+
+
+class RedisSingleFlight(SingleFlight):
+    """
+    Single-flight across workers. The first worker to take `lock:<key>` (SET NX PX)
+    executes and publishes the outcome under `result:<key>` for `result_ttl` seconds;
+    other workers poll for it. Results must be JSON-serializable; HTTPExceptions are
+    shared by status code and detail. If Redis fails, or the lock holder does not
+    publish before the lock expires, the caller executes the call itself.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        key_prefix: str = "singleflight",
+        lock_ttl: float = 10.0,
+        result_ttl: float = 5.0,
+        poll_interval: float = 0.05
+    ):
+        super().__init__()
+        self.client = client
+        self.key_prefix = key_prefix
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+
+    def _redis_keys(self, key: Hashable) -> tuple:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f"{self.key_prefix}:lock:{digest}", f"{self.key_prefix}:result:{digest}"
+
+    @staticmethod
+    def _decode(payload: bytes) -> Any:
+        outcome = json.loads(payload)
+        if "error" in outcome:
+            raise HTTPException(status_code=outcome["error"], detail=outcome.get("detail"))
+        return outcome["ok"]
+
+    async def _publish(self, result_key: str, outcome: Dict[str, Any]) -> None:
+        try:
+            await self.client.set(result_key, json.dumps(outcome, separators=(",", ":")), px=int(self.result_ttl * 1000))
+        except (RedisError, OSError, TypeError, ValueError) as e:
+            log.debug(f"Could not publish single-flight result {result_key}: {e}")
+
+    async def _execute(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key, result_key = self._redis_keys(key)
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except (RedisError, OSError) as e:
+            log.warning(f"Redis single-flight unavailable ({e!r}); executing locally.")
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+            except HTTPException as e:
+                await self._publish(result_key, {"error": e.status_code, "detail": e.detail})
+                raise
+            else:
+                await self._publish(result_key, {"ok": result})
+                return result
+            finally:
+                try:
+                    if await self.client.get(lock_key) in (token, token.encode()):
+                        await self.client.delete(lock_key)
+                except (RedisError, OSError) as e:
+                    log.debug(f"Could not release single-flight lock {lock_key}: {e}")
+
+        # Another worker holds the lock: wait for its outcome
+        deadline = time.monotonic() + self.lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                payload = await self.client.get(result_key)
+                if payload is not None:
+                    self.coalesced += 1
+                    return self._decode(payload)
+                if not await self.client.exists(lock_key):
+                    break
+        except (RedisError, OSError) as e:
+            log.warning(f"Redis single-flight unavailable while waiting ({e!r}); executing locally.")
+        return await fn()
@@ -0,0 +1,192 @@
+# backend/core/symbol_index.py
+
+"""
+In-memory symbol search over a ticker list (prefix and fuzzy matches).
+
+- Symbols and name words are kept in sorted arrays; prefix matches are a
+  bisect plus a short scan. Exact and one-edit ("fuzzy") matches are dict
+  lookups of the query's edit variants, so no query scans the whole list.
+  Fuzzy matches are only looked for when the other tiers found too few results.
+- Entries flagged as known assets (rows of the assets table) rank right after an
+  exact symbol match, ahead of everything else. Their symbols and name words are
+  also kept in arrays of their own and scanned first, so a long run of
+  alphabetically earlier tickers cannot crowd them out of the candidates.
+- The index is immutable: build a new one and swap the reference to refresh it.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Match tiers, best first
+MATCH_EXACT = 0
+MATCH_SYMBOL_PREFIX = 1
+MATCH_NAME_PREFIX = 2
+MATCH_FUZZY = 3
+MATCH_NAMES = {MATCH_EXACT: "exact", MATCH_SYMBOL_PREFIX: "symbol_prefix", MATCH_NAME_PREFIX: "name_prefix", MATCH_FUZZY: "fuzzy"}
+
+# Prefix scans stop after this many candidates per requested result
+CANDIDATES_PER_RESULT = 4
+# Queries shorter than this get no fuzzy matches (everything is one edit away)
+FUZZY_MIN_LENGTH = 3
+FUZZY_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789."
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+def _prefix_scan(keys: Sequence[str], values: Sequence[int], prefix: str, cap: int) -> List[int]:
+    """values[i] for the first `cap` sorted keys starting with `prefix`."""
+    start = bisect_left(keys, prefix)
+    matches = []
+    for position in range(start, len(keys)):
+        if len(matches) >= cap or not keys[position].startswith(prefix):
+            break
+        matches.append(values[position])
+    return matches
+
+
+def _one_edit_variants(word: str) -> set:
+    """Strings one deletion, substitution, insertion or transposition away from `word` (lowercase)."""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = {left + right[1:] for left, right in splits if right}
+    variants |= {left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1}
+    variants |= {left + c + right[1:] for left, right in splits if right for c in FUZZY_ALPHABET}
+    variants |= {left + c + right for left, right in splits for c in FUZZY_ALPHABET}
+    variants.discard(word)
+    return variants
+
+
+class SymbolIndex:
+    """
+    Searchable set of (symbol, name, exchange_mic, asset_type, asset_id) entries.
+    One entry per symbol: a known asset's entry wins over ticker list rows, and
+    among ticker list rows the first one with a name is kept.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]]):
+        by_symbol: Dict[str, Tuple] = {}
+        for symbol, name, exchange_mic, asset_type, asset_id in entries:
+            symbol = (symbol or "").strip().upper()
+            if not symbol:
+                continue
+            current = by_symbol.get(symbol)
+            if current is None or (asset_id and not current[4]):
+                by_symbol[symbol] = (symbol, name or (current[1] if current else None), exchange_mic or None, asset_type, asset_id)
+            elif not current[1] and name:
+                by_symbol[symbol] = current[:1] + (name,) + current[2:]
+
+        self._entries: List[Tuple] = sorted(by_symbol.values())
+        self._symbols: List[str] = [entry[0] for entry in self._entries] # Sorted
+        self._symbol_positions: Dict[str, int] = {symbol.lower(): i for i, symbol in enumerate(self._symbols)}
+
+        self._entry_words: List[Tuple[str, ...]] = [tuple(set(_words(entry[1]))) for entry in self._entries]
+        words = sorted((word, i) for i, entry_words in enumerate(self._entry_words) for word in entry_words)
+        self._words: List[str] = [word for word, _ in words] # Sorted, one item per (word, entry)
+        self._word_entries = array("i", (i for _, i in words))
+        self._word_starts: Dict[str, int] = {}
+        for position, word in enumerate(self._words):
+            self._word_starts.setdefault(word, position)
+
+        # The same arrays restricted to known assets
+        asset_entries = [i for i, entry in enumerate(self._entries) if entry[4]]
+        self._asset_symbols: List[str] = [self._symbols[i] for i in asset_entries] # Sorted
+        self._asset_symbol_entries = array("i", asset_entries)
+        asset_words = [(word, i) for word, i in words if self._entries[i][4]]
+        self._asset_words: List[str] = [word for word, _ in asset_words] # Sorted
+        self._asset_word_entries = array("i", (i for _, i in asset_words))
+        self.asset_count = len(asset_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- Candidate lookups ---
+
+    def _symbol_prefix(self, prefix: str, cap: int, asset_symbols: Dict[str, str]) -> List[int]:
+        """Known assets' symbols first (indexed ones, then `asset_symbols`), then all symbols."""
+        matches = _prefix_scan(self._asset_symbols, self._asset_symbol_entries, prefix, cap)
+        for symbol in asset_symbols:
+            position = self._symbol_positions.get(symbol.lower())
+            if position is not None and symbol.startswith(prefix):
+                matches.append(position)
+        return matches + _prefix_scan(self._symbols, range(len(self._symbols)), prefix, cap)
+
+    def _word_prefix(self, prefix: str, cap: int) -> List[int]:
+        """Known assets' name words first, then all name words."""
+        return (
+            _prefix_scan(self._asset_words, self._asset_word_entries, prefix, cap)
+            + _prefix_scan(self._words, self._word_entries, prefix, cap)
+        )
+
+    def _word_entries_for(self, word: str) -> List[int]:
+        position = self._word_starts.get(word)
+        matches = []
+        while position is not None and position < len(self._words) and self._words[position] == word:
+            matches.append(self._word_entries[position])
+            position += 1
+        return matches
+
+    # --- Search ---
+
+    def search(self, query: str, limit: int = 10, asset_symbols: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Best matches for `query` on symbol or name: exact symbol, then known assets,
+        then symbol prefix, name word prefix and one-edit matches. `asset_symbols`
+        (symbol -> asset ID, optional) marks more entries as known assets, e.g.
+        assets created since the index was built.
+        """
+        asset_symbols = asset_symbols or {}
+        query = (query or "").strip()
+        if not query or limit <= 0:
+            return []
+        cap = limit * CANDIDATES_PER_RESULT
+        symbol_query = query.upper()
+        query_words = _words(query)
+        tiers: Dict[int, int] = {} # Entry -> best tier
+
+        def add(indexes: Iterable[int], tier: int) -> None:
+            for i in indexes:
+                if tier < tiers.get(i, MATCH_FUZZY + 1):
+                    tiers[i] = tier
+
+        exact = self._symbol_positions.get(query.lower())
+        if exact is not None:
+            add([exact], MATCH_EXACT)
+        add(self._symbol_prefix(symbol_query, cap, asset_symbols), MATCH_SYMBOL_PREFIX)
+        if query_words:
+            # Scan by the longest word (fewest matches); every query word must prefix some name word
+            anchor = max(query_words, key=len)
+            others = [q for q in query_words if q != anchor]
+            for i in self._word_prefix(anchor, cap * 2):
+                if all(any(word.startswith(q) for word in self._entry_words[i]) for q in others):
+                    add([i], MATCH_NAME_PREFIX)
+        # Fuzzy matches only fill up results the better tiers left empty
+        if len(tiers) < limit and len(query) >= FUZZY_MIN_LENGTH:
+            for variant in _one_edit_variants(query.lower()):
+                position = self._symbol_positions.get(variant)
+                if position is not None:
+                    add([position], MATCH_FUZZY)
+                if len(query_words) == 1:
+                    add(self._word_entries_for(variant), MATCH_FUZZY)
+
+        def asset_id_of(i: int) -> Optional[str]:
+            entry = self._entries[i]
+            return entry[4] or asset_symbols.get(entry[0])
+
+        ranked = sorted(tiers, key=lambda i: (tiers[i] != MATCH_EXACT, asset_id_of(i) is None, tiers[i], len(self._symbols[i]), self._symbols[i]))
+        results = []
+        for i in ranked[:limit]:
+            symbol, name, exchange_mic, asset_type, _ = self._entries[i]
+            results.append({
+                "symbol": symbol,
+                "name": name,
+                "exchange_mic": exchange_mic,
+                "asset_type": asset_type,
+                "asset_id": asset_id_of(i),
+                "match": MATCH_NAMES[tiers[i]]
+            })
+        return results
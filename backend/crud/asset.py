@@ -1,15 +1,15 @@
 # backend/crud/asset.py
 
 import uuid
-from typing import Sequence, Dict, Any
-from datetime import date # Added for option details
+from typing import Sequence, Dict, Any, List, Tuple
+from datetime import date, datetime # Added for option details
 from decimal import Decimal # Added for option details
 
-from sqlalchemy import select
+from sqlalchemy import select, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload # Import selectinload
+from sqlalchemy.orm import selectinload, aliased # Import selectinload
 
-from backend.models import Asset
+from backend.models import Asset, Position, Transaction
 # Added OptionType
 from backend.models.enums import AssetType, OptionType, Currency # Keep AssetType/OptionType for potential use if needed
 # No longer need specific create schemas here for create_asset
@@ -62,6 +62,85 @@ async def get_asset(db: AsyncSession, asset_id: uuid.UUID) -> Asset | None:
     return result.unique().scalars().first()
 
 
+async def get_assets_by_ids(
+    db: AsyncSession, *, asset_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, Asset]:
+    """
+    Gets many assets in a single `IN (...)` query.
+
+    Returns a dict keyed by asset ID; IDs that do not exist are simply absent.
+    """
+    unique_ids = set(asset_ids)
+    if not unique_ids:
+        return {}
+    result = await db.execute(
+        select(Asset)
+        .options(selectinload(Asset.underlying_asset)) # Eager load
+        .filter(Asset.id.in_(unique_ids))
+    )
+    return {asset.id: asset for asset in result.unique().scalars().all()}
+
+
+async def get_stock_assets_in_use(db: AsyncSession) -> List[Tuple[Asset, datetime | None]]:
+    """
+    Gets every STOCK asset that is held in a position or appears in a transaction.
+
+    Each asset is returned with its earliest transaction date (None when it only
+    appears in positions), ordered by symbol.
+    """
+    first_transactions = (
+        select(Transaction.asset_id, func.min(Transaction.transaction_date).label("first_date"))
+        .where(Transaction.asset_id.is_not(None))
+        .group_by(Transaction.asset_id)
+        .subquery()
+    )
+    stmt = (
+        select(Asset, first_transactions.c.first_date)
+        .outerjoin(first_transactions, first_transactions.c.asset_id == Asset.id)
+        .where(
+            Asset.asset_type == AssetType.STOCK,
+            or_(Asset.id.in_(select(Position.asset_id)), first_transactions.c.asset_id.is_not(None))
+        )
+        .order_by(Asset.symbol, Asset.id)
+    )
+    result = await db.execute(stmt)
+    return [(asset, first_transaction_date) for asset, first_transaction_date in result.unique().all()]
+
+
+async def get_held_stock_assets(db: AsyncSession) -> List[Asset]:
+    """
+    Gets the union of STOCK assets held across all clubs: stocks with an open
+    position in any fund plus the underlyings of open option positions (options
+    are valued from their underlying's price). Ordered by symbol.
+    """
+    held_asset_ids = select(Position.asset_id).where(Position.quantity != 0)
+    option = aliased(Asset)
+    held_underlying_ids = (
+        select(option.underlying_asset_id)
+        .where(option.id.in_(held_asset_ids), option.underlying_asset_id.is_not(None))
+    )
+    stmt = (
+        select(Asset)
+        .where(
+            Asset.asset_type == AssetType.STOCK,
+            or_(Asset.id.in_(held_asset_ids), Asset.id.in_(held_underlying_ids))
+        )
+        .order_by(Asset.symbol, Asset.id)
+    )
+    result = await db.execute(stmt)
+    return list(result.unique().scalars().all())
+
+
+async def get_stock_asset_symbols(db: AsyncSession) -> List[Tuple[str, str | None, uuid.UUID]]:
+    """Gets (symbol, name, id) of every STOCK asset, without loading the ORM objects."""
+    result = await db.execute(
+        select(Asset.symbol, Asset.name, Asset.id)
+        .where(Asset.asset_type == AssetType.STOCK)
+        .order_by(Asset.symbol)
+    )
+    return [tuple(row) for row in result.all()]
+
+
 async def get_asset_by_symbol(db: AsyncSession, symbol: str) -> Asset | None:
     """Gets an asset by its symbol (case-insensitive)."""
     # **FIX:** Eager load underlying_asset when fetching by symbol
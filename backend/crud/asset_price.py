@@ -0,0 +1,209 @@
+# backend/crud/asset_price.py
+
+import uuid
+from datetime import date, datetime, timezone
+from typing import Sequence, Dict, Any, Set, Tuple
+
+from sqlalchemy import select, desc, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import AssetPrice, EmptyPriceDate
+
+# Asset prices are written by the market price fetching code (read-through store)
+# and by backfill jobs. Rows for closed trading days never change. Weekdays the
+# backfill found no price for are kept in empty_price_dates.
+
+# Rows per INSERT statement (5 bind parameters per row)
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+async def get_latest_prices_on_or_before(
+    db: AsyncSession,
+    *,
+    asset_ids: Sequence[uuid.UUID],
+    on_date: date,
+    earliest_date: date | None = None
+) -> Dict[uuid.UUID, AssetPrice]:
+    """
+    Gets, for each asset, the most recent stored price dated on or before `on_date`.
+
+    Uses a single DISTINCT ON query. `earliest_date` bounds how far back a price
+    may be found. Assets without a matching row are absent from the result.
+    """
+    unique_ids = set(asset_ids)
+    if not unique_ids:
+        return {}
+    stmt = (
+        select(AssetPrice)
+        .where(AssetPrice.asset_id.in_(unique_ids), AssetPrice.price_date <= on_date)
+        .distinct(AssetPrice.asset_id)
+        .order_by(AssetPrice.asset_id, desc(AssetPrice.price_date))
+    )
+    if earliest_date is not None:
+        stmt = stmt.where(AssetPrice.price_date >= earliest_date)
+    result = await db.execute(stmt)
+    return {row.asset_id: row for row in result.scalars().all()}
+
+
+async def get_prices_for_period(
+    db: AsyncSession,
+    *,
+    asset_ids: Sequence[uuid.UUID],
+    start_date: date,
+    end_date: date
+) -> Sequence[AssetPrice]:
+    """Gets stored prices for the given assets within a date range (inclusive), ordered by date."""
+    unique_ids = set(asset_ids)
+    if not unique_ids:
+        return []
+    stmt = select(AssetPrice).where(
+        AssetPrice.asset_id.in_(unique_ids),
+        AssetPrice.price_date >= start_date,
+        AssetPrice.price_date <= end_date
+    ).order_by(AssetPrice.price_date, AssetPrice.asset_id)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_close_price_rows(
+    db: AsyncSession,
+    *,
+    asset_ids: Sequence[uuid.UUID],
+    start_date: date,
+    end_date: date
+) -> Sequence[Any]:
+    """
+    Gets (price_date, asset_id, close_price) rows within a date range (inclusive),
+    ordered by date. Like get_prices_for_period, but without building ORM objects,
+    for replays over long histories.
+    """
+    unique_ids = set(asset_ids)
+    if not unique_ids:
+        return []
+    stmt = select(AssetPrice.price_date, AssetPrice.asset_id, AssetPrice.close_price).where(
+        AssetPrice.asset_id.in_(unique_ids),
+        AssetPrice.price_date >= start_date,
+        AssetPrice.price_date <= end_date
+    ).order_by(AssetPrice.price_date, AssetPrice.asset_id)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_stored_price_dates(
+    db: AsyncSession,
+    *,
+    asset_ids: Sequence[uuid.UUID],
+    start_date: date,
+    end_date: date
+) -> Dict[uuid.UUID, Set[date]]:
+    """
+    Gets the dates that already have a stored price, per asset, within a date range (inclusive).
+
+    Only the key columns are selected, so this stays cheap over long histories.
+    Every requested asset gets an entry (an empty set when nothing is stored).
+    """
+    dates_by_asset: Dict[uuid.UUID, Set[date]] = {asset_id: set() for asset_id in asset_ids}
+    if not dates_by_asset:
+        return {}
+    stmt = select(AssetPrice.asset_id, AssetPrice.price_date).where(
+        AssetPrice.asset_id.in_(dates_by_asset.keys()),
+        AssetPrice.price_date >= start_date,
+        AssetPrice.price_date <= end_date
+    )
+    result = await db.execute(stmt)
+    for asset_id, price_date in result.all():
+        dates_by_asset[asset_id].add(price_date)
+    return dates_by_asset
+
+
+async def bulk_insert_asset_prices(
+    db: AsyncSession,
+    *,
+    price_rows: Sequence[Dict[str, Any]]
+) -> int:
+    """
+    Inserts many price rows in one multi-row INSERT.
+
+    Expects dicts with 'asset_id', 'price_date', 'close_price', 'source' and
+    optionally 'fetched_at'. On a (asset_id, price_date) conflict the existing
+    row is kept (ON CONFLICT DO NOTHING semantics), except when it was captured
+    during its own trading day (fetched_at on or before price_date): such an
+    intraday row is replaced by the newer value.
+
+    Returns the number of rows inserted or replaced.
+    """
+    if not price_rows:
+        return 0
+    # Last row wins if the same key is passed twice; Postgres rejects duplicate keys in one statement.
+    fetched_at = datetime.now(timezone.utc)
+    deduped: Dict[tuple, Dict[str, Any]] = {}
+    for row in price_rows:
+        model_data = {k: v for k, v in row.items() if hasattr(AssetPrice, k)}
+        model_data.setdefault('fetched_at', fetched_at) # Multi-row VALUES needs the same keys on every row
+        deduped[(model_data['asset_id'], model_data['price_date'])] = model_data
+
+    rows = list(deduped.values())
+    affected = 0
+    # Chunked to stay well below the bind parameter limit of a single statement
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        stmt = pg_insert(AssetPrice).values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AssetPrice.asset_id, AssetPrice.price_date],
+            set_={
+                "close_price": stmt.excluded.close_price,
+                "source": stmt.excluded.source,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+            where=func.date(AssetPrice.fetched_at) <= AssetPrice.price_date,
+        )
+        result = await db.execute(stmt)
+        affected += result.rowcount or 0
+    await db.flush()
+    return affected
+
+
+async def get_empty_price_dates(
+    db: AsyncSession,
+    *,
+    asset_ids: Sequence[uuid.UUID],
+    start_date: date,
+    end_date: date
+) -> Dict[uuid.UUID, Set[date]]:
+    """
+    Gets the dates recorded as having no price (see bulk_insert_empty_price_dates),
+    per asset, within a date range (inclusive). Every requested asset gets an entry.
+    """
+    dates_by_asset: Dict[uuid.UUID, Set[date]] = {asset_id: set() for asset_id in asset_ids}
+    if not dates_by_asset:
+        return {}
+    stmt = select(EmptyPriceDate.asset_id, EmptyPriceDate.price_date).where(
+        EmptyPriceDate.asset_id.in_(dates_by_asset.keys()),
+        EmptyPriceDate.price_date >= start_date,
+        EmptyPriceDate.price_date <= end_date
+    )
+    result = await db.execute(stmt)
+    for asset_id, price_date in result.all():
+        dates_by_asset[asset_id].add(price_date)
+    return dates_by_asset
+
+
+async def bulk_insert_empty_price_dates(
+    db: AsyncSession,
+    *,
+    empty_dates: Sequence[Tuple[uuid.UUID, date]]
+) -> int:
+    """
+    Records (asset_id, price_date) pairs the provider returned no price for, so the
+    backfill does not request them again. Pairs already recorded are kept.
+    Returns the number of pairs inserted.
+    """
+    rows = [{"asset_id": asset_id, "price_date": price_date} for asset_id, price_date in dict.fromkeys(empty_dates)]
+    inserted = 0
+    # 2 bind parameters per row
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        stmt = pg_insert(EmptyPriceDate).values(rows[start:start + BULK_INSERT_CHUNK_SIZE]).on_conflict_do_nothing()
+        result = await db.execute(stmt)
+        inserted += result.rowcount or 0
+    await db.flush()
+    return inserted
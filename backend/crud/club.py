@@ -1,14 +1,15 @@
 # backend/crud/club.py
 
 import uuid
+from decimal import Decimal
 from typing import Sequence, Dict, Any # Import Dict, Any
 
-from sqlalchemy import select
+from sqlalchemy import select, func, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 # Import models needed
-from backend.models import Club, Fund, User, ClubMembership, FundSplit # Added ClubMembership, FundSplit
+from backend.models import Club, Fund, User, ClubMembership, FundSplit, Position # Added ClubMembership, FundSplit, Position
 
 # Import models needed
 from backend.models import Club, Fund, User # Keep Fund for get_default_fund_for_club
@@ -55,6 +56,77 @@ async def get_club(db: AsyncSession, club_id: uuid.UUID) -> Club | None:
     # Add unique() for safety, although less likely needed than with Asset
     return result.unique().scalars().first()
 
+async def get_club_bank_balance(db: AsyncSession, *, club_id: uuid.UUID) -> Decimal | None:
+    """Reads only the club's bank balance (None if the club does not exist)."""
+    result = await db.execute(select(Club.bank_account_balance).where(Club.id == club_id))
+    return result.scalar_one_or_none()
+
+async def adjust_club_bank_balance(
+    db: AsyncSession, *, club_id: uuid.UUID, delta: Decimal, required: Decimal | None = None
+) -> Decimal | None:
+    """
+    Adds `delta` (negative to debit) to the club's bank balance in one
+    UPDATE ... SET bank_account_balance = bank_account_balance + :delta RETURNING.
+    With `required`, the row is only updated while the balance is at least
+    `required`, so concurrent debits cannot overdraw it. Returns the new balance,
+    or None if the club does not exist or the balance was insufficient.
+    Loaded Club objects are kept in sync.
+    """
+    stmt = update(Club).where(Club.id == club_id)
+    if required is not None:
+        stmt = stmt.where(Club.bank_account_balance >= required)
+    stmt = (
+        stmt.values(bank_account_balance=Club.bank_account_balance + delta)
+        .returning(Club.bank_account_balance)
+        .execution_options(synchronize_session="fetch")
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+async def get_club_ids(db: AsyncSession) -> Sequence[uuid.UUID]:
+    """IDs of all clubs, oldest first (for jobs that visit every club)."""
+    result = await db.execute(select(Club.id).order_by(Club.created_at, Club.id))
+    return result.scalars().all()
+
+async def get_club_valuation_state(db: AsyncSession, *, club_id: uuid.UUID) -> Dict[str, Any] | None:
+    """
+    Everything NAV needs besides prices, in one query: bank cash, total brokerage
+    cash, running units outstanding and the club's positions summed per asset
+    (zero totals left out). Returns None if the club does not exist.
+    Returns {"bank_cash", "brokerage_cash", "total_units", "positions": [(asset_id, quantity)]}.
+    """
+    brokerage_cash = (
+        select(func.coalesce(func.sum(Fund.brokerage_cash_balance), 0))
+        .where(Fund.club_id == Club.id)
+        .correlate(Club)
+        .scalar_subquery()
+    )
+    held = (
+        select(Position.asset_id, func.sum(Position.quantity).label("quantity"))
+        .join(Fund, Fund.id == Position.fund_id)
+        .where(Fund.club_id == club_id)
+        .group_by(Position.asset_id)
+        .having(func.sum(Position.quantity) != 0)
+        .subquery()
+    )
+    # One row per held asset (or a single row with no asset), each carrying the club totals
+    result = await db.execute(
+        select(Club.bank_account_balance, brokerage_cash, Club.total_units_outstanding, held.c.asset_id, held.c.quantity)
+        .select_from(Club)
+        .outerjoin(held, true())
+        .where(Club.id == club_id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    bank_cash, brokerage, total_units = rows[0][:3]
+    return {
+        "bank_cash": Decimal(bank_cash),
+        "brokerage_cash": Decimal(brokerage),
+        "total_units": Decimal(total_units),
+        "positions": [(asset_id, quantity) for *_, asset_id, quantity in rows if asset_id is not None]
+    }
+
 async def get_club_by_name(db: AsyncSession, name: str) -> Club | None:
     """Gets a club by its name."""
     result = await db.execute(select(Club).filter(Club.name == name))
@@ -0,0 +1,61 @@
+# backend/crud/etf_holdings.py
+
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import ETFHoldings
+
+# ETF holdings are written by the exposure report when a stored entry is missing
+# or older than its TTL, and read back by symbol.
+
+
+async def get_etf_holdings_rows(db: AsyncSession, *, symbols: Sequence[str]) -> Dict[str, ETFHoldings]:
+    """Stored holdings for the given (upper case) symbols, keyed by symbol. Symbols never fetched are absent."""
+    if not symbols:
+        return {}
+    result = await db.execute(select(ETFHoldings).where(ETFHoldings.symbol.in_(list(symbols))))
+    return {row.symbol: row for row in result.scalars().all()}
+
+
+async def upsert_etf_holdings(
+    db: AsyncSession,
+    *,
+    entries: Sequence[Dict[str, Any]],
+    fetched_at: datetime
+) -> List[ETFHoldings]:
+    """
+    Inserts or replaces holdings (dicts with 'symbol', 'holdings', 'sector_weights',
+    'source') in one multi-row INSERT ... ON CONFLICT, stamped with `fetched_at`.
+    Returns the stored rows.
+    """
+    # Last entry wins for a repeated symbol; Postgres rejects duplicate keys in one statement.
+    rows = list({
+        entry["symbol"]: {
+            "symbol": entry["symbol"],
+            "holdings": entry["holdings"],
+            "sector_weights": entry["sector_weights"],
+            "source": entry["source"],
+            "fetched_at": fetched_at,
+        }
+        for entry in entries
+    }.values())
+    if not rows:
+        return []
+    stmt = pg_insert(ETFHoldings).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ETFHoldings.symbol],
+        set_={
+            "holdings": stmt.excluded.holdings,
+            "sector_weights": stmt.excluded.sector_weights,
+            "source": stmt.excluded.source,
+            "fetched_at": stmt.excluded.fetched_at,
+        },
+    ).returning(ETFHoldings)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    stored = list(result.scalars().all())
+    await db.flush()
+    return stored
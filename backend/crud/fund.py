@@ -1,9 +1,10 @@
 # backend/crud/fund.py
 
 import uuid
+from decimal import Decimal
 from typing import Sequence, Dict, Any # Import Dict, Any
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -42,6 +43,33 @@ async def get_fund(db: AsyncSession, fund_id: uuid.UUID) -> Fund | None:
     return result.unique().scalars().first()
 
 
+async def get_fund_cash_balance(db: AsyncSession, *, fund_id: uuid.UUID) -> Decimal | None:
+    """Reads only the fund's brokerage cash balance (None if the fund does not exist)."""
+    result = await db.execute(select(Fund.brokerage_cash_balance).where(Fund.id == fund_id))
+    return result.scalar_one_or_none()
+
+
+async def adjust_fund_cash_balance(
+    db: AsyncSession, *, fund_id: uuid.UUID, delta: Decimal, required: Decimal | None = None
+) -> Decimal | None:
+    """
+    Adds `delta` (negative to debit) to the fund's brokerage cash in one
+    UPDATE ... RETURNING, only while the balance is at least `required` if given.
+    Returns the new balance, or None if the fund does not exist or the balance was
+    insufficient. Loaded Fund objects are kept in sync.
+    """
+    stmt = update(Fund).where(Fund.id == fund_id)
+    if required is not None:
+        stmt = stmt.where(Fund.brokerage_cash_balance >= required)
+    stmt = (
+        stmt.values(brokerage_cash_balance=Fund.brokerage_cash_balance + delta)
+        .returning(Fund.brokerage_cash_balance)
+        .execution_options(synchronize_session="fetch")
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
 async def get_fund_by_club_and_name(
     db: AsyncSession, *, club_id: uuid.UUID, name: str
 ) -> Fund | None:
@@ -3,10 +3,10 @@
 import uuid
 from datetime import datetime # Use datetime
 import logging # Import logging at module level
-from typing import Sequence, Dict, Any # Import Dict, Any
+from typing import Sequence, Dict, Any, List # Import Dict, Any
 from decimal import Decimal # Import Decimal
 
-from sqlalchemy import select, desc, func, join # Import desc, func, join
+from sqlalchemy import select, desc, func, join, update # Import desc, func, join, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, selectinload # Import aliased if needed for joins, selectinload
 
@@ -23,7 +23,8 @@ async def create_member_transaction(
     db: AsyncSession, *, member_tx_data: Dict[str, Any] # Accept dictionary
 ) -> MemberTransaction:
     """
-    Creates a new member transaction (deposit/withdrawal) record.
+    Creates a new member transaction (deposit/withdrawal) record and adds its
+    units to the member's unit_balance and the club's total_units_outstanding.
     Expects member_tx_data dict containing 'membership_id', 'transaction_type',
     'amount', 'transaction_date', and potentially 'notes', 'unit_value_used', 'units_transacted'.
     """
@@ -35,6 +36,21 @@ async def create_member_transaction(
 
     db.add(db_obj)
     await db.flush()
+    # Keep the running unit totals in the same transaction as the ledger row
+    if db_obj.units_transacted:
+        club_id = (await db.execute(
+            update(ClubMembership)
+            .where(ClubMembership.id == db_obj.membership_id)
+            .values(unit_balance=ClubMembership.unit_balance + db_obj.units_transacted)
+            .returning(ClubMembership.club_id)
+            .execution_options(synchronize_session="fetch")
+        )).scalar_one()
+        await db.execute(
+            update(Club)
+            .where(Club.id == club_id)
+            .values(total_units_outstanding=Club.total_units_outstanding + db_obj.units_transacted)
+            .execution_options(synchronize_session="fetch")
+        )
     # Refresh to load server-defaults and potentially relationships if needed immediately
     await db.refresh(db_obj, attribute_names=['id', 'created_at', 'updated_at'])
     return db_obj
@@ -101,41 +117,69 @@ async def get_multi_member_transactions(
 # --- EXISTING FUNCTION ---
 async def get_member_unit_balance(db: AsyncSession, *, membership_id: uuid.UUID) -> Decimal:
     """
-    Calculates the current unit balance for a specific club membership.
-    (Implementation unchanged)
+    Gets the current unit balance of a club membership: the running total kept by
+    create_member_transaction, read from one row. Unknown memberships have 0.
     """
-    stmt = select(
-        func.coalesce(func.sum(MemberTransaction.units_transacted), Decimal("0.0"))
-    ).where(
-        MemberTransaction.membership_id == membership_id
-    )
+    stmt = select(ClubMembership.unit_balance).where(ClubMembership.id == membership_id)
     result = await db.execute(stmt)
-    total_units = result.scalar_one()
-    if not isinstance(total_units, Decimal):
-         return Decimal(total_units or "0.0")
-    else:
-         return total_units
+    return result.scalar_one_or_none() or Decimal("0.0")
 
 # --- FUNCTION RENAMED in previous steps, ensure consistency ---
 # This was renamed from get_total_units_for_club in the model/service layer discussion
 async def get_total_units_for_club(db: AsyncSession, *, club_id: uuid.UUID) -> Decimal:
     """
-    Calculates the total outstanding units for an entire club.
-    (Implementation unchanged)
+    Gets the total outstanding units of a club: the running total kept by
+    create_member_transaction, read from one row. Unknown clubs have 0.
     """
-    stmt = select(
-        func.coalesce(func.sum(MemberTransaction.units_transacted), Decimal("0.0"))
-    ).join(
-        ClubMembership, MemberTransaction.membership_id == ClubMembership.id
-    ).where(
-        ClubMembership.club_id == club_id
-    )
+    stmt = select(Club.total_units_outstanding).where(Club.id == club_id)
     result = await db.execute(stmt)
-    total_units = result.scalar_one()
-    if not isinstance(total_units, Decimal):
-         return Decimal(total_units or "0.0")
-    else:
-         return total_units
+    return result.scalar_one_or_none() or Decimal("0.0")
+
+async def reconcile_unit_balances(
+    db: AsyncSession, *, club_ids: Sequence[uuid.UUID] | None = None
+) -> Dict[str, List[uuid.UUID]]:
+    """
+    Rebuilds the running unit totals (club_memberships.unit_balance and
+    clubs.total_units_outstanding) from the member transaction ledger, for
+    `club_ids` or every club. Only rows that drifted are written. Does not commit.
+    Returns the IDs corrected: {"memberships": [...], "clubs": [...]}.
+    """
+    membership_units = (
+        select(ClubMembership.id.label("membership_id"), func.coalesce(func.sum(MemberTransaction.units_transacted), 0).label("units"))
+        .outerjoin(MemberTransaction, MemberTransaction.membership_id == ClubMembership.id)
+        .group_by(ClubMembership.id)
+    )
+    club_units = (
+        select(Club.id.label("club_id"), func.coalesce(func.sum(MemberTransaction.units_transacted), 0).label("units"))
+        .outerjoin(ClubMembership, ClubMembership.club_id == Club.id)
+        .outerjoin(MemberTransaction, MemberTransaction.membership_id == ClubMembership.id)
+        .group_by(Club.id)
+    )
+    if club_ids is not None:
+        membership_units = membership_units.where(ClubMembership.club_id.in_(club_ids))
+        club_units = club_units.where(Club.id.in_(club_ids))
+    membership_units = membership_units.subquery()
+    club_units = club_units.subquery()
+
+    memberships = await db.execute(
+        update(ClubMembership)
+        .where(ClubMembership.id == membership_units.c.membership_id, ClubMembership.unit_balance != membership_units.c.units)
+        .values(unit_balance=membership_units.c.units)
+        .returning(ClubMembership.id)
+        .execution_options(synchronize_session=False)
+    )
+    fixed_memberships = list(memberships.scalars().all())
+    clubs = await db.execute(
+        update(Club)
+        .where(Club.id == club_units.c.club_id, Club.total_units_outstanding != club_units.c.units)
+        .values(total_units_outstanding=club_units.c.units)
+        .returning(Club.id)
+        .execution_options(synchronize_session=False)
+    )
+    fixed_clubs = list(clubs.scalars().all())
+    if fixed_memberships or fixed_clubs:
+        log.warning(f"Reconciled unit balances: {len(fixed_memberships)} membership(s) and {len(fixed_clubs)} club(s) had drifted from the ledger.")
+    return {"memberships": fixed_memberships, "clubs": fixed_clubs}
 
 async def get_multi_by_club_id(
    db: AsyncSession, *, club_id: uuid.UUID, skip: int = 0, limit: int = 5
@@ -159,3 +203,24 @@ async def get_multi_by_club_id(
    )
    result = await db.execute(stmt)
    return result.unique().scalars().all()
+
+async def get_club_member_ledger_rows(
+    db: AsyncSession, *, club_id: uuid.UUID, before: datetime
+) -> Sequence[Any]:
+    """
+    Gets (transaction_date, transaction_type, amount, units_transacted) rows of a
+    club's member transactions dated before `before`, oldest first.
+    """
+    stmt = (
+        select(
+            MemberTransaction.transaction_date,
+            MemberTransaction.transaction_type,
+            MemberTransaction.amount,
+            MemberTransaction.units_transacted
+        )
+        .join(ClubMembership, MemberTransaction.membership_id == ClubMembership.id)
+        .where(ClubMembership.club_id == club_id, MemberTransaction.transaction_date < before)
+        .order_by(MemberTransaction.transaction_date, MemberTransaction.created_at, MemberTransaction.id)
+    )
+    result = await db.execute(stmt)
+    return result.all()
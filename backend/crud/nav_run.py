@@ -0,0 +1,27 @@
+# backend/crud/nav_run.py
+
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import NavRun
+
+# Batch NAV runs are saved by nav_batch_service as they progress and read back
+# by GET /admin/nav-runs/{run_id}, on whichever worker serves it.
+
+
+async def get_nav_run(db: AsyncSession, *, run_id: uuid.UUID) -> Optional[NavRun]:
+    return await db.get(NavRun, run_id, populate_existing=True)
+
+
+async def save_nav_run(db: AsyncSession, *, run_data: Dict[str, Any]) -> None:
+    """Inserts the run (a dict of NavRun columns) or overwrites the stored one with the same run_id."""
+    stmt = pg_insert(NavRun).values(**run_data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NavRun.run_id],
+        set_={key: stmt.excluded[key] for key in run_data if key != "run_id"},
+    )
+    await db.execute(stmt)
+    await db.flush()
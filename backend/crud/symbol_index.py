@@ -0,0 +1,79 @@
+# backend/crud/symbol_index.py
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import SymbolIndexEntry
+
+# The symbol index is written only by the ticker list download and read whole
+# into the in-memory search index.
+
+# Rows per INSERT statement (6 bind parameters per row)
+BULK_UPSERT_CHUNK_SIZE = 1000
+
+
+async def upsert_symbol_index_entries(
+    db: AsyncSession,
+    *,
+    entries: Sequence[Dict[str, Any]],
+    refreshed_at: datetime
+) -> int:
+    """
+    Inserts or updates many entries (dicts with 'symbol', 'exchange_mic', 'name',
+    'asset_type', 'source') with multi-row INSERT ... ON CONFLICT statements, all
+    stamped with `refreshed_at`. Returns the number of rows written.
+    """
+    # Last entry wins for a repeated key; Postgres rejects duplicate keys in one statement.
+    deduped: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for entry in entries:
+        row = {
+            "symbol": entry["symbol"],
+            "exchange_mic": entry.get("exchange_mic") or "",
+            "name": entry.get("name"),
+            "asset_type": entry.get("asset_type"),
+            "source": entry["source"],
+            "refreshed_at": refreshed_at,
+        }
+        deduped[(row["symbol"], row["exchange_mic"])] = row
+    rows = list(deduped.values())
+    written = 0
+    for start in range(0, len(rows), BULK_UPSERT_CHUNK_SIZE):
+        stmt = pg_insert(SymbolIndexEntry).values(rows[start:start + BULK_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SymbolIndexEntry.symbol, SymbolIndexEntry.exchange_mic],
+            set_={
+                "name": stmt.excluded.name,
+                "asset_type": stmt.excluded.asset_type,
+                "source": stmt.excluded.source,
+                "refreshed_at": stmt.excluded.refreshed_at,
+            },
+        )
+        result = await db.execute(stmt)
+        written += result.rowcount or 0
+    await db.flush()
+    return written
+
+
+async def delete_symbol_index_entries_before(db: AsyncSession, *, refreshed_before: datetime) -> int:
+    """Deletes entries not listed by any download since `refreshed_before` (delisted tickers)."""
+    result = await db.execute(delete(SymbolIndexEntry).where(SymbolIndexEntry.refreshed_at < refreshed_before))
+    await db.flush()
+    return result.rowcount or 0
+
+
+async def get_symbol_index_rows(db: AsyncSession) -> List[Tuple[str, str, Optional[str], Optional[str]]]:
+    """All entries as (symbol, exchange_mic, name, asset_type) tuples, ordered by symbol."""
+    result = await db.execute(
+        select(SymbolIndexEntry.symbol, SymbolIndexEntry.exchange_mic, SymbolIndexEntry.name, SymbolIndexEntry.asset_type)
+        .order_by(SymbolIndexEntry.symbol, SymbolIndexEntry.exchange_mic)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def get_last_refreshed_at(db: AsyncSession) -> Optional[datetime]:
+    """Time of the most recent download, or None if the index was never filled."""
+    return await db.scalar(select(func.max(SymbolIndexEntry.refreshed_at)))
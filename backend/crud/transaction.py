@@ -96,3 +96,30 @@ async def get_multi_transactions(
     # Add unique() for safety, especially with joins
     return result.unique().scalars().all()
 
+
+
+async def get_club_ledger_rows(
+    db: AsyncSession,
+    *,
+    club_id: uuid.UUID,
+    before: datetime
+) -> Sequence[Any]:
+    """
+    Gets the fields needed to replay a club's transactions, oldest first:
+    (transaction_date, transaction_type, asset_id, quantity, total_amount,
+    fees_commissions) rows dated before `before`. Only these columns are
+    selected, so long histories load without building ORM objects.
+    """
+    stmt = select(
+        Transaction.transaction_date,
+        Transaction.transaction_type,
+        Transaction.asset_id,
+        Transaction.quantity,
+        Transaction.total_amount,
+        Transaction.fees_commissions
+    ).where(
+        Transaction.club_id == club_id,
+        Transaction.transaction_date < before
+    ).order_by(Transaction.transaction_date, Transaction.created_at, Transaction.id)
+    result = await db.execute(stmt)
+    return result.all()
@@ -3,10 +3,11 @@
 import uuid
 from datetime import date, datetime # Import datetime if needed for created_at/updated_at
 from decimal import Decimal
-from typing import Sequence, Dict, Any # Import Dict, Any
+from typing import Sequence, Dict, Any, List # Import Dict, Any
 
 # Added asc for ordering
-from sqlalchemy import select, desc, asc
+from sqlalchemy import select, desc, asc, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import UnitValueHistory # SQLAlchemy Model
@@ -14,6 +15,9 @@ from backend.models import UnitValueHistory # SQLAlchemy Model
 
 # UnitValueHistory records are typically created periodically by internal logic.
 
+# Rows per INSERT statement (6 bind parameters per row)
+BULK_INSERT_CHUNK_SIZE = 1000
+
 async def create_unit_value_history(
     db: AsyncSession,
     *, # Enforce keyword arguments
@@ -40,6 +44,46 @@ async def create_unit_value_history(
     return db_obj
 
 
+async def bulk_insert_unit_value_histories(
+    db: AsyncSession,
+    *,
+    uvh_rows: Sequence[Dict[str, Any]],
+    replace: bool = False
+) -> List[tuple]:
+    """
+    Inserts many unit value history records with multi-row INSERT ... ON CONFLICT
+    statements. Expects the create_unit_value_history fields in each dict. A row
+    whose (club_id, valuation_date) already exists is skipped, or overwritten when
+    `replace` is set. Returns the (club_id, valuation_date) keys actually written.
+    """
+    # Last row wins for a repeated key; Postgres rejects duplicate keys in one statement.
+    deduped: Dict[tuple, Dict[str, Any]] = {}
+    for row in uvh_rows:
+        model_data = {k: v for k, v in row.items() if hasattr(UnitValueHistory, k)}
+        model_data.setdefault('id', uuid.uuid4()) # Multi-row VALUES needs the same keys on every row
+        deduped[(model_data['club_id'], model_data['valuation_date'])] = model_data
+    rows = list(deduped.values())
+    written: List[tuple] = []
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        stmt = pg_insert(UnitValueHistory).values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+        if replace:
+            stmt = stmt.on_conflict_do_update(
+                constraint='uq_club_valuation_date',
+                set_={
+                    "total_club_value": stmt.excluded.total_club_value,
+                    "total_units_outstanding": stmt.excluded.total_units_outstanding,
+                    "unit_value": stmt.excluded.unit_value,
+                    "updated_at": func.now(),
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(constraint='uq_club_valuation_date')
+        result = await db.execute(stmt.returning(UnitValueHistory.club_id, UnitValueHistory.valuation_date))
+        written.extend(tuple(row) for row in result.all())
+    await db.flush()
+    return written
+
+
 async def get_unit_value_history(
     db: AsyncSession, unit_value_history_id: uuid.UUID
 ) -> UnitValueHistory | None:
@@ -66,6 +110,23 @@ async def get_latest_unit_value_for_club( # Renamed function
     return result.unique().scalars().first()
 
 
+async def get_unit_value_as_of(
+    db: AsyncSession, *, club_id: uuid.UUID, on_date: date
+) -> tuple | None:
+    """
+    Gets (valuation_date, unit_value) of the club's latest valuation on or before
+    `on_date`, or None. A backward scan of the (club_id, valuation_date) unique index.
+    """
+    result = await db.execute(
+        select(UnitValueHistory.valuation_date, UnitValueHistory.unit_value)
+        .where(UnitValueHistory.club_id == club_id, UnitValueHistory.valuation_date <= on_date)
+        .order_by(desc(UnitValueHistory.valuation_date))
+        .limit(1)
+    )
+    row = result.first()
+    return tuple(row) if row is not None else None
+
+
 async def get_multi_unit_value_history(
     db: AsyncSession, *, skip: int = 0, limit: int = 100, club_id: uuid.UUID | None = None # Filter by club_id
 ) -> Sequence[UnitValueHistory]:
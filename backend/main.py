@@ -13,6 +13,12 @@ from contextlib import asynccontextmanager # For lifespan events
 # Import the session initializer
 from backend.core.session import initialize_database, async_engine, SessionFactory
 
+# --- Services ---
+from backend.services.market_data_service import MarketDataService
+from backend.services import accounting_service, exposure_service, nav_batch_service, price_prewarm_service, symbol_index_service
+from backend.services.market_data_providers.hedged_provider import build_hedged_provider
+from backend.services.portfolio_stream_service import PortfolioStreamHub
+
 # --- API Router ---
 # Import the main router that includes all versioned endpoints
 from backend.api import api_router
@@ -38,9 +44,42 @@ async def lifespan(app: FastAPI):
     log.info("Application startup...")
     log.info("Initializing database connection...")
     initialize_database() # Initialize engine and session factory
+    # One market data provider (and pooled HTTP client) per process, shared by all requests
+    try:
+        app.state.market_data_service = MarketDataService()
+        log.info("Market data service initialized.")
+    except ValueError as e:
+        app.state.market_data_service = None
+        log.warning(f"Market data service not initialized: {e}")
+    # Hedged NAV price provider over the service's providers (shared cache, client and rate limits)
+    market_data_service = app.state.market_data_service
+    accounting_service.set_price_provider(build_hedged_provider(
+        accounting_service.MARKET_PRICE_PROVIDERS,
+        get_provider=market_data_service.get_provider if market_data_service else None
+    ))
+    # ETF holdings for exposure reports; an unknown or unconfigured provider is reported here
+    app.state.etf_holdings_provider = exposure_service.resolve_holdings_provider(market_data_service)
+    # Keeps held symbols' prices warm in the price store (market open/close + interval)
+    app.state.price_prewarm_task = price_prewarm_service.start_price_prewarmer()
+    # Shared quote pollers for the live portfolio SSE streams
+    app.state.portfolio_stream_hub = PortfolioStreamHub()
+    # Loads the local symbol search index and keeps its ticker list fresh
+    app.state.symbol_index_task = symbol_index_service.start_symbol_index_refresher(
+        symbol_index_service.resolve_symbol_index_provider(market_data_service)
+    )
     yield
     # Code to run on shutdown
     log.info("Application shutdown...")
+    await price_prewarm_service.stop_price_prewarmer(getattr(app.state, "price_prewarm_task", None))
+    await symbol_index_service.stop_symbol_index_refresher(getattr(app.state, "symbol_index_task", None))
+    if getattr(app.state, "portfolio_stream_hub", None):
+        await app.state.portfolio_stream_hub.aclose()
+    # Background NAV runs are saved as failed (needs the database and price provider)
+    await nav_batch_service.stop_nav_batches()
+    await accounting_service.close_price_provider()
+    if getattr(app.state, "market_data_service", None):
+        log.info("Closing market data provider...")
+        await app.state.market_data_service.aclose()
     if async_engine:
         log.info("Disposing database engine...")
         await async_engine.dispose()
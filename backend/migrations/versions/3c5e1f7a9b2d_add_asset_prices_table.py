@@ -0,0 +1,36 @@
+"""add asset_prices table
+
+Revision ID: 3c5e1f7a9b2d
+Revises: a93f75b8c96f
+Create Date: 2026-10-16 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e1f7a9b2d'
+down_revision: Union[str, None] = 'a93f75b8c96f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('asset_prices',
+    sa.Column('asset_id', sa.UUID(), nullable=False),
+    sa.Column('price_date', sa.Date(), nullable=False),
+    sa.Column('close_price', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.PrimaryKeyConstraint('asset_id', 'price_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('asset_prices')
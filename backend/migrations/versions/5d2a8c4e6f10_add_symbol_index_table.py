@@ -0,0 +1,38 @@
+"""add symbol_index table
+
+Revision ID: 5d2a8c4e6f10
+Revises: 3c5e1f7a9b2d
+Create Date: 2026-10-16 14:03:52.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8c4e6f10'
+down_revision: Union[str, None] = '3c5e1f7a9b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('symbol_index',
+    sa.Column('symbol', sa.String(), nullable=False),
+    sa.Column('exchange_mic', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('asset_type', sa.String(), nullable=True),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('symbol', 'exchange_mic')
+    )
+    op.create_index('ix_symbol_index_refreshed_at', 'symbol_index', ['refreshed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_symbol_index_refreshed_at', table_name='symbol_index')
+    op.drop_table('symbol_index')
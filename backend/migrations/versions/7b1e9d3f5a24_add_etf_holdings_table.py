@@ -0,0 +1,35 @@
+"""add etf_holdings table
+
+Revision ID: 7b1e9d3f5a24
+Revises: 5d2a8c4e6f10
+Create Date: 2026-10-16 16:21:07.402318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e9d3f5a24'
+down_revision: Union[str, None] = '5d2a8c4e6f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('etf_holdings',
+    sa.Column('symbol', sa.String(), nullable=False),
+    sa.Column('holdings', sa.JSON(), nullable=False),
+    sa.Column('sector_weights', sa.JSON(), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('symbol')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('etf_holdings')
@@ -0,0 +1,41 @@
+"""add total_units_outstanding to clubs
+
+Revision ID: 9c4f2a6d8e13
+Revises: 7b1e9d3f5a24
+Create Date: 2026-10-16 17:48:31.950217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f2a6d8e13'
+down_revision: Union[str, None] = '7b1e9d3f5a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('clubs', sa.Column('total_units_outstanding', sa.Numeric(precision=25, scale=8), server_default='0', nullable=False))
+
+    # Backfill the running total from the member transaction ledger
+    op.execute("""
+        UPDATE clubs
+        SET total_units_outstanding = totals.units
+        FROM (
+            SELECT club_memberships.club_id, COALESCE(SUM(member_transactions.units_transacted), 0) AS units
+            FROM member_transactions
+            JOIN club_memberships ON club_memberships.id = member_transactions.membership_id
+            GROUP BY club_memberships.club_id
+        ) AS totals
+        WHERE clubs.id = totals.club_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('clubs', 'total_units_outstanding')
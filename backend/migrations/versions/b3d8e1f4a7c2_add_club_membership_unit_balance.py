@@ -0,0 +1,40 @@
+"""add unit_balance to club_memberships
+
+Revision ID: b3d8e1f4a7c2
+Revises: 9c4f2a6d8e13
+Create Date: 2026-10-16 19:02:14.318640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e1f4a7c2'
+down_revision: Union[str, None] = '9c4f2a6d8e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('club_memberships', sa.Column('unit_balance', sa.Numeric(precision=25, scale=8), server_default='0', nullable=False))
+
+    # Backfill the running balance from the member transaction ledger
+    op.execute("""
+        UPDATE club_memberships
+        SET unit_balance = totals.units
+        FROM (
+            SELECT membership_id, COALESCE(SUM(units_transacted), 0) AS units
+            FROM member_transactions
+            GROUP BY membership_id
+        ) AS totals
+        WHERE club_memberships.id = totals.membership_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('club_memberships', 'unit_balance')
@@ -0,0 +1,46 @@
+"""add nav_runs table
+
+Revision ID: e4a7c2f9b1d6
+Revises: b3d8e1f4a7c2
+Create Date: 2026-10-16 18:42:51.276094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2f9b1d6'
+down_revision: Union[str, None] = 'b3d8e1f4a7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('nav_runs',
+    sa.Column('run_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('valuation_date', sa.Date(), nullable=False),
+    sa.Column('replace', sa.Boolean(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('clubs_total', sa.Integer(), nullable=False),
+    sa.Column('clubs_done', sa.Integer(), nullable=False),
+    sa.Column('stored', sa.Integer(), nullable=False),
+    sa.Column('exists', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('assets_priced', sa.Integer(), nullable=False),
+    sa.Column('clubs', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('run_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('nav_runs')
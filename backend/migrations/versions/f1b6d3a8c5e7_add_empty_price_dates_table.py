@@ -0,0 +1,35 @@
+"""add empty_price_dates table
+
+Revision ID: f1b6d3a8c5e7
+Revises: e4a7c2f9b1d6
+Create Date: 2026-10-16 19:27:13.508432
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d3a8c5e7'
+down_revision: Union[str, None] = 'e4a7c2f9b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('empty_price_dates',
+    sa.Column('asset_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('price_date', sa.Date(), nullable=False),
+    sa.Column('checked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.PrimaryKeyConstraint('asset_id', 'price_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('empty_price_dates')
@@ -9,5 +9,10 @@ from .fund import Fund
 from .fund_split import FundSplit
 from .unit_value_history import UnitValueHistory
 from .asset import Asset
+from .asset_price import AssetPrice
+from .empty_price_date import EmptyPriceDate
+from .symbol_index import SymbolIndexEntry
+from .etf_holdings import ETFHoldings
+from .nav_run import NavRun
 from .transaction import Transaction
 from .member_transaction import MemberTransaction
\ No newline at end of file
@@ -0,0 +1,22 @@
+# models/asset_price.py
+from sqlalchemy import Column, String, Numeric, Date, DateTime, ForeignKey, func
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from backend.core.database import Base
+
+class AssetPrice(Base):
+    __tablename__ = 'asset_prices' # Daily price store, read through by market price fetching
+
+    # Keyed by (asset_id, price_date): one closing/latest price per asset per trading day
+    asset_id = Column(UUID(as_uuid=True), ForeignKey('assets.id'), primary_key=True)
+    price_date = Column(Date, primary_key=True) # Trading day the price belongs to
+
+    close_price = Column(Numeric(18, 6), nullable=False)
+    source = Column(String, nullable=False) # Provider the price came from, e.g. 'alpha_vantage'
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    asset = relationship("Asset")
+
+    def __repr__(self):
+        return f"<AssetPrice(asset_id='{self.asset_id}', price_date='{self.price_date}', close_price={self.close_price})>"
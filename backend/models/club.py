@@ -14,6 +14,8 @@ class Club(IdMixin, TimestampMixin, TableNameMixin, Base):
     description = Column(String, nullable=True)
     # Club Level Cash Account
     bank_account_balance = Column(Numeric(15, 2), nullable=False, default=0.00) # Precision for currency
+    # Running SUM(member_transactions.units_transacted), kept by crud.member_transaction.create_member_transaction
+    total_units_outstanding = Column(Numeric(25, 8), nullable=False, default=0, server_default="0")
 
     creator_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True)
 
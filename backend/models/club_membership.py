@@ -1,5 +1,5 @@
 # models/club_membership.py
-from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Enum as SQLEnum, ForeignKey, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -14,6 +14,8 @@ class ClubMembership(IdMixin, TimestampMixin, TableNameMixin, Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False, index=True) # Added index
     club_id = Column(UUID(as_uuid=True), ForeignKey('clubs.id'), nullable=False, index=True) # Added index
     role = Column(SQLEnum(ClubRole, name="club_role_enum", create_type=True, native_enum=True), nullable=False, default=ClubRole.Member) # Keep enum fixes
+    # Running sum of this member's units_transacted, kept by create_member_transaction
+    unit_balance = Column(Numeric(25, 8), nullable=False, default=0, server_default="0")
 
     # Relationships
     user = relationship("User", back_populates="memberships")
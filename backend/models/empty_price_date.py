@@ -0,0 +1,15 @@
+# models/empty_price_date.py
+from sqlalchemy import Column, Date, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from backend.core.database import Base
+
+class EmptyPriceDate(Base):
+    __tablename__ = 'empty_price_dates' # Weekdays the provider was asked for and had no price (holidays, halts)
+
+    # The price backfill skips these, so settled gaps are not requested again on every run
+    asset_id = Column(UUID(as_uuid=True), ForeignKey('assets.id'), primary_key=True)
+    price_date = Column(Date, primary_key=True)
+    checked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<EmptyPriceDate(asset_id='{self.asset_id}', price_date='{self.price_date}')>"
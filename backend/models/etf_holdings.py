@@ -0,0 +1,19 @@
+# models/etf_holdings.py
+from sqlalchemy import Column, String, DateTime, JSON, func
+from backend.core.database import Base
+
+class ETFHoldings(Base):
+    __tablename__ = 'etf_holdings' # Local copy of provider ETF holdings, refreshed on a slow TTL
+
+    symbol = Column(String, primary_key=True) # Fund's ticker, upper case
+
+    # [[ticker, name, weight], ...] and [[sector, weight], ...] as reported by the provider.
+    # Both empty when the provider has no holdings for the symbol (not an ETF), so
+    # plain stocks are not asked about again until the entry expires.
+    holdings = Column(JSON, nullable=False, default=list)
+    sector_weights = Column(JSON, nullable=False, default=list)
+    source = Column(String, nullable=False) # Provider the holdings came from
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ETFHoldings(symbol='{self.symbol}', holdings={len(self.holdings or [])}, fetched_at='{self.fetched_at}')>"
@@ -0,0 +1,29 @@
+# models/nav_run.py
+from sqlalchemy import Column, String, Text, Date, Boolean, Integer, DateTime, JSON, func
+from sqlalchemy.dialects.postgresql import UUID
+from backend.core.database import Base
+
+class NavRun(Base):
+    __tablename__ = 'nav_runs' # Batch NAV runs (nav_batch_service), readable from any worker
+
+    run_id = Column(UUID(as_uuid=True), primary_key=True)
+    valuation_date = Column(Date, nullable=False)
+    replace = Column(Boolean, nullable=False, default=False)
+    status = Column(String, nullable=False) # pending, running, finished or failed
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    clubs_total = Column(Integer, nullable=False, default=0)
+    clubs_done = Column(Integer, nullable=False, default=0)
+    stored = Column(Integer, nullable=False, default=0)
+    exists = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    assets_priced = Column(Integer, nullable=False, default=0)
+
+    # {club_id: {status, error, total_club_value, unit_value, unpriced_assets}}, amounts as strings
+    clubs = Column(JSON, nullable=False, default=dict)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<NavRun(run_id='{self.run_id}', valuation_date='{self.valuation_date}', status='{self.status}')>"
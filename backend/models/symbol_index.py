@@ -0,0 +1,22 @@
+# models/symbol_index.py
+from sqlalchemy import Column, String, DateTime, Index, func
+from backend.core.database import Base
+
+class SymbolIndexEntry(Base):
+    __tablename__ = 'symbol_index' # Local copy of the provider's ticker list, searched in memory
+
+    # A ticker can be listed on several exchanges
+    symbol = Column(String, primary_key=True)
+    exchange_mic = Column(String, primary_key=True, default="") # '' when the provider gives no exchange
+
+    name = Column(String, nullable=True)
+    asset_type = Column(String, nullable=True) # Provider's type, e.g. 'equity', 'etf'
+    source = Column(String, nullable=False) # Provider the entry came from
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # Last download that listed it
+
+    __table_args__ = (
+        Index('ix_symbol_index_refreshed_at', 'refreshed_at'),
+    )
+
+    def __repr__(self):
+        return f"<SymbolIndexEntry(symbol='{self.symbol}', exchange_mic='{self.exchange_mic}', name='{self.name}')>"
@@ -27,6 +27,7 @@ from .asset import (
     AssetReadBasic,
     AssetRead,
     AssetUpdate,
+    SymbolSearchResult,
 )
 from .user import (
     UserBase,
@@ -81,6 +82,10 @@ from .position import (
 from .reporting import (
     MemberStatementData,
     ClubPerformanceData,
+    TickerExposure,
+    SectorExposure,
+    ETFLookThrough,
+    ClubExposureReport,
 )
 from .transaction import (
     TransactionBase,
@@ -100,6 +105,9 @@ from .transaction import (
 from .unit_value import (
     UnitValueHistoryBase,
     UnitValueHistoryRead,
+    NavBatchRequest,
+    NavBatchClubResult,
+    NavBatchRun,
 )
 
 from .user import (
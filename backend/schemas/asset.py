@@ -74,6 +74,15 @@ class AssetCreateOption(BaseModel):
     name: Optional[str] = Field(None, example="MSFT $300 Call Exp 2025-12-19")
 
 
+class SymbolSearchResult(BaseModel):
+    symbol: str
+    name: Optional[str] = None
+    exchange_mic: Optional[str] = None
+    asset_type: Optional[str] = None # Provider's type, e.g. 'equity', 'etf'
+    asset_id: Optional[uuid.UUID] = None # Set when the symbol is already an asset
+    match: Literal["exact", "symbol_prefix", "name_prefix", "fuzzy"]
+
+
 class AssetUpdate(BaseModel):
     name: Optional[str] = None
     currency: Currency | None = None
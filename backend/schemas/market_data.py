@@ -1,4 +1,6 @@
+import uuid
 from datetime import date, datetime
+from decimal import Decimal
 from typing import List, Optional, Dict, Any, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -456,3 +458,20 @@ class ETFHoldingDetails(BaseModel):
 
 class ETFHoldingResponse(BaseModel):
     data: ETFHoldingDetails
+
+
+# Portfolio Valuation - Market Price Models
+class MarketPriceStatus(str, Enum):
+    OK = "ok"                       # Fresh quote for the valuation date
+    STALE = "stale"                 # Quote found, but not for the valuation date
+    MISSING = "missing"             # No usable quote (unknown asset, unsupported type, provider error)
+    RATE_LIMITED = "rate_limited"   # Skipped or rejected because of the provider quota
+
+
+class MarketPrice(BaseModel):
+    asset_id: uuid.UUID
+    symbol: Optional[str] = None
+    price: Decimal = Decimal("0.0")
+    status: MarketPriceStatus
+    as_of: Optional[date] = None  # Trading day the price belongs to
+    source: Optional[str] = None
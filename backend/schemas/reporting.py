@@ -4,7 +4,7 @@
 Pydantic Schemas for Reporting Responses
 """
 import uuid
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional, TYPE_CHECKING
 
@@ -44,4 +44,34 @@ class ClubPerformanceData(BaseModel):
     # No model_config = orm_config needed here
 
 
+# --- Pydantic Models for Club Look-Through Exposure Response ---
+class TickerExposure(BaseModel):
+    ticker: str
+    name: Optional[str] = None
+    direct_value: Decimal = Field(..., max_digits=15, decimal_places=2, description="Held directly")
+    look_through_value: Decimal = Field(..., max_digits=15, decimal_places=2, description="Held through ETFs")
+    total_value: Decimal = Field(..., max_digits=15, decimal_places=2)
+    weight: float = Field(..., description="Share of the total market value as a decimal (e.g., 0.10 for 10%)")
 
+
+class SectorExposure(BaseModel):
+    sector: str
+    value: Decimal = Field(..., max_digits=15, decimal_places=2)
+    weight: float = Field(..., description="Share of the total market value as a decimal")
+
+
+class ETFLookThrough(BaseModel):
+    symbol: str
+    market_value: Decimal = Field(..., max_digits=15, decimal_places=2)
+    holdings_count: int
+    holdings_as_of: Optional[datetime] = Field(None, description="When the holdings were fetched from the provider")
+
+
+class ClubExposureReport(BaseModel):
+    club_id: uuid.UUID
+    valuation_date: date
+    total_market_value: Decimal = Field(..., max_digits=15, decimal_places=2)
+    by_ticker: List[TickerExposure] = []
+    by_sector: List[SectorExposure] = []
+    etfs: List[ETFLookThrough] = []
+    unpriced_symbols: List[str] = Field([], description="Held symbols without a usable price, counted at 0")
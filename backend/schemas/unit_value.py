@@ -4,7 +4,7 @@ Pydantic Schemas for UnitValueHistory Resource
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, TYPE_CHECKING
+from typing import Dict, Optional, List, TYPE_CHECKING
 
 from pydantic import BaseModel, Field
 
@@ -32,4 +32,36 @@ class UnitValueHistoryRead(UnitValueHistoryBase):
     created_at: datetime
     updated_at: datetime
     club: 'ClubReadBasic' # Nest basic club info
-    model_config = orm_config
\ No newline at end of file
+    model_config = orm_config
+
+
+# --- Batch NAV Runs (all clubs for one valuation date) ---
+class NavBatchRequest(BaseModel):
+    valuation_date: date = Field(default_factory=date.today)
+    club_ids: Optional[List[uuid.UUID]] = Field(None, description="Limit the run to these clubs (default: all clubs)")
+    replace: bool = Field(False, description="Overwrite NAV already stored for the date instead of keeping it")
+
+
+class NavBatchClubResult(BaseModel):
+    status: str = Field(..., description="pending, loaded, stored, exists (kept) or failed")
+    error: Optional[str] = None
+    total_club_value: Optional[Decimal] = Field(None, max_digits=20, decimal_places=2)
+    unit_value: Optional[Decimal] = Field(None, max_digits=20, decimal_places=8)
+    unpriced_assets: int = 0
+
+
+class NavBatchRun(BaseModel):
+    run_id: str
+    valuation_date: date
+    replace: bool
+    status: str = Field(..., description="pending, running, finished or failed")
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    clubs_total: int
+    clubs_done: int
+    stored: int
+    exists: int
+    failed: int
+    assets_priced: int
+    clubs: Dict[str, NavBatchClubResult] = {}
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# backend/scripts/backfill_nav.py
+
+import os
+import sys
+import uuid
+import asyncio
+import argparse
+import logging
+from datetime import date
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to allow importing from backend
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+project_root = os.path.dirname(backend_dir)
+sys.path.append(project_root)
+
+# Load environment variables
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild historical NAV for clubs by replaying their transactions and member transactions "
+                    "against the local price store. NAV already stored is kept unless --replace is given."
+    )
+    parser.add_argument("--club", type=uuid.UUID, action="append", dest="club_ids", default=None,
+                        help="Only backfill this club (repeatable). Default: all clubs.")
+    parser.add_argument("--start", type=date.fromisoformat, default=None,
+                        help="First date to store (YYYY-MM-DD). Default: each club's first ledger date.")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Last date to store (YYYY-MM-DD). Default: yesterday.")
+    parser.add_argument("--replace", action="store_true",
+                        help="Overwrite NAV already stored in the range.")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    # Imported here so sys.path and the environment are set up first
+    from backend.core import session as db_session
+    from backend.services import nav_backfill_service
+
+    db_session.initialize_database()
+    try:
+        summaries = await nav_backfill_service.backfill_nav(
+            club_ids=args.club_ids,
+            start_date=args.start,
+            end_date=args.end,
+            replace=args.replace
+        )
+    finally:
+        await db_session.async_engine.dispose()
+
+    failed = 0
+    for summary in summaries:
+        if summary["error"]:
+            failed += 1
+            print(f"{summary['club_id']}: failed: {summary['error']}")
+            continue
+        print(
+            f"{summary['club_id']}: {summary['rows_written']} of {summary['days']} day(s) stored "
+            f"({summary['start_date']}..{summary['end_date']}); {summary['unpriced_assets']} unpriced asset(s), "
+            f"{summary['skipped_transactions']} transaction(s) ignored."
+        )
+    print(f"NAV backfill finished for {len(summaries)} club(s); {failed} failed.")
+    return 1 if failed else 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+    args = parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
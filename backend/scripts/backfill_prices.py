@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# backend/scripts/backfill_prices.py
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+from datetime import date
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to allow importing from backend
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+project_root = os.path.dirname(backend_dir)
+sys.path.append(project_root)
+
+# Load environment variables
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fill missing daily closing prices for every stock held or traded by a club. "
+                    "Safe to re-run: only gaps that are still missing are fetched."
+    )
+    parser.add_argument("--start", type=date.fromisoformat, default=None,
+                        help="Earliest date to backfill (YYYY-MM-DD). Default: each asset's first transaction date.")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Last date to backfill (YYYY-MM-DD). Default: yesterday.")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Date ranges fetched at the same time (default: PRICE_BACKFILL_MAX_CONCURRENCY).")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only list the missing ranges, do not fetch anything.")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    # Imported here so sys.path and the environment are set up first
+    from backend.core import session as db_session
+    from backend.services import price_backfill_service
+    from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+
+    db_session.initialize_database()
+    try:
+        async with db_session.SessionFactory() as db:
+            if args.dry_run:
+                gaps = await price_backfill_service.find_price_gaps(db, start_date=args.start, end_date=args.end)
+                for (from_date, to_date), by_symbol in sorted(gaps.items()):
+                    print(f"{from_date}..{to_date}: {', '.join(sorted(by_symbol))}")
+                print(f"{len(gaps)} missing range(s).")
+                return 0
+
+            provider = MarketStackAdapter()
+            try:
+                summary = await price_backfill_service.backfill_missing_prices(
+                    db,
+                    provider,
+                    start_date=args.start,
+                    end_date=args.end,
+                    max_concurrency=args.concurrency or price_backfill_service.PRICE_BACKFILL_MAX_CONCURRENCY
+                )
+            finally:
+                await provider.aclose()
+    finally:
+        await db_session.async_engine.dispose()
+
+    print(
+        f"Backfill finished: {summary['rows_written']} price(s) stored for {summary['assets']} asset(s) "
+        f"across {summary['ranges']} range(s), {summary['empty_dates']} date(s) without a price; "
+        f"{summary['ranges_failed']} range(s) failed."
+    )
+    # Failed ranges are retried by simply running the script again
+    return 1 if summary["ranges_failed"] else 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+    args = parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# backend/scripts/benchmark_option_pricing.py
+
+import os
+import sys
+import random
+import argparse
+import statistics
+import time
+
+# Add the parent directory to sys.path to allow importing from backend
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+project_root = os.path.dirname(backend_dir)
+sys.path.append(project_root)
+
+from backend.core import option_pricing
+
+
+def build_contracts(count, seed=42):
+    """Random but reproducible contracts: spot 20-500, strike within +/-30%, 1 day to 2 years."""
+    rng = random.Random(seed)
+    spots = [rng.uniform(20, 500) for _ in range(count)]
+    strikes = [round(s * rng.uniform(0.7, 1.3), 0) for s in spots]
+    years = [rng.randint(1, 730) / 365.0 for _ in range(count)]
+    volatilities = [rng.uniform(0.1, 0.8) for _ in range(count)]
+    rates = [0.045] * count
+    is_call = [rng.random() < 0.5 for _ in range(count)]
+    return spots, strikes, years, volatilities, rates, is_call
+
+
+def time_batch(contracts, use_numpy, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        option_pricing.black_scholes_prices(*contracts, use_numpy=use_numpy)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time one batch Black-Scholes pass over N option contracts.")
+    parser.add_argument("--contracts", type=int, default=1000, help="Contracts per batch (default: 1000)")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed batches per kernel (default: 20)")
+    parser.add_argument("--python-only", action="store_true", help="Only time the pure-Python kernel (no numpy needed)")
+    args = parser.parse_args()
+
+    contracts = build_contracts(args.contracts)
+    kernels = [("python", False)]
+    if not args.python_only:
+        if option_pricing.np is None:
+            sys.exit("numpy is not installed: the vectorized kernel cannot be benchmarked (use --python-only to time the fallback).")
+        kernels.append(("numpy", True))
+        print(f"NumPy kernel normal CDF: {'scipy.special.ndtr' if option_pricing._scipy_ndtr is not None else 'Cody erf/erfc (numpy)'}")
+
+    for name, use_numpy in kernels:
+        time_batch(contracts, use_numpy, 1) # Warm-up
+        timings = time_batch(contracts, use_numpy, args.repeats)
+        print(
+            f"{name:>6}: {args.contracts} contracts in {statistics.median(timings):.2f} ms median "
+            f"(min {min(timings):.2f} ms, max {max(timings):.2f} ms, {args.repeats} runs)"
+        )
+
+
+if __name__ == "__main__":
+    main()
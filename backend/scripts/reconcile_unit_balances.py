@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# backend/scripts/reconcile_unit_balances.py
+
+import os
+import sys
+import uuid
+import asyncio
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to allow importing from backend
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+project_root = os.path.dirname(backend_dir)
+sys.path.append(project_root)
+
+# Load environment variables
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rebuild the running unit totals (per membership and per club) from the member "
+                    "transaction ledger, correcting any that drifted."
+    )
+    parser.add_argument("--club", type=uuid.UUID, action="append", dest="club_ids", default=None,
+                        help="Only reconcile this club (repeatable). Default: all clubs.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what drifted without saving the corrections.")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    # Imported here so sys.path and the environment are set up first
+    from backend.core import session as db_session
+    from backend.crud import member_transaction as crud_member_tx
+
+    db_session.initialize_database()
+    try:
+        async with db_session.SessionFactory() as db:
+            fixed = await crud_member_tx.reconcile_unit_balances(db, club_ids=args.club_ids)
+            if args.dry_run:
+                await db.rollback()
+            else:
+                await db.commit()
+    finally:
+        await db_session.async_engine.dispose()
+
+    for membership_id in fixed["memberships"]:
+        print(f"membership {membership_id}: unit balance {'would be ' if args.dry_run else ''}rebuilt")
+    for club_id in fixed["clubs"]:
+        print(f"club {club_id}: units outstanding {'would be ' if args.dry_run else ''}rebuilt")
+    print(
+        f"{len(fixed['memberships'])} membership(s) and {len(fixed['clubs'])} club(s) drifted from the ledger"
+        f"{' (not saved)' if args.dry_run else ''}."
+    )
+    # A dry run that finds drift exits with status 1, so it can be used as a check
+    return 1 if args.dry_run and (fixed["memberships"] or fixed["clubs"]) else 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+    args = parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
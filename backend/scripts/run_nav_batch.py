@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# backend/scripts/run_nav_batch.py
+
+import os
+import sys
+import uuid
+import asyncio
+import argparse
+import logging
+from datetime import date
+from dotenv import load_dotenv
+
+# Add the parent directory to sys.path to allow importing from backend
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+project_root = os.path.dirname(backend_dir)
+sys.path.append(project_root)
+
+# Load environment variables
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Calculate and store NAV for every club on one valuation date. Each held asset is priced "
+                    "once; NAV already stored for the date is kept unless --replace is given."
+    )
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                        help="Valuation date (YYYY-MM-DD). Default: today.")
+    parser.add_argument("--club", type=uuid.UUID, action="append", dest="club_ids", default=None,
+                        help="Only value this club (repeatable). Default: all clubs.")
+    parser.add_argument("--replace", action="store_true",
+                        help="Overwrite NAV already stored for the date.")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Clubs loaded at the same time (default: NAV_BATCH_MAX_CONCURRENCY).")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> int:
+    # Imported here so sys.path and the environment are set up first
+    from backend.core import session as db_session
+    from backend.services import accounting_service, nav_batch_service
+
+    db_session.initialize_database()
+    try:
+        result = await nav_batch_service.run_nav_batch(
+            args.date,
+            club_ids=args.club_ids,
+            replace=args.replace,
+            max_concurrency=args.concurrency or nav_batch_service.NAV_BATCH_MAX_CONCURRENCY
+        )
+    finally:
+        await accounting_service.close_price_provider()
+        await db_session.async_engine.dispose()
+
+    for club_id, club in sorted(result["clubs"].items()):
+        if club["status"] == nav_batch_service.CLUB_FAILED:
+            print(f"{club_id}: failed: {club['error']}")
+    print(
+        f"NAV run {result['status']} for {args.date}: {result['stored']} stored, {result['exists']} already stored, "
+        f"{result['failed']} failed of {result['clubs_total']} club(s); {result['assets_priced']} asset(s) priced."
+    )
+    # Failed clubs are retried by running the script again (stored clubs are kept)
+    return 1 if result["status"] != "finished" or result["failed"] else 0
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s")
+    args = parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
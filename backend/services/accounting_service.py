@@ -1,25 +1,27 @@
 # backend/services/accounting_service.py
 
 import uuid
+import asyncio
 import logging
 import os # Added for environment variables
+from collections import Counter, defaultdict
 from decimal import Decimal, ROUND_HALF_UP, DivisionByZero
-from datetime import date, datetime, timezone # Added timezone
+from datetime import date, datetime, timezone, timedelta # Added timezone
 from typing import Dict, Any, Sequence, List, Optional
 
 # Third-party imports
-import httpx # Added for async HTTP requests
 # from dotenv import load_dotenv # Added to load env vars
 
 # Assuming SQLAlchemy and FastAPI are installed in the environment
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException, status
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
 
 
 # Import CRUD functions, Models, Schemas, and other Services
+from backend.core import ledger_lock
 from backend.crud import (
     member_transaction as crud_member_tx,
     unit_value_history as crud_unit_value,
@@ -27,19 +29,33 @@ from backend.crud import (
     club as crud_club,
     fund as crud_fund,
     position as crud_position,
-    asset as crud_asset # Added asset CRUD
+    asset as crud_asset, # Added asset CRUD
+    asset_price as crud_asset_price
 )
 from backend.models import (
-    MemberTransaction, UnitValueHistory, ClubMembership, Club, Position, Fund, Asset
+    MemberTransaction, UnitValueHistory, ClubMembership, Club, Position, Fund, Asset, AssetPrice
 )
 from backend.models.enums import MemberTransactionType, AssetType # Added AssetType
 from backend.schemas import MemberTransactionCreate # Removed unused schema imports
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+from backend.services.market_data_interface import MarketDataRateLimitError
+from backend.services.market_data_providers.hedged_provider import HedgedMarketDataProvider, build_hedged_provider
+from backend.services import option_valuation_service
 
 
-# --- Alpha Vantage Configuration ---
-# load_dotenv()
-ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
-ALPHA_VANTAGE_BASE_URL = "https://www.alphavantage.co/query"
+# --- Market Price Fetching Configuration ---
+# Price providers for NAV, in order: the first is the primary, the others hedge it.
+# With MARKET_DATA_PROVIDER=synthetic the default is the synthetic provider alone.
+_DEFAULT_PRICE_PROVIDERS = "synthetic" if os.getenv("MARKET_DATA_PROVIDER", "").lower() == "synthetic" else "alpha_vantage,marketstack"
+MARKET_PRICE_PROVIDERS = [name.strip() for name in os.getenv("MARKET_PRICE_PROVIDERS", _DEFAULT_PRICE_PROVIDERS).split(",") if name.strip()]
+# Maximum number of quote requests in flight at once
+MARKET_PRICE_MAX_CONCURRENCY = int(os.getenv("MARKET_PRICE_MAX_CONCURRENCY", "8"))
+# A quote older than this many days before the valuation date is reported as stale
+MARKET_PRICE_MAX_QUOTE_AGE_DAYS = int(os.getenv("MARKET_PRICE_MAX_QUOTE_AGE_DAYS", "4"))
+# Same-day prices in the price store are re-fetched once older than this
+MARKET_PRICE_FRESHNESS_SECONDS = int(os.getenv("MARKET_PRICE_FRESHNESS_SECONDS", "900"))
+# Symbols per bulk quote request when refreshing the price store
+MARKET_PRICE_REFRESH_BATCH_SIZE = int(os.getenv("MARKET_PRICE_REFRESH_BATCH_SIZE", "100"))
 
 # Configure logging
 log = logging.getLogger(__name__)
@@ -47,71 +63,342 @@ log = logging.getLogger(__name__)
 # Constants
 INITIAL_UNIT_VALUE = Decimal("10.00000000")
 
+# Shared by every valuation in this worker so latency histograms and degradation
+# state cover all NAV runs. The app sets it at startup on top of its market data
+# service's providers (set_price_provider); scripts build their own on first use.
+_price_provider: Optional[HedgedMarketDataProvider] = None
+_price_provider_built = False
+
+
+def set_price_provider(provider: Optional[HedgedMarketDataProvider]) -> None:
+    """Installs the worker's hedged price provider (None: no provider configured)."""
+    global _price_provider, _price_provider_built
+    _price_provider = provider
+    _price_provider_built = True
+
+
+async def close_price_provider() -> None:
+    """Closes the worker's hedged price provider, if any (application shutdown / end of script)."""
+    global _price_provider, _price_provider_built
+    provider, _price_provider, _price_provider_built = _price_provider, None, False
+    if provider is not None:
+        await provider.aclose()
+
+
+def _get_price_provider() -> Optional[HedgedMarketDataProvider]:
+    """Returns the worker's hedged price provider, or None if no provider is configured."""
+    if not _price_provider_built:
+        set_price_provider(build_hedged_provider(MARKET_PRICE_PROVIDERS))
+    return _price_provider
+
+
+def _quote_status_for_date(as_of: Optional[date], valuation_date: date) -> MarketPriceStatus:
+    """ A quote is stale if it is newer than the valuation date or too old to stand in for it. """
+    if as_of is None:
+        return MarketPriceStatus.OK
+    if as_of > valuation_date or (valuation_date - as_of).days > MARKET_PRICE_MAX_QUOTE_AGE_DAYS:
+        return MarketPriceStatus.STALE
+    return MarketPriceStatus.OK
+
+
+async def _fetch_stock_quote(
+    provider: HedgedMarketDataProvider,
+    semaphore: asyncio.Semaphore,
+    asset: Asset,
+    valuation_date: date
+) -> MarketPrice:
+    """ Fetches one quote through the hedged provider under the shared concurrency limit. Never raises. """
+    symbol = asset.symbol
+    missing = MarketPrice(asset_id=asset.id, symbol=symbol, status=MarketPriceStatus.MISSING)
+    async with semaphore:
+        log.debug(f"Fetching price for STOCK symbol: {symbol} (Asset ID: {asset.id})")
+        try:
+            quote, source = await provider.hedged_call("get_equity_quote", symbol)
+        except MarketDataRateLimitError as e:
+            log.warning(f"Rate limited fetching price for {symbol} (Asset ID: {asset.id}): {e.detail}")
+            return missing.model_copy(update={"status": MarketPriceStatus.RATE_LIMITED})
+        except HTTPException as e:
+            log.error(f"Error fetching price for {symbol}: {e.status_code} - {e.detail}")
+            return missing
+        except Exception as e:
+            log.exception(f"Unexpected error fetching price for {symbol}: {e}")
+            return missing
+    if quote is None:
+        log.warning(f"No quote found for symbol {symbol}. Likely invalid symbol.")
+        return missing.model_copy(update={"source": source})
+    price = Decimal(str(quote.price))
+    as_of = quote.timestamp.date()
+    status_for_date = _quote_status_for_date(as_of, valuation_date)
+    if status_for_date == MarketPriceStatus.STALE:
+        log.warning(f"Quote for {symbol} is from {as_of}, not usable as a fresh price for {valuation_date}.")
+    log.info(f"Successfully fetched price for {symbol} from {source}: {price}")
+    return MarketPrice(asset_id=asset.id, symbol=symbol, price=price, status=status_for_date, as_of=as_of, source=source)
+
+
+async def _fetch_stock_quotes(stock_assets: Sequence[Asset], valuation_date: date) -> List[MarketPrice]:
+    """ Requests quotes for STOCK assets concurrently through the hedged price provider. """
+    provider = _get_price_provider()
+    if provider is None:
+        log.error(f"No market price provider available (MARKET_PRICE_PROVIDERS={','.join(MARKET_PRICE_PROVIDERS)}; check API keys). Cannot fetch market prices.")
+        return [MarketPrice(asset_id=asset.id, symbol=asset.symbol, status=MarketPriceStatus.MISSING) for asset in stock_assets]
+    semaphore = asyncio.Semaphore(MARKET_PRICE_MAX_CONCURRENCY)
+    return await asyncio.gather(*(
+        _fetch_stock_quote(provider, semaphore, asset, valuation_date)
+        for asset in stock_assets
+    ))
+
+
+async def _fetch_stock_closes(stock_assets: Sequence[Asset], valuation_date: date) -> List[MarketPrice]:
+    """
+    End-of-day closes for a past valuation date: the last close on or before it
+    (within MARKET_PRICE_MAX_QUOTE_AGE_DAYS), fetched with bulk price series
+    requests through the hedged price provider. Never raises.
+    """
+    provider = _get_price_provider()
+    if provider is None:
+        log.error(f"No market price provider available (MARKET_PRICE_PROVIDERS={','.join(MARKET_PRICE_PROVIDERS)}; check API keys). Cannot fetch market prices.")
+        return [MarketPrice(asset_id=asset.id, symbol=asset.symbol, status=MarketPriceStatus.MISSING) for asset in stock_assets]
+    assets_by_symbol: Dict[str, List[Asset]] = defaultdict(list)
+    for asset in stock_assets:
+        assets_by_symbol[asset.symbol.upper()].append(asset)
+    from_date = valuation_date - timedelta(days=MARKET_PRICE_MAX_QUOTE_AGE_DAYS)
+    symbols = list(assets_by_symbol)
+    batches = [symbols[i:i + MARKET_PRICE_REFRESH_BATCH_SIZE] for i in range(0, len(symbols), MARKET_PRICE_REFRESH_BATCH_SIZE)]
+    results = await asyncio.gather(*(
+        provider.hedged_call("get_price_series_bulk", batch, from_date, valuation_date)
+        for batch in batches
+    ), return_exceptions=True)
+
+    quotes: List[MarketPrice] = []
+    for batch, result in zip(batches, results):
+        status, series_by_symbol, source = MarketPriceStatus.MISSING, {}, None
+        if isinstance(result, MarketDataRateLimitError):
+            log.warning(f"Rate limited fetching closes for {len(batch)} symbol(s) on {valuation_date}: {result.detail}")
+            status = MarketPriceStatus.RATE_LIMITED
+        elif isinstance(result, Exception):
+            log.error(f"Error fetching closes for {len(batch)} symbol(s) on {valuation_date}: {result}")
+        else:
+            series_by_symbol, source = result
+            series_by_symbol = {symbol.upper(): series for symbol, series in (series_by_symbol or {}).items()}
+        for symbol in batch:
+            series = series_by_symbol.get(symbol)
+            window = series.between(from_date, valuation_date) if series else None
+            for asset in assets_by_symbol[symbol]:
+                if not window:
+                    quotes.append(MarketPrice(asset_id=asset.id, symbol=asset.symbol, status=status, source=source))
+                    continue
+                as_of = date.fromordinal(window.dates[-1])
+                quotes.append(MarketPrice(
+                    asset_id=asset.id, symbol=asset.symbol, price=Decimal(str(window.close[-1])),
+                    status=_quote_status_for_date(as_of, valuation_date), as_of=as_of, source=source
+                ))
+        if not isinstance(result, Exception):
+            log.info(f"Fetched closes for {len(batch)} symbol(s) on {valuation_date} from {source}.")
+    return quotes
+
+
+def _stored_price_is_usable(row: AssetPrice, valuation_date: date, today: date) -> bool:
+    """
+    A stored price can be served for `valuation_date` if no trading (week)day falls between
+    its price_date and the valuation date. Past valuation dates never change; for the current
+    day the row must be settled (fetched after its trading day) or within the freshness window.
+    """
+    day = row.price_date + timedelta(days=1)
+    while day <= valuation_date:
+        if day.weekday() < 5:
+            return False
+        day += timedelta(days=1)
+    if valuation_date < today:
+        return True
+    fetched_at = row.fetched_at if row.fetched_at.tzinfo else row.fetched_at.replace(tzinfo=timezone.utc)
+    settled = fetched_at.astimezone(timezone.utc).date() > row.price_date
+    fresh = (datetime.now(timezone.utc) - fetched_at).total_seconds() <= MARKET_PRICE_FRESHNESS_SECONDS
+    return settled or fresh
+
+
+async def _get_stock_quotes_read_through(
+    db: AsyncSession,
+    stock_assets: Sequence[Asset],
+    valuation_date: date
+) -> Dict[uuid.UUID, MarketPrice]:
+    """
+    Serves STOCK prices from the asset_prices store, fetches only the assets it cannot
+    answer and bulk-inserts what was fetched. Past valuation dates are fetched as the
+    EOD close on or before the date and stored under the close's trading day; latest
+    quotes are only requested for the current day. A stored price that is too old to
+    be served is still used (as stale) if the upstream fetch fails.
+    """
+    stored = await crud_asset_price.get_latest_prices_on_or_before(
+        db=db,
+        asset_ids=[asset.id for asset in stock_assets],
+        on_date=valuation_date,
+        earliest_date=valuation_date - timedelta(days=MARKET_PRICE_MAX_QUOTE_AGE_DAYS)
+    )
+    today = date.today()
+    quotes: Dict[uuid.UUID, MarketPrice] = {}
+    to_fetch: List[Asset] = []
+    for asset in stock_assets:
+        row = stored.get(asset.id)
+        if row is not None and _stored_price_is_usable(row, valuation_date, today):
+            quotes[asset.id] = MarketPrice(asset_id=asset.id, symbol=asset.symbol, price=row.close_price, status=MarketPriceStatus.OK, as_of=row.price_date, source=row.source)
+        else:
+            to_fetch.append(asset)
+    log.debug(f"Price store served {len(quotes)} of {len(stock_assets)} stock prices for {valuation_date}; fetching {len(to_fetch)}.")
+    if not to_fetch:
+        return quotes
+
+    new_rows: List[Dict[str, Any]] = []
+    fetch = _fetch_stock_closes if valuation_date < today else _fetch_stock_quotes
+    for quote in await fetch(to_fetch, valuation_date):
+        if quote.status in (MarketPriceStatus.OK, MarketPriceStatus.STALE) and quote.as_of:
+            new_rows.append({"asset_id": quote.asset_id, "price_date": quote.as_of, "close_price": quote.price, "source": quote.source})
+        fallback = stored.get(quote.asset_id)
+        if quote.status in (MarketPriceStatus.MISSING, MarketPriceStatus.RATE_LIMITED) and fallback is not None:
+            log.warning(f"Using stored price from {fallback.price_date} for {quote.symbol} after fetch status '{quote.status.value}'.")
+            quote = MarketPrice(asset_id=quote.asset_id, symbol=quote.symbol, price=fallback.close_price, status=MarketPriceStatus.STALE, as_of=fallback.price_date, source=fallback.source)
+        quotes[quote.asset_id] = quote
+
+    if new_rows:
+        try:
+            # Savepoint so a failed cache write cannot abort the caller's transaction
+            async with db.begin_nested():
+                stored_count = await crud_asset_price.bulk_insert_asset_prices(db=db, price_rows=new_rows)
+            log.debug(f"Stored {stored_count} fetched prices in the price store.")
+        except SQLAlchemyError as e:
+            log.error(f"Failed to store fetched prices: {e}")
+    return quotes
+
+
+async def refresh_stock_prices(
+    db: AsyncSession,
+    stock_assets: Sequence[Asset],
+    valuation_date: date
+) -> Dict[str, int]:
+    """
+    Fetches current quotes for STOCK assets with bulk quote requests (one per
+    MARKET_PRICE_REFRESH_BATCH_SIZE symbols) and upserts them into the asset_prices
+    store, so later reads for `valuation_date` are served without upstream calls.
+    Intraday rows already stored for the day are replaced. Does not commit.
+
+    Returns counts: {"assets", "requests", "stored", "failed"}.
+    """
+    assets_by_symbol: Dict[str, List[Asset]] = defaultdict(list)
+    for asset in stock_assets:
+        assets_by_symbol[asset.symbol.upper()].append(asset)
+    counts = {"assets": len(stock_assets), "requests": 0, "stored": 0, "failed": 0}
+    if not assets_by_symbol:
+        return counts
+    provider = _get_price_provider()
+    if provider is None:
+        log.error(f"No market price provider available (MARKET_PRICE_PROVIDERS={','.join(MARKET_PRICE_PROVIDERS)}). Cannot refresh market prices.")
+        counts["failed"] = len(stock_assets)
+        return counts
+
+    symbols = list(assets_by_symbol)
+    batches = [symbols[i:i + MARKET_PRICE_REFRESH_BATCH_SIZE] for i in range(0, len(symbols), MARKET_PRICE_REFRESH_BATCH_SIZE)]
+    counts["requests"] = len(batches)
+    results = await asyncio.gather(*(provider.hedged_call("get_equity_quotes", batch) for batch in batches), return_exceptions=True)
+
+    new_rows: List[Dict[str, Any]] = []
+    refreshed: set = set()
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            log.warning(f"Bulk quote request for {len(batch)} symbol(s) failed: {result}")
+            continue
+        quotes, source = result
+        for symbol, quote in (quotes or {}).items():
+            as_of = quote.timestamp.date()
+            if as_of > valuation_date:
+                continue
+            for asset in assets_by_symbol.get(symbol.upper(), []):
+                new_rows.append({"asset_id": asset.id, "price_date": as_of, "close_price": Decimal(str(quote.price)), "source": source})
+                refreshed.add(asset.id)
+    counts["failed"] = len(stock_assets) - len(refreshed)
+    if new_rows:
+        counts["stored"] = await crud_asset_price.bulk_insert_asset_prices(db=db, price_rows=new_rows)
+    log.info(f"Refreshed prices for {len(refreshed)} of {len(stock_assets)} stock assets in {len(batches)} bulk request(s); {counts['stored']} row(s) stored.")
+    return counts
+
+
 # --- Market Data Service ---
-async def get_market_prices(
-    db: AsyncSession, # Add db session to fetch asset details
+async def get_market_price_quotes(
+    db: AsyncSession,
     asset_ids: Sequence[uuid.UUID],
-    valuation_date: date # Keep valuation_date, though AV GlobalQuote gives latest
-) -> Dict[uuid.UUID, Decimal]:
+    valuation_date: date
+) -> Dict[uuid.UUID, MarketPrice]:
     """
-    Fetches market prices for given asset IDs using Alpha Vantage GLOBAL_QUOTE.
-    Currently only supports STOCK assets. Returns 0 for OPTIONS.
+    Fetches market prices with a per-asset status (ok/stale/missing/rate_limited).
+
+    STOCK prices are read through the asset_prices store first, so past valuation
+    dates cost no API calls. All assets are loaded in one query and the remaining
+    STOCK quotes are requested concurrently,
+    bounded by MARKET_PRICE_MAX_CONCURRENCY and the providers' rate limits, so the
+    total time is bounded by the slowest quote rather than the sum of all of them.
+    OPTION assets are valued in one batch from their underlying's price (fetched
+    together with the stock legs), see option_valuation_service.
     """
-    # ... (Implementation unchanged) ...
-    if not ALPHA_VANTAGE_API_KEY:
-        log.error("ALPHA_VANTAGE_API_KEY environment variable not set. Cannot fetch market prices.")
-        return {asset_id: Decimal("0.0") for asset_id in asset_ids}
-    prices: Dict[uuid.UUID, Decimal] = {}
     unique_asset_ids = set(asset_ids)
-    asset_details: Dict[uuid.UUID, Asset] = {}
+    quotes: Dict[uuid.UUID, MarketPrice] = {}
+    asset_details = await crud_asset.get_assets_by_ids(db=db, asset_ids=list(unique_asset_ids))
+
+    stock_assets: Dict[uuid.UUID, Asset] = {}
+    option_assets: List[Asset] = []
     for asset_id in unique_asset_ids:
-        asset = await crud_asset.get_asset(db=db, asset_id=asset_id)
-        if asset: asset_details[asset_id] = asset
-        else:
+        asset = asset_details.get(asset_id)
+        if not asset:
             log.warning(f"Asset ID {asset_id} not found in database. Cannot fetch price.")
-            prices[asset_id] = Decimal("0.0")
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        for asset_id, asset in asset_details.items():
-            if asset_id in prices: continue
-            if asset.asset_type == AssetType.OPTION:
-                log.warning(f"Options pricing not supported via Alpha Vantage in MVP. Returning 0 for asset {asset_id} ({asset.symbol}).")
-                prices[asset_id] = Decimal("0.0")
-                continue
-            if asset.asset_type == AssetType.STOCK:
-                symbol = asset.symbol
-                log.debug(f"Fetching price for STOCK symbol: {symbol} (Asset ID: {asset_id})")
-                params = {"function": "GLOBAL_QUOTE", "symbol": symbol, "apikey": ALPHA_VANTAGE_API_KEY}
-                try:
-                    response = await client.get(ALPHA_VANTAGE_BASE_URL, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-                    if "Error Message" in data:
-                        log.error(f"Alpha Vantage API error for symbol {symbol}: {data['Error Message']}")
-                        prices[asset_id] = Decimal("0.0")
-                    elif "Note" in data and "API call frequency" in data["Note"]:
-                        log.warning(f"Alpha Vantage rate limit likely hit for symbol {symbol}. Note: {data['Note']}")
-                        prices[asset_id] = Decimal("0.0")
-                    elif "Global Quote" in data and data["Global Quote"]:
-                        quote = data["Global Quote"]
-                        price_str = quote.get("05. price")
-                        if price_str:
-                            try: prices[asset_id] = Decimal(price_str); log.info(f"Successfully fetched price for {symbol}: {prices[asset_id]}")
-                            except Exception: log.error(f"Failed to convert price '{price_str}' to Decimal for symbol {symbol}."); prices[asset_id] = Decimal("0.0")
-                        else: log.warning(f"Price ('05. price') not found in Alpha Vantage response for symbol {symbol}. Response: {data}"); prices[asset_id] = Decimal("0.0")
-                    else:
-                        if "Global Quote" in data and not data["Global Quote"]: log.warning(f"Empty 'Global Quote' in Alpha Vantage response for symbol {symbol}. Likely invalid symbol.")
-                        else: log.warning(f"Unexpected Alpha Vantage response format for symbol {symbol}. Response: {data}")
-                        prices[asset_id] = Decimal("0.0")
-                except httpx.HTTPStatusError as e: log.error(f"HTTP error fetching price for {symbol}: {e.response.status_code} - {e.request.url}"); prices[asset_id] = Decimal("0.0")
-                except httpx.RequestError as e: log.error(f"Network error fetching price for {symbol}: {e}"); prices[asset_id] = Decimal("0.0")
-                except Exception as e: log.exception(f"Unexpected error fetching price for {symbol}: {e}"); prices[asset_id] = Decimal("0.0")
-            else: log.warning(f"Asset type '{asset.asset_type}' not supported for price fetching. Asset ID: {asset_id}"); prices[asset_id] = Decimal("0.0")
-    log.info(f"Market price fetching complete for valuation date {valuation_date}. Retrieved {len(prices)} prices.")
+            quotes[asset_id] = MarketPrice(asset_id=asset_id, status=MarketPriceStatus.MISSING)
+        elif asset.asset_type == AssetType.OPTION:
+            option_assets.append(asset)
+        elif asset.asset_type == AssetType.STOCK:
+            stock_assets[asset.id] = asset
+        else:
+            log.warning(f"Asset type '{asset.asset_type}' not supported for price fetching. Asset ID: {asset_id}")
+            quotes[asset_id] = MarketPrice(asset_id=asset_id, symbol=asset.symbol, status=MarketPriceStatus.MISSING)
+
+    # Underlyings of the options are fetched with the stock legs but only returned if requested
+    missing_underlying_ids = {
+        option.underlying_asset_id for option in option_assets
+        if option.underlying_asset_id and option.underlying_asset_id not in stock_assets
+    }
+    underlying_assets = await crud_asset.get_assets_by_ids(db=db, asset_ids=list(missing_underlying_ids)) if missing_underlying_ids else {}
+    stock_quotes: Dict[uuid.UUID, MarketPrice] = {}
+    if stock_assets or underlying_assets:
+        stock_quotes = await _get_stock_quotes_read_through(db, [*stock_assets.values(), *underlying_assets.values()], valuation_date)
+    quotes.update({asset_id: quote for asset_id, quote in stock_quotes.items() if asset_id in stock_assets})
+    if option_assets:
+        quotes.update(await option_valuation_service.value_option_assets(db, option_assets, stock_quotes, valuation_date))
+
+    status_counts = Counter(quote.status.value for quote in quotes.values())
+    log.info(f"Market price fetching complete for valuation date {valuation_date}. Statuses: {dict(status_counts)}")
+    return quotes
+
+
+async def get_market_prices(
+    db: AsyncSession, # Add db session to fetch asset details
+    asset_ids: Sequence[uuid.UUID],
+    valuation_date: date
+) -> Dict[uuid.UUID, Decimal]:
+    """
+    Fetches market prices for given asset IDs.
+    Thin wrapper over get_market_price_quotes that returns only the prices;
+    assets without a usable quote are priced at 0.
+    """
+    quotes = await get_market_price_quotes(db, asset_ids, valuation_date)
+    prices: Dict[uuid.UUID, Decimal] = {asset_id: quote.price for asset_id, quote in quotes.items()}
     for asset_id in asset_ids:
         if asset_id not in prices: prices[asset_id] = Decimal("0.0"); log.warning(f"Asset ID {asset_id} was requested but not found in results, defaulting price to 0.0.")
     return prices
 
 
+# --- Unit Value Lookup ---
+def _effective_date(transaction_date: datetime) -> date:
+    """Calendar day (UTC) a member transaction is priced on; naive datetimes are UTC."""
+    if transaction_date.tzinfo is not None:
+        transaction_date = transaction_date.astimezone(timezone.utc)
+    return transaction_date.date()
+
+
 # --- Member Deposit/Withdrawal Processing ---
 async def process_member_deposit(
     db: AsyncSession,
@@ -124,23 +411,24 @@ async def process_member_deposit(
     log.info(f"Processing deposit for user {deposit_in.user_id} in club {deposit_in.club_id} amount {deposit_in.amount}")
     membership = await crud_membership.get_club_membership_by_user_and_club(db=db, user_id=deposit_in.user_id, club_id=deposit_in.club_id)
     if not membership: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User membership in the specified club not found.")
-    club = await crud_club.get_club(db=db, club_id=deposit_in.club_id)
-    if not club: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {deposit_in.club_id} not found.")
-    latest_unit_record = await crud_unit_value.get_latest_unit_value_for_club(db=db, club_id=club.id)
+    club_id = membership.club_id
+    await ledger_lock.lock_club_ledger(db, club_id) # Held until commit, so concurrent ledger writes for the club queue here
+    # From the database, not the per-worker index: NAV stored by any worker must price this deposit
+    effective = await crud_unit_value.get_unit_value_as_of(db, club_id=club_id, on_date=_effective_date(deposit_in.transaction_date))
     unit_value_used: Decimal
-    if latest_unit_record: unit_value_used = latest_unit_record.unit_value; log.info(f"Using latest unit value for club {club.id}: {unit_value_used}")
-    else: unit_value_used = INITIAL_UNIT_VALUE; log.info(f"No unit value history found for club {club.id}. Using initial unit value: {unit_value_used}")
-    if unit_value_used <= Decimal("0"): log.error(f"Unit value is zero or negative ({unit_value_used}) for club {club.id}. Cannot calculate units."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot process deposit: Invalid unit value.")
+    if effective: unit_value_used = effective[1]; log.info(f"Using unit value of {effective[0]} for club {club_id}: {unit_value_used}")
+    else: unit_value_used = INITIAL_UNIT_VALUE; log.info(f"No unit value history on or before the deposit date for club {club_id}. Using initial unit value: {unit_value_used}")
+    if unit_value_used <= Decimal("0"): log.error(f"Unit value is zero or negative ({unit_value_used}) for club {club_id}. Cannot calculate units."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot process deposit: Invalid unit value.")
     try: units_transacted = (deposit_in.amount / unit_value_used).quantize(Decimal("0.00000001"), rounding=ROUND_HALF_UP); log.info(f"Calculated units for deposit: {units_transacted}")
-    except DivisionByZero: log.error(f"Division by zero error calculating units for club {club.id} with unit value {unit_value_used}."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error calculating units for deposit.")
+    except DivisionByZero: log.error(f"Division by zero error calculating units for club {club_id} with unit value {unit_value_used}."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error calculating units for deposit.")
     member_tx_data = {"membership_id": membership.id, "transaction_type": MemberTransactionType.DEPOSIT, "amount": deposit_in.amount, "transaction_date": deposit_in.transaction_date, "unit_value_used": unit_value_used, "units_transacted": units_transacted, "notes": deposit_in.notes}
     try:
         created_member_tx_raw = await crud_member_tx.create_member_transaction(db=db, member_tx_data=member_tx_data)
         log.info(f"Created member transaction {created_member_tx_raw.id}")
-        club.bank_account_balance += deposit_in.amount
-        db.add(club) # Add the actual club object
-        log.info(f"Updated club {club.id} bank balance to {club.bank_account_balance}")
-        await db.flush() # Flush the real session
+        # One UPDATE ... RETURNING instead of loading the club and writing it back
+        new_balance = await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=deposit_in.amount)
+        if new_balance is None: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {club_id} not found.")
+        log.info(f"Updated club {club_id} bank balance to {new_balance}")
         
         # --- Start Modification ---
         new_tx_id = created_member_tx_raw.id # Get the ID
@@ -182,27 +470,29 @@ async def process_member_withdrawal(
     log.info(f"Processing withdrawal for user {withdrawal_in.user_id} in club {withdrawal_in.club_id} amount {withdrawal_in.amount}")
     membership = await crud_membership.get_club_membership_by_user_and_club(db=db, user_id=withdrawal_in.user_id, club_id=withdrawal_in.club_id)
     if not membership: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User membership in the specified club not found.")
-    club = await crud_club.get_club(db=db, club_id=withdrawal_in.club_id)
-    if not club: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {withdrawal_in.club_id} not found.")
-    latest_unit_record = await crud_unit_value.get_latest_unit_value_for_club(db=db, club_id=club.id)
-    if not latest_unit_record: log.error(f"No unit value history found for club {club.id}. Cannot process withdrawal."); raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cannot process withdrawal: No unit value history found for club.")
-    unit_value_used = latest_unit_record.unit_value
-    log.info(f"Using latest unit value for withdrawal: {unit_value_used}")
-    if unit_value_used <= Decimal("0"): log.error(f"Unit value is zero or negative ({unit_value_used}) for club {club.id}. Cannot calculate units for withdrawal."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot process withdrawal: Invalid unit value.")
+    club_id = membership.club_id
+    await ledger_lock.lock_club_ledger(db, club_id) # Held until commit, so concurrent ledger writes for the club queue here
+    effective = await crud_unit_value.get_unit_value_as_of(db, club_id=club_id, on_date=_effective_date(withdrawal_in.transaction_date))
+    if not effective: log.error(f"No unit value history on or before the withdrawal date for club {club_id}. Cannot process withdrawal."); raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cannot process withdrawal: No unit value history found for club on or before the transaction date.")
+    unit_value_used = effective[1]
+    log.info(f"Using unit value of {effective[0]} for withdrawal: {unit_value_used}")
+    if unit_value_used <= Decimal("0"): log.error(f"Unit value is zero or negative ({unit_value_used}) for club {club_id}. Cannot calculate units for withdrawal."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot process withdrawal: Invalid unit value.")
     try: units_being_redeemed = (withdrawal_in.amount / unit_value_used).quantize(Decimal("0.00000001"), rounding=ROUND_HALF_UP); log.info(f"Calculated units to redeem for withdrawal: {units_being_redeemed}")
-    except DivisionByZero: log.error(f"Division by zero error calculating units for withdrawal in club {club.id}."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error calculating units for withdrawal.")
+    except DivisionByZero: log.error(f"Division by zero error calculating units for withdrawal in club {club_id}."); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error calculating units for withdrawal.")
     try: current_member_units = await crud_member_tx.get_member_unit_balance(db=db, membership_id=membership.id); log.info(f"Member {membership.id} current unit balance: {current_member_units}")
     except Exception as e: log.exception(f"Error retrieving unit balance for membership {membership.id}: {e}"); raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not retrieve member unit balance.")
     if current_member_units < units_being_redeemed: log.warning(f"Insufficient units for withdrawal for membership {membership.id}. Required: {units_being_redeemed}, Available: {current_member_units}"); raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient units for withdrawal. Required: {units_being_redeemed:.8f}, Available: {current_member_units:.8f}")
-    if club.bank_account_balance < withdrawal_in.amount: log.warning(f"Insufficient cash in club bank account {club.id} for withdrawal. Required: {withdrawal_in.amount}, Available: {club.bank_account_balance}"); raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient cash in club bank account to cover withdrawal. Required: {withdrawal_in.amount:.2f}, Available: {club.bank_account_balance:.2f}")
     member_tx_data = {"membership_id": membership.id, "transaction_type": MemberTransactionType.WITHDRAWAL, "amount": withdrawal_in.amount, "transaction_date": withdrawal_in.transaction_date, "unit_value_used": unit_value_used, "units_transacted": -units_being_redeemed, "notes": withdrawal_in.notes}
     try:
+        # Debited only while the balance covers it, in the same statement
+        new_balance = await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=-withdrawal_in.amount, required=withdrawal_in.amount)
+        if new_balance is None:
+            available = await crud_club.get_club_bank_balance(db, club_id=club_id)
+            if available is None: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {club_id} not found.")
+            log.warning(f"Insufficient cash in club bank account {club_id} for withdrawal. Required: {withdrawal_in.amount}, Available: {available}"); raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient cash in club bank account to cover withdrawal. Required: {withdrawal_in.amount:.2f}, Available: {available:.2f}")
+        log.info(f"Updated club {club_id} bank balance to {new_balance}")
         created_member_tx = await crud_member_tx.create_member_transaction(db=db, member_tx_data=member_tx_data)
         log.info(f"Created member transaction {created_member_tx.id} for withdrawal.")
-        club.bank_account_balance -= withdrawal_in.amount
-        db.add(club) # Add the actual club object
-        log.info(f"Updated club {club.id} bank balance to {club.bank_account_balance}")
-        await db.flush() # Flush the real session
         log.info(f"Successfully processed member withdrawal {created_member_tx.id}")
         # --- FIX: Removed problematic refresh calls ---
         # await db.refresh(created_member_tx)
@@ -215,6 +505,57 @@ async def process_member_withdrawal(
 
 
 # --- NAV Calculation ---
+def compute_nav(
+    club_id: uuid.UUID,
+    state: Dict[str, Any],
+    market_prices: Dict[uuid.UUID, Decimal],
+    valuation_date: date
+) -> Dict[str, Any]:
+    """
+    Values a club from its valuation state (crud_club.get_club_valuation_state) and
+    prices, without any I/O. Returns the UnitValueHistory fields as a dict. Assets
+    missing from `market_prices` are valued at 0; zero units give a unit value of 0.
+    """
+    # 1. Total Market Value of Positions
+    total_market_value = Decimal("0.0")
+    for asset_id, quantity in state["positions"]:
+        price = market_prices.get(asset_id, Decimal("0.0"))
+        if price == Decimal("0.0"):
+             log.warning(f"Using price 0.0 for asset {asset_id} in NAV calculation for club {club_id}.")
+        total_market_value += quantity * price
+        log.debug(f"Asset {asset_id} (Qty: {quantity}) value: {(quantity * price):.2f} (Price: {price})")
+
+    # 2. Total Club Value (NAV) = positions + bank cash + brokerage cash
+    total_cash = state["bank_cash"] + state["brokerage_cash"]
+    total_club_value = total_market_value + total_cash
+    log.debug(f"Club {club_id} NAV {total_club_value:.2f} (Positions: {total_market_value:.2f}, Bank: {state['bank_cash']}, Brokerage: {state['brokerage_cash']})")
+
+    # 3. NAV per Unit, over the running units total kept with the member transaction ledger
+    return build_nav_row(club_id, valuation_date, total_club_value, state["total_units"])
+
+
+def build_nav_row(
+    club_id: uuid.UUID,
+    valuation_date: date,
+    total_club_value: Decimal,
+    total_units_outstanding: Decimal
+) -> Dict[str, Any]:
+    """UnitValueHistory fields for a club value and units total, rounded as stored."""
+    unit_value = Decimal("0.0")
+    if total_units_outstanding > Decimal("0"):
+        unit_value = (total_club_value / total_units_outstanding).quantize(Decimal("0.00000001"), rounding=ROUND_HALF_UP)
+    elif total_club_value != Decimal("0.0"):
+        log.warning(f"Club {club_id} has value ({total_club_value}) but zero units outstanding. Setting unit value to 0.")
+
+    return {
+        "club_id": club_id,
+        "valuation_date": valuation_date,
+        "total_club_value": total_club_value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+        "total_units_outstanding": total_units_outstanding,
+        "unit_value": unit_value
+    }
+
+
 async def calculate_and_store_nav(
     db: AsyncSession,
     *,
@@ -224,43 +565,22 @@ async def calculate_and_store_nav(
     """
     Calculates the Net Asset Value (NAV) and NAV per unit for a club on a specific date
     and stores it in the UnitValueHistory table.
+
+    Cash, units outstanding and per-asset position totals come from one query over
+    running totals (crud_club.get_club_valuation_state), so the cost depends on
+    the number of held assets, not on the length of the club's ledger.
+    For all clubs at once, see nav_batch_service.
     """
     log.info(f"Calculating NAV for club {club_id} on {valuation_date}")
 
-    # 1. Fetch Club with related Funds, Positions, and Assets
-    stmt = (
-        select(Club)
-        .where(Club.id == club_id)
-        .options(
-            selectinload(Club.funds)
-            .selectinload(Fund.positions)
-            .selectinload(Position.asset)
-        )
-    )
-    result = await db.execute(stmt)
-    club = result.unique().scalar_one_or_none()
-
-    if not club:
+    # 1. Load cash, units and the positions projection
+    state = await crud_club.get_club_valuation_state(db=db, club_id=club_id)
+    if state is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {club_id} not found.")
 
-    # 2. Aggregate Positions and Identify Unique Assets
-    all_positions: list[Position] = []
-    all_asset_ids: set[uuid.UUID] = set()
-    total_brokerage_cash = Decimal("0.0")
-    funds = club.funds
-    for fund in funds:
-        total_brokerage_cash += fund.brokerage_cash_balance
-        fund_positions = fund.positions
-        all_positions.extend(fund_positions)
-        for pos in fund_positions:
-            if pos.asset and pos.asset.id:
-                 all_asset_ids.add(pos.asset.id)
-            else:
-                 log.warning(f"Position {pos.id} in fund {fund.id} is missing asset information.")
-
-    # 3. Fetch Market Prices using the integrated service
+    # 2. Fetch Market Prices using the integrated service
     try:
-        market_prices = await get_market_prices(db, list(all_asset_ids), valuation_date) # Pass db session
+        market_prices = await get_market_prices(db, [asset_id for asset_id, _ in state["positions"]], valuation_date) # Pass db session
     except Exception as e:
         log.exception(f"Failed to fetch market prices for club {club_id} on {valuation_date}: {e}")
         raise HTTPException(
@@ -268,60 +588,14 @@ async def calculate_and_store_nav(
             detail=f"Failed to retrieve market prices for NAV calculation: {e}"
         )
 
-    # 4. Calculate Total Market Value of Positions
-    total_market_value = Decimal("0.0")
-    for pos in all_positions:
-        price = market_prices.get(pos.asset_id, Decimal("0.0"))
-        if price == Decimal("0.0") and pos.asset_id in all_asset_ids:
-             log.warning(f"Using price 0.0 for asset {pos.asset_id} (Symbol: {pos.asset.symbol if pos.asset else 'N/A'}) in NAV calculation.")
-        total_market_value += pos.quantity * price
-        log.debug(f"Position {pos.id} (Asset: {pos.asset.symbol if pos.asset else 'N/A'}, Qty: {pos.quantity}) value: {(pos.quantity * price):.2f} (Price: {price})")
-
-    log.info(f"Total market value of positions for club {club_id}: {total_market_value:.2f}")
-
-    # 5. Calculate Total Cash
-    total_cash = club.bank_account_balance + total_brokerage_cash
-    log.info(f"Total cash for club {club_id}: {total_cash:.2f} (Bank: {club.bank_account_balance}, Brokerage: {total_brokerage_cash})")
+    # 3. Value the club
+    history_data = compute_nav(club_id, state, market_prices, valuation_date)
+    log.info(f"Club {club_id} NAV on {valuation_date}: {history_data['total_club_value']} over {history_data['total_units_outstanding']} units = {history_data['unit_value']} per unit")
 
-    # 6. Calculate Total Club Value (NAV)
-    total_club_value = total_market_value + total_cash
-    log.info(f"Total club value (NAV) for club {club_id}: {total_club_value:.2f}")
-
-    # 7. Get Total Units Outstanding
-    try:
-        total_units_outstanding = await crud_member_tx.get_total_units_for_club(db=db, club_id=club.id)
-        log.info(f"Total units outstanding for club {club.id}: {total_units_outstanding}")
-    except Exception as e:
-        log.exception(f"Error retrieving total units for club {club.id}: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not retrieve total club units.")
-
-    # 8. Calculate NAV per Unit
-    unit_value = Decimal("0.0")
-    if total_units_outstanding > Decimal("0"):
-        try:
-            unit_value = (total_club_value / total_units_outstanding).quantize(Decimal("0.00000001"), rounding=ROUND_HALF_UP)
-            log.info(f"Calculated NAV per unit for club {club.id}: {unit_value}")
-        except DivisionByZero:
-            log.error(f"Division by zero calculating unit value for club {club.id} (Total Value: {total_club_value}, Total Units: {total_units_outstanding})");
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error calculating NAV per unit (division by zero).")
-    elif total_club_value != Decimal("0.0"):
-        log.warning(f"Club {club.id} has value ({total_club_value}) but zero units outstanding. Setting unit value to 0.")
-        unit_value = Decimal("0.0")
-    else:
-        log.info(f"Club {club.id} has zero value and zero units. Setting unit value to 0.")
-        unit_value = Decimal("0.0")
-
-    # 9. Store Unit Value History
-    history_data = {
-        "club_id": club.id,
-        "valuation_date": valuation_date,
-        "total_club_value": total_club_value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
-        "total_units_outstanding": total_units_outstanding,
-        "unit_value": unit_value
-    }
+    # 4. Store Unit Value History
     try:
         new_history_record = await crud_unit_value.create_unit_value_history(db=db, uvh_data=history_data)
-        log.info(f"Stored unit value history for club {club.id} on {valuation_date} (ID: {new_history_record.id})")
+        log.info(f"Stored unit value history for club {club_id} on {valuation_date} (ID: {new_history_record.id})")
         # --- FIX: Removed problematic refresh call ---
         # await db.refresh(new_history_record, attribute_names=['club'])
         # --- END FIX ---
@@ -17,6 +17,7 @@ from backend.crud import asset as crud_asset
 from backend.models import Asset # [cite: backend_files/models/asset.py]
 from backend.models.enums import AssetType, Currency, OptionType # [cite: backend_files/models/enums.py]
 from backend.schemas import AssetCreateStock, AssetCreateOption # [cite: backend_files/schemas/asset.py]
+from backend.services import symbol_index_service
 
 
 # Configure logging
@@ -62,6 +63,7 @@ async def get_or_create_stock_asset(
         # Use eager loading in CRUD now
         new_asset = await crud_asset.create_asset(db=db, asset_data=asset_data) # [cite: crud_asset_py_updated]
         log.info(f"Successfully created new STOCK asset (ID: {new_asset.id}) for symbol: {symbol_upper}")
+        symbol_index_service.note_new_asset(new_asset)
         return new_asset
     except IntegrityError as e:
         # This likely means a STOCK with this symbol was created concurrently,
@@ -0,0 +1,240 @@
+# backend/services/exposure_service.py
+
+"""
+Look-through exposure of a club: ETF positions expanded into their constituents
+and merged with the club's direct positions, by ticker and by sector.
+
+- ETF holdings are stored in the etf_holdings table and refetched from the
+  provider only when older than ETF_HOLDINGS_TTL_HOURS. Symbols the provider has
+  no holdings for are stored empty, so plain stocks are asked about once per TTL.
+- Normalized breakdowns are kept in a worker-wide LRU until their stored entry
+  expires: a report for a club holding many ETFs costs no holdings queries
+  once they are warm, only the position and price lookups.
+- The aggregation itself is one pass over all (position, ticker/sector) rows,
+  see core.exposure.look_through.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.exposure import Breakdown, OTHER_HOLDINGS, look_through, make_breakdown
+from backend.crud import etf_holdings as crud_etf_holdings
+from backend.models import ETFHoldings
+from backend.models.enums import AssetType
+from backend.schemas.market_data import MarketPriceStatus
+from backend.services import accounting_service
+from backend.services.market_data_interface import MarketDataServiceInterface
+from backend.services.market_data_providers.cache_backends import LRUCache, MISSING
+from backend.services.market_data_service import MARKET_DATA_PROVIDER, MarketDataService
+from backend.services.portfolio_stream_service import load_club_holdings
+
+log = logging.getLogger(__name__)
+
+# --- ETF Holdings Configuration ---
+# Stored holdings older than this are refetched (funds rebalance slowly)
+ETF_HOLDINGS_TTL_HOURS = float(os.getenv("ETF_HOLDINGS_TTL_HOURS", "168"))
+# Provider asked for holdings (defaults to the market data provider)
+ETF_HOLDINGS_PROVIDER = os.getenv("ETF_HOLDINGS_PROVIDER", MARKET_DATA_PROVIDER).lower()
+ETF_HOLDINGS_FETCH_CONCURRENCY = int(os.getenv("ETF_HOLDINGS_FETCH_CONCURRENCY", "4"))
+ETF_HOLDINGS_CACHE_MAX_ENTRIES = int(os.getenv("ETF_HOLDINGS_CACHE_MAX_ENTRIES", "4096"))
+# A failed fetch is retried after this many seconds, not on every report
+ETF_HOLDINGS_RETRY_SECONDS = 300.0
+
+CENT = Decimal("0.01")
+
+# Symbol -> (breakdown or None, {ticker: name}, fetched_at or None), per worker
+_breakdowns = LRUCache(ETF_HOLDINGS_CACHE_MAX_ENTRIES)
+
+FundBreakdown = Tuple[Optional[Breakdown], Dict[str, str], Optional[datetime]]
+
+
+def _from_row(row: ETFHoldings) -> FundBreakdown:
+    breakdown = make_breakdown(
+        [(ticker, weight) for ticker, _, weight in row.holdings],
+        [(sector, weight) for sector, weight in row.sector_weights]
+    )
+    names = {(ticker or "").upper(): name for ticker, name, _ in row.holdings if name}
+    return breakdown, names, row.fetched_at
+
+
+def _remember(symbol: str, value: FundBreakdown, ttl: float) -> FundBreakdown:
+    _breakdowns.set(symbol, value, max(ttl, 1.0))
+    return value
+
+
+def resolve_holdings_provider(market_data_service: Optional[MarketDataService]) -> Optional[MarketDataServiceInterface]:
+    """
+    The app-scoped ETF_HOLDINGS_PROVIDER from the market data service, resolved
+    once at startup. None (logged) if it is unknown or not configured: reports
+    then use the stored holdings only.
+    """
+    if market_data_service is None:
+        log.error(f"ETF holdings provider '{ETF_HOLDINGS_PROVIDER}' unavailable: market data service not initialized.")
+        return None
+    try:
+        return market_data_service.get_provider(ETF_HOLDINGS_PROVIDER)
+    except (KeyError, ValueError) as e:
+        log.error(f"ETF holdings provider '{ETF_HOLDINGS_PROVIDER}' not available: {e}")
+        return None
+
+
+async def _fetch_holdings(symbols: Sequence[str], provider: Optional[MarketDataServiceInterface]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Asks the provider for each symbol's holdings; None for symbols whose fetch failed."""
+    if provider is None:
+        log.warning(f"No ETF holdings provider configured; {len(symbols)} symbol(s) not refreshed.")
+        return {symbol: None for symbol in symbols}
+    semaphore = asyncio.Semaphore(max(ETF_HOLDINGS_FETCH_CONCURRENCY, 1))
+
+    async def fetch(symbol: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        async with semaphore:
+            try:
+                details = await provider.get_etf_holdings(symbol)
+            except Exception as e:
+                log.warning(f"Could not fetch ETF holdings for {symbol} from '{ETF_HOLDINGS_PROVIDER}': {e}")
+                return symbol, None
+        return symbol, {
+            "symbol": symbol,
+            "holdings": [[h.ticker, h.name, h.weight] for h in details.output.holdings] if details else [],
+            "sector_weights": [[s.sector, s.weight] for s in details.output.signature.sector_weights] if details else [],
+            "source": ETF_HOLDINGS_PROVIDER
+        }
+
+    return dict(await asyncio.gather(*(fetch(symbol) for symbol in symbols)))
+
+
+async def get_fund_breakdowns(
+    db: AsyncSession,
+    symbols: Sequence[str],
+    provider: Optional[MarketDataServiceInterface]
+) -> Dict[str, FundBreakdown]:
+    """
+    Look-through breakdowns for the given STOCK symbols, from the worker cache,
+    then the etf_holdings table, then `provider` (stale and unknown symbols,
+    fetched concurrently and stored). A symbol that is not a fund maps to a None
+    breakdown. If a refetch fails the stale entry is used. Does not commit.
+    """
+    found: Dict[str, FundBreakdown] = {}
+    missing: List[str] = []
+    for symbol in dict.fromkeys(symbols):
+        value = _breakdowns.get(symbol)
+        if value is MISSING:
+            missing.append(symbol)
+        else:
+            found[symbol] = value
+    if not missing:
+        return found
+
+    now = datetime.now(timezone.utc)
+    ttl = timedelta(hours=ETF_HOLDINGS_TTL_HOURS)
+    rows = await crud_etf_holdings.get_etf_holdings_rows(db, symbols=missing)
+    stale: List[str] = []
+    for symbol in missing:
+        row = rows.get(symbol)
+        if row is not None and now - row.fetched_at < ttl:
+            found[symbol] = _remember(symbol, _from_row(row), (row.fetched_at + ttl - now).total_seconds())
+        else:
+            stale.append(symbol)
+    if not stale:
+        return found
+
+    fetched = await _fetch_holdings(stale, provider)
+    stored = await crud_etf_holdings.upsert_etf_holdings(db, entries=[entry for entry in fetched.values() if entry is not None], fetched_at=now)
+    for row in stored:
+        found[row.symbol] = _remember(row.symbol, _from_row(row), ttl.total_seconds())
+    for symbol in stale:
+        if symbol not in found:
+            row = rows.get(symbol)
+            value = _from_row(row) if row is not None else (None, {}, None)
+            found[symbol] = _remember(symbol, value, ETF_HOLDINGS_RETRY_SECONDS)
+    log.info(f"Fetched ETF holdings for {len(stored)} of {len(stale)} symbol(s) from '{ETF_HOLDINGS_PROVIDER}'.")
+    return found
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _weight(value: float, total: float) -> float:
+    return round(value / total, 6) if total else 0.0
+
+
+async def get_club_exposure_report(
+    db: AsyncSession,
+    *,
+    club_id: uuid.UUID,
+    valuation_date: date,
+    provider: Optional[MarketDataServiceInterface] = None
+) -> Dict[str, Any]:
+    """
+    Club market value by ticker (direct and through ETFs) and by sector, largest
+    first. Positions without a usable price count at 0 and are listed in
+    'unpriced_symbols'. Cash is not included. Raises 404 for an unknown club.
+    `provider` is the app-scoped ETF holdings provider (see resolve_holdings_provider).
+    """
+    holdings = await load_club_holdings(db, club_id)
+    positions = holdings["positions"]
+    quotes = await accounting_service.get_market_price_quotes(db, list({p["asset_id"] for p in positions}), valuation_date) if positions else {}
+
+    # Positions in several funds are merged per symbol
+    symbol_values: Dict[str, float] = {}
+    names: Dict[str, str] = {}
+    stock_symbols: List[str] = []
+    unpriced: List[str] = []
+    for position in positions:
+        symbol = position["symbol"].upper()
+        quote = quotes.get(position["asset_id"])
+        if quote is None or quote.status in (MarketPriceStatus.MISSING, MarketPriceStatus.RATE_LIMITED):
+            unpriced.append(symbol)
+            value = 0.0
+        else:
+            value = float(position["quantity"] * quote.price)
+        symbol_values[symbol] = symbol_values.get(symbol, 0.0) + value
+        if position["name"]:
+            names[symbol] = position["name"]
+        if position["asset_type"] == AssetType.STOCK:
+            stock_symbols.append(symbol)
+
+    funds = await get_fund_breakdowns(db, stock_symbols, provider)
+    breakdowns = {symbol: fund[0] for symbol, fund in funds.items() if fund[0] is not None}
+    for symbol in breakdowns:
+        for ticker, name in funds[symbol][1].items():
+            names.setdefault(ticker, name) # Asset names win over the provider's
+    by_ticker, by_sector = look_through(list(symbol_values.items()), breakdowns)
+
+    total = sum(symbol_values.values())
+    tickers = sorted(by_ticker.items(), key=lambda item: (-(item[1][0] + item[1][1]), item[0]))
+    sectors = sorted(by_sector.items(), key=lambda item: (-item[1], item[0]))
+    return {
+        "club_id": club_id,
+        "valuation_date": valuation_date,
+        "total_market_value": _money(total),
+        "by_ticker": [
+            {
+                "ticker": ticker,
+                "name": names.get(ticker) if ticker != OTHER_HOLDINGS else None,
+                "direct_value": _money(direct),
+                "look_through_value": _money(via_etfs),
+                "total_value": _money(direct + via_etfs),
+                "weight": _weight(direct + via_etfs, total)
+            }
+            for ticker, (direct, via_etfs) in tickers
+        ],
+        "by_sector": [{"sector": sector, "value": _money(value), "weight": _weight(value, total)} for sector, value in sectors],
+        "etfs": [
+            {
+                "symbol": symbol,
+                "market_value": _money(symbol_values[symbol]),
+                "holdings_count": len([t for t in breakdowns[symbol][0] if t != OTHER_HOLDINGS]),
+                "holdings_as_of": funds[symbol][2]
+            }
+            for symbol in sorted(breakdowns)
+        ],
+        "unpriced_symbols": sorted(set(unpriced))
+    }
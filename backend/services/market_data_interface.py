@@ -1,7 +1,11 @@
 # backend/services/market_data_interface.py
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import date, datetime
+
+from fastapi import HTTPException
+
+from backend.core.price_series import PriceSeries
 from backend.schemas.market_data import (
     EquityQuote,
     HistoricalPricePoint,
@@ -26,12 +30,42 @@ from backend.schemas.market_data import (
     ETFHoldingDetails
 )
 
+class MarketDataProviderError(HTTPException):
+    """
+    The provider could not be reached or refused service (after retries).
+
+    Adapters raise these instead of returning None/[] so callers can tell
+    "no data exists" apart from "data could not be fetched".
+    """
+
+    def __init__(self, detail: str, status_code: int = 502):
+        super().__init__(status_code=status_code, detail=detail)
+
+
+class MarketDataRateLimitError(MarketDataProviderError):
+    """The provider's quota was exhausted and the call's deadline did not allow waiting."""
+
+    def __init__(self, detail: str = "Rate limit exceeded for market data provider"):
+        super().__init__(detail=detail, status_code=429)
+
+
+class MarketDataUnavailableError(MarketDataProviderError):
+    """The provider kept failing (5xx, timeouts, network errors) until the call's deadline."""
+
+    def __init__(self, detail: str = "Market data provider unavailable"):
+        super().__init__(detail=detail, status_code=503)
+
+
 class MarketDataServiceInterface(ABC):
     """
     Interface for a service that provides market data from various external APIs.
     All methods should be asynchronous and return our canonical Pydantic models.
     """
 
+    async def aclose(self) -> None:
+        """Release network resources (e.g. pooled HTTP connections). No-op by default."""
+        pass
+
     @abstractmethod
     async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
         """Fetch a real-time or delayed quote for an equity (stock, ETF)."""
@@ -48,6 +82,58 @@ class MarketDataServiceInterface(ABC):
         """Fetch historical price data for an equity."""
         pass
 
+    async def iter_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> AsyncIterator[HistoricalPricePoint]:
+        """Stream historical price data for an equity. Providers with paginated APIs should override this."""
+        for point in await self.get_historical_price_data(symbol, from_date, to_date, exchange):
+            yield point
+
+    async def get_price_series(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> PriceSeries:
+        """Fetch historical prices as a columnar PriceSeries sorted by date. Providers should override this to skip per-row models."""
+        return PriceSeries.from_points(symbol.upper(), await self.get_historical_price_data(symbol, from_date, to_date, exchange))
+
+    async def get_price_series_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, PriceSeries]:
+        """Fetch historical prices for many equities as PriceSeries, keyed by symbol."""
+        points_by_symbol = await self.get_historical_price_data_bulk(symbols, from_date, to_date, exchange)
+        return {symbol: PriceSeries.from_points(symbol, points) for symbol, points in points_by_symbol.items()}
+
+    @abstractmethod
+    async def get_equity_quotes(
+        self,
+        symbols: List[str],
+        exchange: Optional[str] = None
+    ) -> Dict[str, EquityQuote]:
+        """Fetch quotes for many equities in as few upstream calls as possible, keyed by symbol."""
+        pass
+
+    @abstractmethod
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        """Fetch historical price data for many equities, keyed by symbol."""
+        pass
+
     @abstractmethod
     async def get_intraday_price_data(
         self,
@@ -129,6 +215,11 @@ class MarketDataServiceInterface(ABC):
         """Search for symbols/companies based on a query string."""
         pass
 
+    async def iter_ticker_list(self) -> AsyncIterator[CompanyProfile]:
+        """Stream the provider's full ticker list (for the local symbol index). Empty unless overridden."""
+        return
+        yield
+
     # Phase 2 - Commodity Prices
     @abstractmethod
     async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
@@ -0,0 +1,366 @@
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.schemas.market_data import (
+    EquityQuote,
+    HistoricalPricePoint,
+    IntradayPricePoint,
+    CompanyProfile,
+    DividendData,
+    StockSplitData,
+    MarketAssetType,
+    OptionQuote,
+    ForexQuote,
+    CryptoQuote,
+    IndexQuote,
+    MarketMover,
+    CommodityPrice,
+    HistoricalCommodityPriceData,
+    CompanyRatingData,
+    IndexBasicInfo,
+    BondCountry,
+    BondInfoData,
+    ETFTicker,
+    ETFHoldingDetails
+)
+from backend.services.market_data_interface import (
+    MarketDataServiceInterface,
+    MarketDataProviderError,
+    MarketDataRateLimitError,
+    MarketDataUnavailableError
+)
+from backend.core.rate_limit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+ALPHA_VANTAGE_BASE_URL = "https://www.alphavantage.co/query"
+ALPHA_VANTAGE_TIMEOUT_SECONDS = float(os.getenv("ALPHA_VANTAGE_TIMEOUT_SECONDS", "15"))
+# Client-side quota (the free tier allows far less; set to your plan's limit)
+ALPHA_VANTAGE_CALLS_PER_MINUTE = float(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "75"))
+ALPHA_VANTAGE_BURST = float(os.getenv("ALPHA_VANTAGE_BURST", "5"))
+# Calls that would wait longer than this for quota fail with MarketDataRateLimitError
+ALPHA_VANTAGE_MAX_WAIT_SECONDS = float(os.getenv("ALPHA_VANTAGE_MAX_WAIT_SECONDS", "10"))
+# Alpha Vantage has no multi-symbol endpoints; bulk methods fan out this many calls at once
+ALPHA_VANTAGE_MAX_CONCURRENCY = int(os.getenv("ALPHA_VANTAGE_MAX_CONCURRENCY", "8"))
+# TIME_SERIES_DAILY "compact" returns the latest 100 trading days (~140 calendar days)
+COMPACT_HISTORY_DAYS = 140
+
+
+def _float(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return default
+
+
+def _day_timestamp(value: str) -> datetime:
+    day = date.fromisoformat(value[:10])
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class AlphaVantageAdapter(MarketDataServiceInterface):
+    """
+    Adapter for the Alpha Vantage API
+    Covers equity quotes, daily history and currency rates; other methods return None/[].
+    Errors follow the interface: quota exhaustion raises MarketDataRateLimitError,
+    upstream failures raise MarketDataUnavailableError, unknown symbols return None/[].
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.api_key = os.environ.get("ALPHA_VANTAGE_API_KEY")
+        if not self.api_key:
+            raise ValueError("ALPHA_VANTAGE_API_KEY environment variable not set")
+
+        self.base_url = ALPHA_VANTAGE_BASE_URL
+        self.client = client or httpx.AsyncClient(timeout=ALPHA_VANTAGE_TIMEOUT_SECONDS)
+        self.rate_limiter = TokenBucket.per_minute(ALPHA_VANTAGE_CALLS_PER_MINUTE, burst=ALPHA_VANTAGE_BURST)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client"""
+        if not self.client.is_closed:
+            await self.client.aclose()
+
+    async def _query(self, function: str, **params: Any) -> Dict[str, Any]:
+        """
+        Call one Alpha Vantage function
+        Returns the JSON payload, or {} when Alpha Vantage reports an invalid call
+        (e.g. an unknown symbol). Quota messages are raised as rate limit errors.
+        """
+        if not await self.rate_limiter.acquire(timeout=ALPHA_VANTAGE_MAX_WAIT_SECONDS):
+            raise MarketDataRateLimitError(f"Alpha Vantage quota exhausted; {function} not sent")
+
+        params = {"function": function, "apikey": self.api_key, **params}
+        try:
+            response = await self.client.get(self.base_url, params=params)
+        except httpx.RequestError as e:
+            raise MarketDataUnavailableError(f"Alpha Vantage request failed: {type(e).__name__}: {e}")
+        if response.status_code == 429:
+            raise MarketDataRateLimitError("Rate limit exceeded for Alpha Vantage")
+        if response.status_code >= 500:
+            raise MarketDataUnavailableError(f"Alpha Vantage request failed: HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise MarketDataProviderError(f"Alpha Vantage error: HTTP {response.status_code}", status_code=response.status_code)
+        try:
+            data = response.json()
+        except ValueError:
+            raise MarketDataUnavailableError("Alpha Vantage returned a non-JSON response")
+
+        if "Error Message" in data:
+            log.warning(f"Alpha Vantage {function} error for {params.get('symbol') or params}: {data['Error Message']}")
+            return {}
+        # Quota exhaustion is reported with HTTP 200 and a "Note"/"Information" message
+        quota_message = data.get("Note") or data.get("Information")
+        if quota_message and len(data) == 1:
+            raise MarketDataRateLimitError(f"Alpha Vantage rate limit: {quota_message}")
+        return data
+
+    async def _fan_out(self, symbols: List[str], fetch) -> Dict[str, Any]:
+        """
+        Run `fetch(symbol)` for each symbol concurrently, keyed by upper-cased symbol
+        Symbols without data are omitted. If every symbol failed, the first error is raised.
+        """
+        unique_symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        semaphore = asyncio.Semaphore(ALPHA_VANTAGE_MAX_CONCURRENCY)
+
+        async def bounded(symbol: str):
+            async with semaphore:
+                return await fetch(symbol)
+
+        results = await asyncio.gather(*(bounded(symbol) for symbol in unique_symbols), return_exceptions=True)
+        values: Dict[str, Any] = {}
+        errors: List[BaseException] = []
+        for symbol, result in zip(unique_symbols, results):
+            if isinstance(result, BaseException):
+                log.warning(f"Alpha Vantage request for {symbol} failed: {result}")
+                errors.append(result)
+            elif result:
+                values[symbol] = result
+        if errors and not values:
+            raise errors[0]
+        return values
+
+    # --- Equities ---
+
+    @staticmethod
+    def _to_equity_quote(symbol: str, quote: Dict[str, Any]) -> EquityQuote:
+        """Map a GLOBAL_QUOTE payload to an EquityQuote"""
+        price = _float(quote.get("05. price"))
+        open_price = _float(quote.get("02. open"))
+        return EquityQuote(
+            symbol=quote.get("01. symbol", symbol).upper(),
+            name=quote.get("01. symbol", symbol).upper(),
+            exchange="",
+            price=price,
+            change=_float(quote.get("09. change")),
+            percent_change=_float(quote.get("10. change percent")),
+            volume=int(_float(quote.get("06. volume"))),
+            timestamp=_day_timestamp(quote["07. latest trading day"]) if quote.get("07. latest trading day") else datetime.now(timezone.utc),
+            open=open_price,
+            high=_float(quote.get("03. high")),
+            low=_float(quote.get("04. low")),
+            adj_open=open_price,
+            adj_close=price,
+            asset_type="Stock",
+            price_currency="usd"
+        )
+
+    async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
+        """Get the latest quote for a symbol (GLOBAL_QUOTE)"""
+        data = await self._query("GLOBAL_QUOTE", symbol=symbol)
+        quote = data.get("Global Quote")
+        if not quote or not quote.get("05. price"):
+            log.warning(f"No Alpha Vantage quote for {symbol}")
+            return None
+        return self._to_equity_quote(symbol, quote)
+
+    async def get_equity_quotes(self, symbols: List[str], exchange: Optional[str] = None) -> Dict[str, EquityQuote]:
+        """Get quotes for many symbols (one GLOBAL_QUOTE call per symbol, run concurrently)"""
+        return await self._fan_out(symbols, lambda symbol: self.get_equity_quote(symbol, exchange))
+
+    async def get_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> List[HistoricalPricePoint]:
+        """
+        Get daily prices between two dates (TIME_SERIES_DAILY), oldest first
+        Prices are unadjusted; adjusted fields repeat them.
+        """
+        output_size = "compact" if (date.today() - from_date).days <= COMPACT_HISTORY_DAYS else "full"
+        data = await self._query("TIME_SERIES_DAILY", symbol=symbol, outputsize=output_size)
+        series = data.get("Time Series (Daily)") or {}
+        points = []
+        for day, values in series.items():
+            if not (from_date.isoformat() <= day <= to_date.isoformat()):
+                continue
+            open_price, high, low, close = (_float(values.get(k)) for k in ("1. open", "2. high", "3. low", "4. close"))
+            volume = int(_float(values.get("5. volume")))
+            points.append(HistoricalPricePoint(
+                date=_day_timestamp(day),
+                open=open_price,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+                adj_open=open_price,
+                adj_high=high,
+                adj_low=low,
+                adj_close=close,
+                adj_volume=volume,
+                split_factor=1.0,
+                dividend=0.0,
+                symbol=symbol.upper(),
+                exchange="",
+                name=symbol.upper(),
+                asset_type="Stock",
+                price_currency="usd"
+            ))
+        points.sort(key=lambda point: point.date)
+        return points
+
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        """Get daily prices for many symbols (one call per symbol, run concurrently)"""
+        return await self._fan_out(symbols, lambda symbol: self.get_historical_price_data(symbol, from_date, to_date, exchange))
+
+    # --- Currencies ---
+
+    async def _exchange_rate(self, from_currency: str, to_currency: str) -> Optional[Dict[str, Any]]:
+        data = await self._query("CURRENCY_EXCHANGE_RATE", from_currency=from_currency, to_currency=to_currency)
+        rate = data.get("Realtime Currency Exchange Rate")
+        if not rate or not rate.get("5. Exchange Rate"):
+            return None
+        return rate
+
+    @staticmethod
+    def _rate_timestamp(rate: Dict[str, Any]) -> datetime:
+        try:
+            # "Last Refreshed" is reported in UTC
+            return datetime.fromisoformat(rate.get("6. Last Refreshed", "")).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return datetime.now(timezone.utc)
+
+    async def get_forex_quote(self, base_currency: str, quote_currency: str) -> Optional[ForexQuote]:
+        """Get the current exchange rate (CURRENCY_EXCHANGE_RATE)"""
+        rate = await self._exchange_rate(base_currency, quote_currency)
+        if rate is None:
+            return None
+        return ForexQuote(
+            base_currency=base_currency.upper(),
+            quote_currency=quote_currency.upper(),
+            rate=_float(rate["5. Exchange Rate"]),
+            timestamp=self._rate_timestamp(rate)
+        )
+
+    async def get_crypto_quote(self, base_asset: str, quote_asset: str) -> Optional[CryptoQuote]:
+        """Get the current crypto price (CURRENCY_EXCHANGE_RATE; no volume or change data)"""
+        rate = await self._exchange_rate(base_asset, quote_asset)
+        if rate is None:
+            return None
+        return CryptoQuote(
+            base_asset=base_asset.upper(),
+            quote_asset=quote_asset.upper(),
+            price=_float(rate["5. Exchange Rate"]),
+            volume_24h=0.0,
+            change_24h=0.0,
+            percent_change_24h=0.0,
+            timestamp=self._rate_timestamp(rate)
+        )
+
+    # --- Not available from Alpha Vantage in this adapter ---
+
+    async def get_intraday_price_data(
+        self,
+        symbol: str,
+        interval: str,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        exchange: Optional[str] = None
+    ) -> List[IntradayPricePoint]:
+        return []
+
+    async def get_company_profile(self, symbol: str, exchange: Optional[str] = None) -> Optional[CompanyProfile]:
+        return None
+
+    async def get_dividend_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[DividendData]:
+        return []
+
+    async def get_stock_split_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[StockSplitData]:
+        return []
+
+    async def get_option_quote(self, contract_symbol: str) -> Optional[OptionQuote]:
+        return None
+
+    async def get_index_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[IndexQuote]:
+        return None
+
+    async def get_market_movers(self, market_segment: str, top_n: int = 10, exchange: Optional[str] = None) -> List[MarketMover]:
+        return []
+
+    async def search_symbols(self, query: str, asset_type: Optional[MarketAssetType] = None, limit: int = 10) -> List[CompanyProfile]:
+        return []
+
+    async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
+        return None
+
+    async def get_historical_commodity_prices(
+        self,
+        commodity_name: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        frequency: Optional[str] = None
+    ) -> Optional[HistoricalCommodityPriceData]:
+        return None
+
+    async def get_company_ratings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        rated: Optional[str] = None
+    ) -> Optional[CompanyRatingData]:
+        return None
+
+    async def list_stock_market_indexes(self, limit: int = 100, offset: int = 0) -> List[IndexBasicInfo]:
+        return []
+
+    async def list_bond_countries(self, limit: int = 100, offset: int = 0) -> List[BondCountry]:
+        return []
+
+    async def get_bond_info(self, country: str) -> Optional[BondInfoData]:
+        return None
+
+    async def list_etfs(self, limit: int = 100, offset: int = 0) -> List[ETFTicker]:
+        return []
+
+    async def get_etf_holdings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Optional[ETFHoldingDetails]:
+        return None
@@ -0,0 +1,318 @@
+# backend/services/market_data_providers/cache_backends.py
+
+"""
+Storage backends for CachedMarketDataProvider.
+
+- InMemoryCacheBackend: per-process bounded LRU (see LRUCache).
+- RedisCacheBackend: cache shared by all workers. Values are stored as compact
+  JSON (column names once, rows as arrays; zlib-compressed when large). If Redis
+  is unreachable it falls back to an in-memory backend and retries later.
+- Keys are plain strings built by the provider (already namespaced by provider).
+"""
+
+import json
+import logging
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from backend.core.price_series import PriceSeries
+from backend.schemas import market_data as market_data_schemas
+
+try: # Optional dependency: only needed when MARKET_DATA_REDIS_URL is set
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError: # pragma: no cover - redis is in requirements.txt
+    redis_asyncio = None
+    RedisError = OSError
+
+log = logging.getLogger(__name__)
+
+# --- Cache Configuration ---
+MARKET_DATA_CACHE_MAX_ENTRIES = int(os.getenv("MARKET_DATA_CACHE_MAX_ENTRIES", "2048"))
+MARKET_DATA_REDIS_URL = os.getenv("MARKET_DATA_REDIS_URL")
+# After a Redis error, use the in-process fallback for this long before trying Redis again
+REDIS_RETRY_AFTER_SECONDS = float(os.getenv("MARKET_DATA_REDIS_RETRY_AFTER_SECONDS", "30"))
+# Payloads larger than this many bytes are zlib-compressed
+COMPRESS_MIN_BYTES = 512
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded LRU with per-entry expiry (None = never expires).
+
+    Counts hits, misses and evictions (entries dropped to respect `max_entries`;
+    expired entries removed on access are counted as misses, not evictions).
+    """
+
+    def __init__(self, max_entries: int = MARKET_DATA_CACHE_MAX_ENTRIES):
+        if max_entries <= 0:
+            raise ValueError("LRUCache max_entries must be positive")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable) -> Any:
+        """Returns the live value for `key` (refreshing its LRU position) or MISSING. Does not touch counters."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable) -> Any:
+        """Like peek(), but records a hit or a miss."""
+        value = self.peek(key)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+
+# --- Serialization ---
+# Every pydantic model in schemas.market_data can be cached; payloads carry the model name.
+_MODEL_TYPES: Dict[str, type] = {
+    name: obj for name, obj in vars(market_data_schemas).items()
+    if isinstance(obj, type) and issubclass(obj, BaseModel) and obj is not BaseModel
+}
+
+
+def _rows(models: Sequence[BaseModel]) -> Tuple[str, List[str], List[list]]:
+    model_type = type(models[0])
+    columns = list(model_type.model_fields)
+    rows = []
+    for model in models:
+        dumped = model.model_dump(mode="json")
+        rows.append([dumped[column] for column in columns])
+    return model_type.__name__, columns, rows
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serializes a model, a list of models or a dict of models keyed by string.
+
+    Lists and dicts are stored column-wise ({"m": model, "c": columns, "r": rows})
+    so field names are not repeated for every row; a PriceSeries is stored as its
+    metadata plus one list per column. Raises TypeError for other values.
+    """
+    if isinstance(value, PriceSeries):
+        payload = {
+            "s": [value.symbol, value.exchange, value.name, value.asset_type, value.price_currency],
+            "d": value.dates.tolist(),
+            "c": {column: values.tolist() for column, values in value.columns.items()},
+        }
+        return b"z" + zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+    if isinstance(value, BaseModel):
+        payload = {"m": type(value).__name__, "v": value.model_dump(mode="json")}
+    elif isinstance(value, list) and value and all(isinstance(v, BaseModel) for v in value):
+        name, columns, rows = _rows(value)
+        payload = {"m": name, "c": columns, "r": rows}
+    elif isinstance(value, dict) and value and all(isinstance(v, BaseModel) for v in value.values()):
+        name, columns, rows = _rows(list(value.values()))
+        payload = {"m": name, "k": list(value.keys()), "c": columns, "r": rows}
+    else:
+        raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+    if payload["m"] not in _MODEL_TYPES:
+        raise TypeError(f"Model {payload['m']} is not a market data schema")
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_value(data: bytes) -> Any:
+    """Inverse of encode_value()."""
+    raw = zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:]
+    payload = json.loads(raw)
+    if "s" in payload:
+        series = PriceSeries(*payload["s"])
+        series.dates.extend(payload["d"])
+        for column, values in payload["c"].items():
+            series.columns[column].extend(values)
+        return series
+    model_type = _MODEL_TYPES[payload["m"]]
+    if "v" in payload:
+        return model_type.model_validate(payload["v"])
+    models = [model_type.model_validate(dict(zip(payload["c"], row))) for row in payload["r"]]
+    if "k" in payload:
+        return dict(zip(payload["k"], models))
+    return models
+
+
+# --- Backends ---
+
+class CacheBackend(ABC):
+    """Async key/value storage with per-entry TTL (None = no expiry)."""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        """Returns the cached value or MISSING."""
+        pass
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """Returns values (or MISSING) in the order of `keys`."""
+        return [await self.get(key) for key in keys]
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    async def aclose(self) -> None:
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU; values are kept as objects (no serialization)."""
+
+    name = "memory"
+
+    def __init__(self, cache: Optional[LRUCache] = None):
+        self.cache = cache or LRUCache()
+
+    async def get(self, key: str) -> Any:
+        return self.cache.peek(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        self.cache.set(key, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "evictions": self.cache.evictions, "size": len(self.cache)}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache in Redis. Any Redis/connection error switches to the in-process
+    `fallback` for REDIS_RETRY_AFTER_SECONDS instead of failing the request.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, fallback: Optional[InMemoryCacheBackend] = None, key_prefix: str = "marketdata"):
+        self.client = client
+        self.fallback = fallback or InMemoryCacheBackend()
+        self.key_prefix = key_prefix
+        self.errors = 0
+        self._unavailable_until = 0.0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        if redis_asyncio is None:
+            raise RuntimeError("The 'redis' package is required for the Redis market data cache")
+        # Short timeouts: a slow cache must not be slower than the upstream API
+        client = redis_asyncio.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return cls(client, **kwargs)
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        self.errors += 1
+        self._unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        log.warning(f"Redis market data cache unavailable ({error!r}); using in-process cache for {REDIS_RETRY_AFTER_SECONDS}s.")
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def _decode(self, key: str, data: Optional[bytes]) -> Any:
+        if data is None:
+            return MISSING
+        try:
+            return decode_value(data)
+        except Exception as e:
+            log.warning(f"Discarding undecodable cache entry {key}: {e}")
+            return MISSING
+
+    async def get(self, key: str) -> Any:
+        if not self._available():
+            return await self.fallback.get(key)
+        try:
+            data = await self.client.get(self._redis_key(key))
+        except (RedisError, OSError) as e:
+            self._mark_unavailable(e)
+            return await self.fallback.get(key)
+        return self._decode(key, data)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any]:
+        if not keys:
+            return []
+        if not self._available():
+            return await self.fallback.get_many(keys)
+        try:
+            values = await self.client.mget([self._redis_key(key) for key in keys])
+        except (RedisError, OSError) as e:
+            self._mark_unavailable(e)
+            return await self.fallback.get_many(keys)
+        return [self._decode(key, data) for key, data in zip(keys, values)]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if not self._available():
+            await self.fallback.set(key, value, ttl)
+            return
+        try:
+            payload = encode_value(value)
+        except TypeError as e:
+            log.debug(f"Not caching {key} in Redis: {e}")
+            return
+        try:
+            # Redis expiries are whole seconds; round up so a TTL never becomes "no expiry"
+            await self.client.set(self._redis_key(key), payload, ex=None if ttl is None else max(1, int(ttl + 0.999)))
+        except (RedisError, OSError) as e:
+            self._mark_unavailable(e)
+            await self.fallback.set(key, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "errors": self.errors, "fallback_active": not self._available(), "fallback": self.fallback.stats()}
+
+    async def aclose(self) -> None:
+        try:
+            await self.client.aclose()
+        except (RedisError, OSError) as e:
+            log.debug(f"Error closing Redis market data cache client: {e}")
+
+
+def build_cache_backend() -> CacheBackend:
+    """Redis backend when MARKET_DATA_REDIS_URL is set, otherwise in-process."""
+    if MARKET_DATA_REDIS_URL:
+        try:
+            backend = RedisCacheBackend.from_url(MARKET_DATA_REDIS_URL)
+            log.info("Using Redis market data cache.")
+            return backend
+        except (RuntimeError, ValueError) as e:
+            log.error(f"Cannot use Redis market data cache: {e}. Falling back to in-process cache.")
+    return InMemoryCacheBackend()
@@ -0,0 +1,313 @@
+# backend/services/market_data_providers/cached_provider.py
+
+"""
+Caching decorator for any MarketDataServiceInterface.
+
+- CachedMarketDataProvider wraps a provider and serves repeated requests from a
+  cache backend (in-process LRU or Redis, see cache_backends), with per-method TTLs
+  (short for quotes, indefinite for settled historical ranges, long for reference lists).
+- Keys are namespaced by provider so several providers can share one Redis.
+- Empty/None results are never cached: adapters return them on upstream errors.
+- Methods without a TTL below are passed straight through to the wrapped provider.
+"""
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.schemas.market_data import (
+    EquityQuote,
+    HistoricalPricePoint,
+    IntradayPricePoint,
+    CompanyProfile,
+    DividendData,
+    StockSplitData,
+    OptionQuote,
+    ForexQuote,
+    CryptoQuote,
+    IndexQuote,
+    MarketMover,
+    MarketAssetType,
+    CommodityPrice,
+    HistoricalCommodityPriceData,
+    CompanyRatingData,
+    IndexBasicInfo,
+    BondCountry,
+    BondInfoData,
+    ETFTicker,
+    ETFHoldingDetails
+)
+from backend.core.price_series import PriceSeries
+from backend.services.market_data_interface import MarketDataServiceInterface
+from backend.services.market_data_providers.cache_backends import CacheBackend, InMemoryCacheBackend, MISSING
+
+log = logging.getLogger(__name__)
+
+# --- Cache Configuration ---
+QUOTE_CACHE_TTL_SECONDS = float(os.getenv("MARKET_DATA_QUOTE_TTL_SECONDS", "60"))
+LIST_CACHE_TTL_SECONDS = float(os.getenv("MARKET_DATA_LIST_TTL_SECONDS", str(24 * 60 * 60)))
+# Historical ranges ending at least this many days ago are settled: the provider has published
+# (and corrected) their last EOD record, so they are cached without expiry
+HISTORICAL_SETTLE_DAYS = int(os.getenv("MARKET_DATA_HISTORICAL_SETTLE_DAYS", "2"))
+# Ranges ending before today but not settled yet (the last day may still be missing or revised)
+RECENT_HISTORICAL_CACHE_TTL_SECONDS = float(os.getenv("MARKET_DATA_RECENT_HISTORICAL_TTL_SECONDS", str(60 * 60)))
+
+
+def historical_cache_ttl(to_date: date) -> Optional[float]:
+    """TTL for a historical range ending on `to_date`: None (no expiry) once settled"""
+    today = date.today()
+    if to_date >= today:
+        return QUOTE_CACHE_TTL_SECONDS
+    if to_date > today - timedelta(days=HISTORICAL_SETTLE_DAYS):
+        return RECENT_HISTORICAL_CACHE_TTL_SECONDS
+    return None
+
+
+class CachedMarketDataProvider(MarketDataServiceInterface):
+    """Caching decorator around another market data provider"""
+
+    def __init__(
+        self,
+        provider: MarketDataServiceInterface,
+        cache: Optional[CacheBackend] = None,
+        namespace: Optional[str] = None
+    ):
+        self.provider = provider
+        self.cache = cache or InMemoryCacheBackend()
+        self.namespace = namespace or type(provider).__name__.lower()
+        self.hits = 0
+        self.misses = 0
+        # (symbol, exchange) -> cached (from_date, to_date) ranges, so a request for a
+        # sub-range can be answered from a wider cached one. Kept per process.
+        self._historical_ranges: Dict[Tuple[str, Optional[str]], List[Tuple[date, date]]] = {}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the backend's own stats (evictions, errors, ...)"""
+        return {"hits": self.hits, "misses": self.misses, **self.cache.stats()}
+
+    async def aclose(self) -> None:
+        log.info(f"Market data cache stats at shutdown: {self.cache_stats()}")
+        await self.cache.aclose()
+        await self.provider.aclose()
+
+    def _key(self, method: str, *parts: Any) -> str:
+        return ":".join([self.namespace, method, *("" if p is None else str(p) for p in parts)])
+
+    def _record(self, value: Any) -> Any:
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def _cached(self, key: str, ttl: Optional[float], fetch) -> Any:
+        value = self._record(await self.cache.get(key))
+        if value is not MISSING:
+            return value
+        value = await fetch()
+        if value: # Adapters return None/[] on upstream errors; never cache those
+            await self.cache.set(key, value, ttl)
+        return value
+
+    # --- Cached methods ---
+
+    async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
+        return await self._cached(
+            self._key("equity_quote", symbol.upper(), exchange), QUOTE_CACHE_TTL_SECONDS,
+            lambda: self.provider.get_equity_quote(symbol, exchange)
+        )
+
+    async def get_equity_quotes(self, symbols: List[str], exchange: Optional[str] = None) -> Dict[str, EquityQuote]:
+        """Serves cached symbols and fetches only the rest in one bulk call"""
+        unique_symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        cached = await self.cache.get_many([self._key("equity_quote", symbol, exchange) for symbol in unique_symbols])
+        quotes: Dict[str, EquityQuote] = {}
+        to_fetch: List[str] = []
+        for symbol, quote in zip(unique_symbols, cached):
+            if self._record(quote) is MISSING:
+                to_fetch.append(symbol)
+            else:
+                quotes[symbol] = quote
+        if to_fetch:
+            fetched = await self.provider.get_equity_quotes(to_fetch, exchange)
+            for symbol, quote in fetched.items():
+                await self.cache.set(self._key("equity_quote", symbol.upper(), exchange), quote, QUOTE_CACHE_TTL_SECONDS)
+            quotes.update(fetched)
+        return quotes
+
+    async def get_index_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[IndexQuote]:
+        # Only forward `exchange` when given; not every adapter accepts it
+        args = (symbol,) if exchange is None else (symbol, exchange)
+        return await self._cached(
+            self._key("index_quote", symbol.upper(), exchange), QUOTE_CACHE_TTL_SECONDS,
+            lambda: self.provider.get_index_quote(*args)
+        )
+
+    async def get_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> List[HistoricalPricePoint]:
+        """
+        Settled ranges (see historical_cache_ttl) never change and are cached without
+        expiry; recent ranges expire so late or corrected EOD records are picked up.
+        A request inside any cached range is answered by slicing that range.
+        """
+        range_key = (symbol.upper(), exchange)
+        # The exact range may have been cached by another worker
+        points = await self.cache.get(self._key("historical", *range_key, from_date, to_date))
+        if points is MISSING:
+            for cached_from, cached_to in list(self._historical_ranges.get(range_key, [])):
+                if cached_from <= from_date and to_date <= cached_to:
+                    points = await self.cache.get(self._key("historical", *range_key, cached_from, cached_to))
+                    if points is not MISSING:
+                        break
+                    # Expired or evicted; forget the range
+                    self._historical_ranges[range_key].remove((cached_from, cached_to))
+        if self._record(points) is not MISSING:
+            return [p for p in points if from_date <= p.date.date() <= to_date]
+
+        points = await self.provider.get_historical_price_data(symbol, from_date, to_date, exchange)
+        if points:
+            ttl = historical_cache_ttl(to_date)
+            await self.cache.set(self._key("historical", *range_key, from_date, to_date), points, ttl)
+            if (from_date, to_date) not in self._historical_ranges.setdefault(range_key, []):
+                self._historical_ranges[range_key].append((from_date, to_date))
+        return points
+
+    async def get_price_series(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> PriceSeries:
+        """Same TTL policy as get_historical_price_data (exact ranges only)"""
+        return await self._cached(
+            self._key("price_series", symbol.upper(), exchange, from_date, to_date), historical_cache_ttl(to_date),
+            lambda: self.provider.get_price_series(symbol, from_date, to_date, exchange)
+        )
+
+    async def list_stock_market_indexes(self, limit: int = 100, offset: int = 0) -> List[IndexBasicInfo]:
+        return await self._cached(
+            self._key("list_stock_market_indexes", limit, offset), LIST_CACHE_TTL_SECONDS,
+            lambda: self.provider.list_stock_market_indexes(limit, offset)
+        )
+
+    async def list_bond_countries(self, limit: int = 100, offset: int = 0) -> List[BondCountry]:
+        return await self._cached(
+            self._key("list_bond_countries", limit, offset), LIST_CACHE_TTL_SECONDS,
+            lambda: self.provider.list_bond_countries(limit, offset)
+        )
+
+    async def list_etfs(self, limit: int = 100, offset: int = 0) -> List[ETFTicker]:
+        return await self._cached(
+            self._key("list_etfs", limit, offset), LIST_CACHE_TTL_SECONDS,
+            lambda: self.provider.list_etfs(limit, offset)
+        )
+
+    # --- Pass-through methods ---
+
+    async def get_price_series_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, PriceSeries]:
+        return await self.provider.get_price_series_bulk(symbols, from_date, to_date, exchange)
+
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        return await self.provider.get_historical_price_data_bulk(symbols, from_date, to_date, exchange)
+
+    async def get_intraday_price_data(
+        self,
+        symbol: str,
+        interval: str,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        exchange: Optional[str] = None
+    ) -> List[IntradayPricePoint]:
+        return await self.provider.get_intraday_price_data(symbol, interval, from_date, to_date, exchange)
+
+    async def get_company_profile(self, symbol: str, exchange: Optional[str] = None) -> Optional[CompanyProfile]:
+        return await self.provider.get_company_profile(symbol, exchange)
+
+    async def get_dividend_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[DividendData]:
+        return await self.provider.get_dividend_data(symbol, from_date, to_date, exchange)
+
+    async def get_stock_split_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[StockSplitData]:
+        return await self.provider.get_stock_split_data(symbol, from_date, to_date, exchange)
+
+    async def get_option_quote(self, contract_symbol: str) -> Optional[OptionQuote]:
+        return await self.provider.get_option_quote(contract_symbol)
+
+    async def get_forex_quote(self, base_currency: str, quote_currency: str) -> Optional[ForexQuote]:
+        return await self.provider.get_forex_quote(base_currency, quote_currency)
+
+    async def get_crypto_quote(self, base_asset: str, quote_asset: str) -> Optional[CryptoQuote]:
+        return await self.provider.get_crypto_quote(base_asset, quote_asset)
+
+    async def get_market_movers(self, market_segment: str, top_n: int = 10, exchange: Optional[str] = None) -> List[MarketMover]:
+        return await self.provider.get_market_movers(market_segment, top_n, exchange)
+
+    async def search_symbols(self, query: str, asset_type: Optional[MarketAssetType] = None, limit: int = 10) -> List[CompanyProfile]:
+        return await self.provider.search_symbols(query, asset_type, limit)
+
+    async def iter_ticker_list(self) -> AsyncIterator[CompanyProfile]:
+        # Bulk download for the symbol index: not worth caching
+        async for profile in self.provider.iter_ticker_list():
+            yield profile
+
+    async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
+        return await self.provider.get_commodity_price(commodity_name)
+
+    async def get_historical_commodity_prices(
+        self,
+        commodity_name: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        frequency: Optional[str] = None
+    ) -> Optional[HistoricalCommodityPriceData]:
+        return await self.provider.get_historical_commodity_prices(commodity_name, date_from, date_to, frequency)
+
+    async def get_company_ratings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        rated: Optional[str] = None
+    ) -> Optional[CompanyRatingData]:
+        return await self.provider.get_company_ratings(ticker, date_from, date_to, rated)
+
+    async def get_bond_info(self, country: str) -> Optional[BondInfoData]:
+        return await self.provider.get_bond_info(country)
+
+    async def get_etf_holdings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Optional[ETFHoldingDetails]:
+        return await self.provider.get_etf_holdings(ticker, date_from, date_to)
@@ -0,0 +1,412 @@
+# backend/services/market_data_providers/hedged_provider.py
+
+"""
+Composite provider that hedges requests across several MarketDataServiceInterface
+implementations to cut tail latency.
+
+- Providers are tried in configured order (the first is the primary). If a call
+  has not answered by the provider's observed p95 latency, the same call is also
+  sent to the next provider; the first non-empty answer wins and the others are
+  cancelled. A provider that fails or answers empty hands over immediately.
+- Each provider keeps a latency histogram and error counts by kind. A provider
+  whose recent error rate is too high is marked degraded and moved to the back
+  of the order for a cooldown period.
+- Empty answers (None, [], {}) do not count as errors: adapters return them for
+  unknown symbols.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from backend.schemas.market_data import (
+    EquityQuote,
+    HistoricalPricePoint,
+    IntradayPricePoint,
+    CompanyProfile,
+    DividendData,
+    StockSplitData,
+    OptionQuote,
+    ForexQuote,
+    CryptoQuote,
+    IndexQuote,
+    MarketMover,
+    MarketAssetType,
+    CommodityPrice,
+    HistoricalCommodityPriceData,
+    CompanyRatingData,
+    IndexBasicInfo,
+    BondCountry,
+    BondInfoData,
+    ETFTicker,
+    ETFHoldingDetails
+)
+from backend.core.price_series import PriceSeries
+from backend.services.market_data_providers.registry import create_provider
+from backend.services.market_data_interface import (
+    MarketDataServiceInterface,
+    MarketDataRateLimitError,
+    MarketDataUnavailableError
+)
+
+log = logging.getLogger(__name__)
+
+# --- Hedging Configuration ---
+# Hedge delay used until a provider has MARKET_DATA_HEDGE_MIN_SAMPLES latency samples
+MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS", "1.0"))
+# Never hedge sooner than this, however fast the primary usually is
+MARKET_DATA_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("MARKET_DATA_HEDGE_MIN_DELAY_SECONDS", "0.05"))
+MARKET_DATA_HEDGE_MIN_SAMPLES = int(os.getenv("MARKET_DATA_HEDGE_MIN_SAMPLES", "20"))
+# Degraded: at least half of the last 20 calls failed (with at least 5 calls observed)
+PROVIDER_ERROR_WINDOW = 20
+PROVIDER_DEGRADED_MIN_CALLS = 5
+PROVIDER_DEGRADED_ERROR_RATE = float(os.getenv("MARKET_DATA_PROVIDER_DEGRADED_ERROR_RATE", "0.5"))
+PROVIDER_DEGRADED_COOLDOWN_SECONDS = float(os.getenv("MARKET_DATA_PROVIDER_DEGRADED_COOLDOWN_SECONDS", "30"))
+
+# Upper bounds (seconds) of the latency histogram buckets; slower calls go to an overflow bucket
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with percentile estimates (linear within a bucket).
+
+    Bucket counts are halved every `decay_every` samples so percentiles follow the
+    provider's recent behaviour rather than its whole history.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_SECONDS, decay_every: int = 1000):
+        self.buckets = tuple(buckets)
+        self.counts = [0.0] * (len(self.buckets) + 1)
+        self.decay_every = decay_every
+        self.samples = 0 # Lifetime sample count (not decayed)
+
+    @property
+    def total(self) -> float:
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.samples += 1
+        if self.samples % self.decay_every == 0:
+            self.counts = [count / 2 for count in self.counts]
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimated q-th percentile (0 < q <= 1) in seconds, or None without samples."""
+        total = self.total
+        if total == 0:
+            return None
+        target = q * total
+        cumulative = 0.0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1] * 2
+                return lower + (upper - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.buckets[-1] * 2
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+def _error_kind(error: BaseException) -> str:
+    if isinstance(error, MarketDataRateLimitError):
+        return "rate_limited"
+    if isinstance(error, MarketDataUnavailableError):
+        return "unavailable"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    return "error"
+
+
+class ProviderHealth:
+    """Latency histogram, error counts and degradation state for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.errors: Counter = Counter()
+        self.calls = 0
+        self.empty = 0
+        self.hedged_wins = 0
+        self._recent_failures: deque = deque(maxlen=PROVIDER_ERROR_WINDOW)
+        self._degraded_until = 0.0
+
+    def is_degraded(self) -> bool:
+        return time.monotonic() < self._degraded_until
+
+    def hedge_delay(self) -> float:
+        """How long to wait for this provider before hedging: its observed p95."""
+        p95 = self.latency.percentile(0.95) if self.latency.samples >= MARKET_DATA_HEDGE_MIN_SAMPLES else None
+        return max(MARKET_DATA_HEDGE_MIN_DELAY_SECONDS, p95 if p95 is not None else MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS)
+
+    def record_success(self, elapsed: float, empty: bool = False) -> None:
+        self.calls += 1
+        self.empty += int(empty)
+        self.latency.observe(elapsed)
+        self._recent_failures.append(False)
+
+    def record_cancelled(self, elapsed: float) -> None:
+        # A losing call was at least this slow; recording it keeps the p95 of a provider
+        # that keeps losing races from looking better than it is.
+        self.latency.observe(elapsed)
+
+    def record_failure(self, elapsed: float, error: BaseException) -> None:
+        self.calls += 1
+        self.errors[_error_kind(error)] += 1
+        self.latency.observe(elapsed)
+        self._recent_failures.append(True)
+        recent = self._recent_failures
+        if len(recent) >= PROVIDER_DEGRADED_MIN_CALLS and sum(recent) / len(recent) >= PROVIDER_DEGRADED_ERROR_RATE:
+            if not self.is_degraded():
+                log.warning(f"Market data provider '{self.name}' degraded ({sum(recent)}/{len(recent)} recent calls failed); routing around it for {PROVIDER_DEGRADED_COOLDOWN_SECONDS}s.")
+            self._degraded_until = time.monotonic() + PROVIDER_DEGRADED_COOLDOWN_SECONDS
+            recent.clear() # Start a fresh window when it is retried after the cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "empty": self.empty,
+            "errors": dict(self.errors),
+            "hedged_wins": self.hedged_wins,
+            "degraded": self.is_degraded(),
+            "latency": self.latency.snapshot(),
+        }
+
+
+class HedgedMarketDataProvider(MarketDataServiceInterface):
+    """Hedges every call across the given (name, provider) pairs, primary first"""
+
+    def __init__(self, providers: Sequence[Tuple[str, MarketDataServiceInterface]], close_providers: bool = True):
+        if not providers:
+            raise ValueError("HedgedMarketDataProvider needs at least one provider")
+        self.providers: List[Tuple[str, MarketDataServiceInterface]] = list(providers)
+        # False when the providers are shared and closed by their owner (MarketDataService)
+        self.close_providers = close_providers
+        self.health: Dict[str, ProviderHealth] = {name: ProviderHealth(name) for name, _ in self.providers}
+        self.hedges = 0
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Per-provider latency percentiles, error counts and degradation state"""
+        return {"hedges": self.hedges, "providers": {name: health.stats() for name, health in self.health.items()}}
+
+    async def aclose(self) -> None:
+        log.info(f"Market data provider stats at shutdown: {self.latency_stats()}")
+        if self.close_providers:
+            for _, provider in self.providers:
+                await provider.aclose()
+
+    def _ordered(self) -> List[Tuple[str, MarketDataServiceInterface]]:
+        """Configured order, with degraded providers moved to the back"""
+        healthy = [p for p in self.providers if not self.health[p[0]].is_degraded()]
+        degraded = [p for p in self.providers if self.health[p[0]].is_degraded()]
+        return healthy + degraded
+
+    async def _timed(self, name: str, method: str, args: tuple) -> Any:
+        health = self.health[name]
+        provider = dict(self.providers)[name]
+        started = time.monotonic()
+        try:
+            result = await getattr(provider, method)(*args)
+        except asyncio.CancelledError:
+            health.record_cancelled(time.monotonic() - started)
+            raise
+        except Exception as e:
+            health.record_failure(time.monotonic() - started, e)
+            raise
+        health.record_success(time.monotonic() - started, empty=not result)
+        return result
+
+    async def hedged_call(self, method: str, *args: Any) -> Tuple[Any, Optional[str]]:
+        """
+        Run `method(*args)` with hedging; returns (result, name of the provider that answered).
+
+        Raises the last provider error if no provider gave an answer. If providers
+        only answered empty, the empty answer is returned with the name of the last one.
+        """
+        order = self._ordered()
+        pending: Dict[asyncio.Task, str] = {}
+        launched = 0
+        last_error: Optional[BaseException] = None
+        empty_answer: Tuple[Any, Optional[str]] = (None, None)
+        got_empty = False
+
+        def launch_next() -> None:
+            nonlocal launched
+            name, _ = order[launched]
+            launched += 1
+            pending[asyncio.ensure_future(self._timed(name, method, args))] = name
+
+        launch_next()
+        try:
+            while pending:
+                # Wait for the most recently launched provider's p95 before hedging
+                timeout = self.health[order[launched - 1][0]].hedge_delay() if launched < len(order) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    log.debug(f"Hedging {method} to '{order[launched][0]}' after {timeout:.3f}s")
+                    launch_next()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if result:
+                        if name != order[0][0]:
+                            self.health[name].hedged_wins += 1
+                        return result, name
+                    empty_answer, got_empty = (result, name), True
+                # No usable answer yet: hand over to the next provider right away
+                if launched < len(order):
+                    launch_next()
+        finally:
+            # Safe on shared providers: a coalesced upstream call (core.single_flight)
+            # keeps running for its other callers, only this leg stops waiting
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Let the losers unwind (close their connections) before returning
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if got_empty:
+            return empty_answer
+        if isinstance(last_error, HTTPException):
+            raise last_error
+        raise MarketDataUnavailableError(f"All market data providers failed for {method}: {last_error}")
+
+    async def _hedged(self, method: str, *args: Any) -> Any:
+        result, _ = await self.hedged_call(method, *args)
+        return result
+
+    # --- Interface methods ---
+
+    async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
+        return await self._hedged("get_equity_quote", symbol, exchange)
+
+    async def get_equity_quotes(self, symbols: List[str], exchange: Optional[str] = None) -> Dict[str, EquityQuote]:
+        return await self._hedged("get_equity_quotes", symbols, exchange)
+
+    async def get_historical_price_data(self, symbol, from_date, to_date, exchange=None) -> List[HistoricalPricePoint]:
+        return await self._hedged("get_historical_price_data", symbol, from_date, to_date, exchange)
+
+    async def get_historical_price_data_bulk(self, symbols, from_date, to_date, exchange=None) -> Dict[str, List[HistoricalPricePoint]]:
+        return await self._hedged("get_historical_price_data_bulk", symbols, from_date, to_date, exchange)
+
+    async def get_price_series(self, symbol, from_date, to_date, exchange=None) -> PriceSeries:
+        return await self._hedged("get_price_series", symbol, from_date, to_date, exchange)
+
+    async def get_price_series_bulk(self, symbols, from_date, to_date, exchange=None) -> Dict[str, PriceSeries]:
+        return await self._hedged("get_price_series_bulk", symbols, from_date, to_date, exchange)
+
+    async def iter_historical_price_data(self, symbol, from_date, to_date, exchange=None):
+        """Streams from the first healthy provider (a stream cannot be hedged once started)"""
+        _, provider = self._ordered()[0]
+        async for point in provider.iter_historical_price_data(symbol, from_date, to_date, exchange):
+            yield point
+
+    async def iter_ticker_list(self):
+        """Streams from the first healthy provider"""
+        _, provider = self._ordered()[0]
+        async for profile in provider.iter_ticker_list():
+            yield profile
+
+    async def get_intraday_price_data(self, symbol, interval, from_date=None, to_date=None, exchange=None) -> List[IntradayPricePoint]:
+        return await self._hedged("get_intraday_price_data", symbol, interval, from_date, to_date, exchange)
+
+    async def get_company_profile(self, symbol: str, exchange: Optional[str] = None) -> Optional[CompanyProfile]:
+        return await self._hedged("get_company_profile", symbol, exchange)
+
+    async def get_dividend_data(self, symbol, from_date=None, to_date=None, exchange=None) -> List[DividendData]:
+        return await self._hedged("get_dividend_data", symbol, from_date, to_date, exchange)
+
+    async def get_stock_split_data(self, symbol, from_date=None, to_date=None, exchange=None) -> List[StockSplitData]:
+        return await self._hedged("get_stock_split_data", symbol, from_date, to_date, exchange)
+
+    async def get_option_quote(self, contract_symbol: str) -> Optional[OptionQuote]:
+        return await self._hedged("get_option_quote", contract_symbol)
+
+    async def get_forex_quote(self, base_currency: str, quote_currency: str) -> Optional[ForexQuote]:
+        return await self._hedged("get_forex_quote", base_currency, quote_currency)
+
+    async def get_crypto_quote(self, base_asset: str, quote_asset: str) -> Optional[CryptoQuote]:
+        return await self._hedged("get_crypto_quote", base_asset, quote_asset)
+
+    async def get_index_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[IndexQuote]:
+        # Only forward `exchange` when given; not every adapter accepts it
+        args = (symbol,) if exchange is None else (symbol, exchange)
+        return await self._hedged("get_index_quote", *args)
+
+    async def get_market_movers(self, market_segment: str, top_n: int = 10, exchange: Optional[str] = None) -> List[MarketMover]:
+        return await self._hedged("get_market_movers", market_segment, top_n, exchange)
+
+    async def search_symbols(self, query: str, asset_type: Optional[MarketAssetType] = None, limit: int = 10) -> List[CompanyProfile]:
+        return await self._hedged("search_symbols", query, asset_type, limit)
+
+    async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
+        return await self._hedged("get_commodity_price", commodity_name)
+
+    async def get_historical_commodity_prices(self, commodity_name, date_from=None, date_to=None, frequency=None) -> Optional[HistoricalCommodityPriceData]:
+        return await self._hedged("get_historical_commodity_prices", commodity_name, date_from, date_to, frequency)
+
+    async def get_company_ratings(self, ticker, date_from=None, date_to=None, rated=None) -> Optional[CompanyRatingData]:
+        return await self._hedged("get_company_ratings", ticker, date_from, date_to, rated)
+
+    async def list_stock_market_indexes(self, limit: int = 100, offset: int = 0) -> List[IndexBasicInfo]:
+        return await self._hedged("list_stock_market_indexes", limit, offset)
+
+    async def list_bond_countries(self, limit: int = 100, offset: int = 0) -> List[BondCountry]:
+        return await self._hedged("list_bond_countries", limit, offset)
+
+    async def get_bond_info(self, country: str) -> Optional[BondInfoData]:
+        return await self._hedged("get_bond_info", country)
+
+    async def list_etfs(self, limit: int = 100, offset: int = 0) -> List[ETFTicker]:
+        return await self._hedged("list_etfs", limit, offset)
+
+    async def get_etf_holdings(self, ticker, date_from=None, date_to=None) -> Optional[ETFHoldingDetails]:
+        return await self._hedged("get_etf_holdings", ticker, date_from, date_to)
+
+
+# Adapters that can be combined by name (MARKET_PRICE_PROVIDERS)
+def build_hedged_provider(
+    names: Sequence[str],
+    get_provider: Optional[Callable[[str], MarketDataServiceInterface]] = None
+) -> Optional[HedgedMarketDataProvider]:
+    """
+    Hedged provider over the named adapters, in order. Adapters that cannot be
+    created (e.g. missing API key) are skipped; returns None if none can be.
+
+    With `get_provider` (MarketDataService.get_provider) the app-scoped providers
+    are used, sharing their cache, HTTP client and rate limit with the API; their
+    owner closes them. Otherwise new adapters are created and closed with the
+    hedged provider.
+    """
+    providers: List[Tuple[str, MarketDataServiceInterface]] = []
+    for name in names:
+        try:
+            providers.append((name, (get_provider or create_provider)(name)))
+        except KeyError as e:
+            log.error(str(e.args[0]))
+        except ValueError as e:
+            log.warning(f"Market data provider '{name}' not available: {e}")
+    return HedgedMarketDataProvider(providers, close_providers=get_provider is None) if providers else None
@@ -1,9 +1,16 @@
+import asyncio
+import copy
+import functools
+import importlib.util
+import logging
 import os
-from datetime import date, datetime
-from typing import Dict, List, Optional, Any, cast
+import random
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional, Any, cast
 
 import httpx
-from fastapi import HTTPException
 
 from backend.schemas.market_data import (
     # Phase 1 detailed schemas
@@ -45,124 +52,283 @@ from backend.schemas.market_data import (
     SectorWeight,
     ETFHolding
 )
-from backend.services.market_data_interface import MarketDataServiceInterface
+from backend.services.market_data_interface import (
+    MarketDataServiceInterface,
+    MarketDataProviderError,
+    MarketDataRateLimitError,
+    MarketDataUnavailableError
+)
+from backend.core.price_series import PriceSeries, parse_eod_records
+from backend.core.rate_limit import TokenBucket
+from backend.core.single_flight import SingleFlight, RedisSingleFlight
+
+log = logging.getLogger(__name__)
+
+# MarketStack accepts at most 100 comma-separated symbols and 1000 results per call
+MAX_SYMBOLS_PER_REQUEST = 100
+MAX_RESULTS_PER_PAGE = 1000
+# Pages of one paginated request fetched concurrently
+MARKETSTACK_PAGE_FAN_OUT = int(os.getenv("MARKETSTACK_PAGE_FAN_OUT", "4"))
+
+# Connection pool for the shared client (one adapter per process, see main.lifespan)
+MARKETSTACK_TIMEOUT_SECONDS = float(os.getenv("MARKETSTACK_TIMEOUT_SECONDS", "30"))
+MARKETSTACK_MAX_CONNECTIONS = int(os.getenv("MARKETSTACK_MAX_CONNECTIONS", "20"))
+MARKETSTACK_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MARKETSTACK_MAX_KEEPALIVE_CONNECTIONS", "10"))
+MARKETSTACK_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("MARKETSTACK_KEEPALIVE_EXPIRY_SECONDS", "60"))
+# HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Client-side quota and retry policy (MarketStack allows ~5 requests/second)
+MARKETSTACK_CALLS_PER_MINUTE = float(os.getenv("MARKETSTACK_CALLS_PER_MINUTE", "300"))
+MARKETSTACK_BURST = float(os.getenv("MARKETSTACK_BURST", "5"))
+MARKETSTACK_MAX_RETRIES = int(os.getenv("MARKETSTACK_MAX_RETRIES", "3"))
+MARKETSTACK_BACKOFF_BASE_SECONDS = float(os.getenv("MARKETSTACK_BACKOFF_BASE_SECONDS", "0.5"))
+MARKETSTACK_BACKOFF_MAX_SECONDS = float(os.getenv("MARKETSTACK_BACKOFF_MAX_SECONDS", "8"))
+# Upper bound for one _make_request call including quota waits and retries
+MARKETSTACK_REQUEST_DEADLINE_SECONDS = float(os.getenv("MARKETSTACK_REQUEST_DEADLINE_SECONDS", "20"))
+
+# Coalesce identical concurrent requests across workers through Redis (MARKET_DATA_REDIS_URL)
+MARKETSTACK_SHARED_SINGLE_FLIGHT = os.getenv("MARKETSTACK_SHARED_SINGLE_FLIGHT", "false").lower() == "true"
+MARKET_DATA_REDIS_URL = os.getenv("MARKET_DATA_REDIS_URL")
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Create the pooled keep-alive client used by the adapter"""
+    return httpx.AsyncClient(
+        timeout=MARKETSTACK_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=MARKETSTACK_MAX_CONNECTIONS,
+            max_keepalive_connections=MARKETSTACK_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=MARKETSTACK_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=HTTP2_AVAILABLE,
+    )
+
+
+def build_single_flight() -> SingleFlight:
+    """In-process single-flight, or Redis-coordinated when MARKETSTACK_SHARED_SINGLE_FLIGHT is enabled"""
+    if MARKETSTACK_SHARED_SINGLE_FLIGHT and MARKET_DATA_REDIS_URL:
+        try:
+            import redis.asyncio as redis_asyncio
+            client = redis_asyncio.from_url(MARKET_DATA_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+            return RedisSingleFlight(client, key_prefix="marketstack:singleflight")
+        except (ImportError, ValueError) as e:
+            log.error(f"Cannot use Redis single-flight: {e}. Coalescing within this process only.")
+    return SingleFlight()
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (1-based)"""
+    cap = min(MARKETSTACK_BACKOFF_MAX_SECONDS, MARKETSTACK_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_RAISE = object()
+
+
+def _provider_call(what: str, *, not_found: Any = _RAISE):
+    """
+    Error handling shared by the adapter's methods: provider errors propagate,
+    and anything else (a response the method could not parse) is logged and
+    raised as MarketDataProviderError, so no failure becomes a None/[] or a
+    partial bulk result. Single-resource methods pass `not_found` (None or [])
+    to return it for a 404 (unknown symbol); bulk and paginated methods raise.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            except MarketDataProviderError as e:
+                if e.status_code == 404 and not_found is not _RAISE:
+                    return copy.copy(not_found)
+                raise
+            except Exception as e:
+                log.exception(f"Error fetching {what}: {e}")
+                raise MarketDataProviderError(f"Unexpected market data provider response for {what}: {e}") from e
+        return wrapper
+    return decorator
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> tuple:
+    """Single-flight key: endpoint plus params with normalized values (symbols upper-cased, no API key)"""
+    normalized = []
+    for name, value in params.items():
+        if name == "access_key" or value is None:
+            continue
+        value = str(value).strip()
+        if name in ("symbols", "ticker", "benchmark"):
+            value = ",".join(part.strip().upper() for part in value.split(","))
+        normalized.append((name, value))
+    return (endpoint, tuple(sorted(normalized)))
 
 
 class MarketStackAdapter(MarketDataServiceInterface):
     """Adapter for MarketStack API V2"""
 
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, single_flight: Optional[SingleFlight] = None):
         self.api_key = os.environ.get("MARKETSTACK_API_KEY")
         if not self.api_key:
             raise ValueError("MARKETSTACK_API_KEY environment variable not set")
         
         self.base_url = "https://api.marketstack.com/v2"
-        self.client = httpx.AsyncClient(timeout=30.0)  # 30 second timeout
+        # Reused across requests so connections (and TLS sessions) stay warm
+        self.client = client or build_http_client()
+        # Identical concurrent requests share one upstream call
+        self.single_flight = single_flight or build_single_flight()
+        self.rate_limiter = TokenBucket.per_minute(MARKETSTACK_CALLS_PER_MINUTE, burst=MARKETSTACK_BURST)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its pooled connections"""
+        log.info(f"MarketStack request coalescing stats: {self.single_flight.stats()}")
+        if not self.client.is_closed:
+            await self.client.aclose()
+            log.info("MarketStack HTTP client closed.")
 
     async def _make_request(self, endpoint: str, params: Dict[str, Any] = None) -> Dict:
-        """Make a request to the MarketStack API"""
-        if params is None:
-            params = {}
-        
+        """
+        Make a request to the MarketStack API
+        Concurrent calls with the same endpoint and normalized params are coalesced
+        into one upstream request; all callers get its result or its error.
+        """
+        params = dict(params or {})
+        return await self.single_flight.do(
+            request_key(endpoint, params),
+            lambda: self._send_request(endpoint, params)
+        )
+
+    async def _send_request(self, endpoint: str, params: Dict[str, Any]) -> Dict:
+        """
+        Send one request to the MarketStack API
+        Each attempt first takes a token from the client-side bucket. 429, 5xx, timeouts
+        and network errors are retried with jittered exponential backoff (or after the
+        server's Retry-After) until MARKETSTACK_MAX_RETRIES or the call's deadline.
+        """
         # Add API key to params
         params["access_key"] = self.api_key
         
         url = f"{self.base_url}{endpoint}"
+        deadline = time.monotonic() + MARKETSTACK_REQUEST_DEADLINE_SECONDS
+        attempt = 0
         
-        try:
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 429:
-                raise HTTPException(
-                    status_code=429, 
-                    detail="Rate limit exceeded for market data provider"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await self.rate_limiter.acquire(timeout=remaining):
+                raise MarketDataRateLimitError(
+                    f"Market data request to {endpoint} could not be sent within {MARKETSTACK_REQUEST_DEADLINE_SECONDS}s quota window"
                 )
-            elif e.response.status_code == 401:
-                raise HTTPException(
-                    status_code=401, 
-                    detail="Unauthorized access to market data provider"
+            
+            retry_after: Optional[float] = None
+            try:
+                response = await self.client.get(
+                    url, params=params, timeout=min(MARKETSTACK_TIMEOUT_SECONDS, max(deadline - time.monotonic(), 0.1))
                 )
-            else:
-                raise HTTPException(
-                    status_code=e.response.status_code,
-                    detail=f"Market data provider error: {e.response.text}"
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    failure = f"HTTP {response.status_code}"
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 401:
+                    raise MarketDataProviderError("Unauthorized access to market data provider")
+                raise MarketDataProviderError(
+                    f"Market data provider error: HTTP {e.response.status_code}: {e.response.text}",
+                    status_code=e.response.status_code
                 )
-        except httpx.RequestError as e:
-            raise HTTPException(
-                status_code=503,
-                detail=f"Market data provider request failed: {str(e)}"
-            )
-
+            except httpx.RequestError as e:
+                response = None
+                failure = f"{type(e).__name__}: {e}"
+            
+            attempt += 1
+            delay = retry_after if retry_after is not None else _backoff_delay(attempt)
+            if attempt > MARKETSTACK_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                log.warning(f"MarketStack {endpoint} failed after {attempt} attempt(s): {failure}")
+                if response is not None and response.status_code == 429:
+                    raise MarketDataRateLimitError()
+                raise MarketDataUnavailableError(f"Market data provider request failed: {failure}")
+            log.info(f"MarketStack {endpoint} attempt {attempt} failed ({failure}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
 
+    @_provider_call("index quote", not_found=None)
     async def get_index_quote(self, symbol: str) -> Optional[IndexQuote]:
         """Get current quote for a market index"""
-        try:
-            response = await self._make_request(
-                "/indexinfo", {"benchmark": symbol}
-            )
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            
-            return IndexQuote(
-                symbol=symbol,
-                name=result.get("basics", {}).get("name", "Unknown"),
-                price=float(result.get("last", 0)),
-                change=float(result.get("change_dollar", 0)),
-                percent_change=float(result.get("change_percent", 0)),
-                timestamp=datetime.fromisoformat(result.get("date", "").replace("Z", "+00:00"))
-            )
-        except Exception as e:
-            print(f"Error fetching index quote: {e}")
+        response = await self._make_request(
+            "/indexinfo", {"benchmark": symbol}
+        )
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return None
+        
+        result = response["result"]
+        
+        return IndexQuote(
+            symbol=symbol,
+            name=result.get("basics", {}).get("name", "Unknown"),
+            price=float(result.get("last", 0)),
+            change=float(result.get("change_dollar", 0)),
+            percent_change=float(result.get("change_percent", 0)),
+            timestamp=datetime.fromisoformat(result.get("date", "").replace("Z", "+00:00"))
+        )
 
 
     # Phase 2 - Commodity Prices
+    @_provider_call("commodity price", not_found=None)
     async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
         """Get current commodity price"""
-        try:
-            response = await self._make_request(
-                "/commodities", {"commodity_name": commodity_name}
-            )
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            basics = result.get("basics", {})
-            
-            return CommodityPrice(
-                commodity_name=basics.get("commodity_name", commodity_name),
-                commodity_unit=basics.get("commodity_unit", ""),
-                commodity_price=float(result.get("commodity_price", 0)),
-                price_change_day=float(result.get("price_change_day", 0)),
-                percentage_day=float(result.get("percentage_day", 0)),
-                percentage_week=float(result.get("percentage_week", 0)),
-                percentage_month=float(result.get("percentage_month", 0)),
-                percentage_year=float(result.get("percentage_year", 0)),
-                quarter1_25=float(result.get("quarter1_25", 0)),
-                quarter2_25=float(result.get("quarter2_25", 0)),
-                quarter3_25=float(result.get("quarter3_25", 0)),
-                quarter4_25=float(result.get("quarter4_25", 0)),
-                quarter1_24=float(result.get("quarter1_24", 0)),
-                quarter2_24=float(result.get("quarter2_24", 0)),
-                quarter3_24=float(result.get("quarter3_24", 0)),
-                quarter4_24=float(result.get("quarter4_24", 0)),
-                quarter1_23=float(result.get("quarter1_23", 0)),
-                quarter2_23=float(result.get("quarter2_23", 0)),
-                quarter3_23=float(result.get("quarter3_23", 0)),
-                quarter4_23=float(result.get("quarter4_23", 0)),
-                datetime=datetime.fromisoformat(result.get("datetime", "").replace("Z", "+00:00"))
-            )
-        except Exception as e:
-            print(f"Error fetching commodity price: {e}")
+        response = await self._make_request(
+            "/commodities", {"commodity_name": commodity_name}
+        )
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return None
+        
+        result = response["result"]
+        basics = result.get("basics", {})
+        
+        return CommodityPrice(
+            commodity_name=basics.get("commodity_name", commodity_name),
+            commodity_unit=basics.get("commodity_unit", ""),
+            commodity_price=float(result.get("commodity_price", 0)),
+            price_change_day=float(result.get("price_change_day", 0)),
+            percentage_day=float(result.get("percentage_day", 0)),
+            percentage_week=float(result.get("percentage_week", 0)),
+            percentage_month=float(result.get("percentage_month", 0)),
+            percentage_year=float(result.get("percentage_year", 0)),
+            quarter1_25=float(result.get("quarter1_25", 0)),
+            quarter2_25=float(result.get("quarter2_25", 0)),
+            quarter3_25=float(result.get("quarter3_25", 0)),
+            quarter4_25=float(result.get("quarter4_25", 0)),
+            quarter1_24=float(result.get("quarter1_24", 0)),
+            quarter2_24=float(result.get("quarter2_24", 0)),
+            quarter3_24=float(result.get("quarter3_24", 0)),
+            quarter4_24=float(result.get("quarter4_24", 0)),
+            quarter1_23=float(result.get("quarter1_23", 0)),
+            quarter2_23=float(result.get("quarter2_23", 0)),
+            quarter3_23=float(result.get("quarter3_23", 0)),
+            quarter4_23=float(result.get("quarter4_23", 0)),
+            datetime=datetime.fromisoformat(result.get("datetime", "").replace("Z", "+00:00"))
+        )
 
     # Phase 2 - Historical Commodity Prices
+    @_provider_call("historical commodity prices", not_found=None)
     async def get_historical_commodity_prices(
         self, 
         commodity_name: str, 
@@ -180,36 +346,33 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if frequency:
             params["frequency"] = frequency
         
-        try:
-            response = await self._make_request("/commoditieshistory", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            basics = result.get("basics", {})
-            
-            data_points = []
-            for point in result.get("data", []):
-                data_points.append(
-                    CommodityPricePoint(
-                        commodity_price=float(point.get("commodity_price", 0)),
-                        date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00"))
-                    )
+        response = await self._make_request("/commoditieshistory", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
+            return None
+        
+        result = response["result"]
+        basics = result.get("basics", {})
+        
+        data_points = []
+        for point in result.get("data", []):
+            data_points.append(
+                CommodityPricePoint(
+                    commodity_price=float(point.get("commodity_price", 0)),
+                    date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00"))
                 )
-            
-            return HistoricalCommodityPriceData(
-                basics=CommodityBasics(
-                    commodity_name=basics.get("commodity_name", commodity_name),
-                    commodity_unit=basics.get("commodity_unit", "")
-                ),
-                data=data_points
             )
-        except Exception as e:
-            print(f"Error fetching historical commodity prices: {e}")
-            return None
+        
+        return HistoricalCommodityPriceData(
+            basics=CommodityBasics(
+                commodity_name=basics.get("commodity_name", commodity_name),
+                commodity_unit=basics.get("commodity_unit", "")
+            ),
+            data=data_points
+        )
 
     # Phase 2 - Company Ratings
+    @_provider_call("company ratings", not_found=None)
     async def get_company_ratings(
         self, 
         ticker: str, 
@@ -227,164 +390,149 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if rated:
             params["rated"] = rated
         
-        try:
-            response = await self._make_request("/companyratings", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            basics = result.get("basics", {})
-            output = result.get("output", {})
-            consensus = output.get("analyst_consensus", {})
-            analysts_data = output.get("analysts", [])
-            
-            analysts = []
-            for analyst in analysts_data:
-                analysts.append(
-                    AnalystRatingDetail(
-                        analyst_name=analyst.get("analyst_name", ""),
-                        analyst_rating=analyst.get("analyst_rating", ""),
-                        target_price=float(analyst.get("target_price", 0)),
-                        rating_date=datetime.fromisoformat(analyst.get("rating_date", "").replace("Z", "+00:00"))
-                    )
+        response = await self._make_request("/companyratings", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
+            return None
+        
+        result = response["result"]
+        basics = result.get("basics", {})
+        output = result.get("output", {})
+        consensus = output.get("analyst_consensus", {})
+        analysts_data = output.get("analysts", [])
+        
+        analysts = []
+        for analyst in analysts_data:
+            analysts.append(
+                AnalystRatingDetail(
+                    analyst_name=analyst.get("analyst_name", ""),
+                    analyst_rating=analyst.get("analyst_rating", ""),
+                    target_price=float(analyst.get("target_price", 0)),
+                    rating_date=datetime.fromisoformat(analyst.get("rating_date", "").replace("Z", "+00:00"))
                 )
-            
-            return CompanyRatingData(
-                status=response.get("status", ""),
-                result=CompanyRatingResult(
-                    basics=CompanyBasics(
-                        ticker=basics.get("ticker", ticker),
-                        name=basics.get("name", ""),
-                        exchange=basics.get("exchange", "")
+            )
+        
+        return CompanyRatingData(
+            status=response.get("status", ""),
+            result=CompanyRatingResult(
+                basics=CompanyBasics(
+                    ticker=basics.get("ticker", ticker),
+                    name=basics.get("name", ""),
+                    exchange=basics.get("exchange", "")
+                ),
+                output=CompanyRatingOutput(
+                    analyst_consensus=AnalystConsensus(
+                        buy=int(consensus.get("buy", 0)),
+                        hold=int(consensus.get("hold", 0)),
+                        sell=int(consensus.get("sell", 0)),
+                        average_rating=float(consensus.get("average_rating", 0)),
+                        average_target_price=float(consensus.get("average_target_price", 0)),
+                        high_target_price=float(consensus.get("high_target_price", 0)),
+                        low_target_price=float(consensus.get("low_target_price", 0)),
+                        median_target_price=float(consensus.get("median_target_price", 0))
                     ),
-                    output=CompanyRatingOutput(
-                        analyst_consensus=AnalystConsensus(
-                            buy=int(consensus.get("buy", 0)),
-                            hold=int(consensus.get("hold", 0)),
-                            sell=int(consensus.get("sell", 0)),
-                            average_rating=float(consensus.get("average_rating", 0)),
-                            average_target_price=float(consensus.get("average_target_price", 0)),
-                            high_target_price=float(consensus.get("high_target_price", 0)),
-                            low_target_price=float(consensus.get("low_target_price", 0)),
-                            median_target_price=float(consensus.get("median_target_price", 0))
-                        ),
-                        analysts=analysts
-                    )
+                    analysts=analysts
                 )
             )
-        except Exception as e:
-            print(f"Error fetching company ratings: {e}")
-            return None
+        )
 
     # Phase 2 - Stock Market Index Listing
+    @_provider_call("stock market indexes", not_found=[])
     async def list_stock_market_indexes(self, limit: int = 100, offset: int = 0) -> List[IndexBasicInfo]:
         """Get a list of all available stock market indexes/benchmarks"""
         params = {"limit": limit, "offset": offset}
         
-        try:
-            response = await self._make_request("/benchmarks", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return []
-            
-            result = response["result"]
-            indexes = []
-            
-            for index_data in result:
-                indexes.append(
-                    IndexBasicInfo(
-                        benchmark=index_data.get("benchmark", ""),
-                        name=index_data.get("name", ""),
-                        country=index_data.get("country", ""),
-                        currency=index_data.get("currency", "")
-                    )
-                )
-            
-            return indexes
-        except Exception as e:
-            print(f"Error fetching stock market indexes: {e}")
+        response = await self._make_request("/benchmarks", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return []
+        
+        result = response["result"]
+        indexes = []
+        
+        for index_data in result:
+            indexes.append(
+                IndexBasicInfo(
+                    benchmark=index_data.get("benchmark", ""),
+                    name=index_data.get("name", ""),
+                    country=index_data.get("country", ""),
+                    currency=index_data.get("currency", "")
+                )
+            )
+        
+        return indexes
 
     # Phase 2 - Bonds Data
+    @_provider_call("bond countries", not_found=[])
     async def list_bond_countries(self, limit: int = 100, offset: int = 0) -> List[BondCountry]:
         """Get a list of bond-issuing countries"""
         params = {"limit": limit, "offset": offset}
         
-        try:
-            response = await self._make_request("/bondslist", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return []
-            
-            result = response["result"]
-            countries = []
-            
-            for country_data in result:
-                countries.append(
-                    BondCountry(
-                        country=country_data.get("country", "")
-                    )
-                )
-            
-            return countries
-        except Exception as e:
-            print(f"Error fetching bond countries: {e}")
+        response = await self._make_request("/bondslist", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return []
+        
+        result = response["result"]
+        countries = []
+        
+        for country_data in result:
+            countries.append(
+                BondCountry(
+                    country=country_data.get("country", "")
+                )
+            )
+        
+        return countries
 
+    @_provider_call("bond info", not_found=None)
     async def get_bond_info(self, country: str) -> Optional[BondInfoData]:
         """Get specific bond info for a country"""
-        try:
-            response = await self._make_request(
-                "/bond", {"country": country}
-            )
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            
-            return BondInfoData(
-                region=result.get("region", ""),
-                country=result.get("country", country),
-                type=result.get("type", ""),
-                yield_value=float(result.get("yield", 0)),
-                price_change_day=float(result.get("price_change_day", 0)),
-                percentage_week=float(result.get("percentage_week", 0)),
-                percentage_month=float(result.get("percentage_month", 0)),
-                percentage_year=float(result.get("percentage_year", 0)),
-                datetime=datetime.fromisoformat(result.get("datetime", "").replace("Z", "+00:00"))
-            )
-        except Exception as e:
-            print(f"Error fetching bond info: {e}")
+        response = await self._make_request(
+            "/bond", {"country": country}
+        )
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return None
+        
+        result = response["result"]
+        
+        return BondInfoData(
+            region=result.get("region", ""),
+            country=result.get("country", country),
+            type=result.get("type", ""),
+            yield_value=float(result.get("yield", 0)),
+            price_change_day=float(result.get("price_change_day", 0)),
+            percentage_week=float(result.get("percentage_week", 0)),
+            percentage_month=float(result.get("percentage_month", 0)),
+            percentage_year=float(result.get("percentage_year", 0)),
+            datetime=datetime.fromisoformat(result.get("datetime", "").replace("Z", "+00:00"))
+        )
 
     # Phase 2 - ETF Data
+    @_provider_call("ETF list", not_found=[])
     async def list_etfs(self, limit: int = 100, offset: int = 0) -> List[ETFTicker]:
         """Get a list of ETFs"""
         params = {"list": "ticker", "limit": limit, "offset": offset}
         
-        try:
-            response = await self._make_request("/etflist", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return []
-            
-            result = response["result"]
-            etfs = []
-            
-            for etf_data in result:
-                etfs.append(
-                    ETFTicker(
-                        ticker=etf_data.get("ticker", "")
-                    )
-                )
-            
-            return etfs
-        except Exception as e:
-            print(f"Error fetching ETF list: {e}")
+        response = await self._make_request("/etflist", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return []
+        
+        result = response["result"]
+        etfs = []
+        
+        for etf_data in result:
+            etfs.append(
+                ETFTicker(
+                    ticker=etf_data.get("ticker", "")
+                )
+            )
+        
+        return etfs
 
+    @_provider_call("ETF holdings", not_found=None)
     async def get_etf_holdings(
         self, 
         ticker: str, 
@@ -399,138 +547,145 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if date_to:
             params["date_to"] = date_to.isoformat()
         
-        try:
-            response = await self._make_request("/etfholdings", params)
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            basics = result.get("basics", {})
-            output = result.get("output", {})
-            attributes = output.get("attributes", {})
-            signature = output.get("signature", {})
-            holdings_data = output.get("holdings", [])
-            
-            # Process sector weights
-            sector_weights = []
-            for sector in signature.get("sector_weights", []):
-                sector_weights.append(
-                    SectorWeight(
-                        sector=sector.get("sector", ""),
-                        weight=float(sector.get("weight", 0))
-                    )
+        response = await self._make_request("/etfholdings", params)
+        
+        if response.get("status") != "ok" or not response.get("result"):
+            return None
+        
+        result = response["result"]
+        basics = result.get("basics", {})
+        output = result.get("output", {})
+        attributes = output.get("attributes", {})
+        signature = output.get("signature", {})
+        holdings_data = output.get("holdings", [])
+        
+        # Process sector weights
+        sector_weights = []
+        for sector in signature.get("sector_weights", []):
+            sector_weights.append(
+                SectorWeight(
+                    sector=sector.get("sector", ""),
+                    weight=float(sector.get("weight", 0))
                 )
-            
-            # Process holdings
-            holdings = []
-            for holding in holdings_data:
-                holdings.append(
-                    ETFHolding(
-                        ticker=holding.get("ticker", ""),
-                        name=holding.get("name", ""),
-                        weight=float(holding.get("weight", 0)),
-                        shares=int(holding.get("shares", 0)),
-                        market_value=float(holding.get("market_value", 0))
-                    )
+            )
+        
+        # Process holdings
+        holdings = []
+        for holding in holdings_data:
+            holdings.append(
+                ETFHolding(
+                    ticker=holding.get("ticker", ""),
+                    name=holding.get("name", ""),
+                    weight=float(holding.get("weight", 0)),
+                    shares=int(holding.get("shares", 0)),
+                    market_value=float(holding.get("market_value", 0))
                 )
-            
-            return ETFHoldingDetails(
-                basics=ETFBasics(
-                    ticker=basics.get("ticker", ticker),
-                    name=basics.get("name", ""),
-                    exchange=basics.get("exchange", "")
+            )
+        
+        return ETFHoldingDetails(
+            basics=ETFBasics(
+                ticker=basics.get("ticker", ticker),
+                name=basics.get("name", ""),
+                exchange=basics.get("exchange", "")
+            ),
+            output=ETFOutput(
+                attributes=ETFAttributes(
+                    aum=float(attributes.get("aum", 0)),
+                    expense_ratio=float(attributes.get("expense_ratio", 0)),
+                    shares_outstanding=float(attributes.get("shares_outstanding", 0)),
+                    nav=float(attributes.get("nav", 0))
                 ),
-                output=ETFOutput(
-                    attributes=ETFAttributes(
-                        aum=float(attributes.get("aum", 0)),
-                        expense_ratio=float(attributes.get("expense_ratio", 0)),
-                        shares_outstanding=float(attributes.get("shares_outstanding", 0)),
-                        nav=float(attributes.get("nav", 0))
-                    ),
-                    signature=ETFSignature(
-                        sector_weights=sector_weights
-                    ),
-                    holdings=holdings
-                )
+                signature=ETFSignature(
+                    sector_weights=sector_weights
+                ),
+                holdings=holdings
             )
-        except Exception as e:
-            print(f"Error fetching ETF holdings: {e}")
-            return None
+        )
 
     # Implement other required methods from MarketDataServiceInterface
+    @_provider_call("equity quote", not_found=None)
     async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
         """
         Get current equity quote for a symbol using the latest EOD data
         Uses MarketStack's /tickers/{symbol}/eod/latest or /eod endpoint
         """
-        try:
-            # Construct the endpoint and params
-            endpoint = f"/tickers/{symbol}/eod/latest" if exchange is None else "/eod"
-            params = {}
-            
-            if exchange:
-                params["symbols"] = symbol
-                params["exchange"] = exchange
-            
-            response = await self._make_request(endpoint, params)
-            
-            # Handle different response structures based on endpoint
-            if endpoint.startswith("/tickers"):
-                # Single result from /tickers/{symbol}/eod/latest
-                if not response.get("data"):
-                    return None
-                
-                data = response["data"]
-                # If data is a list, take the first item
-                if isinstance(data, list) and len(data) > 0:
-                    data = data[0]
-            else:
-                # Multiple results from /eod
-                if not response.get("data") or len(response["data"]) == 0:
-                    return None
-                
-                # Take the most recent data point
-                data = response["data"][0]
+        # Construct the endpoint and params
+        endpoint = f"/tickers/{symbol}/eod/latest" if exchange is None else "/eod"
+        params = {}
+        
+        if exchange:
+            params["symbols"] = symbol
+            params["exchange"] = exchange
+        
+        response = await self._make_request(endpoint, params)
+        
+        # Handle different response structures based on endpoint
+        if endpoint.startswith("/tickers"):
+            # Single result from /tickers/{symbol}/eod/latest
+            if not response.get("data"):
+                return None
             
-            # Calculate change and percent_change
-            change = 0.0
-            percent_change = 0.0
+            data = response["data"]
+            # If data is a list, take the first item
+            if isinstance(data, list) and len(data) > 0:
+                data = data[0]
+        else:
+            # Multiple results from /eod
+            if not response.get("data") or len(response["data"]) == 0:
+                return None
             
-            # Map the response to EquityQuote schema
-            return EquityQuote(
-                symbol=symbol,
-                name=data.get("name", "Unknown"),
-                exchange=data.get("exchange", "Unknown"),
-                price=float(data.get("adj_close", 0)),
-                change=change,  # Would need previous day's close to calculate
-                percent_change=percent_change,  # Would need previous day's close to calculate
-                volume=int(data.get("volume", 0)),
-                timestamp=datetime.fromisoformat(data.get("date", "").replace("Z", "+00:00")),
-                open=float(data.get("open", 0)),
-                high=float(data.get("high", 0)),
-                low=float(data.get("low", 0)),
-                adj_open=float(data.get("adj_open", 0)),
-                adj_close=float(data.get("adj_close", 0)),
-                dividend=float(data.get("dividend", 0)) if data.get("dividend") is not None else None,
-                split_factor=float(data.get("split_factor", 1.0)) if data.get("split_factor") is not None else None,
-                asset_type=data.get("asset_type", "Stock"),
-                price_currency=data.get("price_currency", "USD").lower()
-            )
-        except Exception as e:
-            print(f"Error fetching equity quote: {e}")
-            return None
+            # Take the most recent data point
+            data = response["data"][0]
+        
+        return self._to_equity_quote(symbol, data)
 
-    async def get_historical_price_data(
+    async def _iter_pages(self, endpoint: str, params: Dict[str, Any]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield the `data` records of every page of a paginated endpoint
+        The first page reveals `pagination.total`; the remaining offsets are then
+        requested concurrently (at most MARKETSTACK_PAGE_FAN_OUT at a time) and yielded
+        as they complete, so pages may arrive out of order.
+        """
+        params = {**params, "limit": MAX_RESULTS_PER_PAGE, "offset": 0}
+        first = await self._make_request(endpoint, params)
+        first_page = first.get("data") or []
+        yield first_page
+        
+        pagination = first.get("pagination") or {}
+        total = int(pagination.get("total") or 0)
+        # The provider may cap the page size below what was asked for
+        page_size = int(pagination.get("limit") or len(first_page) or MAX_RESULTS_PER_PAGE)
+        offsets = range(len(first_page), total, page_size) if first_page else range(0)
+        if not offsets:
+            return
+        
+        semaphore = asyncio.Semaphore(MARKETSTACK_PAGE_FAN_OUT)
+        
+        async def fetch_page(offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                response = await self._make_request(endpoint, {**params, "offset": offset})
+                return response.get("data") or []
+        
+        tasks = [asyncio.create_task(fetch_page(offset)) for offset in offsets]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                yield await next_page
+        finally:
+            # Consumer stopped early or a page failed: don't leave requests running
+            # (a page another caller is coalesced onto keeps running for it)
+            for task in tasks:
+                task.cancel()
+
+    async def iter_historical_price_data(
         self,
         symbol: str,
         from_date: date,
         to_date: date,
         exchange: Optional[str] = None
-    ) -> List[HistoricalPricePoint]:
+    ) -> AsyncIterator[HistoricalPricePoint]:
         """
-        Get historical price data for a symbol
-        Uses MarketStack's /eod endpoint
+        Stream historical price data for a symbol across all /eod pages
+        Points are yielded page by page as pages arrive (not globally sorted).
         """
         params = {
             "symbols": symbol,
@@ -542,42 +697,208 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if exchange:
             params["exchange"] = exchange
         
-        try:
-            response = await self._make_request("/eod", params)
-            
-            if not response.get("data"):
-                return []
-            
-            historical_data = []
-            for point in response["data"]:
-                historical_data.append(
-                    HistoricalPricePoint(
-                        date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00")),
-                        open=float(point.get("open", 0)),
-                        high=float(point.get("high", 0)),
-                        low=float(point.get("low", 0)),
-                        close=float(point.get("close", 0)),
-                        volume=int(point.get("volume", 0)),
-                        adj_high=float(point.get("adj_high", 0)),
-                        adj_low=float(point.get("adj_low", 0)),
-                        adj_open=float(point.get("adj_open", 0)),
-                        adj_close=float(point.get("adj_close", 0)),
-                        adj_volume=int(point.get("adj_volume", 0)),
-                        split_factor=float(point.get("split_factor", 1.0)),
-                        dividend=float(point.get("dividend", 0)),
-                        symbol=symbol,
-                        exchange=point.get("exchange", ""),
-                        name=point.get("name", ""),
-                        asset_type=point.get("asset_type", "Stock"),
-                        price_currency=point.get("price_currency", "usd")
-                    )
-                )
-            
-            return historical_data
-        except Exception as e:
-            print(f"Error fetching historical price data: {e}")
-            return []
+        async for page in self._iter_pages("/eod", params):
+            for point in page:
+                yield self._to_historical_point(symbol, point)
+
+    @_provider_call("historical price data")
+    async def get_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> List[HistoricalPricePoint]:
+        """
+        Get historical price data for a symbol
+        Collects iter_historical_price_data (all pages) sorted by date ascending
+        """
+        historical_data = [
+            point async for point in self.iter_historical_price_data(symbol, from_date, to_date, exchange)
+        ]
+        historical_data.sort(key=lambda p: p.date)
+        return historical_data
+
+    async def get_price_series(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> PriceSeries:
+        """
+        Get historical prices for a symbol as a columnar PriceSeries
+        Parses /eod pages straight into typed arrays; no per-row models are built.
+        """
+        series = await self.get_price_series_bulk([symbol], from_date, to_date, exchange)
+        return series[symbol.upper()]
+
+    @_provider_call("price series")
+    async def get_price_series_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, PriceSeries]:
+        """
+        Get historical prices for many symbols as PriceSeries keyed by symbol
+        Chunks symbols like get_historical_price_data_bulk. Symbols without data get an empty series.
+        """
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, PriceSeries]:
+            params = {
+                "symbols": ",".join(chunk),
+                "date_from": from_date.isoformat(),
+                "date_to": to_date.isoformat(),
+                "sort": "ASC"
+            }
+            if exchange:
+                params["exchange"] = exchange
+            series: Dict[str, PriceSeries] = {symbol: PriceSeries(symbol) for symbol in chunk}
+            async for page in self._iter_pages("/eod", params):
+                # Only keep records for requested symbols
+                parse_eod_records((r for r in page if (r.get("symbol") or "").upper() in series), series)
+            return series
+
+        merged: Dict[str, PriceSeries] = {}
+        for chunk_series in await asyncio.gather(*(fetch_chunk(chunk) for chunk in self._symbol_chunks(symbols))):
+            merged.update(chunk_series)
+        for series in merged.values():
+            series.sort()
+        return merged
+
+    @staticmethod
+    def _to_equity_quote(symbol: str, data: Dict[str, Any]) -> EquityQuote:
+        """Map a MarketStack EOD record to an EquityQuote"""
+        # Calculate change and percent_change
+        change = 0.0
+        percent_change = 0.0
+        
+        # Map the response to EquityQuote schema
+        return EquityQuote(
+            symbol=symbol,
+            name=data.get("name", "Unknown"),
+            exchange=data.get("exchange", "Unknown"),
+            price=float(data.get("adj_close", 0)),
+            change=change,  # Would need previous day's close to calculate
+            percent_change=percent_change,  # Would need previous day's close to calculate
+            volume=int(data.get("volume", 0)),
+            timestamp=datetime.fromisoformat(data.get("date", "").replace("Z", "+00:00")),
+            open=float(data.get("open", 0)),
+            high=float(data.get("high", 0)),
+            low=float(data.get("low", 0)),
+            adj_open=float(data.get("adj_open", 0)),
+            adj_close=float(data.get("adj_close", 0)),
+            dividend=float(data.get("dividend", 0)) if data.get("dividend") is not None else None,
+            split_factor=float(data.get("split_factor", 1.0)) if data.get("split_factor") is not None else None,
+            asset_type=data.get("asset_type", "Stock"),
+            price_currency=data.get("price_currency", "USD").lower()
+        )
+
+    @staticmethod
+    def _to_historical_point(symbol: str, point: Dict[str, Any]) -> HistoricalPricePoint:
+        """Map a MarketStack EOD record to a HistoricalPricePoint"""
+        return HistoricalPricePoint(
+            date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00")),
+            open=float(point.get("open", 0)),
+            high=float(point.get("high", 0)),
+            low=float(point.get("low", 0)),
+            close=float(point.get("close", 0)),
+            volume=int(point.get("volume", 0)),
+            adj_high=float(point.get("adj_high", 0)),
+            adj_low=float(point.get("adj_low", 0)),
+            adj_open=float(point.get("adj_open", 0)),
+            adj_close=float(point.get("adj_close", 0)),
+            adj_volume=int(point.get("adj_volume", 0)),
+            split_factor=float(point.get("split_factor", 1.0)),
+            dividend=float(point.get("dividend", 0)),
+            symbol=symbol,
+            exchange=point.get("exchange", ""),
+            name=point.get("name", ""),
+            asset_type=point.get("asset_type", "Stock"),
+            price_currency=point.get("price_currency", "usd")
+        )
 
+    @staticmethod
+    def _symbol_chunks(symbols: List[str]) -> List[List[str]]:
+        """Dedupe symbols (keeping order) and split them into provider-sized chunks"""
+        unique_symbols = list(dict.fromkeys(s.upper() for s in symbols if s))
+        return [
+            unique_symbols[i:i + MAX_SYMBOLS_PER_REQUEST]
+            for i in range(0, len(unique_symbols), MAX_SYMBOLS_PER_REQUEST)
+        ]
+
+    @_provider_call("equity quotes")
+    async def get_equity_quotes(
+        self,
+        symbols: List[str],
+        exchange: Optional[str] = None
+    ) -> Dict[str, EquityQuote]:
+        """
+        Get latest EOD quotes for many symbols
+        Uses MarketStack's /eod/latest endpoint with up to MAX_SYMBOLS_PER_REQUEST
+        comma-separated symbols per call; chunks are requested concurrently.
+        Symbols without data are absent from the result.
+        """
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, EquityQuote]:
+            params = {"symbols": ",".join(chunk), "limit": len(chunk)}
+            if exchange:
+                params["exchange"] = exchange
+            response = await self._make_request("/eod/latest", params)
+            quotes = {}
+            for data in response.get("data") or []:
+                symbol = (data.get("symbol") or "").upper()
+                # Keep the first (most recent) record per symbol
+                if symbol in chunk and symbol not in quotes:
+                    quotes[symbol] = self._to_equity_quote(symbol, data)
+            return quotes
+
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in self._symbol_chunks(symbols)))
+        merged: Dict[str, EquityQuote] = {}
+        for chunk_quotes in results:
+            merged.update(chunk_quotes)
+        return merged
+
+    @_provider_call("historical price data")
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        """
+        Get historical price data for many symbols
+        Uses MarketStack's /eod endpoint with up to MAX_SYMBOLS_PER_REQUEST symbols
+        per call, walking all limit/offset pages of each chunk (see _iter_pages).
+        Returns points per symbol sorted by date ascending.
+        """
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, List[HistoricalPricePoint]]:
+            params = {
+                "symbols": ",".join(chunk),
+                "date_from": from_date.isoformat(),
+                "date_to": to_date.isoformat(),
+                "sort": "ASC"
+            }
+            if exchange:
+                params["exchange"] = exchange
+            series: Dict[str, List[HistoricalPricePoint]] = {symbol: [] for symbol in chunk}
+            async for page in self._iter_pages("/eod", params):
+                for point in page:
+                    symbol = (point.get("symbol") or "").upper()
+                    if symbol in series:
+                        series[symbol].append(self._to_historical_point(symbol, point))
+            return series
+
+        results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in self._symbol_chunks(symbols)))
+        merged: Dict[str, List[HistoricalPricePoint]] = {}
+        for chunk_series in results:
+            merged.update(chunk_series)
+        for points in merged.values():
+            points.sort(key=lambda p: p.date)
+        return merged
+
+    @_provider_call("intraday price data", not_found=[])
     async def get_intraday_price_data(
         self,
         symbol: str,
@@ -604,142 +925,135 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if to_date:
             params["date_to"] = to_date.isoformat()
         
-        try:
-            response = await self._make_request("/intraday", params)
-            
-            if not response.get("data"):
-                return []
-            
-            intraday_data = []
-            for point in response["data"]:
-                intraday_data.append(
-                    IntradayPricePoint(
-                        date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00")),
-                        open=float(point.get("open", 0)),
-                        high=float(point.get("high", 0)),
-                        low=float(point.get("low", 0)),
-                        close=float(point.get("close", 0)),
-                        volume=float(point.get("volume", 0)),
-                        symbol=symbol,
-                        exchange=point.get("exchange", ""),
-                        mid=float(point.get("mid")) if point.get("mid") is not None else None,
-                        last_size=int(point.get("last_size")) if point.get("last_size") is not None else None,
-                        bid_size=float(point.get("bid_size")) if point.get("bid_size") is not None else None,
-                        bid_price=float(point.get("bid_price")) if point.get("bid_price") is not None else None,
-                        ask_price=float(point.get("ask_price")) if point.get("ask_price") is not None else None,
-                        ask_size=float(point.get("ask_size")) if point.get("ask_size") is not None else None,
-                        last=float(point.get("last")) if point.get("last") is not None else None,
-                        marketstack_last=float(point.get("marketstack_last")) if point.get("marketstack_last") is not None else None
-                    )
-                )
-            
-            return intraday_data
-        except Exception as e:
-            print(f"Error fetching intraday price data: {e}")
+        response = await self._make_request("/intraday", params)
+        
+        if not response.get("data"):
             return []
+        
+        intraday_data = []
+        for point in response["data"]:
+            intraday_data.append(
+                IntradayPricePoint(
+                    date=datetime.fromisoformat(point.get("date", "").replace("Z", "+00:00")),
+                    open=float(point.get("open", 0)),
+                    high=float(point.get("high", 0)),
+                    low=float(point.get("low", 0)),
+                    close=float(point.get("close", 0)),
+                    volume=float(point.get("volume", 0)),
+                    symbol=symbol,
+                    exchange=point.get("exchange", ""),
+                    mid=float(point.get("mid")) if point.get("mid") is not None else None,
+                    last_size=int(point.get("last_size")) if point.get("last_size") is not None else None,
+                    bid_size=float(point.get("bid_size")) if point.get("bid_size") is not None else None,
+                    bid_price=float(point.get("bid_price")) if point.get("bid_price") is not None else None,
+                    ask_price=float(point.get("ask_price")) if point.get("ask_price") is not None else None,
+                    ask_size=float(point.get("ask_size")) if point.get("ask_size") is not None else None,
+                    last=float(point.get("last")) if point.get("last") is not None else None,
+                    marketstack_last=float(point.get("marketstack_last")) if point.get("marketstack_last") is not None else None
+                )
+            )
+        
+        return intraday_data
 
+    @_provider_call("company profile", not_found=None)
     async def get_company_profile(self, symbol: str, exchange: Optional[str] = None) -> Optional[CompanyProfile]:
         """
         Get company profile information
         Uses MarketStack's /tickerinfo and /tickers/{symbol} endpoints
         """
+        # First, get basic ticker info
+        ticker_params = {"ticker": symbol}
+        ticker_info = await self._make_request("/tickerinfo", ticker_params)
+        
+        if not ticker_info.get("data"):
+            return None
+        
+        ticker_data = ticker_info["data"]
+        
+        # Get additional ticker details if available
+        additional_data = {}
         try:
-            # First, get basic ticker info
-            ticker_params = {"ticker": symbol}
-            ticker_info = await self._make_request("/tickerinfo", ticker_params)
-            
-            if not ticker_info.get("data"):
-                return None
-            
-            ticker_data = ticker_info["data"]
-            
-            # Get additional ticker details if available
-            additional_data = {}
-            try:
-                additional_response = await self._make_request(f"/tickers/{symbol}")
-                if additional_response:
-                    additional_data = additional_response
-            except Exception as e:
-                print(f"Error fetching additional ticker data: {e}")
-            
-            # Extract stock exchange info
-            stock_exchange = None
-            if ticker_data.get("stock_exchanges") and len(ticker_data["stock_exchanges"]) > 0:
-                exchange_data = ticker_data["stock_exchanges"][0]
-                stock_exchange = StockExchangeInfo(
-                    name=exchange_data.get("exchange_name", ""),
-                    acronym=exchange_data.get("acronym1", ""),
-                    mic=exchange_data.get("exchange_mic", ""),
-                    country=exchange_data.get("country", None),
-                    country_code=exchange_data.get("alpha2_code", None),
-                    city=exchange_data.get("city", None),
-                    website=exchange_data.get("website", None)
-                )
-            else:
-                # Create a minimal StockExchangeInfo if not available
-                stock_exchange = StockExchangeInfo(
-                    name="Unknown",
-                    acronym="",
-                    mic=""
-                )
-            
-            # Extract address details
-            address = None
-            if ticker_data.get("address"):
-                address_data = ticker_data["address"]
-                address = CompanyAddress(
-                    street1=address_data.get("street1", None),
-                    street2=address_data.get("street2", None),
-                    city=address_data.get("city", None),
-                    postal_code=address_data.get("postal_code", None),
-                    stateOrCountry=address_data.get("stateOrCountry", None),
-                    state_or_country_description=address_data.get("state_or_country_description", None)
-                )
-            
-            # Extract key executives
-            key_executives = []
-            if ticker_data.get("key_executives"):
-                for exec_data in ticker_data["key_executives"]:
-                    key_executives.append(
-                        KeyExecutive(
-                            name=exec_data.get("name", ""),
-                            salary=exec_data.get("salary", None),
-                            function=exec_data.get("function", None),
-                            exercised=exec_data.get("exercised", None),
-                            birth_year=exec_data.get("birth_year", None)
-                        )
-                    )
-            
-            # Create the CompanyProfile
-            return CompanyProfile(
-                symbol=symbol,
-                name=ticker_data.get("name", ""),
-                stock_exchange_info=stock_exchange,
-                asset_type=ticker_data.get("item_type", "equity"),
-                currency=additional_data.get("currency", None),
-                about=ticker_data.get("about", None),
-                industry=ticker_data.get("industry", None),
-                sector=ticker_data.get("sector", None),
-                website=ticker_data.get("website", None),
-                full_time_employees=int(ticker_data.get("full_time_employees", 0)) if ticker_data.get("full_time_employees") else None,
-                ipo_date=date.fromisoformat(ticker_data.get("ipo_date")) if ticker_data.get("ipo_date") else None,
-                date_founded=date.fromisoformat(ticker_data.get("date_founded")) if ticker_data.get("date_founded") else None,
-                address_details=address,
-                phone_number=ticker_data.get("phone", None),
-                key_executives=key_executives if key_executives else None,
-                cik=additional_data.get("cik", None),
-                isin=additional_data.get("isin", None),
-                cusip=additional_data.get("cusip", None),
-                ein=ticker_data.get("ein_employer_id", None),
-                lei=additional_data.get("lei", None),
-                sic_code=ticker_data.get("sic_code", None),
-                sic_name=ticker_data.get("sic_name", None),
-                item_type=ticker_data.get("item_type", None)
+            additional_data = await self._make_request(f"/tickers/{symbol}") or {}
+        except MarketDataProviderError as e:
+            if e.status_code != 404:
+                raise
+        
+        # Extract stock exchange info
+        stock_exchange = None
+        if ticker_data.get("stock_exchanges") and len(ticker_data["stock_exchanges"]) > 0:
+            exchange_data = ticker_data["stock_exchanges"][0]
+            stock_exchange = StockExchangeInfo(
+                name=exchange_data.get("exchange_name", ""),
+                acronym=exchange_data.get("acronym1", ""),
+                mic=exchange_data.get("exchange_mic", ""),
+                country=exchange_data.get("country", None),
+                country_code=exchange_data.get("alpha2_code", None),
+                city=exchange_data.get("city", None),
+                website=exchange_data.get("website", None)
             )
-        except Exception as e:
-            print(f"Error fetching company profile: {e}")
-            return None
+        else:
+            # Create a minimal StockExchangeInfo if not available
+            stock_exchange = StockExchangeInfo(
+                name="Unknown",
+                acronym="",
+                mic=""
+            )
+        
+        # Extract address details
+        address = None
+        if ticker_data.get("address"):
+            address_data = ticker_data["address"]
+            address = CompanyAddress(
+                street1=address_data.get("street1", None),
+                street2=address_data.get("street2", None),
+                city=address_data.get("city", None),
+                postal_code=address_data.get("postal_code", None),
+                stateOrCountry=address_data.get("stateOrCountry", None),
+                state_or_country_description=address_data.get("state_or_country_description", None)
+            )
+        
+        # Extract key executives
+        key_executives = []
+        if ticker_data.get("key_executives"):
+            for exec_data in ticker_data["key_executives"]:
+                key_executives.append(
+                    KeyExecutive(
+                        name=exec_data.get("name", ""),
+                        salary=exec_data.get("salary", None),
+                        function=exec_data.get("function", None),
+                        exercised=exec_data.get("exercised", None),
+                        birth_year=exec_data.get("birth_year", None)
+                    )
+                )
+        
+        # Create the CompanyProfile
+        return CompanyProfile(
+            symbol=symbol,
+            name=ticker_data.get("name", ""),
+            stock_exchange_info=stock_exchange,
+            asset_type=ticker_data.get("item_type", "equity"),
+            currency=additional_data.get("currency", None),
+            about=ticker_data.get("about", None),
+            industry=ticker_data.get("industry", None),
+            sector=ticker_data.get("sector", None),
+            website=ticker_data.get("website", None),
+            full_time_employees=int(ticker_data.get("full_time_employees", 0)) if ticker_data.get("full_time_employees") else None,
+            ipo_date=date.fromisoformat(ticker_data.get("ipo_date")) if ticker_data.get("ipo_date") else None,
+            date_founded=date.fromisoformat(ticker_data.get("date_founded")) if ticker_data.get("date_founded") else None,
+            address_details=address,
+            phone_number=ticker_data.get("phone", None),
+            key_executives=key_executives if key_executives else None,
+            cik=additional_data.get("cik", None),
+            isin=additional_data.get("isin", None),
+            cusip=additional_data.get("cusip", None),
+            ein=ticker_data.get("ein_employer_id", None),
+            lei=additional_data.get("lei", None),
+            sic_code=ticker_data.get("sic_code", None),
+            sic_name=ticker_data.get("sic_name", None),
+            item_type=ticker_data.get("item_type", None)
+        )
 
+    @_provider_call("dividend data", not_found=[])
     async def get_dividend_data(
         self,
         symbol: str,
@@ -762,31 +1076,28 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if to_date:
             params["date_to"] = to_date.isoformat()
         
-        try:
-            response = await self._make_request("/dividends", params)
-            
-            if not response.get("data"):
-                return []
-            
-            dividend_data = []
-            for div in response["data"]:
-                dividend_data.append(
-                    DividendData(
-                        date=datetime.fromisoformat(div.get("date", "").replace("Z", "+00:00")),
-                        dividend=float(div.get("dividend", 0)),
-                        symbol=symbol,
-                        payment_date=datetime.fromisoformat(div.get("payment_date", "").replace("Z", "+00:00")) if div.get("payment_date") else None,
-                        record_date=datetime.fromisoformat(div.get("record_date", "").replace("Z", "+00:00")) if div.get("record_date") else None,
-                        declaration_date=datetime.fromisoformat(div.get("declaration_date", "").replace("Z", "+00:00")) if div.get("declaration_date") else None,
-                        distr_freq=div.get("distr_freq", None)
-                    )
-                )
-            
-            return dividend_data
-        except Exception as e:
-            print(f"Error fetching dividend data: {e}")
+        response = await self._make_request("/dividends", params)
+        
+        if not response.get("data"):
             return []
+        
+        dividend_data = []
+        for div in response["data"]:
+            dividend_data.append(
+                DividendData(
+                    date=datetime.fromisoformat(div.get("date", "").replace("Z", "+00:00")),
+                    dividend=float(div.get("dividend", 0)),
+                    symbol=symbol,
+                    payment_date=datetime.fromisoformat(div.get("payment_date", "").replace("Z", "+00:00")) if div.get("payment_date") else None,
+                    record_date=datetime.fromisoformat(div.get("record_date", "").replace("Z", "+00:00")) if div.get("record_date") else None,
+                    declaration_date=datetime.fromisoformat(div.get("declaration_date", "").replace("Z", "+00:00")) if div.get("declaration_date") else None,
+                    distr_freq=div.get("distr_freq", None)
+                )
+            )
+        
+        return dividend_data
 
+    @_provider_call("stock split data", not_found=[])
     async def get_stock_split_data(
         self,
         symbol: str,
@@ -809,58 +1120,51 @@ class MarketStackAdapter(MarketDataServiceInterface):
         if to_date:
             params["date_to"] = to_date.isoformat()
         
-        try:
-            response = await self._make_request("/splits", params)
-            
-            if not response.get("data"):
-                return []
-            
-            split_data = []
-            for split in response["data"]:
-                split_data.append(
-                    StockSplitData(
-                        date=date.fromisoformat(split.get("date", "").split("T")[0]),
-                        split_factor=float(split.get("split_factor", 1.0)),
-                        symbol=symbol,
-                        stock_split=split.get("stock_split", "")
-                    )
-                )
-            
-            return split_data
-        except Exception as e:
-            print(f"Error fetching stock split data: {e}")
+        response = await self._make_request("/splits", params)
+        
+        if not response.get("data"):
             return []
+        
+        split_data = []
+        for split in response["data"]:
+            split_data.append(
+                StockSplitData(
+                    date=date.fromisoformat(split.get("date", "").split("T")[0]),
+                    split_factor=float(split.get("split_factor", 1.0)),
+                    symbol=symbol,
+                    stock_split=split.get("stock_split", "")
+                )
+            )
+        
+        return split_data
 
     async def get_option_quote(self, contract_symbol: str) -> Optional[Any]:
         """Placeholder for get_option_quote method"""
         pass
 
+    @_provider_call("forex quote", not_found=None)
     async def get_forex_quote(self, base_currency: str, quote_currency: str) -> Optional[ForexQuote]:
         """
         Get current forex exchange rate
         Uses MarketStack's /forex endpoint
         """
-        try:
-            response = await self._make_request(
-                "/forex", {"base": base_currency, "quote": quote_currency}
-            )
-            
-            if response.get("status") != "ok" or not response.get("result"):
-                return None
-            
-            result = response["result"]
-            
-            return ForexQuote(
-                base_currency=base_currency,
-                quote_currency=quote_currency,
-                rate=float(result.get("rate", 0)),
-                timestamp=datetime.fromisoformat(result.get("date", "").replace("Z", "+00:00")),
-                change=float(result.get("change", 0)) if result.get("change") is not None else None,
-                percent_change=float(result.get("percent_change", 0)) if result.get("percent_change") is not None else None
-            )
-        except Exception as e:
-            print(f"Error fetching forex quote: {e}")
+        response = await self._make_request(
+            "/forex", {"base": base_currency, "quote": quote_currency}
+        )
+        
+        if response.get("status") != "ok" or not response.get("result"):
             return None
+        
+        result = response["result"]
+        
+        return ForexQuote(
+            base_currency=base_currency,
+            quote_currency=quote_currency,
+            rate=float(result.get("rate", 0)),
+            timestamp=datetime.fromisoformat(result.get("date", "").replace("Z", "+00:00")),
+            change=float(result.get("change", 0)) if result.get("change") is not None else None,
+            percent_change=float(result.get("percent_change", 0)) if result.get("percent_change") is not None else None
+        )
 
     async def get_crypto_quote(self, base_asset: str, quote_asset: str) -> Optional[Any]:
         """Placeholder for get_crypto_quote method"""
@@ -870,6 +1174,28 @@ class MarketStackAdapter(MarketDataServiceInterface):
         """Placeholder for get_market_movers method"""
         return []
 
+    async def iter_ticker_list(self) -> AsyncIterator[CompanyProfile]:
+        """
+        Stream every ticker of MarketStack's /tickerslist across all pages
+        Used to fill the local symbol index; pages may arrive out of order.
+        """
+        async for page in self._iter_pages("/tickerslist", {}):
+            for item in page:
+                if not item.get("ticker"):
+                    continue
+                stock_exchange = item.get("stock_exchange") or {}
+                yield CompanyProfile(
+                    symbol=item["ticker"],
+                    name=item.get("name") or "",
+                    stock_exchange_info=StockExchangeInfo(
+                        name=stock_exchange.get("name") or "Unknown",
+                        acronym=stock_exchange.get("acronym") or "",
+                        mic=stock_exchange.get("mic") or ""
+                    ),
+                    asset_type=item.get("asset_type") or "equity"
+                )
+
+    @_provider_call("symbol search", not_found=[])
     async def search_symbols(
         self,
         query: str,
@@ -885,36 +1211,32 @@ class MarketStackAdapter(MarketDataServiceInterface):
             "limit": limit
         }
         
-        try:
-            response = await self._make_request("/tickerslist", params)
-            
-            if not response.get("data"):
-                return []
+        response = await self._make_request("/tickerslist", params)
+        
+        if not response.get("data"):
+            return []
+        
+        search_results = []
+        for item in response["data"]:
+            # Skip if asset_type filter is provided and doesn't match
+            if asset_type and item.get("asset_type") != asset_type.value:
+                continue
+            
+            # Create a minimal StockExchangeInfo
+            stock_exchange = StockExchangeInfo(
+                name=item.get("stock_exchange", {}).get("name", "Unknown"),
+                acronym=item.get("stock_exchange", {}).get("acronym", ""),
+                mic=item.get("stock_exchange", {}).get("mic", "")
+            )
             
-            search_results = []
-            for item in response["data"]:
-                # Skip if asset_type filter is provided and doesn't match
-                if asset_type and item.get("asset_type") != asset_type.value:
-                    continue
-                
-                # Create a minimal StockExchangeInfo
-                stock_exchange = StockExchangeInfo(
-                    name=item.get("stock_exchange", {}).get("name", "Unknown"),
-                    acronym=item.get("stock_exchange", {}).get("acronym", ""),
-                    mic=item.get("stock_exchange", {}).get("mic", "")
-                )
-                
-                # Create a minimal CompanyProfile for search results
-                search_results.append(
-                    CompanyProfile(
-                        symbol=item.get("ticker", ""),
-                        name=item.get("name", ""),
-                        stock_exchange_info=stock_exchange,
-                        asset_type=item.get("asset_type", "equity")
-                    )
+            # Create a minimal CompanyProfile for search results
+            search_results.append(
+                CompanyProfile(
+                    symbol=item.get("ticker", ""),
+                    name=item.get("name", ""),
+                    stock_exchange_info=stock_exchange,
+                    asset_type=item.get("asset_type", "equity")
                 )
-            
-            return search_results
-        except Exception as e:
-            print(f"Error searching symbols: {e}")
-            return []
+            )
+        
+        return search_results
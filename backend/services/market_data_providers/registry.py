@@ -0,0 +1,33 @@
+# backend/services/market_data_providers/registry.py
+
+"""
+Market data providers by name, as used in MARKET_DATA_PROVIDER and
+MARKET_PRICE_PROVIDERS.
+"""
+
+from typing import Callable, Dict
+
+from backend.services.market_data_interface import MarketDataServiceInterface
+
+
+def provider_factories() -> Dict[str, Callable[[], MarketDataServiceInterface]]:
+    # Imported lazily: each adapter module reads its own API key settings
+    from backend.services.market_data_providers.alpha_vantage_adapter import AlphaVantageAdapter
+    from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+    from backend.services.market_data_providers.synthetic_provider import SyntheticMarketDataProvider
+    return {
+        "alpha_vantage": AlphaVantageAdapter,
+        "marketstack": MarketStackAdapter,
+        "synthetic": SyntheticMarketDataProvider
+    }
+
+
+def create_provider(name: str) -> MarketDataServiceInterface:
+    """
+    Creates the named provider. Raises KeyError for an unknown name and lets the
+    adapter's ValueError (e.g. missing API key) through.
+    """
+    factories = provider_factories()
+    if name not in factories:
+        raise KeyError(f"Unknown market data provider '{name}'. Known providers: {', '.join(factories)}")
+    return factories[name]()
@@ -0,0 +1,473 @@
+# backend/services/market_data_providers/synthetic_provider.py
+
+"""
+Offline, deterministic market data for load tests and benchmarks.
+
+- Every symbol gets its own seeded random walk of daily prices starting on
+  SYNTHETIC_EPOCH, so the same (seed, symbol, date) always yields the same
+  quote, bar, split and dividend, whatever range was requested before.
+- Prices are generated on weekdays only. adj_* fields are split-adjusted to
+  today; raw fields are what traded at the time. Some symbols split (2:1, 3:1
+  or 4:1) in some years and some pay quarterly dividends.
+- Latency, upstream errors and 429s can be injected (from a separate seeded
+  stream, so runs are reproducible) to exercise retries, hedging and fallbacks.
+- Select it with MARKET_DATA_PROVIDER=synthetic; no network or API key needed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import random
+from array import array
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend.schemas.market_data import (
+    EquityQuote,
+    HistoricalPricePoint,
+    IntradayPricePoint,
+    CompanyProfile,
+    StockExchangeInfo,
+    DividendData,
+    StockSplitData,
+    MarketAssetType,
+    OptionQuote,
+    ForexQuote,
+    CryptoQuote,
+    IndexQuote,
+    MarketMover,
+    CommodityPrice,
+    HistoricalCommodityPriceData,
+    CompanyRatingData,
+    IndexBasicInfo,
+    BondCountry,
+    BondInfoData,
+    ETFTicker,
+    ETFHoldingDetails
+)
+from backend.core.price_series import PriceSeries
+from backend.services.market_data_interface import (
+    MarketDataServiceInterface,
+    MarketDataRateLimitError,
+    MarketDataUnavailableError
+)
+
+log = logging.getLogger(__name__)
+
+# --- Synthetic Data Configuration ---
+SYNTHETIC_MARKET_DATA_SEED = int(os.getenv("SYNTHETIC_MARKET_DATA_SEED", "42"))
+# Injected per call: fixed latency plus uniform jitter (milliseconds), then failures
+SYNTHETIC_MARKET_DATA_LATENCY_MS = float(os.getenv("SYNTHETIC_MARKET_DATA_LATENCY_MS", "0"))
+SYNTHETIC_MARKET_DATA_LATENCY_JITTER_MS = float(os.getenv("SYNTHETIC_MARKET_DATA_LATENCY_JITTER_MS", "0"))
+SYNTHETIC_MARKET_DATA_ERROR_RATE = float(os.getenv("SYNTHETIC_MARKET_DATA_ERROR_RATE", "0"))
+SYNTHETIC_MARKET_DATA_RATE_LIMIT_RATE = float(os.getenv("SYNTHETIC_MARKET_DATA_RATE_LIMIT_RATE", "0"))
+
+# First generated trading day (a Monday); earlier dates have no data
+SYNTHETIC_EPOCH = date(2000, 1, 3)
+SPLIT_PROBABILITY_PER_YEAR = 0.08
+DIVIDEND_PAYER_PROBABILITY = 0.6
+DIVIDEND_MONTHS = (2, 5, 8, 11)
+EXCHANGE_MIC = "XSYN"
+
+
+def _stable_seed(*parts: object) -> int:
+    """Seed derived from the parts; unlike hash(), stable across processes"""
+    digest = hashlib.blake2b(":".join(str(p) for p in parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _trading_index(day: date) -> int:
+    """Index of `day` among weekdays since SYNTHETIC_EPOCH (weekends map to the Friday before)"""
+    weeks, weekday = divmod((day - SYNTHETIC_EPOCH).days, 7)
+    return weeks * 5 + min(weekday, 4)
+
+
+def _trading_day(index: int) -> date:
+    weeks, weekday = divmod(index, 5)
+    return SYNTHETIC_EPOCH + timedelta(days=weeks * 7 + weekday)
+
+
+def _latest_trading_day(today: Optional[date] = None) -> date:
+    today = today or date.today()
+    return today - timedelta(days=max(0, today.weekday() - 4))
+
+
+def _timestamp(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+class _RandomWalk:
+    """Split-adjusted daily bars for one key, generated on demand and cached"""
+
+    def __init__(self, seed: int, key: str, base_range: Tuple[float, float], volatility_range: Tuple[float, float]):
+        meta = random.Random(_stable_seed(seed, key, "meta"))
+        self.base_price = meta.uniform(*base_range)
+        self.volatility = meta.uniform(*volatility_range)
+        self.drift = meta.uniform(-0.0001, 0.0004)
+        self.base_volume = meta.randint(100_000, 20_000_000)
+        self._rng = random.Random(_stable_seed(seed, key, "walk"))
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.volume = array("q")
+
+    def extend_to(self, index: int) -> None:
+        rng = self._rng
+        while len(self.close) <= index:
+            previous = self.close[-1] if self.close else self.base_price
+            # Same number of draws per day, so every day's bar is fixed by the seed
+            gap, ret, spread_up, spread_down, volume_factor = rng.gauss(0, 0.3), rng.gauss(0, 1), rng.random(), rng.random(), rng.lognormvariate(0, 0.4)
+            open_price = previous * math.exp(self.volatility * gap)
+            close = previous * math.exp(self.drift + self.volatility * ret)
+            self.open.append(round(open_price, 4))
+            self.close.append(round(close, 4))
+            self.high.append(round(max(open_price, close) * (1 + self.volatility * spread_up), 4))
+            self.low.append(round(min(open_price, close) * (1 - self.volatility * spread_down), 4))
+            self.volume.append(int(self.base_volume * volume_factor))
+
+
+class SyntheticMarketDataProvider(MarketDataServiceInterface):
+    """Deterministic offline provider (seeded random walks per symbol) with optional fault injection"""
+
+    def __init__(
+        self,
+        seed: int = SYNTHETIC_MARKET_DATA_SEED,
+        latency_ms: float = SYNTHETIC_MARKET_DATA_LATENCY_MS,
+        latency_jitter_ms: float = SYNTHETIC_MARKET_DATA_LATENCY_JITTER_MS,
+        error_rate: float = SYNTHETIC_MARKET_DATA_ERROR_RATE,
+        rate_limit_rate: float = SYNTHETIC_MARKET_DATA_RATE_LIMIT_RATE,
+        today: Optional[date] = None
+    ):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        # Fixed "today" makes quotes reproducible across days too (tests, recorded benchmarks)
+        self.today = today
+        self.calls = 0
+        self.injected: Counter = Counter()
+        self._fault_rng = random.Random(_stable_seed(seed, "faults"))
+        self._walks: Dict[str, _RandomWalk] = {}
+
+    # --- Fault injection ---
+
+    async def _simulate_call(self, method: str) -> None:
+        """Sleeps for the configured latency, then maybe raises an injected error"""
+        self.calls += 1
+        if self.latency_ms or self.latency_jitter_ms:
+            await asyncio.sleep((self.latency_ms + self._fault_rng.random() * self.latency_jitter_ms) / 1000)
+        roll = self._fault_rng.random()
+        if roll < self.rate_limit_rate:
+            self.injected["rate_limited"] += 1
+            raise MarketDataRateLimitError(f"Synthetic rate limit on {method}")
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.injected["unavailable"] += 1
+            raise MarketDataUnavailableError(f"Synthetic upstream failure on {method}")
+
+    # --- Generators ---
+
+    def _today(self) -> date:
+        return self.today or date.today()
+
+    def _walk(self, key: str, base_range=(20.0, 400.0), volatility_range=(0.008, 0.03)) -> _RandomWalk:
+        walk = self._walks.get(key)
+        if walk is None:
+            walk = self._walks[key] = _RandomWalk(self.seed, key, base_range, volatility_range)
+        return walk
+
+    def _splits(self, symbol: str, from_date: date, to_date: date) -> List[Tuple[date, float]]:
+        """(date, factor) of splits between two dates; at most one per symbol and year"""
+        splits = []
+        for year in range(max(from_date.year, SYNTHETIC_EPOCH.year), to_date.year + 1):
+            rng = random.Random(_stable_seed(self.seed, symbol, "split", year))
+            if rng.random() >= SPLIT_PROBABILITY_PER_YEAR:
+                continue
+            day = _trading_day(_trading_index(date(year, 1, 1) + timedelta(days=rng.randint(0, 364))))
+            if from_date <= day <= to_date and day >= SYNTHETIC_EPOCH:
+                splits.append((day, float(rng.choice((2, 3, 4)))))
+        return splits
+
+    def _dividend_yield(self, symbol: str) -> Optional[float]:
+        rng = random.Random(_stable_seed(self.seed, symbol, "dividend"))
+        return rng.uniform(0.005, 0.04) if rng.random() < DIVIDEND_PAYER_PROBABILITY else None
+
+    def _dividends(self, symbol: str, from_date: date, to_date: date) -> List[Tuple[date, float]]:
+        """(ex-date, amount per share at the time) of quarterly dividends between two dates"""
+        dividend_yield = self._dividend_yield(symbol)
+        if dividend_yield is None:
+            return []
+        walk = self._walk(symbol)
+        dividends = []
+        for year in range(max(from_date.year, SYNTHETIC_EPOCH.year), to_date.year + 1):
+            for month in DIVIDEND_MONTHS:
+                ex_date = date(year, month, 15)
+                if ex_date.weekday() > 4: # Weekend: next Monday
+                    ex_date += timedelta(days=7 - ex_date.weekday())
+                if not (from_date <= ex_date <= to_date) or ex_date > self._today():
+                    continue
+                index = _trading_index(ex_date)
+                walk.extend_to(index)
+                raw_close = walk.close[index] * self._split_factor_after(symbol, ex_date)
+                dividends.append((ex_date, round(raw_close * dividend_yield / 4, 4)))
+        return dividends
+
+    def _split_factor_after(self, symbol: str, day: date) -> float:
+        """Product of split factors after `day` up to today (raw price = adjusted price x this)"""
+        factor = 1.0
+        for _, split_factor in self._splits(symbol, day + timedelta(days=1), self._today()):
+            factor *= split_factor
+        return factor
+
+    def _bars(self, symbol: str, from_date: date, to_date: date) -> PriceSeries:
+        """Daily bars between two dates (capped at today) as a PriceSeries"""
+        symbol = symbol.upper()
+        series = PriceSeries(symbol, exchange=EXCHANGE_MIC, name=f"{symbol} Synthetic Inc.", asset_type="Stock", price_currency="usd")
+        to_date = min(to_date, self._today())
+        start, stop = max(_trading_index(from_date), 0), _trading_index(to_date)
+        if from_date.weekday() > 4:
+            start += 1 # A weekend start maps to the Friday before
+        if stop < start or to_date < SYNTHETIC_EPOCH:
+            return series
+        walk = self._walk(symbol)
+        walk.extend_to(stop)
+
+        splits = self._splits(symbol, _trading_day(start), self._today())
+        split_on = dict(splits)
+        dividends = dict(self._dividends(symbol, _trading_day(start), to_date))
+        # Running factor for "splits after this day", updated as the loop passes split days
+        factor_after = 1.0
+        for _, split_factor in splits:
+            factor_after *= split_factor
+        columns = series.columns
+        for index in range(start, stop + 1):
+            day = _trading_day(index)
+            if day in split_on:
+                factor_after /= split_on[day]
+            adjusted = (walk.open[index], walk.high[index], walk.low[index], walk.close[index])
+            series.dates.append(day.toordinal())
+            for column, value in zip(("open", "high", "low", "close"), adjusted):
+                columns[column].append(round(value * factor_after, 4))
+                columns[f"adj_{column}"].append(value)
+            columns["volume"].append(int(walk.volume[index] / factor_after))
+            columns["adj_volume"].append(walk.volume[index])
+            columns["split_factor"].append(split_on.get(day, 1.0))
+            columns["dividend"].append(dividends.get(day, 0.0))
+        return series
+
+    # --- Equities ---
+
+    async def get_equity_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[EquityQuote]:
+        await self._simulate_call("get_equity_quote")
+        return self._quote(symbol)
+
+    def _quote(self, symbol: str) -> Optional[EquityQuote]:
+        latest = _latest_trading_day(self._today())
+        bars = self._bars(symbol, latest - timedelta(days=7), latest)
+        if len(bars) == 0:
+            return None
+        last, previous = len(bars) - 1, max(len(bars) - 2, 0)
+        price, previous_close = bars.close[last], bars.close[previous]
+        change = round(price - previous_close, 4)
+        return EquityQuote(
+            symbol=bars.symbol,
+            name=bars.name,
+            exchange=bars.exchange,
+            price=price,
+            change=change,
+            percent_change=round(change / previous_close * 100, 4) if previous_close else 0.0,
+            volume=bars.volume[last],
+            timestamp=_timestamp(date.fromordinal(bars.dates[last])),
+            open=bars.open[last],
+            high=bars.high[last],
+            low=bars.low[last],
+            adj_open=bars.adj_open[last],
+            adj_close=bars.adj_close[last],
+            dividend=bars.dividend[last],
+            split_factor=bars.split_factor[last],
+            asset_type=bars.asset_type,
+            price_currency=bars.price_currency
+        )
+
+    async def get_equity_quotes(self, symbols: List[str], exchange: Optional[str] = None) -> Dict[str, EquityQuote]:
+        await self._simulate_call("get_equity_quotes")
+        quotes = {}
+        for symbol in dict.fromkeys(s.upper() for s in symbols if s):
+            quote = self._quote(symbol)
+            if quote:
+                quotes[symbol] = quote
+        return quotes
+
+    async def get_price_series(self, symbol: str, from_date: date, to_date: date, exchange: Optional[str] = None) -> PriceSeries:
+        await self._simulate_call("get_price_series")
+        return self._bars(symbol, from_date, to_date)
+
+    async def get_price_series_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, PriceSeries]:
+        await self._simulate_call("get_price_series_bulk")
+        return {symbol: self._bars(symbol, from_date, to_date) for symbol in dict.fromkeys(s.upper() for s in symbols if s)}
+
+    async def get_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> List[HistoricalPricePoint]:
+        await self._simulate_call("get_historical_price_data")
+        return self._bars(symbol, from_date, to_date).to_points()
+
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        exchange: Optional[str] = None
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        await self._simulate_call("get_historical_price_data_bulk")
+        return {symbol: self._bars(symbol, from_date, to_date).to_points() for symbol in dict.fromkeys(s.upper() for s in symbols if s)}
+
+    async def get_dividend_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[DividendData]:
+        await self._simulate_call("get_dividend_data")
+        to_date = to_date or self._today()
+        from_date = from_date or to_date - timedelta(days=365)
+        return [
+            DividendData(date=_timestamp(ex_date), dividend=amount, symbol=symbol.upper(), payment_date=_timestamp(ex_date + timedelta(days=14)), distr_freq="q")
+            for ex_date, amount in self._dividends(symbol.upper(), from_date, to_date)
+        ]
+
+    async def get_stock_split_data(
+        self,
+        symbol: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        exchange: Optional[str] = None
+    ) -> List[StockSplitData]:
+        await self._simulate_call("get_stock_split_data")
+        to_date = min(to_date or self._today(), self._today())
+        from_date = from_date or SYNTHETIC_EPOCH
+        return [
+            StockSplitData(date=split_day, split_factor=factor, symbol=symbol.upper(), stock_split=f"{int(factor)}:1")
+            for split_day, factor in self._splits(symbol.upper(), from_date, to_date)
+        ]
+
+    async def get_company_profile(self, symbol: str, exchange: Optional[str] = None) -> Optional[CompanyProfile]:
+        await self._simulate_call("get_company_profile")
+        return CompanyProfile(
+            symbol=symbol.upper(),
+            name=f"{symbol.upper()} Synthetic Inc.",
+            stock_exchange_info=StockExchangeInfo(name="Synthetic Exchange", acronym="SYN", mic=EXCHANGE_MIC),
+            currency="USD"
+        )
+
+    # --- Indexes and currencies ---
+
+    async def get_index_quote(self, symbol: str, exchange: Optional[str] = None) -> Optional[IndexQuote]:
+        await self._simulate_call("get_index_quote")
+        walk = self._walk(f"index:{symbol.upper()}", base_range=(1000.0, 20000.0), volatility_range=(0.006, 0.015))
+        index = _trading_index(_latest_trading_day(self._today()))
+        walk.extend_to(index)
+        price, previous = walk.close[index], walk.close[max(index - 1, 0)]
+        return IndexQuote(
+            symbol=symbol.upper(),
+            name=f"{symbol.upper()} Synthetic Index",
+            price=price,
+            change=round(price - previous, 4),
+            percent_change=round((price - previous) / previous * 100, 4),
+            timestamp=_timestamp(_trading_day(index))
+        )
+
+    async def get_forex_quote(self, base_currency: str, quote_currency: str) -> Optional[ForexQuote]:
+        await self._simulate_call("get_forex_quote")
+        walk = self._walk(f"fx:{base_currency.upper()}/{quote_currency.upper()}", base_range=(0.5, 2.0), volatility_range=(0.002, 0.008))
+        index = _trading_index(_latest_trading_day(self._today()))
+        walk.extend_to(index)
+        rate, previous = walk.close[index], walk.close[max(index - 1, 0)]
+        return ForexQuote(
+            base_currency=base_currency.upper(),
+            quote_currency=quote_currency.upper(),
+            rate=rate,
+            timestamp=_timestamp(_trading_day(index)),
+            change=round(rate - previous, 6),
+            percent_change=round((rate - previous) / previous * 100, 4)
+        )
+
+    # --- Not generated ---
+
+    async def get_intraday_price_data(
+        self,
+        symbol: str,
+        interval: str,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        exchange: Optional[str] = None
+    ) -> List[IntradayPricePoint]:
+        return []
+
+    async def get_option_quote(self, contract_symbol: str) -> Optional[OptionQuote]:
+        return None
+
+    async def get_crypto_quote(self, base_asset: str, quote_asset: str) -> Optional[CryptoQuote]:
+        return None
+
+    async def get_market_movers(self, market_segment: str, top_n: int = 10, exchange: Optional[str] = None) -> List[MarketMover]:
+        return []
+
+    async def search_symbols(self, query: str, asset_type: Optional[MarketAssetType] = None, limit: int = 10) -> List[CompanyProfile]:
+        return []
+
+    async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
+        return None
+
+    async def get_historical_commodity_prices(
+        self,
+        commodity_name: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        frequency: Optional[str] = None
+    ) -> Optional[HistoricalCommodityPriceData]:
+        return None
+
+    async def get_company_ratings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        rated: Optional[str] = None
+    ) -> Optional[CompanyRatingData]:
+        return None
+
+    async def list_stock_market_indexes(self, limit: int = 100, offset: int = 0) -> List[IndexBasicInfo]:
+        return []
+
+    async def list_bond_countries(self, limit: int = 100, offset: int = 0) -> List[BondCountry]:
+        return []
+
+    async def get_bond_info(self, country: str) -> Optional[BondInfoData]:
+        return None
+
+    async def list_etfs(self, limit: int = 100, offset: int = 0) -> List[ETFTicker]:
+        return []
+
+    async def get_etf_holdings(
+        self,
+        ticker: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Optional[ETFHoldingDetails]:
+        return None
@@ -1,9 +1,13 @@
-from datetime import date, datetime
-from typing import List, Optional, Any
+import os
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 from backend.schemas.market_data import (
+    EquityQuote,
+    HistoricalPricePoint,
     StockQuote,
     StockHistoricalData,
+    StockHistoricalDataPoint,
     IndexQuote,
     ForexRate,
     # Phase 2 additions
@@ -17,18 +21,71 @@ from backend.schemas.market_data import (
     ETFHoldingDetails
 )
 from backend.services.market_data_interface import MarketDataServiceInterface
-from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+from backend.services.market_data_providers.registry import create_provider
+from backend.services.market_data_providers.cached_provider import CachedMarketDataProvider
+from backend.services.market_data_providers.cache_backends import build_cache_backend
+
+
+# Range used by get_stock_historical_data when no start date is given
+DEFAULT_HISTORICAL_DAYS = 30
+# Provider behind the service: "marketstack", "alpha_vantage" or "synthetic" (offline, deterministic)
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "marketstack").lower()
+# Wrap the default provider in the market data cache (Redis if MARKET_DATA_REDIS_URL is set)
+MARKET_DATA_CACHE_ENABLED = os.getenv("MARKET_DATA_CACHE_ENABLED", "true").lower() == "true"
+
+
+def _build_provider(name: str) -> MarketDataServiceInterface:
+    provider = create_provider(name)
+    if MARKET_DATA_CACHE_ENABLED:
+        provider = CachedMarketDataProvider(provider, cache=build_cache_backend(), namespace=name)
+    return provider
 
 
 class MarketDataService:
     """Service for retrieving market data"""
 
     def __init__(self, provider: Optional[MarketDataServiceInterface] = None):
-        self.provider = provider or MarketStackAdapter()
+        if provider is None:
+            try:
+                provider = _build_provider(MARKET_DATA_PROVIDER)
+            except KeyError as e:
+                raise ValueError(e.args[0]) from e
+        self.provider = provider
+        # App-scoped providers by name, all closed with the service
+        self._providers: Dict[str, MarketDataServiceInterface] = {MARKET_DATA_PROVIDER: provider}
+
+    def get_provider(self, name: str) -> MarketDataServiceInterface:
+        """
+        The app-scoped provider with the given name: this service's own provider
+        for MARKET_DATA_PROVIDER, otherwise one created (and cached) on first use.
+        Raises KeyError for an unknown name and ValueError if it is not configured.
+        """
+        name = name.lower()
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = self._providers[name] = _build_provider(name)
+        return provider
+
+    async def aclose(self) -> None:
+        """Close the providers' network resources (called on application shutdown)"""
+        for provider in self._providers.values():
+            await provider.aclose()
 
     async def get_stock_quote(self, symbol: str) -> Optional[StockQuote]:
         """Get current stock quote for a symbol"""
-        return await self.provider.get_stock_quote(symbol)
+        quote = await self.provider.get_equity_quote(symbol)
+        if not quote:
+            return None
+        return StockQuote(
+            symbol=quote.symbol,
+            name=quote.name,
+            exchange=quote.exchange,
+            price=quote.price,
+            change=quote.change,
+            percent_change=quote.percent_change,
+            volume=quote.volume,
+            timestamp=quote.timestamp
+        )
 
     async def get_stock_historical_data(
         self,
@@ -36,11 +93,47 @@ class MarketDataService:
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
     ) -> Optional[StockHistoricalData]:
-        """Get historical stock data for a symbol"""
-        return await self.provider.get_stock_historical_data(
-            symbol, from_date, to_date
+        """Get historical stock data for a symbol (defaults to the last DEFAULT_HISTORICAL_DAYS days)"""
+        to_date = to_date or date.today()
+        from_date = from_date or to_date - timedelta(days=DEFAULT_HISTORICAL_DAYS)
+        series = await self.provider.get_price_series(symbol, from_date, to_date)
+        if not series:
+            return None
+        # Models are built only here, at the API edge
+        return StockHistoricalData(
+            symbol=symbol,
+            name=series.name,
+            exchange=series.exchange,
+            data=[
+                StockHistoricalDataPoint(date=day, open=o, high=h, low=l, close=c, volume=v)
+                for day, o, h, l, c, v in zip(
+                    series.iter_dates(), series.open, series.high, series.low, series.close, series.volume
+                )
+            ]
         )
 
+    async def get_equity_quotes(self, symbols: List[str]) -> Dict[str, EquityQuote]:
+        """Get latest quotes for many symbols in bulk, keyed by symbol"""
+        return await self.provider.get_equity_quotes(symbols)
+
+    async def get_historical_price_data_bulk(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+    ) -> Dict[str, List[HistoricalPricePoint]]:
+        """Get historical prices for many symbols in bulk, keyed by symbol"""
+        return await self.provider.get_historical_price_data_bulk(symbols, from_date, to_date)
+
+    def iter_historical_price_data(
+        self,
+        symbol: str,
+        from_date: date,
+        to_date: date,
+    ) -> AsyncIterator[HistoricalPricePoint]:
+        """Stream historical prices for a symbol page by page (for long ranges)"""
+        return self.provider.iter_historical_price_data(symbol, from_date, to_date)
+
     async def get_index_quote(self, symbol: str) -> Optional[IndexQuote]:
         """Get current quote for a market index"""
         return await self.provider.get_index_quote(symbol)
@@ -49,7 +142,15 @@ class MarketDataService:
         self, base_currency: str, quote_currency: str
     ) -> Optional[ForexRate]:
         """Get current forex exchange rate"""
-        return await self.provider.get_forex_rate(base_currency, quote_currency)
+        quote = await self.provider.get_forex_quote(base_currency, quote_currency)
+        if not quote:
+            return None
+        return ForexRate(
+            base_currency=quote.base_currency,
+            quote_currency=quote.quote_currency,
+            rate=quote.rate,
+            timestamp=quote.timestamp
+        )
 
     # Phase 2 - Commodity Prices
     async def get_commodity_price(self, commodity_name: str) -> Optional[CommodityPrice]:
@@ -0,0 +1,308 @@
+# backend/services/nav_backfill_service.py
+
+"""
+Historical NAV (UnitValueHistory series) rebuilt by replaying a club's ledger
+(scripts/backfill_nav.py).
+
+- The club's transactions and member transactions are loaded once, oldest
+  first, and replayed in date order: positions, bank cash, brokerage cash and
+  units outstanding are updated per event with the same cash effects the
+  transaction services apply.
+- Prices come from the local price store (asset_prices) only, in one query for
+  the whole range; the last stored close is carried forward over holidays and
+  gaps. The market value is kept incrementally (quantity changes and price
+  changes each adjust it), so every weekday costs O(1) plus its own events and
+  price rows: ten years of history are valued in one pass.
+- OPTION positions are valued at intrinsic value from the underlying's stored
+  close (there is no historical volatility per day); held assets without any
+  stored price count at 0 and are reported.
+- All rows are written with one bulk insert; NAV already stored is kept unless
+  `replace` is given.
+"""
+
+import heapq
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import option_pricing
+from backend.core import session as db_session
+from backend.crud import asset as crud_asset
+from backend.crud import asset_price as crud_asset_price
+from backend.crud import club as crud_club
+from backend.crud import member_transaction as crud_member_tx
+from backend.crud import transaction as crud_transaction
+from backend.crud import unit_value_history as crud_unit_value
+from backend.models.enums import AssetType, MemberTransactionType, OptionType, TransactionType
+from backend.services.accounting_service import build_nav_row
+from backend.services.option_valuation_service import OPTION_CONTRACT_MULTIPLIER
+from backend.services.transaction_service import BUY_TYPES, SELL_TYPES
+
+log = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+# Option lifecycle events close `quantity` contracts of the position (long or short)
+LIFECYCLE_TYPES = {
+    TransactionType.OPTION_EXPIRATION,
+    TransactionType.OPTION_EXERCISE,
+    TransactionType.OPTION_ASSIGNMENT,
+}
+# Cash receipts credited to the fund's brokerage account
+BROKERAGE_RECEIPT_TYPES = {TransactionType.DIVIDEND, TransactionType.BROKERAGE_INTEREST}
+
+# Option asset ID -> (underlying asset ID, strike, is_call)
+OptionTerms = Dict[uuid.UUID, Tuple[uuid.UUID, float, bool]]
+
+
+def _utc_day(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+
+
+def _weekdays(start_date: date, end_date: date) -> List[date]:
+    days = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class LedgerReplay:
+    """Running state of one club while its ledger is replayed."""
+
+    def __init__(self, options: Optional[OptionTerms] = None):
+        self.bank_cash = ZERO
+        self.brokerage_cash = ZERO
+        self.total_units = ZERO
+        self.market_value = ZERO
+        self.quantities: Dict[uuid.UUID, Decimal] = {}
+        self.prices: Dict[uuid.UUID, Decimal] = {}
+        self.awaiting_price: Set[uuid.UUID] = set() # Held now, no price known yet
+        self.unpriced: Set[uuid.UUID] = set() # Held without a price on some valuation day
+        self.skipped = 0 # Transactions without a cash or position effect to replay
+        self._options_by_underlying: Dict[uuid.UUID, List[Tuple[uuid.UUID, float, bool]]] = {}
+        for option_id, (underlying_id, strike, is_call) in (options or {}).items():
+            self._options_by_underlying.setdefault(underlying_id, []).append((option_id, strike, is_call))
+
+    @property
+    def total_value(self) -> Decimal:
+        return self.market_value + self.bank_cash + self.brokerage_cash
+
+    def _move(self, asset_id: uuid.UUID, quantity_change: Decimal) -> None:
+        quantity = self.quantities.get(asset_id, ZERO) + quantity_change
+        self.quantities[asset_id] = quantity
+        price = self.prices.get(asset_id)
+        if price is not None:
+            self.market_value += quantity_change * price
+        elif quantity:
+            self.awaiting_price.add(asset_id)
+        else:
+            self.awaiting_price.discard(asset_id)
+
+    def set_price(self, asset_id: uuid.UUID, price: Decimal) -> None:
+        """Sets an asset's price; options on it are repriced at intrinsic value."""
+        quantity = self.quantities.get(asset_id)
+        if quantity:
+            self.market_value += quantity * (price - self.prices.get(asset_id, ZERO))
+        self.prices[asset_id] = price
+        self.awaiting_price.discard(asset_id)
+        options = self._options_by_underlying.get(asset_id)
+        if options:
+            values = option_pricing.intrinsic_values([float(price)] * len(options), [strike for _, strike, _ in options], [call for _, _, call in options])
+            for (option_id, _, _), value in zip(options, values):
+                self.set_price(option_id, (Decimal(str(value)) * OPTION_CONTRACT_MULTIPLIER).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP))
+
+    def apply_transaction(self, row: Sequence[Any]) -> None:
+        """Applies a (transaction_date, type, asset_id, quantity, total_amount, fees) row."""
+        _, tx_type, asset_id, quantity, total_amount, fees = row
+        quantity = quantity or ZERO
+        amount = total_amount or ZERO
+        fees = fees or ZERO
+        if tx_type in BUY_TYPES:
+            self.brokerage_cash -= amount + fees
+            self._move(asset_id, quantity)
+        elif tx_type in SELL_TYPES:
+            self.brokerage_cash += amount - fees
+            self._move(asset_id, -quantity)
+        elif tx_type in LIFECYCLE_TYPES:
+            # The stock leg of an exercise/assignment is its own linked BUY/SELL row
+            held = self.quantities.get(asset_id, ZERO)
+            self._move(asset_id, -quantity if held > 0 else quantity)
+            self.brokerage_cash -= fees
+        elif tx_type in BROKERAGE_RECEIPT_TYPES:
+            self.brokerage_cash += amount - fees
+        elif tx_type == TransactionType.BANK_INTEREST:
+            self.bank_cash += amount - fees
+        elif tx_type == TransactionType.CLUB_EXPENSE:
+            self.bank_cash -= amount + fees
+        elif tx_type == TransactionType.BANK_TO_BROKERAGE:
+            self.bank_cash -= amount + fees
+            self.brokerage_cash += amount
+        elif tx_type == TransactionType.BROKERAGE_TO_BANK:
+            self.brokerage_cash -= amount + fees
+            self.bank_cash += amount
+        elif tx_type == TransactionType.INTERFUND_CASH_TRANSFER:
+            self.brokerage_cash -= fees # Both funds are in the club's brokerage total
+        else:
+            self.skipped += 1
+
+    def apply_member_transaction(self, row: Sequence[Any]) -> None:
+        """Applies a (transaction_date, type, amount, units_transacted) row; units are signed."""
+        _, tx_type, amount, units = row
+        if tx_type == MemberTransactionType.DEPOSIT:
+            self.bank_cash += amount
+        elif tx_type == MemberTransactionType.WITHDRAWAL:
+            self.bank_cash -= amount
+        self.total_units += units or ZERO
+
+
+def replay_nav_series(
+    club_id: uuid.UUID,
+    transactions: Sequence[Sequence[Any]],
+    member_transactions: Sequence[Sequence[Any]],
+    price_rows: Iterable[Sequence[Any]],
+    valuation_days: Sequence[date],
+    *,
+    options: Optional[OptionTerms] = None,
+    seed_prices: Optional[Dict[uuid.UUID, Decimal]] = None
+) -> Tuple[List[Dict[str, Any]], LedgerReplay]:
+    """
+    Values a club on each of the ascending `valuation_days` from its ledger rows
+    (as returned by the crud ledger queries, oldest first) and (price_date,
+    asset_id, close_price) rows ordered by date. Events and prices dated on a
+    valuation day count for it; `seed_prices` are the closes known before the
+    first price row. Returns the UnitValueHistory rows and the final state.
+    """
+    replay = LedgerReplay(options)
+    for asset_id, price in (seed_prices or {}).items():
+        replay.set_price(asset_id, price)
+
+    events = heapq.merge(
+        ((row, replay.apply_transaction) for row in transactions),
+        ((row, replay.apply_member_transaction) for row in member_transactions),
+        key=lambda event: event[0][0]
+    )
+    next_event = next(events, None)
+    prices = iter(price_rows)
+    next_price = next(prices, None)
+
+    rows = []
+    for day in valuation_days:
+        while next_event is not None and _utc_day(next_event[0][0]) <= day:
+            row, apply = next_event
+            apply(row)
+            next_event = next(events, None)
+        while next_price is not None and next_price[0] <= day:
+            replay.set_price(next_price[1], next_price[2])
+            next_price = next(prices, None)
+        replay.unpriced.update(replay.awaiting_price)
+        rows.append(build_nav_row(club_id, day, replay.total_value, replay.total_units))
+    return rows, replay
+
+
+async def backfill_club_nav(
+    db: AsyncSession,
+    *,
+    club_id: uuid.UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    replace: bool = False
+) -> Dict[str, Any]:
+    """
+    Rebuilds a club's NAV for every weekday from `start_date` (default: its first
+    ledger date) to `end_date` (default: yesterday) and stores it. Events before
+    `start_date` still count towards the state. Does not commit.
+    Returns a summary dict.
+    """
+    end_date = end_date or date.today() - timedelta(days=1)
+    before = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    transactions = await crud_transaction.get_club_ledger_rows(db, club_id=club_id, before=before)
+    member_transactions = await crud_member_tx.get_club_member_ledger_rows(db, club_id=club_id, before=before)
+    summary = {
+        "club_id": club_id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": 0,
+        "rows_written": 0,
+        "transactions": len(transactions),
+        "member_transactions": len(member_transactions),
+        "skipped_transactions": 0,
+        "unpriced_assets": 0
+    }
+    if not transactions and not member_transactions:
+        log.info(f"NAV backfill for club {club_id}: no ledger entries up to {end_date}.")
+        return summary
+    if start_date is None:
+        start_date = min(_utc_day(rows[0][0]) for rows in (transactions, member_transactions) if rows)
+        summary["start_date"] = start_date
+
+    # Traded assets, and the underlyings options are valued from
+    assets = await crud_asset.get_assets_by_ids(db=db, asset_ids=list({row[2] for row in transactions if row[2] is not None}))
+    options: OptionTerms = {
+        asset.id: (asset.underlying_asset_id, float(asset.strike_price), asset.option_type == OptionType.CALL)
+        for asset in assets.values()
+        if asset.asset_type == AssetType.OPTION and asset.underlying_asset_id and asset.strike_price is not None and asset.option_type
+    }
+    priced_ids = [asset.id for asset in assets.values() if asset.asset_type == AssetType.STOCK]
+    priced_ids += [underlying_id for underlying_id, _, _ in options.values()]
+
+    seeds = await crud_asset_price.get_latest_prices_on_or_before(db, asset_ids=priced_ids, on_date=start_date - timedelta(days=1))
+    price_rows = await crud_asset_price.get_close_price_rows(db, asset_ids=priced_ids, start_date=start_date, end_date=end_date)
+
+    days = _weekdays(start_date, end_date)
+    rows, replay = replay_nav_series(
+        club_id, transactions, member_transactions, price_rows, days,
+        options=options, seed_prices={asset_id: row.close_price for asset_id, row in seeds.items()}
+    )
+    written = await crud_unit_value.bulk_insert_unit_value_histories(db, uvh_rows=rows, replace=replace)
+    summary.update(
+        days=len(days),
+        rows_written=len(written),
+        skipped_transactions=replay.skipped,
+        unpriced_assets=len(replay.unpriced)
+    )
+    if replay.skipped:
+        log.warning(f"NAV backfill for club {club_id}: {replay.skipped} transaction(s) of types without a replayable effect were ignored.")
+    log.info(
+        f"NAV backfill for club {club_id} {start_date}..{end_date}: {len(written)} of {len(days)} day(s) stored from "
+        f"{len(transactions)} transaction(s), {len(member_transactions)} member transaction(s) and {len(price_rows)} price(s)."
+    )
+    return summary
+
+
+async def backfill_nav(
+    *,
+    club_ids: Optional[Iterable[uuid.UUID]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    replace: bool = False,
+    session_factory: Optional[Callable] = None
+) -> List[Dict[str, Any]]:
+    """
+    Runs backfill_club_nav for `club_ids` (default: every club), one session and
+    commit per club so a failing club does not lose the others. A failed club's
+    summary has an 'error'.
+    """
+    session_factory = session_factory or db_session.SessionFactory
+    if club_ids is None:
+        async with session_factory() as db:
+            club_ids = await crud_club.get_club_ids(db)
+
+    summaries = []
+    for club_id in dict.fromkeys(club_ids):
+        try:
+            async with session_factory() as db:
+                summary = await backfill_club_nav(db, club_id=club_id, start_date=start_date, end_date=end_date, replace=replace)
+                await db.commit()
+            summary["error"] = None
+        except Exception as e:
+            log.exception(f"NAV backfill for club {club_id} failed: {e}")
+            summary = {"club_id": club_id, "error": str(e)}
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,262 @@
+# backend/services/nav_batch_service.py
+
+"""
+NAV for every club in one run (nightly job: scripts/run_nav_batch.py, or
+POST /admin/nav-runs).
+
+- Each club's valuation state (crud_club.get_club_valuation_state) is loaded
+  concurrently, at most NAV_BATCH_MAX_CONCURRENCY at a time, each in its own
+  session, so one club's failure does not stop the others.
+- The union of held assets is priced once through
+  accounting_service.get_market_price_quotes, however many clubs hold an asset.
+- All UnitValueHistory rows are written with multi-row INSERT ... ON CONFLICT:
+  NAV already stored for the date is kept, or overwritten with `replace`.
+- Progress and errors are recorded per club in the run dict, which is saved
+  to the nav_runs table when the run starts, after the clubs are loaded and
+  when it ends, so GET /admin/nav-runs/{run_id} works on any worker and after
+  a restart. Runs still in the background at shutdown are stopped and saved
+  as failed; a run whose worker died without shutting down stays 'running'.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from backend.core import session as db_session
+from backend.crud import club as crud_club
+from backend.crud import nav_run as crud_nav_run
+from backend.crud import unit_value_history as crud_unit_value
+from backend.schemas.market_data import MarketPriceStatus
+from backend.services import accounting_service
+
+log = logging.getLogger(__name__)
+
+# --- Batch NAV Configuration ---
+# Clubs whose valuation state is loaded at the same time (one session each)
+NAV_BATCH_MAX_CONCURRENCY = int(os.getenv("NAV_BATCH_MAX_CONCURRENCY", "8"))
+
+# Per-club statuses
+CLUB_PENDING = "pending"
+CLUB_LOADED = "loaded"
+CLUB_STORED = "stored"
+CLUB_EXISTS = "exists" # NAV for the date was already stored and kept
+CLUB_FAILED = "failed"
+
+# Quotes valued at 0 (as in calculate_and_store_nav) and reported per club
+UNPRICED_STATUSES = (MarketPriceStatus.MISSING, MarketPriceStatus.RATE_LIMITED)
+
+# Runs started in the background by the admin endpoint (referenced so they are not collected)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+# Per-club amounts, stored as strings in nav_runs.clubs
+CLUB_AMOUNTS = ("total_club_value", "unit_value")
+
+
+def new_nav_run(valuation_date: date, replace: bool = False) -> Dict[str, Any]:
+    """A pending run; run_nav_batch fills it in as it goes."""
+    run = {
+        "run_id": str(uuid.uuid4()),
+        "valuation_date": valuation_date,
+        "replace": replace,
+        "status": "pending",
+        "error": None,
+        "started_at": None,
+        "finished_at": None,
+        "clubs_total": 0,
+        "clubs_done": 0,
+        "stored": 0,
+        "exists": 0,
+        "failed": 0,
+        "assets_priced": 0,
+        "clubs": {}
+    }
+    return run
+
+
+def _run_row(run: Dict[str, Any]) -> Dict[str, Any]:
+    clubs = {
+        club_id: {key: (str(value) if key in CLUB_AMOUNTS and value is not None else value) for key, value in result.items()}
+        for club_id, result in run["clubs"].items()
+    }
+    return {**run, "run_id": uuid.UUID(run["run_id"]), "clubs": clubs}
+
+
+async def _save_run(run: Dict[str, Any], session_factory: Callable) -> None:
+    """Writes the run to nav_runs in its own session and commits."""
+    async with session_factory() as db:
+        await crud_nav_run.save_nav_run(db, run_data=_run_row(run))
+        await db.commit()
+
+
+async def get_nav_run(run_id: str, *, session_factory: Optional[Callable] = None) -> Optional[Dict[str, Any]]:
+    """The stored run (as returned by run_nav_batch), or None if `run_id` is unknown."""
+    try:
+        run_uuid = uuid.UUID(run_id)
+    except ValueError:
+        return None
+    async with (session_factory or db_session.SessionFactory)() as db:
+        row = await crud_nav_run.get_nav_run(db, run_id=run_uuid)
+    if row is None:
+        return None
+    run = {key: getattr(row, key) for key in new_nav_run(row.valuation_date)}
+    run["run_id"] = str(row.run_id)
+    run["clubs"] = {
+        club_id: {key: (Decimal(value) if key in CLUB_AMOUNTS and value is not None else value) for key, value in result.items()}
+        for club_id, result in (row.clubs or {}).items()
+    }
+    return run
+
+
+def _finish_club(run: Dict[str, Any], club_id: uuid.UUID, club_status: str, error: Optional[str] = None, **values: Any) -> None:
+    result = run["clubs"][str(club_id)]
+    result.update(status=club_status, error=error, **values)
+    run["clubs_done"] += 1
+    run[club_status] += 1
+    if error:
+        log.warning(f"NAV run {run['run_id']}: club {club_id} failed: {error}")
+
+
+def _fail_run(run: Dict[str, Any], error: str) -> None:
+    run.update(status="failed", error=error)
+    for club_id, result in run["clubs"].items():
+        if result["status"] in (CLUB_PENDING, CLUB_LOADED):
+            _finish_club(run, club_id, CLUB_FAILED, f"Run failed: {error}")
+
+
+async def run_nav_batch(
+    valuation_date: date,
+    *,
+    club_ids: Optional[Iterable[uuid.UUID]] = None,
+    replace: bool = False,
+    max_concurrency: int = NAV_BATCH_MAX_CONCURRENCY,
+    session_factory: Optional[Callable] = None,
+    run: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Calculates and stores NAV for `club_ids` (default: every club) on
+    `valuation_date`. Per-club failures are recorded in the run and do not stop
+    it; the run itself only fails if prices or the final write fail.
+    The run is saved to nav_runs as it progresses.
+    Returns the run dict (see new_nav_run).
+    """
+    session_factory = session_factory or db_session.SessionFactory
+    run = run or new_nav_run(valuation_date, replace)
+    run.update(status="running", started_at=datetime.now(timezone.utc))
+
+    async def save_progress() -> None:
+        # Progress is best effort: the NAV itself is stored either way
+        try:
+            await _save_run(run, session_factory)
+        except Exception as e:
+            log.exception(f"NAV run {run['run_id']}: could not save progress: {e}")
+
+    try:
+        if club_ids is None:
+            async with session_factory() as db:
+                club_ids = await crud_club.get_club_ids(db)
+        club_ids = list(dict.fromkeys(club_ids))
+        run["clubs"] = {
+            str(club_id): {"status": CLUB_PENDING, "error": None, "total_club_value": None, "unit_value": None, "unpriced_assets": 0}
+            for club_id in club_ids
+        }
+        run["clubs_total"] = len(club_ids)
+        log.info(f"NAV run {run['run_id']} for {valuation_date}: {len(club_ids)} club(s)")
+        await save_progress()
+
+        # 1. Valuation states, concurrently
+        states: Dict[uuid.UUID, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def load_state(club_id: uuid.UUID) -> None:
+            async with semaphore:
+                try:
+                    async with session_factory() as db:
+                        state = await crud_club.get_club_valuation_state(db=db, club_id=club_id)
+                except Exception as e:
+                    _finish_club(run, club_id, CLUB_FAILED, f"Could not load club: {e}")
+                    return
+            if state is None:
+                _finish_club(run, club_id, CLUB_FAILED, "Club not found.")
+                return
+            states[club_id] = state
+            run["clubs"][str(club_id)]["status"] = CLUB_LOADED
+
+        await asyncio.gather(*(load_state(club_id) for club_id in club_ids))
+        await save_progress()
+
+        async with session_factory() as db:
+            # 2. Each held asset priced once
+            asset_ids = {asset_id for state in states.values() for asset_id, _ in state["positions"]}
+            quotes = await accounting_service.get_market_price_quotes(db, list(asset_ids), valuation_date) if asset_ids else {}
+            prices = {asset_id: quote.price for asset_id, quote in quotes.items()}
+            unpriced = {asset_id for asset_id, quote in quotes.items() if quote.status in UNPRICED_STATUSES}
+            run["assets_priced"] = len(prices) - len(unpriced)
+
+            # 3. Values
+            rows = []
+            for club_id in club_ids:
+                state = states.get(club_id)
+                if state is None:
+                    continue
+                try:
+                    rows.append(accounting_service.compute_nav(club_id, state, prices, valuation_date))
+                except Exception as e:
+                    _finish_club(run, club_id, CLUB_FAILED, f"Could not value club: {e}")
+                    states.pop(club_id)
+
+            # 4. One bulk write, committed with the prices the read-through store fetched
+            written = set(await crud_unit_value.bulk_insert_unit_value_histories(db, uvh_rows=rows, replace=replace))
+            await db.commit()
+
+        for row in rows:
+            club_id = row["club_id"]
+            _finish_club(
+                run, club_id,
+                CLUB_STORED if (club_id, valuation_date) in written else CLUB_EXISTS,
+                total_club_value=row["total_club_value"],
+                unit_value=row["unit_value"],
+                unpriced_assets=sum(1 for asset_id, _ in states[club_id]["positions"] if asset_id in unpriced or asset_id not in prices)
+            )
+        run["status"] = "finished"
+    except asyncio.CancelledError:
+        log.warning(f"NAV run {run['run_id']} for {valuation_date} was stopped.")
+        _fail_run(run, "Stopped before it finished (worker shut down).")
+        raise
+    except Exception as e:
+        log.exception(f"NAV run {run['run_id']} for {valuation_date} failed: {e}")
+        _fail_run(run, str(e))
+    finally:
+        run["finished_at"] = datetime.now(timezone.utc)
+        await save_progress()
+    log.info(
+        f"NAV run {run['run_id']} {run['status']}: {run['stored']} stored, {run['exists']} kept, "
+        f"{run['failed']} failed of {run['clubs_total']} club(s); {run['assets_priced']} asset(s) priced"
+    )
+    return run
+
+
+async def start_nav_batch(valuation_date: date, *, club_ids: Optional[Iterable[uuid.UUID]] = None, replace: bool = False) -> Dict[str, Any]:
+    """
+    Saves a pending run, starts run_nav_batch for it in the background and
+    returns the run dict; poll it with get_nav_run.
+    """
+    run = new_nav_run(valuation_date, replace)
+    await _save_run(run, db_session.SessionFactory)
+    task = asyncio.create_task(run_nav_batch(valuation_date, club_ids=club_ids, replace=replace, run=run), name=f"nav-run-{run['run_id']}")
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return run
+
+
+async def stop_nav_batches() -> None:
+    """Stops runs still in the background (app shutdown); each is saved as failed."""
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,213 @@
+# backend/services/option_valuation_service.py
+
+"""
+Values OPTION assets for NAV and portfolio reports.
+
+- All option assets of a valuation are priced in one batch (core.option_pricing)
+  from their underlying's price (fetched with the stock legs), strike and expiration.
+- The model is Black-Scholes or Black-76 (OPTION_PRICING_MODEL). Volatility comes
+  from a pluggable VolatilitySource: a constant, or historical volatility computed
+  from the asset_prices store (OPTION_VOLATILITY_SOURCE).
+- Contracts without a usable volatility, expired contracts and contracts whose
+  underlying price is known but cannot be modelled are valued at intrinsic value.
+- Prices are per contract (per-share value x OPTION_CONTRACT_MULTIPLIER), the same
+  unit as option trade prices and position quantities.
+"""
+
+import logging
+import math
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import option_pricing
+from backend.crud import asset_price as crud_asset_price
+from backend.models import Asset
+from backend.models.enums import OptionType
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+
+log = logging.getLogger(__name__)
+
+# --- Option Valuation Configuration ---
+# "black_scholes" (spot + dividend yield) or "black76" (forward)
+OPTION_PRICING_MODEL = os.getenv("OPTION_PRICING_MODEL", "black_scholes").lower()
+OPTION_RISK_FREE_RATE = float(os.getenv("OPTION_RISK_FREE_RATE", "0.045"))
+OPTION_DIVIDEND_YIELD = float(os.getenv("OPTION_DIVIDEND_YIELD", "0.0"))
+# "historical" (from stored closes, constant as fallback) or "constant"
+OPTION_VOLATILITY_SOURCE = os.getenv("OPTION_VOLATILITY_SOURCE", "historical").lower()
+OPTION_DEFAULT_VOLATILITY = float(os.getenv("OPTION_DEFAULT_VOLATILITY", "0.30"))
+OPTION_VOLATILITY_LOOKBACK_DAYS = int(os.getenv("OPTION_VOLATILITY_LOOKBACK_DAYS", "90"))
+# Fewer daily returns than this and historical volatility is not trusted
+OPTION_VOLATILITY_MIN_RETURNS = 20
+OPTION_CONTRACT_MULTIPLIER = Decimal(os.getenv("OPTION_CONTRACT_MULTIPLIER", "100"))
+TRADING_DAYS_PER_YEAR = 252
+DAYS_PER_YEAR = 365.0
+
+
+# --- Volatility Sources ---
+
+class VolatilitySource(ABC):
+    """Provides annualized volatilities for underlying assets."""
+
+    @abstractmethod
+    async def get_volatilities(
+        self,
+        db: AsyncSession,
+        underlying_asset_ids: Sequence[uuid.UUID],
+        valuation_date: date
+    ) -> Dict[uuid.UUID, Optional[float]]:
+        """Returns a volatility (or None when unknown) per underlying asset ID."""
+        pass
+
+
+class ConstantVolatilitySource(VolatilitySource):
+    """The same volatility for every underlying."""
+
+    def __init__(self, volatility: float = OPTION_DEFAULT_VOLATILITY):
+        self.volatility = volatility
+
+    async def get_volatilities(self, db, underlying_asset_ids, valuation_date):
+        return {asset_id: self.volatility for asset_id in underlying_asset_ids}
+
+
+def historical_volatility(closes: Sequence[float]) -> Optional[float]:
+    """Annualized standard deviation of daily log returns; None with too few returns."""
+    returns = [
+        math.log(current / previous)
+        for previous, current in zip(closes, closes[1:])
+        if previous > 0 and current > 0
+    ]
+    if len(returns) < OPTION_VOLATILITY_MIN_RETURNS:
+        return None
+    mean = sum(returns) / len(returns)
+    variance = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+    return math.sqrt(variance * TRADING_DAYS_PER_YEAR)
+
+
+class HistoricalVolatilitySource(VolatilitySource):
+    """
+    Historical volatility from the asset_prices store over `lookback_days`, loaded
+    for all underlyings in one query. Underlyings without enough history get
+    `fallback_volatility` (None = value those options at intrinsic).
+    """
+
+    def __init__(
+        self,
+        lookback_days: int = OPTION_VOLATILITY_LOOKBACK_DAYS,
+        fallback_volatility: Optional[float] = OPTION_DEFAULT_VOLATILITY
+    ):
+        self.lookback_days = lookback_days
+        self.fallback_volatility = fallback_volatility
+
+    async def get_volatilities(self, db, underlying_asset_ids, valuation_date):
+        rows = await crud_asset_price.get_prices_for_period(
+            db=db,
+            asset_ids=underlying_asset_ids,
+            start_date=valuation_date - timedelta(days=self.lookback_days),
+            end_date=valuation_date
+        )
+        closes: Dict[uuid.UUID, List[float]] = defaultdict(list)
+        for row in rows: # Ordered by date
+            closes[row.asset_id].append(float(row.close_price))
+        volatilities: Dict[uuid.UUID, Optional[float]] = {}
+        for asset_id in underlying_asset_ids:
+            volatility = historical_volatility(closes.get(asset_id, []))
+            volatilities[asset_id] = volatility if volatility else self.fallback_volatility
+        return volatilities
+
+
+def build_volatility_source() -> VolatilitySource:
+    """Volatility source selected by OPTION_VOLATILITY_SOURCE."""
+    if OPTION_VOLATILITY_SOURCE == "constant":
+        return ConstantVolatilitySource()
+    if OPTION_VOLATILITY_SOURCE != "historical":
+        log.warning(f"Unknown OPTION_VOLATILITY_SOURCE '{OPTION_VOLATILITY_SOURCE}'; using historical volatility.")
+    return HistoricalVolatilitySource()
+
+
+# --- Valuation ---
+
+def _per_contract(per_share: float) -> Decimal:
+    return (Decimal(str(per_share)) * OPTION_CONTRACT_MULTIPLIER).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+
+
+async def value_option_assets(
+    db: AsyncSession,
+    option_assets: Sequence[Asset],
+    underlying_quotes: Dict[uuid.UUID, MarketPrice],
+    valuation_date: date,
+    volatility_source: Optional[VolatilitySource] = None
+) -> Dict[uuid.UUID, MarketPrice]:
+    """
+    Prices OPTION assets in one batch.
+
+    `underlying_quotes` holds the prices of the underlying stocks keyed by asset ID.
+    An option whose underlying has no usable price is reported as missing; otherwise
+    it inherits the underlying quote's status and as_of date. `source` is the model
+    name, or "intrinsic" when the fallback was used.
+    """
+    quotes: Dict[uuid.UUID, MarketPrice] = {}
+    priceable: List[Asset] = []
+    for asset in option_assets:
+        underlying = underlying_quotes.get(asset.underlying_asset_id)
+        if asset.strike_price is None or asset.expiration_date is None or asset.option_type is None:
+            log.warning(f"Option asset {asset.id} ({asset.symbol}) is missing contract details. Cannot value it.")
+            quotes[asset.id] = MarketPrice(asset_id=asset.id, symbol=asset.symbol, status=MarketPriceStatus.MISSING)
+        elif underlying is None or underlying.status not in (MarketPriceStatus.OK, MarketPriceStatus.STALE):
+            log.warning(f"No usable underlying price for option {asset.id} ({asset.symbol}). Cannot value it.")
+            quotes[asset.id] = MarketPrice(
+                asset_id=asset.id, symbol=asset.symbol,
+                status=underlying.status if underlying else MarketPriceStatus.MISSING
+            )
+        else:
+            priceable.append(asset)
+    if not priceable:
+        return quotes
+
+    volatility_source = volatility_source or build_volatility_source()
+    underlying_ids = list({asset.underlying_asset_id for asset in priceable})
+    volatilities = await volatility_source.get_volatilities(db, underlying_ids, valuation_date)
+
+    spots = [float(underlying_quotes[asset.underlying_asset_id].price) for asset in priceable]
+    strikes = [float(asset.strike_price) for asset in priceable]
+    years = [(asset.expiration_date - valuation_date).days / DAYS_PER_YEAR for asset in priceable]
+    vols = [volatilities.get(asset.underlying_asset_id) for asset in priceable]
+    is_call = [asset.option_type == OptionType.CALL for asset in priceable]
+    rates = [OPTION_RISK_FREE_RATE] * len(priceable)
+
+    if OPTION_PRICING_MODEL == "black76":
+        forwards = [
+            s * math.exp((OPTION_RISK_FREE_RATE - OPTION_DIVIDEND_YIELD) * max(t, 0.0))
+            for s, t in zip(spots, years)
+        ]
+        per_share = option_pricing.black76_prices(forwards, strikes, years, vols, rates, is_call)
+        model_name = "black76"
+    else:
+        per_share = option_pricing.black_scholes_prices(
+            spots, strikes, years, vols, rates, is_call,
+            dividend_yields=[OPTION_DIVIDEND_YIELD] * len(priceable)
+        )
+        model_name = "black_scholes"
+    modelled = option_pricing.model_priced_mask(spots, strikes, years, vols)
+    intrinsic = option_pricing.intrinsic_values(spots, strikes, is_call)
+
+    for i, asset in enumerate(priceable):
+        underlying = underlying_quotes[asset.underlying_asset_id]
+        # Black-76 discounts its fallback; an expired or unmodelled contract is worth its plain intrinsic value
+        value = per_share[i] if modelled[i] else intrinsic[i]
+        quotes[asset.id] = MarketPrice(
+            asset_id=asset.id,
+            symbol=asset.symbol,
+            price=_per_contract(value),
+            status=underlying.status,
+            as_of=underlying.as_of,
+            source=model_name if modelled[i] else "intrinsic"
+        )
+    log.info(f"Valued {len(priceable)} option contract(s) with {model_name}; {modelled.count(False)} at intrinsic value.")
+    return quotes
@@ -0,0 +1,309 @@
+# backend/services/portfolio_stream_service.py
+
+"""
+Live club portfolio values pushed over Server-Sent Events.
+
+- A PortfolioStreamHub (one per process, created in main.lifespan) runs one
+  quote poller per set of held assets. Clubs holding the same assets share a
+  poller, and all members watching a club share one channel, so 200 viewers of
+  a club cost one quote refresh per poll instead of 200 portfolio reports.
+- Each poll reloads the watched clubs' holdings and cash (one query per club),
+  fetches quotes once through accounting_service.get_market_price_quotes (which
+  reads through the asset_prices store) and revalues each club once. A frame is
+  serialized once per club and only pushed when the values changed.
+- Every subscriber has a small bounded queue. A slow client whose queue is full
+  loses its oldest frame instead of blocking the poller: only the latest
+  portfolio value matters. Idle connections get heartbeat comments.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import session as db_session
+from backend.models import Asset, Club, Fund, Position
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+from backend.services import accounting_service
+
+log = logging.getLogger(__name__)
+
+# --- Portfolio Stream Configuration ---
+PORTFOLIO_STREAM_POLL_SECONDS = float(os.getenv("PORTFOLIO_STREAM_POLL_SECONDS", "15"))
+PORTFOLIO_STREAM_HEARTBEAT_SECONDS = float(os.getenv("PORTFOLIO_STREAM_HEARTBEAT_SECONDS", "15"))
+# Frames buffered per client; when full, the oldest frame is dropped
+PORTFOLIO_STREAM_QUEUE_SIZE = int(os.getenv("PORTFOLIO_STREAM_QUEUE_SIZE", "4"))
+# Client reconnect delay sent in the SSE "retry" field
+PORTFOLIO_STREAM_RETRY_MS = int(os.getenv("PORTFOLIO_STREAM_RETRY_MS", "5000"))
+
+CENT = Decimal("0.01")
+
+
+# --- Holdings and Valuation ---
+
+async def load_club_holdings(db: AsyncSession, club_id: uuid.UUID) -> Dict[str, Any]:
+    """
+    Cash and open positions of a club, for valuation without the full report query.
+    Returns {"cash": Decimal, "positions": [{"position_id", "fund_id", "asset_id", "symbol", "name", "asset_type", "quantity"}]}.
+    """
+    cash_result = await db.execute(
+        select(Club.bank_account_balance, func.coalesce(func.sum(Fund.brokerage_cash_balance), 0))
+        .outerjoin(Fund, Fund.club_id == Club.id)
+        .where(Club.id == club_id)
+        .group_by(Club.id, Club.bank_account_balance)
+    )
+    cash_row = cash_result.one_or_none()
+    if cash_row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club {club_id} not found.")
+    positions_result = await db.execute(
+        select(Position.id, Position.fund_id, Position.asset_id, Asset.symbol, Asset.name, Asset.asset_type, Position.quantity)
+        .join(Fund, Fund.id == Position.fund_id)
+        .join(Asset, Asset.id == Position.asset_id)
+        .where(Fund.club_id == club_id, Position.quantity != 0)
+        .order_by(Asset.symbol, Position.id)
+    )
+    return {
+        "cash": Decimal(cash_row[0]) + Decimal(cash_row[1]),
+        "positions": [
+            {"position_id": position_id, "fund_id": fund_id, "asset_id": asset_id, "symbol": symbol, "name": name, "asset_type": asset_type, "quantity": quantity}
+            for position_id, fund_id, asset_id, symbol, name, asset_type, quantity in positions_result.all()
+        ]
+    }
+
+
+def value_holdings(
+    club_id: uuid.UUID,
+    holdings: Dict[str, Any],
+    quotes: Dict[uuid.UUID, MarketPrice],
+    valuation_date: date
+) -> Dict[str, Any]:
+    """Portfolio totals and per-position market values; positions without a usable price are valued at 0."""
+    positions = []
+    total_market_value = Decimal("0.0")
+    for position in holdings["positions"]:
+        quote = quotes.get(position["asset_id"])
+        price = quote.price if quote and quote.price is not None else None
+        market_value = position["quantity"] * price if price is not None else Decimal("0.0")
+        total_market_value += market_value
+        positions.append({
+            "position_id": str(position["position_id"]),
+            "fund_id": str(position["fund_id"]),
+            "asset_id": str(position["asset_id"]),
+            "symbol": position["symbol"],
+            "quantity": str(position["quantity"]),
+            "price": str(price) if price is not None else None,
+            "market_value": str(market_value.quantize(CENT, rounding=ROUND_HALF_UP)),
+            "status": quote.status.value if quote else MarketPriceStatus.MISSING.value,
+            "as_of": quote.as_of.isoformat() if quote and quote.as_of else None
+        })
+    total_market_value = total_market_value.quantize(CENT, rounding=ROUND_HALF_UP)
+    total_cash_value = holdings["cash"].quantize(CENT, rounding=ROUND_HALF_UP)
+    return {
+        "club_id": str(club_id),
+        "valuation_date": valuation_date.isoformat(),
+        "total_market_value": str(total_market_value),
+        "total_cash_value": str(total_cash_value),
+        "total_value": str(total_market_value + total_cash_value),
+        "positions": positions
+    }
+
+
+# --- Fan-out ---
+
+class PortfolioSubscriber:
+    """One connected client: a bounded queue of serialized frames."""
+
+    def __init__(self, club_id: uuid.UUID, queue_size: int = PORTFOLIO_STREAM_QUEUE_SIZE):
+        self.club_id = club_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+        self.dropped = 0
+
+    def offer(self, frame: str) -> None:
+        """Queues a frame without blocking; a full queue loses its oldest frame."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+
+class _ClubChannel:
+    """Subscribers watching one club, and the club's latest holdings and frame."""
+
+    def __init__(self, club_id: uuid.UUID, holdings: Dict[str, Any]):
+        self.club_id = club_id
+        self.holdings = holdings
+        self.subscribers: Set[PortfolioSubscriber] = set()
+        self.last_values: Optional[Dict[str, Any]] = None
+        self.last_frame: Optional[str] = None
+
+    @property
+    def asset_ids(self) -> FrozenSet[uuid.UUID]:
+        return frozenset(position["asset_id"] for position in self.holdings["positions"])
+
+    def publish(self, quotes: Dict[uuid.UUID, MarketPrice], valuation_date: date) -> bool:
+        """Revalues the club once and pushes the frame to every subscriber if anything changed."""
+        values = value_holdings(self.club_id, self.holdings, quotes, valuation_date)
+        if values == self.last_values:
+            return False
+        self.last_values = values
+        self.last_frame = json.dumps({**values, "sent_at": datetime.now(timezone.utc).isoformat()})
+        for subscriber in self.subscribers:
+            subscriber.offer(self.last_frame)
+        return True
+
+
+class _QuotePoller:
+    """Polls quotes for one asset set and revalues every club channel holding exactly that set."""
+
+    def __init__(self, hub: "PortfolioStreamHub", asset_ids: FrozenSet[uuid.UUID]):
+        self.hub = hub
+        self.asset_ids = asset_ids
+        self.channels: Dict[uuid.UUID, _ClubChannel] = {}
+        self.quotes: Dict[uuid.UUID, MarketPrice] = {}
+        self.valuation_date: Optional[date] = None
+        self.polls = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run(), name=f"portfolio-poller-{len(self.asset_ids)}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Portfolio stream poll failed for {len(self.channels)} club(s): {e}")
+            await asyncio.sleep(self.hub.poll_seconds)
+
+    async def poll_once(self) -> None:
+        channels = list(self.channels.values())
+        valuation_date = date.today()
+        async with self.hub.session_factory() as db:
+            for channel in channels:
+                channel.holdings = await load_club_holdings(db, channel.club_id)
+            quotes = await accounting_service.get_market_price_quotes(db, list(self.asset_ids), valuation_date) if self.asset_ids else {}
+            await db.commit() # Keeps prices fetched by the read-through store
+        self.polls += 1
+        self.quotes, self.valuation_date = quotes, valuation_date
+        for channel in channels:
+            if channel.asset_ids != self.asset_ids:
+                self.hub._rehome(channel) # Holdings changed: move to the poller of the new asset set
+            elif self.channels.get(channel.club_id) is channel:
+                channel.publish(quotes, valuation_date)
+
+
+class PortfolioStreamHub:
+    """Shares quote pollers and per-club channels across all SSE subscribers of this process."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        poll_seconds: float = PORTFOLIO_STREAM_POLL_SECONDS,
+        queue_size: int = PORTFOLIO_STREAM_QUEUE_SIZE
+    ):
+        self._session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self._channels: Dict[uuid.UUID, _ClubChannel] = {}
+        self._pollers: Dict[FrozenSet[uuid.UUID], _QuotePoller] = {}
+
+    @property
+    def session_factory(self) -> Callable[[], Any]:
+        factory = self._session_factory or db_session.SessionFactory
+        if factory is None:
+            raise RuntimeError("Database is not initialized.")
+        return factory
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pollers": len(self._pollers),
+            "channels": len(self._channels),
+            "subscribers": sum(len(channel.subscribers) for channel in self._channels.values())
+        }
+
+    async def subscribe(self, db: AsyncSession, club_id: uuid.UUID) -> PortfolioSubscriber:
+        """Registers a client for a club's frames; it immediately gets the latest frame if there is one."""
+        subscriber = PortfolioSubscriber(club_id, self.queue_size)
+        channel = self._channels.get(club_id)
+        if channel is None:
+            channel = _ClubChannel(club_id, await load_club_holdings(db, club_id))
+            self._channels[club_id] = channel
+            self._attach(channel)
+        channel.subscribers.add(subscriber)
+        if channel.last_frame is not None:
+            subscriber.offer(channel.last_frame)
+        log.debug(f"Portfolio stream subscriber added for club {club_id}: {self.stats()}")
+        return subscriber
+
+    def unsubscribe(self, subscriber: PortfolioSubscriber) -> None:
+        channel = self._channels.get(subscriber.club_id)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            del self._channels[channel.club_id]
+            self._detach(channel)
+        log.debug(f"Portfolio stream subscriber removed for club {subscriber.club_id}: {self.stats()}")
+
+    def _attach(self, channel: _ClubChannel) -> None:
+        poller = self._pollers.get(channel.asset_ids)
+        if poller is None:
+            poller = self._pollers[channel.asset_ids] = _QuotePoller(self, channel.asset_ids)
+            poller.channels[channel.club_id] = channel
+            poller.start() # Polls right away, then every poll_seconds
+            return
+        poller.channels[channel.club_id] = channel
+        if poller.valuation_date is not None:
+            channel.publish(poller.quotes, poller.valuation_date)
+
+    def _detach(self, channel: _ClubChannel) -> None:
+        for asset_ids, poller in list(self._pollers.items()):
+            if poller.channels.get(channel.club_id) is channel:
+                del poller.channels[channel.club_id]
+                if not poller.channels:
+                    del self._pollers[asset_ids]
+                    if poller.task:
+                        poller.task.cancel()
+
+    def _rehome(self, channel: _ClubChannel) -> None:
+        self._detach(channel)
+        self._attach(channel)
+
+    async def aclose(self) -> None:
+        """Stops every poller (called on application shutdown)."""
+        tasks = [poller.task for poller in self._pollers.values() if poller.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pollers.clear()
+        self._channels.clear()
+
+
+async def sse_events(
+    hub: PortfolioStreamHub,
+    subscriber: PortfolioSubscriber,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat_seconds: float = PORTFOLIO_STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """SSE frames for one subscriber: portfolio events, heartbeat comments while idle. Unsubscribes on exit."""
+    try:
+        yield f"retry: {PORTFOLIO_STREAM_RETRY_MS}\n\n"
+        while not await is_disconnected():
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: portfolio\ndata: {frame}\n\n"
+    finally:
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,209 @@
+# backend/services/price_backfill_service.py
+
+"""
+Backfills the local daily price store (asset_prices) for STOCK assets.
+
+- Targets every STOCK asset held in a position or referenced by a transaction,
+  from its first transaction date up to yesterday.
+- Only the missing (asset, date) ranges are fetched: ranges shared by several
+  symbols go out as one bulk historical request, and several ranges are fetched
+  concurrently.
+- Each fetched range is written with batched multi-row inserts and committed on
+  its own. An interrupted run therefore resumes where it stopped: the next run
+  only finds the gaps that are still missing.
+- Weekdays the provider returned no price for (exchange holidays, halts) are
+  recorded in empty_price_dates once they are PRICE_BACKFILL_SETTLE_DAYS old,
+  so they are not requested again; more recent ones are retried, as the
+  provider may still publish them.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import asset as crud_asset
+from backend.crud import asset_price as crud_asset_price
+from backend.core.price_series import PriceSeries
+from backend.services.market_data_interface import MarketDataProviderError, MarketDataServiceInterface
+
+log = logging.getLogger(__name__)
+
+# --- Backfill Configuration ---
+# Date ranges fetched from the provider at the same time
+PRICE_BACKFILL_MAX_CONCURRENCY = int(os.getenv("PRICE_BACKFILL_MAX_CONCURRENCY", "4"))
+# Start date for assets that are held but have no transactions (days before the end date)
+PRICE_BACKFILL_DEFAULT_DAYS = int(os.getenv("PRICE_BACKFILL_DEFAULT_DAYS", "365"))
+# Age (days) after which a weekday without a provider price is recorded as having none
+PRICE_BACKFILL_SETTLE_DAYS = int(os.getenv("PRICE_BACKFILL_SETTLE_DAYS", "5"))
+
+
+def _weekdays(start_date: date, end_date: date) -> List[date]:
+    days = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def find_missing_ranges(known_dates: Set[date], start_date: date, end_date: date) -> List[Tuple[date, date]]:
+    """
+    Returns the (from_date, to_date) ranges of weekdays in [start_date, end_date]
+    that are not in `known_dates` (stored prices plus dates recorded as having
+    none). Weekends do not split a range.
+    """
+    weekdays = _weekdays(start_date, end_date)
+    ranges: List[Tuple[date, date]] = []
+    run_start: Optional[int] = None
+    for i, day in enumerate(weekdays + [None]):
+        missing = day is not None and day not in known_dates
+        if missing and run_start is None:
+            run_start = i
+        elif not missing and run_start is not None:
+            ranges.append((weekdays[run_start], weekdays[i - 1]))
+            run_start = None
+    return ranges
+
+
+async def find_price_gaps(
+    db: AsyncSession,
+    *,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[Tuple[date, date], Dict[str, List[uuid.UUID]]]:
+    """
+    Works out which stock prices are missing from the store.
+
+    Each asset is checked from its first transaction date (never before
+    `start_date` when given) to `end_date` (default: yesterday); dates recorded
+    as having no price are not missing. Returns the missing ranges, each mapped
+    to {symbol: [asset_id, ...]}.
+    """
+    end_date = end_date or date.today() - timedelta(days=1)
+    fallback_start = start_date or end_date - timedelta(days=PRICE_BACKFILL_DEFAULT_DAYS)
+
+    assets_in_use = await crud_asset.get_stock_assets_in_use(db)
+    asset_starts: Dict[uuid.UUID, date] = {}
+    symbols: Dict[uuid.UUID, str] = {}
+    for asset, first_transaction_date in assets_in_use:
+        asset_start = first_transaction_date.date() if first_transaction_date else fallback_start
+        if start_date:
+            asset_start = max(asset_start, start_date)
+        if asset_start <= end_date:
+            asset_starts[asset.id] = asset_start
+            symbols[asset.id] = asset.symbol.upper()
+    if not asset_starts:
+        return {}
+
+    window = {"asset_ids": list(asset_starts), "start_date": min(asset_starts.values()), "end_date": end_date}
+    stored = await crud_asset_price.get_stored_price_dates(db, **window)
+    empty = await crud_asset_price.get_empty_price_dates(db, **window)
+    gaps: Dict[Tuple[date, date], Dict[str, List[uuid.UUID]]] = defaultdict(lambda: defaultdict(list))
+    for asset_id, asset_start in asset_starts.items():
+        for missing_range in find_missing_ranges(stored[asset_id] | empty[asset_id], asset_start, end_date):
+            gaps[missing_range][symbols[asset_id]].append(asset_id)
+    return {missing_range: dict(by_symbol) for missing_range, by_symbol in gaps.items()}
+
+
+def _series_to_rows(
+    series: PriceSeries,
+    asset_ids: List[uuid.UUID],
+    from_date: date,
+    to_date: date,
+    source: str
+) -> List[Dict[str, Any]]:
+    rows = []
+    window = series.between(from_date, to_date)
+    for price_date, close in zip(window.iter_dates(), window.close):
+        close_price = Decimal(str(close))
+        for asset_id in asset_ids:
+            rows.append({"asset_id": asset_id, "price_date": price_date, "close_price": close_price, "source": source})
+    return rows
+
+
+async def backfill_missing_prices(
+    db: AsyncSession,
+    provider: MarketDataServiceInterface,
+    *,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_concurrency: int = PRICE_BACKFILL_MAX_CONCURRENCY,
+    source: str = "marketstack"
+) -> Dict[str, int]:
+    """
+    Fetches and stores every missing stock price (see find_price_gaps).
+
+    Ranges are fetched concurrently (at most `max_concurrency` at a time) with the
+    provider's bulk price series API; each completed range is inserted and
+    committed before the next one is written. A range that fails upstream is
+    logged and left for the next run. Settled weekdays the provider had no
+    price for are recorded with the range.
+
+    Returns counters: assets, ranges, ranges_failed, rows_written, empty_dates.
+    """
+    gaps = await find_price_gaps(db, start_date=start_date, end_date=end_date)
+    summary = {
+        "assets": len({asset_id for by_symbol in gaps.values() for ids in by_symbol.values() for asset_id in ids}),
+        "ranges": len(gaps),
+        "ranges_failed": 0,
+        "rows_written": 0,
+        "empty_dates": 0,
+    }
+    if not gaps:
+        log.info("Price store is complete; nothing to backfill.")
+        return summary
+    log.info(f"Backfilling {summary['ranges']} missing price range(s) for {summary['assets']} asset(s).")
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    settled_through = date.today() - timedelta(days=PRICE_BACKFILL_SETTLE_DAYS)
+
+    async def fetch_range(missing_range: Tuple[date, date], by_symbol: Dict[str, List[uuid.UUID]]):
+        from_date, to_date = missing_range
+        async with semaphore:
+            try:
+                series = await provider.get_price_series_bulk(list(by_symbol), from_date, to_date)
+            except MarketDataProviderError as e:
+                log.error(f"Could not fetch prices for {len(by_symbol)} symbol(s) {from_date}..{to_date}: {e.detail}")
+                return missing_range, by_symbol, None
+        return missing_range, by_symbol, series
+
+    tasks = [asyncio.ensure_future(fetch_range(r, by_symbol)) for r, by_symbol in gaps.items()]
+    try:
+        for done, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+            (from_date, to_date), by_symbol, series_by_symbol = await next_result
+            if series_by_symbol is None:
+                summary["ranges_failed"] += 1
+                continue
+            rows = []
+            for symbol, asset_ids in by_symbol.items():
+                series = series_by_symbol.get(symbol)
+                if series:
+                    rows.extend(_series_to_rows(series, asset_ids, from_date, to_date, source))
+            priced = {(row["asset_id"], row["price_date"]) for row in rows}
+            empty_dates = [
+                (asset_id, day)
+                for asset_ids in by_symbol.values() for asset_id in asset_ids
+                for day in _weekdays(from_date, min(to_date, settled_through))
+                if (asset_id, day) not in priced
+            ]
+            written = await crud_asset_price.bulk_insert_asset_prices(db, price_rows=rows)
+            recorded = await crud_asset_price.bulk_insert_empty_price_dates(db, empty_dates=empty_dates)
+            await db.commit() # Checkpoint: this range is done even if the run is interrupted later
+            summary["rows_written"] += written
+            summary["empty_dates"] += recorded
+            log.info(
+                f"[{done}/{summary['ranges']}] {from_date}..{to_date}: stored {written} price(s) for {len(by_symbol)} symbol(s), "
+                f"{recorded} date(s) without a price."
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+    return summary
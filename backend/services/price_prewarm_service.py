@@ -0,0 +1,109 @@
+# backend/services/price_prewarm_service.py
+
+"""
+Background pre-warming of the asset_prices store for every stock held by any club.
+
+- Started from main.lifespan. Each run loads the union of held stock assets
+  (including underlyings of held options) and refreshes their quotes with bulk
+  requests (accounting_service.refresh_stock_prices), so dashboards read warm
+  prices instead of making cold upstream calls.
+- Runs are aligned to the market session: at the open, every
+  PRICE_PREWARM_INTERVAL_SECONDS during the session, and once shortly after the
+  close to store closing prices. Weekends are skipped. A run also happens at startup.
+- Quota use is therefore one bulk refresh per interval, independent of traffic.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from backend.core import session as db_session
+from backend.crud import asset as crud_asset
+from backend.services import accounting_service
+
+log = logging.getLogger(__name__)
+
+# --- Pre-warm Configuration ---
+PRICE_PREWARM_ENABLED = os.getenv("PRICE_PREWARM_ENABLED", "true").lower() == "true"
+# Refresh interval while the market is open
+PRICE_PREWARM_INTERVAL_SECONDS = int(os.getenv("PRICE_PREWARM_INTERVAL_SECONDS", "1800"))
+# Closing prices are refreshed this long after the close, once the provider has settled them
+PRICE_PREWARM_CLOSE_DELAY_SECONDS = int(os.getenv("PRICE_PREWARM_CLOSE_DELAY_SECONDS", "300"))
+MARKET_TIMEZONE = ZoneInfo(os.getenv("MARKET_TIMEZONE", "America/New_York"))
+MARKET_OPEN_TIME = time.fromisoformat(os.getenv("MARKET_OPEN_TIME", "09:30"))
+MARKET_CLOSE_TIME = time.fromisoformat(os.getenv("MARKET_CLOSE_TIME", "16:00"))
+
+
+def refresh_times_for_day(day: date) -> List[datetime]:
+    """Scheduled refreshes on `day` (market timezone): open, each interval until the close, close + delay."""
+    if day.weekday() >= 5:
+        return []
+    market_open = datetime.combine(day, MARKET_OPEN_TIME, tzinfo=MARKET_TIMEZONE)
+    market_close = datetime.combine(day, MARKET_CLOSE_TIME, tzinfo=MARKET_TIMEZONE)
+    times = []
+    current = market_open
+    while current < market_close:
+        times.append(current)
+        current += timedelta(seconds=max(PRICE_PREWARM_INTERVAL_SECONDS, 60))
+    times.append(market_close + timedelta(seconds=PRICE_PREWARM_CLOSE_DELAY_SECONDS))
+    return times
+
+
+def next_refresh_time(now: datetime) -> datetime:
+    """First scheduled refresh strictly after `now` (an aware datetime)."""
+    local_now = now.astimezone(MARKET_TIMEZONE)
+    for offset in range(8): # Always finds the next weekday
+        for refresh_at in refresh_times_for_day(local_now.date() + timedelta(days=offset)):
+            if refresh_at > local_now:
+                return refresh_at
+    raise RuntimeError("No market session found in the next week.")
+
+
+async def prewarm_held_prices() -> Dict[str, int]:
+    """Refreshes the stored prices of all held stock assets in one session and commits."""
+    if db_session.SessionFactory is None:
+        raise RuntimeError("Database is not initialized.")
+    valuation_date = datetime.now(MARKET_TIMEZONE).date()
+    async with db_session.SessionFactory() as db:
+        stock_assets = await crud_asset.get_held_stock_assets(db)
+        counts = await accounting_service.refresh_stock_prices(db, stock_assets, valuation_date)
+        await db.commit()
+    return counts
+
+
+async def run_price_prewarmer() -> None:
+    """Refreshes now, then at every scheduled refresh time until cancelled. Errors are logged, never raised."""
+    while True:
+        try:
+            counts = await prewarm_held_prices()
+            log.info(f"Price pre-warm complete: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Price pre-warm failed: {e}")
+        now = datetime.now(MARKET_TIMEZONE)
+        refresh_at = next_refresh_time(now)
+        log.debug(f"Next price pre-warm at {refresh_at.isoformat()}")
+        await asyncio.sleep((refresh_at - now).total_seconds())
+
+
+def start_price_prewarmer() -> Optional[asyncio.Task]:
+    """Starts the pre-warm loop as a background task (None when disabled)."""
+    if not PRICE_PREWARM_ENABLED:
+        log.info("Price pre-warming disabled (PRICE_PREWARM_ENABLED=false).")
+        return None
+    return asyncio.create_task(run_price_prewarmer(), name="price-prewarmer")
+
+
+async def stop_price_prewarmer(task: Optional[asyncio.Task]) -> None:
+    """Cancels the pre-warm task and waits for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
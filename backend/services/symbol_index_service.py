@@ -0,0 +1,181 @@
+# backend/services/symbol_index_service.py
+
+"""
+Local symbol search for autocomplete, without upstream calls per keystroke.
+
+- A background task (started from main.lifespan) downloads the app-scoped
+  provider's full ticker list into the symbol_index table every SYMBOL_INDEX_REFRESH_HOURS.
+  Tickers no longer listed are deleted; an empty download changes nothing.
+- The table and the STOCK rows of the assets table are loaded into an in-memory
+  core.symbol_index.SymbolIndex, swapped in whole after each refresh. Assets
+  rank first; assets created since the last load are remembered separately.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import session as db_session
+from backend.core.symbol_index import SymbolIndex
+from backend.crud import asset as crud_asset
+from backend.crud import symbol_index as crud_symbol_index
+from backend.models import Asset
+from backend.services.market_data_interface import MarketDataServiceInterface
+from backend.services.market_data_service import MARKET_DATA_PROVIDER, MarketDataService
+
+log = logging.getLogger(__name__)
+
+# --- Symbol Index Configuration ---
+SYMBOL_INDEX_REFRESH_ENABLED = os.getenv("SYMBOL_INDEX_REFRESH_ENABLED", "true").lower() == "true"
+SYMBOL_INDEX_REFRESH_HOURS = float(os.getenv("SYMBOL_INDEX_REFRESH_HOURS", "24"))
+# Provider whose ticker list is downloaded (defaults to the market data provider)
+SYMBOL_INDEX_PROVIDER = os.getenv("SYMBOL_INDEX_PROVIDER", MARKET_DATA_PROVIDER).lower()
+# Entries written per upsert batch during a download
+SYMBOL_INDEX_WRITE_BATCH_SIZE = 5000
+
+# Worker-wide index, swapped in whole on reload
+_index: Optional[SymbolIndex] = None
+_index_lock = asyncio.Lock()
+# Symbol -> asset ID of STOCK assets created since the index was loaded
+_new_assets: Dict[str, str] = {}
+
+
+async def load_symbol_index(db: AsyncSession) -> SymbolIndex:
+    """(Re)builds the in-memory index from the symbol_index table and the STOCK assets."""
+    global _index
+    ticker_rows = await crud_symbol_index.get_symbol_index_rows(db)
+    asset_rows = await crud_asset.get_stock_asset_symbols(db)
+    entries = [(symbol, name, None, "equity", str(asset_id)) for symbol, name, asset_id in asset_rows]
+    entries += [(symbol, name, exchange_mic, asset_type, None) for symbol, exchange_mic, name, asset_type in ticker_rows]
+    # Building sorts the whole list: keep it off the event loop
+    index = await asyncio.to_thread(SymbolIndex, entries)
+    _index = index
+    _new_assets.clear()
+    log.info(f"Symbol index loaded: {len(index)} symbols ({index.asset_count} known assets).")
+    return index
+
+
+async def get_symbol_index(db: AsyncSession) -> SymbolIndex:
+    """The loaded index; loaded on first use if the background task has not done it yet."""
+    if _index is not None:
+        return _index
+    async with _index_lock:
+        if _index is None:
+            await load_symbol_index(db)
+    return _index
+
+
+def note_new_asset(asset: Asset) -> None:
+    """Ranks a newly created STOCK asset first until the next reload."""
+    _new_assets[asset.symbol.upper()] = str(asset.id)
+
+
+async def search_symbols(db: AsyncSession, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Prefix/fuzzy search on symbol and name; no upstream calls."""
+    index = await get_symbol_index(db)
+    return index.search(query, limit, asset_symbols=_new_assets)
+
+
+async def refresh_symbol_index(db: AsyncSession, provider: MarketDataServiceInterface, source: str) -> Dict[str, int]:
+    """
+    Downloads the provider's ticker list into the symbol_index table, deletes
+    tickers it no longer lists, commits and reloads the in-memory index.
+    """
+    started_at = datetime.now(timezone.utc)
+    batch: List[Dict[str, Any]] = []
+    counts = {"downloaded": 0, "written": 0, "deleted": 0}
+    async for profile in provider.iter_ticker_list():
+        batch.append({
+            "symbol": profile.symbol.upper(),
+            "exchange_mic": profile.stock_exchange_info.mic,
+            "name": profile.name or None,
+            "asset_type": profile.asset_type,
+            "source": source
+        })
+        if len(batch) >= SYMBOL_INDEX_WRITE_BATCH_SIZE:
+            counts["written"] += await crud_symbol_index.upsert_symbol_index_entries(db=db, entries=batch, refreshed_at=started_at)
+            counts["downloaded"] += len(batch)
+            batch = []
+    if batch:
+        counts["written"] += await crud_symbol_index.upsert_symbol_index_entries(db=db, entries=batch, refreshed_at=started_at)
+        counts["downloaded"] += len(batch)
+    if counts["downloaded"] == 0:
+        log.warning(f"Provider '{source}' returned no tickers; keeping the existing symbol index.")
+        return counts
+    counts["deleted"] = await crud_symbol_index.delete_symbol_index_entries_before(db=db, refreshed_before=started_at)
+    await db.commit()
+    await load_symbol_index(db)
+    log.info(f"Symbol index refreshed from '{source}': {counts}")
+    return counts
+
+
+def resolve_symbol_index_provider(market_data_service: Optional[MarketDataService]) -> Optional[MarketDataServiceInterface]:
+    """
+    The app-scoped SYMBOL_INDEX_PROVIDER from the market data service, resolved
+    once at startup. None (logged) if it is unknown or not configured: the index
+    is then loaded from the table but not refreshed.
+    """
+    if market_data_service is None:
+        log.error(f"Symbol index provider '{SYMBOL_INDEX_PROVIDER}' unavailable: market data service not initialized.")
+        return None
+    try:
+        return market_data_service.get_provider(SYMBOL_INDEX_PROVIDER)
+    except (KeyError, ValueError) as e:
+        log.error(f"Symbol index provider '{SYMBOL_INDEX_PROVIDER}' not available: {e}")
+        return None
+
+
+async def _refresh_if_due(provider: Optional[MarketDataServiceInterface]) -> float:
+    """
+    Loads the index, refreshes it from `provider` if the last download is too old;
+    returns seconds until the next is due. The provider is not closed (app-scoped).
+    """
+    interval = timedelta(hours=SYMBOL_INDEX_REFRESH_HOURS)
+    async with db_session.SessionFactory() as db:
+        last_refreshed_at = await crud_symbol_index.get_last_refreshed_at(db)
+        if _index is None:
+            await load_symbol_index(db)
+        now = datetime.now(timezone.utc)
+        if last_refreshed_at is not None and now - last_refreshed_at < interval:
+            return (last_refreshed_at + interval - now).total_seconds()
+        if provider is None:
+            log.warning("No symbol index provider configured; serving the stored ticker list.")
+        else:
+            await refresh_symbol_index(db, provider, SYMBOL_INDEX_PROVIDER)
+    return interval.total_seconds()
+
+
+async def run_symbol_index_refresher(provider: Optional[MarketDataServiceInterface]) -> None:
+    """Keeps the index loaded and refreshed until cancelled. Errors are logged and retried after an hour."""
+    while True:
+        try:
+            delay = await _refresh_if_due(provider)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Symbol index refresh failed: {e}")
+            delay = 3600.0
+        await asyncio.sleep(delay)
+
+
+def start_symbol_index_refresher(provider: Optional[MarketDataServiceInterface]) -> Optional[asyncio.Task]:
+    """Starts the refresh loop over the app-scoped `provider` as a background task (None when disabled)."""
+    if not SYMBOL_INDEX_REFRESH_ENABLED:
+        log.info("Symbol index refresh disabled (SYMBOL_INDEX_REFRESH_ENABLED=false).")
+        return None
+    return asyncio.create_task(run_symbol_index_refresher(provider), name="symbol-index-refresher")
+
+
+async def stop_symbol_index_refresher(task: Optional[asyncio.Task]) -> None:
+    """Cancels the refresh task and waits for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -12,6 +12,7 @@ from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 # Import CRUD functions, Models, Schemas, and Enums
+from backend.core import ledger_lock
 from backend.crud import (
     transaction as crud_transaction,
     position as crud_position,
@@ -160,6 +161,8 @@ async def process_trade_transaction(
     if not fund:
         log.warning(f"Fund not found: {fund_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Fund with id {fund_id} not found.")
+    await ledger_lock.lock_club_ledger(db, fund.club_id) # Until commit: serializes this club's cash and position writes
+    await db.refresh(fund, ["brokerage_cash_balance"]) # Loaded before the lock; the buy cash check below needs the settled value
 
     asset = await crud_asset.get_asset(db=db, asset_id=trade_in.asset_id) # [cite: backend_files/crud/asset.py]
     if not asset:
@@ -188,15 +191,15 @@ async def process_trade_transaction(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid transaction type for a trade.")
 
     # --- 3. Pre-Transaction Validation (Cash Check for Buys) ---
+    # Fails fast before anything is written; the debit in step 6 re-checks atomically
     # Quantity check for sells is now handled within _update_or_create_position helper
-    if trade_type in BUY_TYPES:
-        required_cash = abs(net_cash_effect)
-        if fund.brokerage_cash_balance < required_cash: # [cite: backend_files/models/fund.py]
-            log.warning(f"Insufficient funds for buy transaction in fund {fund_id}. Required: {required_cash}, Available: {fund.brokerage_cash_balance}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient funds. Required: {required_cash:.2f}, Available: {fund.brokerage_cash_balance:.2f}"
-            )
+    required_cash = abs(net_cash_effect) if trade_type in BUY_TYPES else None
+    if required_cash is not None and fund.brokerage_cash_balance < required_cash: # [cite: backend_files/models/fund.py]
+        log.warning(f"Insufficient funds for buy transaction in fund {fund_id}. Required: {required_cash}, Available: {fund.brokerage_cash_balance}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient funds. Required: {required_cash:.2f}, Available: {fund.brokerage_cash_balance:.2f}"
+        )
 
     # --- 4. Create Transaction Record ---
     transaction_data = {
@@ -226,10 +229,16 @@ async def process_trade_transaction(
             price_per_unit=price # Pass price for cost basis calc on buys
         )
 
-        # --- 6. Update Fund Cash Balance ---
+        # --- 6. Update Fund Cash Balance (one UPDATE; buys only while the cash covers them) ---
         log.info(f"Updating fund {fund_id} cash balance by {net_cash_effect:.2f}")
-        fund.brokerage_cash_balance += net_cash_effect # Update the model attribute directly
-        db.add(fund) # Add updated fund to the session
+        new_balance = await crud_fund.adjust_fund_cash_balance(db, fund_id=fund_id, delta=net_cash_effect, required=required_cash)
+        if new_balance is None:
+            available = await crud_fund.get_fund_cash_balance(db, fund_id=fund_id)
+            log.warning(f"Insufficient funds for buy transaction in fund {fund_id}. Required: {required_cash}, Available: {available}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient funds. Required: {required_cash:.2f}, Available: {available:.2f}"
+            )
 
         # --- 7. Flush (Optional but good practice) ---
         await db.flush()
@@ -278,6 +287,7 @@ async def process_cash_receipt_transaction(
     if not fund:
         log.warning(f"Fund not found: {fund_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Fund with id {fund_id} not found.")
+    await ledger_lock.lock_club_ledger(db, fund.club_id) # Until commit: serializes this club's cash and position writes
 
     # --- 2. Validate Asset ID based on Type ---
     asset = None # Initialize asset as None
@@ -322,8 +332,7 @@ async def process_cash_receipt_transaction(
 
         # --- 5. Update Fund Cash Balance ---
         log.info(f"Updating fund {fund_id} cash balance by {net_cash_effect:.2f}")
-        fund.brokerage_cash_balance += net_cash_effect # Update the model attribute directly
-        db.add(fund) # Add updated fund to the session
+        await crud_fund.adjust_fund_cash_balance(db, fund_id=fund_id, delta=net_cash_effect)
 
         # --- 6. Flush (Optional but good practice) ---
         await db.flush()
@@ -344,6 +353,13 @@ async def process_cash_receipt_transaction(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred processing the cash receipt.")
 
 
+async def _debit_source_fund(db: AsyncSession, *, source_fund: Fund, total_deduction: Decimal) -> None:
+    """Debits a transfer's source fund only while its cash covers the deduction (400 otherwise)."""
+    if await crud_fund.adjust_fund_cash_balance(db, fund_id=source_fund.id, delta=-total_deduction, required=total_deduction) is None:
+        available = await crud_fund.get_fund_cash_balance(db, fund_id=source_fund.id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient funds in source fund '{source_fund.name}'. Required: {total_deduction:.2f}, Available: {available:.2f}")
+
+
 async def process_cash_transfer_transaction(
     db: AsyncSession,
     *,
@@ -358,11 +374,12 @@ async def process_cash_transfer_transaction(
     tx_type = transfer_in.transaction_type
     amount = transfer_in.total_amount
     log.info(f"Processing cash transfer for club {club_id}, type {tx_type}, amount {amount}")
-    club = await crud_club.get_club(db=db, club_id=club_id) # [cite: backend_files/crud/club.py]
-    if not club: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club with id {club_id} not found.")
+    await ledger_lock.lock_club_ledger(db, club_id) # Before the balance read, so the pre-check sees settled balances
+    bank_balance = await crud_club.get_club_bank_balance(db, club_id=club_id) # [cite: backend_files/crud/club.py]
+    if bank_balance is None: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Club with id {club_id} not found.")
     fees = transfer_in.fees_commissions or Decimal("0.0"); total_deduction = amount + fees
     if tx_type == TransactionType.BANK_TO_BROKERAGE:
-        if club.bank_account_balance < total_deduction: raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient funds in club bank account. Required: {total_deduction:.2f}, Available: {club.bank_account_balance:.2f}")
+        if bank_balance < total_deduction: raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient funds in club bank account. Required: {total_deduction:.2f}, Available: {bank_balance:.2f}")
     elif tx_type == TransactionType.BROKERAGE_TO_BANK or tx_type == TransactionType.INTERFUND_CASH_TRANSFER:
         fund_id = transfer_in.fund_id
         if not fund_id: raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Source fund_id is required.")
@@ -373,13 +390,17 @@ async def process_cash_transfer_transaction(
 
     try:
         if tx_type == TransactionType.BANK_TO_BROKERAGE:
-            fund_splits = await crud_fund_split.get_fund_splits_by_club(db=db, club_id=club.id) # [cite: backend_files/crud/fund_split.py]
+            fund_splits = await crud_fund_split.get_fund_splits_by_club(db=db, club_id=club_id) # [cite: backend_files/crud/fund_split.py]
             if not fund_splits: raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot process BANK_TO_BROKERAGE: No fund splits defined for this club.")
             total_split_percentage = sum(fs.split_percentage for fs in fund_splits) # [cite: backend_files/models/fund_split.py]
             if total_split_percentage > Decimal("1.0"): raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Fund split percentages exceed 100% ({total_split_percentage*100}%). Cannot distribute transfer.")
             log.info(f"Distributing BANK_TO_BROKERAGE amount {amount} according to fund splits.")
             distributed_amount_total = Decimal("0.0"); created_transactions: list[Transaction] = []
-            club.bank_account_balance -= total_deduction; db.add(club); log.info(f"Decreased club {club_id} bank balance by {total_deduction}")
+            # The checks above are advisory; the debit itself only applies while the balance covers it
+            if await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=-total_deduction, required=total_deduction) is None:
+                available = await crud_club.get_club_bank_balance(db, club_id=club_id)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient funds in club bank account. Required: {total_deduction:.2f}, Available: {available:.2f}")
+            log.info(f"Decreased club {club_id} bank balance by {total_deduction}")
             fee_applied = False
             for i, split in enumerate(fund_splits):
                 split_amount = (amount * split.split_percentage).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
@@ -394,9 +415,9 @@ async def process_cash_transfer_transaction(
                 created_tx = await crud_transaction.create_transaction(db=db, transaction_data=transfer_tx_data) # [cite: backend_files/crud/transaction.py]
                 created_transactions.append(created_tx)
                 if fees > 0: fee_applied = True
-                target_fund.brokerage_cash_balance += split_amount; db.add(target_fund); log.info(f"Created BANK_TO_BROKERAGE tx {created_tx.id}, increased fund {target_fund.id} brokerage by {split_amount}")
+                await crud_fund.adjust_fund_cash_balance(db, fund_id=target_fund.id, delta=split_amount); log.info(f"Created BANK_TO_BROKERAGE tx {created_tx.id}, increased fund {target_fund.id} brokerage by {split_amount}")
             remainder = amount - distributed_amount_total
-            if remainder > Decimal("0.00"): log.warning(f"Transfer amount {amount} was not fully distributed due to splits < 100% or rounding. Remainder: {remainder}. Leaving remainder in bank account."); club.bank_account_balance += remainder; db.add(club); log.info(f"Adjusted club bank balance by {remainder} due to undistributed amount.")
+            if remainder > Decimal("0.00"): log.warning(f"Transfer amount {amount} was not fully distributed due to splits < 100% or rounding. Remainder: {remainder}. Leaving remainder in bank account."); await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=remainder); log.info(f"Adjusted club bank balance by {remainder} due to undistributed amount.")
             await db.flush()
             
             # Eagerly load relationships to prevent MissingGreenlet errors during serialization
@@ -410,7 +431,8 @@ async def process_cash_transfer_transaction(
             if not source_fund: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Source fund {fund_id} not found.")
             transaction_data = {"club_id": club_id, "fund_id": fund_id, "asset_id": None, "transaction_type": tx_type, "transaction_date": transfer_in.transaction_date, "quantity": None, "price_per_unit": None, "total_amount": amount, "fees_commissions": fees, "description": transfer_in.description}
             created_transaction = await crud_transaction.create_transaction(db=db, transaction_data=transaction_data)
-            source_fund.brokerage_cash_balance -= total_deduction; club.bank_account_balance += amount; db.add(source_fund); db.add(club); log.info(f"Decreased fund {source_fund.id} brokerage by {total_deduction}, increased club {club_id} bank by {amount}")
+            await _debit_source_fund(db, source_fund=source_fund, total_deduction=total_deduction)
+            await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=amount); log.info(f"Decreased fund {source_fund.id} brokerage by {total_deduction}, increased club {club_id} bank by {amount}")
             await db.flush()
             
             # Eagerly load relationships to prevent MissingGreenlet errors during serialization
@@ -425,7 +447,8 @@ async def process_cash_transfer_transaction(
             if not source_fund or not target_fund: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Source or target fund not found.")
             transaction_data = {"club_id": club_id, "fund_id": fund_id, "asset_id": None, "transaction_type": tx_type, "transaction_date": transfer_in.transaction_date, "quantity": None, "price_per_unit": None, "total_amount": amount, "fees_commissions": fees, "description": transfer_in.description or f"Transfer to fund {target_fund.name}"}
             created_transaction = await crud_transaction.create_transaction(db=db, transaction_data=transaction_data)
-            source_fund.brokerage_cash_balance -= total_deduction; target_fund.brokerage_cash_balance += amount; db.add(source_fund); db.add(target_fund); log.info(f"Decreased fund {source_fund.id} brokerage by {total_deduction}, increased fund {target_fund.id} brokerage by {amount}")
+            await _debit_source_fund(db, source_fund=source_fund, total_deduction=total_deduction)
+            await crud_fund.adjust_fund_cash_balance(db, fund_id=target_fund.id, delta=amount); log.info(f"Decreased fund {source_fund.id} brokerage by {total_deduction}, increased fund {target_fund.id} brokerage by {amount}")
             await db.flush()
             
             # Eagerly load relationships to prevent MissingGreenlet errors during serialization
@@ -449,6 +472,7 @@ async def process_option_lifecycle_transaction(
     log.info(f"Processing option lifecycle transaction for fund {fund_id}, option asset {option_asset_id}, type {tx_type}, quantity {quantity}")
     fund = await crud_fund.get_fund(db=db, fund_id=fund_id);
     if not fund: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Fund {fund_id} not found.")
+    await ledger_lock.lock_club_ledger(db, fund.club_id)
     option_asset = await crud_asset.get_asset(db=db, asset_id=option_asset_id);
     if not option_asset: raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Option asset {option_asset_id} not found.")
     if option_asset.asset_type != "Option": raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Asset provided is not an option.")
@@ -486,7 +510,7 @@ async def process_option_lifecycle_transaction(
             log.info(f"Updated stock position for asset {underlying_asset.id} quantity by {stock_quantity_change}")
         net_cash_change = cash_change_from_stock - fees
         log.info(f"Updating fund {fund_id} cash balance by {net_cash_change:.2f} (Stock: {cash_change_from_stock}, Fees: {-fees})")
-        fund.brokerage_cash_balance += net_cash_change; db.add(fund)
+        await crud_fund.adjust_fund_cash_balance(db, fund_id=fund_id, delta=net_cash_change)
         await db.flush()
         log.info(f"Successfully processed option lifecycle transaction {primary_tx.id}")
         return primary_tx
@@ -516,15 +540,6 @@ async def process_club_expense_transaction(
         HTTPException: If club not found or insufficient balance
     """
     try:
-        # Fetch the club
-        club = await crud_club.get_club(db=db, club_id=club_id)
-        if not club:
-            log.error(f"Club with ID {club_id} not found")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Club with ID {club_id} not found",
-            )
-            
         # Validate transaction type
         if expense_in.transaction_type != TransactionType.CLUB_EXPENSE:
             log.error(f"Invalid transaction type: {expense_in.transaction_type}")
@@ -533,12 +548,22 @@ async def process_club_expense_transaction(
                 detail="Transaction type must be CLUB_EXPENSE",
             )
             
+        await ledger_lock.lock_club_ledger(db, club_id)
+
         # Calculate total deduction
         total_deduction = expense_in.total_amount + expense_in.fees_commissions
         
-        # Check if club has sufficient balance
-        if club.bank_account_balance < total_deduction:
-            log.error(f"Insufficient balance: {club.bank_account_balance} < {total_deduction}")
+        # Debit the club in one UPDATE, only while its balance covers the expense
+        new_balance = await crud_club.adjust_club_bank_balance(db, club_id=club_id, delta=-total_deduction, required=total_deduction)
+        if new_balance is None:
+            available = await crud_club.get_club_bank_balance(db, club_id=club_id)
+            if available is None:
+                log.error(f"Club with ID {club_id} not found")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Club with ID {club_id} not found",
+                )
+            log.error(f"Insufficient balance: {available} < {total_deduction}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient club bank account balance",
@@ -558,10 +583,6 @@ async def process_club_expense_transaction(
         
         # Create the transaction
         transaction = await crud_transaction.create_transaction(db=db, transaction_data=transaction_data)
-        
-        # Update club balance
-        club.bank_account_balance -= total_deduction
-        db.add(club)
         await db.flush()
         
         return transaction
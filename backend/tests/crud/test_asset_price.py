@@ -0,0 +1,96 @@
+# backend/tests/crud/test_asset_price.py
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import asset as crud_asset
+from backend.crud import asset_price as crud_asset_price
+from backend.models import Asset
+from backend.models.enums import AssetType, Currency
+
+pytestmark = pytest.mark.asyncio(loop_scope="function")
+
+
+async def create_stock(db_session: AsyncSession, prefix: str = "PX") -> Asset:
+    symbol = f"{prefix}{uuid.uuid4().hex[:6].upper()}"
+    return await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": symbol, "currency": Currency.USD})
+
+
+async def test_bulk_insert_and_latest_lookup(db_session: AsyncSession):
+    """ Test a multi-row insert and the latest-on-or-before lookup. """
+    asset_a = await create_stock(db_session)
+    asset_b = await create_stock(db_session)
+    day = date(2024, 3, 15)
+    rows = [
+        {"asset_id": asset_a.id, "price_date": day - timedelta(days=1), "close_price": Decimal("10.00"), "source": "test"},
+        {"asset_id": asset_a.id, "price_date": day, "close_price": Decimal("11.00"), "source": "test"},
+        {"asset_id": asset_b.id, "price_date": day - timedelta(days=10), "close_price": Decimal("20.00"), "source": "test"},
+    ]
+
+    inserted = await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=rows)
+    assert inserted == 3
+
+    latest = await crud_asset_price.get_latest_prices_on_or_before(db=db_session, asset_ids=[asset_a.id, asset_b.id], on_date=day)
+    assert latest[asset_a.id].close_price == Decimal("11.00")
+    assert latest[asset_b.id].price_date == day - timedelta(days=10)
+
+    bounded = await crud_asset_price.get_latest_prices_on_or_before(
+        db=db_session, asset_ids=[asset_a.id, asset_b.id], on_date=day - timedelta(days=1), earliest_date=day - timedelta(days=4)
+    )
+    assert bounded[asset_a.id].close_price == Decimal("10.00")
+    assert asset_b.id not in bounded
+
+    period = await crud_asset_price.get_prices_for_period(db=db_session, asset_ids=[asset_a.id], start_date=day - timedelta(days=5), end_date=day)
+    assert [p.price_date for p in period] == [day - timedelta(days=1), day]
+
+
+async def test_bulk_insert_conflicts(db_session: AsyncSession):
+    """ Test settled rows are kept on conflict while intraday rows are replaced. """
+    asset = await create_stock(db_session)
+    settled_day = date(2024, 3, 14)
+    intraday_day = date(2024, 3, 15)
+    await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[
+        {"asset_id": asset.id, "price_date": settled_day, "close_price": Decimal("10.00"), "source": "test",
+         "fetched_at": datetime(2024, 3, 15, 12, 0, tzinfo=timezone.utc)},
+        {"asset_id": asset.id, "price_date": intraday_day, "close_price": Decimal("11.00"), "source": "test",
+         "fetched_at": datetime(2024, 3, 15, 15, 0, tzinfo=timezone.utc)},
+    ])
+
+    affected = await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[
+        {"asset_id": asset.id, "price_date": settled_day, "close_price": Decimal("99.00"), "source": "other"},
+        {"asset_id": asset.id, "price_date": intraday_day, "close_price": Decimal("12.00"), "source": "test"},
+    ])
+    assert affected == 1
+
+    period = await crud_asset_price.get_prices_for_period(db=db_session, asset_ids=[asset.id], start_date=settled_day, end_date=intraday_day)
+    for row in period:
+        await db_session.refresh(row)
+    assert [p.close_price for p in period] == [Decimal("10.00"), Decimal("12.00")]
+
+
+async def test_bulk_insert_empty(db_session: AsyncSession):
+    """ Test empty inputs do not hit the database. """
+    assert await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[]) == 0
+    assert await crud_asset_price.get_latest_prices_on_or_before(db=db_session, asset_ids=[], on_date=date.today()) == {}
+
+
+async def test_get_stored_price_dates(db_session: AsyncSession):
+    """ Test stored dates are grouped per asset and every requested asset gets an entry. """
+    asset_a = await create_stock(db_session)
+    asset_b = await create_stock(db_session)
+    day = date(2024, 3, 15)
+    await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[
+        {"asset_id": asset_a.id, "price_date": day - timedelta(days=1), "close_price": Decimal("10.00"), "source": "test"},
+        {"asset_id": asset_a.id, "price_date": day, "close_price": Decimal("11.00"), "source": "test"},
+        {"asset_id": asset_a.id, "price_date": day + timedelta(days=3), "close_price": Decimal("12.00"), "source": "test"},
+    ])
+
+    stored = await crud_asset_price.get_stored_price_dates(
+        db=db_session, asset_ids=[asset_a.id, asset_b.id], start_date=day - timedelta(days=7), end_date=day
+    )
+    assert stored == {asset_a.id: {day - timedelta(days=1), day}, asset_b.id: set()}
+    assert await crud_asset_price.get_stored_price_dates(db=db_session, asset_ids=[], start_date=day, end_date=day) == {}
@@ -1,6 +1,8 @@
 # backend/tests/crud/test_club.py
 
 import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
 # from typing import AsyncGenerator # No longer needed
 
 import pytest
@@ -10,8 +12,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import refactored CRUD function
 from backend.crud import club as crud_club
+from backend.crud import asset as crud_asset, club_membership as crud_membership, fund as crud_fund
+from backend.crud import member_transaction as crud_mem_tx, position as crud_position
 # Import models needed
 from backend.models import Club, User
+from backend.models.enums import AssetType, ClubRole, Currency, MemberTransactionType
 # Import schemas needed for update
 from backend.schemas import ClubUpdate # Removed ClubCreate
 
@@ -209,3 +214,68 @@ async def test_delete_club(db_session: AsyncSession):
 #     with pytest.raises(IntegrityError):
 #         await crud_club.create_club(db=db_session, club_data=club_data_dup)
 
+
+
+async def test_get_club_valuation_state(db_session: AsyncSession):
+    """Cash, running units and per-asset position totals come back from one query."""
+    creator = await create_test_user(db_session, email=f"state_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|state_{uuid.uuid4()}")
+    club = await crud_club.create_club(db=db_session, club_data={"name": "State Club", "creator_id": creator.id, "bank_account_balance": Decimal("100.00")})
+    assert await crud_club.get_club_valuation_state(db=db_session, club_id=club.id) == {
+        "bank_cash": Decimal("100.00"), "brokerage_cash": Decimal("0"), "total_units": Decimal("0"), "positions": []
+    }
+
+    funds = [
+        await crud_fund.create_fund(db=db_session, fund_data={"club_id": club.id, "name": name, "brokerage_cash_balance": Decimal(cash)})
+        for name, cash in (("Fund A", "20.50"), ("Fund B", "30.00"))
+    ]
+    held = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"VS{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    closed = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"VC{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    for fund, asset, quantity in ((funds[0], held, "10"), (funds[1], held, "5"), (funds[0], closed, "0")):
+        await crud_position.create_position(db=db_session, position_data={"fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal(quantity), "average_cost_basis": Decimal("1")})
+
+    membership = await crud_membership.create_club_membership(db=db_session, membership_data={"user_id": creator.id, "club_id": club.id, "role": ClubRole.Member})
+    for tx_type, units in ((MemberTransactionType.DEPOSIT, "50.5"), (MemberTransactionType.WITHDRAWAL, "-10.25")):
+        await crud_mem_tx.create_member_transaction(db=db_session, member_tx_data={
+            "membership_id": membership.id, "transaction_type": tx_type, "amount": Decimal("1"),
+            "transaction_date": datetime.now(timezone.utc), "unit_value_used": Decimal("10"), "units_transacted": Decimal(units)
+        })
+
+    state = await crud_club.get_club_valuation_state(db=db_session, club_id=club.id)
+    assert state["bank_cash"] == Decimal("100.00") and state["brokerage_cash"] == Decimal("50.50")
+    assert state["total_units"] == Decimal("40.25")
+    assert state["total_units"] == await crud_mem_tx.get_total_units_for_club(db=db_session, club_id=club.id)
+    assert state["positions"] == [(held.id, Decimal("15"))]
+    assert club.total_units_outstanding == Decimal("40.25") # Loaded object kept in sync
+    assert await crud_club.get_club_valuation_state(db=db_session, club_id=uuid.uuid4()) is None
+
+
+async def test_running_unit_balances_and_reconciliation(db_session: AsyncSession):
+    """Member and club unit totals follow the ledger, and drift is repaired from it."""
+    creator = await create_test_user(db_session, email=f"units_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|units_{uuid.uuid4()}")
+    other = await create_test_user(db_session, email=f"units_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|units_{uuid.uuid4()}")
+    club = await crud_club.create_club(db=db_session, club_data={"name": "Units Club", "creator_id": creator.id})
+    memberships = [
+        await crud_membership.create_club_membership(db=db_session, membership_data={"user_id": user.id, "club_id": club.id, "role": ClubRole.Member})
+        for user in (creator, other)
+    ]
+    for membership, units in ((memberships[0], "30"), (memberships[0], "-5.5"), (memberships[1], "12.125")):
+        await crud_mem_tx.create_member_transaction(db=db_session, member_tx_data={
+            "membership_id": membership.id, "transaction_type": MemberTransactionType.DEPOSIT, "amount": Decimal("1"),
+            "transaction_date": datetime.now(timezone.utc), "unit_value_used": Decimal("10"), "units_transacted": Decimal(units)
+        })
+
+    assert await crud_mem_tx.get_member_unit_balance(db=db_session, membership_id=memberships[0].id) == Decimal("24.5")
+    assert await crud_mem_tx.get_member_unit_balance(db=db_session, membership_id=memberships[1].id) == Decimal("12.125")
+    assert await crud_mem_tx.get_member_unit_balance(db=db_session, membership_id=uuid.uuid4()) == Decimal("0")
+    assert await crud_mem_tx.get_total_units_for_club(db=db_session, club_id=club.id) == Decimal("36.625")
+    assert memberships[0].unit_balance == Decimal("24.5") # Loaded object kept in sync
+    assert await crud_mem_tx.reconcile_unit_balances(db_session, club_ids=[club.id]) == {"memberships": [], "clubs": []}
+
+    # Totals changed behind the ledger's back are rebuilt from it
+    memberships[1].unit_balance = Decimal("99")
+    club.total_units_outstanding = Decimal("0")
+    await db_session.flush()
+    fixed = await crud_mem_tx.reconcile_unit_balances(db_session, club_ids=[club.id])
+    assert fixed == {"memberships": [memberships[1].id], "clubs": [club.id]}
+    assert await crud_mem_tx.get_member_unit_balance(db=db_session, membership_id=memberships[1].id) == Decimal("12.125")
+    assert await crud_mem_tx.get_total_units_for_club(db=db_session, club_id=club.id) == Decimal("36.625")
@@ -1,6 +1,7 @@
 # backend/tests/crud/test_fund.py
 
 import uuid
+from decimal import Decimal
 
 import pytest
 import pytest_asyncio
@@ -169,3 +170,19 @@ async def test_delete_fund(db_session: AsyncSession):
 #     }
 #     with pytest.raises(IntegrityError):
 #          await crud_fund.create_fund(db=db_session, fund_data=fund_data_dup)
+
+
+async def test_adjust_fund_cash_balance_debits_only_while_covered(db_session: AsyncSession):
+    creator = await create_test_user(db_session, email=f"cash_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|cash_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Cash Fund")
+
+    assert await crud_fund.adjust_fund_cash_balance(db_session, fund_id=fund.id, delta=Decimal("100.00")) == Decimal("100.00")
+    assert await crud_fund.adjust_fund_cash_balance(db_session, fund_id=fund.id, delta=Decimal("-60.00"), required=Decimal("60.00")) == Decimal("40.00")
+    # Not enough cash: nothing is written
+    assert await crud_fund.adjust_fund_cash_balance(db_session, fund_id=fund.id, delta=Decimal("-60.00"), required=Decimal("60.00")) is None
+    assert await crud_fund.get_fund_cash_balance(db_session, fund_id=fund.id) == Decimal("40.00")
+    # The loaded object sees the new balance without a refresh
+    assert fund.brokerage_cash_balance == Decimal("40.00")
+    assert await crud_fund.adjust_fund_cash_balance(db_session, fund_id=uuid.uuid4(), delta=Decimal("1.00")) is None
+    assert await crud_fund.get_fund_cash_balance(db_session, fund_id=uuid.uuid4()) is None
@@ -1,5 +1,6 @@
 # backend/tests/services/test_accounting_service.py
 
+import asyncio
 import pytest
 import uuid
 from decimal import Decimal, ROUND_HALF_UP, DivisionByZero
@@ -10,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, MissingGreenlet
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException
+import httpx
 
 # Service functions to test
 from backend.services import accounting_service
@@ -29,6 +31,7 @@ from backend.models import User, Club, Fund, Asset, Position, ClubMembership, Me
 from backend.models.enums import AssetType, MemberTransactionType, ClubRole, Currency, OptionType
 # Import schemas
 from backend.schemas import MemberTransactionCreate
+from backend.schemas.market_data import MarketPriceStatus
 
 # Import Auth0 mocking fixtures
 from backend.tests.auth_fixtures import mock_auth0_token_verification, mock_get_current_active_user, test_user
@@ -612,3 +615,151 @@ async def test_get_member_equity_membership_not_found(db_session: AsyncSession):
     
     assert exc_info.value.status_code == 404
     assert "Membership for user" in exc_info.value.detail
+
+
+# --- Tests for get_market_price_quotes ---
+
+def _patch_alpha_vantage(monkeypatch, handler):
+    """ Makes an Alpha Vantage adapter on a MockTransport calling `handler` the only price provider. """
+    from backend.services.market_data_providers.alpha_vantage_adapter import AlphaVantageAdapter
+    from backend.services.market_data_providers.hedged_provider import HedgedMarketDataProvider
+
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "test-key")
+    adapter = AlphaVantageAdapter(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(accounting_service, "_price_provider", HedgedMarketDataProvider([("alpha_vantage", adapter)]))
+    monkeypatch.setattr(accounting_service, "_price_provider_built", True)
+
+
+async def test_get_market_price_quotes_statuses(db_session: AsyncSession, monkeypatch):
+    """ Test quotes are fetched for every stock and each asset gets a status. """
+    suffix = uuid.uuid4().hex[:6].upper()
+    ok_asset = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"OK{suffix}", "currency": Currency.USD})
+    stale_asset = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"OLD{suffix}", "currency": Currency.USD})
+    limited_asset = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"RL{suffix}", "currency": Currency.USD})
+    unknown_asset_id = uuid.uuid4()
+    valuation_date = date.today()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        symbol = request.url.params["symbol"]
+        if symbol.startswith("OK"):
+            return httpx.Response(200, json={"Global Quote": {"05. price": "101.25", "07. latest trading day": valuation_date.isoformat()}})
+        if symbol.startswith("OLD"):
+            old_day = valuation_date - timedelta(days=30)
+            return httpx.Response(200, json={"Global Quote": {"05. price": "50.00", "07. latest trading day": old_day.isoformat()}})
+        return httpx.Response(200, json={"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."})
+
+    _patch_alpha_vantage(monkeypatch, handler)
+
+    quotes = await accounting_service.get_market_price_quotes(
+        db_session, [ok_asset.id, stale_asset.id, limited_asset.id, unknown_asset_id], valuation_date
+    )
+
+    assert quotes[ok_asset.id].status == MarketPriceStatus.OK
+    assert quotes[ok_asset.id].price == Decimal("101.25")
+    assert quotes[stale_asset.id].status == MarketPriceStatus.STALE
+    assert quotes[stale_asset.id].price == Decimal("50.00")
+    assert quotes[limited_asset.id].status == MarketPriceStatus.RATE_LIMITED
+    assert quotes[limited_asset.id].price == Decimal("0.0")
+    assert quotes[unknown_asset_id].status == MarketPriceStatus.MISSING
+
+    prices = await accounting_service.get_market_prices(db_session, [ok_asset.id, unknown_asset_id], valuation_date)
+    assert prices == {ok_asset.id: Decimal("101.25"), unknown_asset_id: Decimal("0.0")}
+
+
+async def test_get_market_price_quotes_runs_concurrently(db_session: AsyncSession, monkeypatch):
+    """ Test quote requests overlap instead of running one after another. """
+    suffix = uuid.uuid4().hex[:6].upper()
+    assets = [
+        await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"C{i}{suffix}", "currency": Currency.USD})
+        for i in range(4)
+    ]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return httpx.Response(200, json={"Global Quote": {"05. price": "10.00", "07. latest trading day": date.today().isoformat()}})
+
+    _patch_alpha_vantage(monkeypatch, handler)
+    monkeypatch.setattr(accounting_service, "MARKET_PRICE_MAX_CONCURRENCY", 2)
+
+    quotes = await accounting_service.get_market_price_quotes(db_session, [a.id for a in assets], date.today())
+
+    assert all(q.status == MarketPriceStatus.OK for q in quotes.values())
+    assert max_in_flight == 2
+
+
+async def test_get_market_price_quotes_reads_through_price_store(db_session: AsyncSession, monkeypatch):
+    """ Test past dates are priced from EOD closes, stored under their trading day, and a repeat valuation makes no API calls. """
+    from backend.crud import asset_price as crud_asset_price
+
+    suffix = uuid.uuid4().hex[:6].upper()
+    asset = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"RT{suffix}", "currency": Currency.USD})
+    valuation_date = date(2024, 3, 18) # Monday
+    calls = 0
+    upstream_down = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        assert request.url.params["function"] == "TIME_SERIES_DAILY" # Past dates never use the latest quote
+        if upstream_down:
+            return httpx.Response(429)
+        return httpx.Response(200, json={"Time Series (Daily)": {
+            day: {"1. open": close, "2. high": close, "3. low": close, "4. close": close, "5. volume": "1000"}
+            for day, close in (("2024-03-14", "41.00"), ("2024-03-15", "42.50"), ("2024-03-18", "44.00"))
+        }})
+
+    _patch_alpha_vantage(monkeypatch, handler)
+    monkeypatch.setattr(accounting_service, "MARKET_PRICE_MAX_QUOTE_AGE_DAYS", 4)
+
+    first = await accounting_service.get_market_price_quotes(db_session, [asset.id], valuation_date - timedelta(days=3))
+    assert first[asset.id].status == MarketPriceStatus.OK
+    assert first[asset.id].price == Decimal("42.50")
+    assert calls == 1
+    stored = await crud_asset_price.get_latest_prices_on_or_before(db=db_session, asset_ids=[asset.id], on_date=date.today())
+    assert stored[asset.id].price_date == date(2024, 3, 15)
+
+    # Friday's stored close covers the weekend
+    second = await accounting_service.get_market_price_quotes(db_session, [asset.id], valuation_date - timedelta(days=1))
+    assert second[asset.id].price == Decimal("42.50")
+    assert second[asset.id].as_of == date(2024, 3, 15)
+    assert calls == 1
+
+    # Monday needs a fresh quote; when the fetch fails the stored close is used as stale
+    upstream_down = True
+    third = await accounting_service.get_market_price_quotes(db_session, [asset.id], valuation_date)
+    assert calls == 2
+    assert third[asset.id].status == MarketPriceStatus.STALE
+    assert third[asset.id].price == Decimal("42.50")
+
+
+async def test_get_market_price_quotes_values_options_from_underlying(db_session: AsyncSession, monkeypatch):
+    """ Test options are valued from the underlying's price instead of being reported as missing. """
+    from backend.crud import asset_price as crud_asset_price
+    from backend.services import option_valuation_service
+
+    suffix = uuid.uuid4().hex[:6].upper()
+    underlying = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"UL{suffix}", "currency": Currency.USD})
+    valuation_date = date(2024, 3, 15)
+    call = await crud_asset.create_asset(db=db_session, asset_data={
+        "asset_type": AssetType.OPTION, "symbol": f"UL{suffix}C", "currency": Currency.USD, "underlying_asset_id": underlying.id,
+        "option_type": OptionType.CALL, "strike_price": Decimal("100"), "expiration_date": valuation_date + timedelta(days=30)
+    })
+    await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[
+        {"asset_id": underlying.id, "price_date": valuation_date, "close_price": Decimal("110.00"), "source": "test"},
+    ])
+    monkeypatch.setattr(option_valuation_service, "OPTION_VOLATILITY_SOURCE", "constant")
+    _patch_alpha_vantage(monkeypatch, lambda request: httpx.Response(500))
+
+    quotes = await accounting_service.get_market_price_quotes(db_session, [call.id], valuation_date)
+
+    assert set(quotes) == {call.id} # The underlying was fetched but not requested
+    assert quotes[call.id].status == MarketPriceStatus.OK
+    assert quotes[call.id].source == "black_scholes"
+    # Worth more than its intrinsic value of 10 per share (1000 per contract)
+    assert Decimal("1000") < quotes[call.id].price < Decimal("1500")
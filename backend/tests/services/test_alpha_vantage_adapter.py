@@ -0,0 +1,95 @@
+# backend/tests/services/test_alpha_vantage_adapter.py
+
+from datetime import date
+
+import httpx
+import pytest
+
+from backend.services.market_data_interface import MarketDataRateLimitError, MarketDataUnavailableError
+from backend.services.market_data_providers.alpha_vantage_adapter import AlphaVantageAdapter
+
+
+def _adapter(monkeypatch, handler) -> AlphaVantageAdapter:
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "test-key")
+    return AlphaVantageAdapter(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def _global_quote(symbol: str, price: str, day: str = "2024-03-15") -> dict:
+    return {"Global Quote": {
+        "01. symbol": symbol, "02. open": "10.00", "03. high": "11.00", "04. low": "9.50", "05. price": price,
+        "06. volume": "12345", "07. latest trading day": day, "09. change": "0.50", "10. change percent": "4.7619%"
+    }}
+
+
+@pytest.mark.asyncio
+async def test_equity_quote_mapping(monkeypatch):
+    """ GLOBAL_QUOTE fields are mapped to an EquityQuote; unknown symbols return None. """
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["function"] == "GLOBAL_QUOTE"
+        if request.url.params["symbol"] == "NOPE":
+            return httpx.Response(200, json={"Global Quote": {}})
+        return httpx.Response(200, json=_global_quote("AAPL", "10.50"))
+
+    adapter = _adapter(monkeypatch, handler)
+    quote = await adapter.get_equity_quote("AAPL")
+    assert quote.price == 10.5
+    assert quote.percent_change == pytest.approx(4.7619)
+    assert quote.volume == 12345
+    assert quote.timestamp.date() == date(2024, 3, 15)
+    assert await adapter.get_equity_quote("NOPE") is None
+
+    quotes = await adapter.get_equity_quotes(["aapl", "NOPE"])
+    assert list(quotes) == ["AAPL"]
+
+
+@pytest.mark.asyncio
+async def test_errors_follow_the_interface(monkeypatch):
+    """ Quota notes and 429s raise rate limit errors, 5xx and network errors raise unavailable. """
+    responses = {
+        "NOTE": httpx.Response(200, json={"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}),
+        "HTTP429": httpx.Response(429),
+        "HTTP500": httpx.Response(500),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        symbol = request.url.params["symbol"]
+        if symbol == "DOWN":
+            raise httpx.ConnectError("connection refused")
+        return responses[symbol]
+
+    adapter = _adapter(monkeypatch, handler)
+    with pytest.raises(MarketDataRateLimitError):
+        await adapter.get_equity_quote("NOTE")
+    with pytest.raises(MarketDataRateLimitError):
+        await adapter.get_equity_quote("HTTP429")
+    with pytest.raises(MarketDataUnavailableError):
+        await adapter.get_equity_quote("HTTP500")
+    with pytest.raises(MarketDataUnavailableError):
+        await adapter.get_equity_quote("DOWN")
+    # A bulk call only raises when every symbol failed
+    with pytest.raises(MarketDataUnavailableError):
+        await adapter.get_equity_quotes(["HTTP500", "DOWN"])
+
+
+@pytest.mark.asyncio
+async def test_historical_price_data(monkeypatch):
+    """ Daily series are filtered to the requested range and sorted oldest first. """
+    series = {
+        "2024-03-15": {"1. open": "3", "2. high": "3", "3. low": "3", "4. close": "3.5", "5. volume": "300"},
+        "2024-03-14": {"1. open": "2", "2. high": "2", "3. low": "2", "4. close": "2.5", "5. volume": "200"},
+        "2024-03-13": {"1. open": "1", "2. high": "1", "3. low": "1", "4. close": "1.5", "5. volume": "100"},
+    }
+    seen_output_sizes = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_output_sizes.append(request.url.params["outputsize"])
+        return httpx.Response(200, json={"Meta Data": {}, "Time Series (Daily)": series})
+
+    adapter = _adapter(monkeypatch, handler)
+    points = await adapter.get_historical_price_data("msft", date(2024, 3, 14), date(2024, 3, 15))
+    assert [p.close for p in points] == [2.5, 3.5]
+    assert points[0].symbol == "MSFT"
+    assert seen_output_sizes == ["full"] # Older than the compact window
+
+    bulk = await adapter.get_historical_price_data_bulk(["MSFT", "IBM"], date(2024, 3, 13), date(2024, 3, 13))
+    assert {symbol: [p.close for p in points] for symbol, points in bulk.items()} == {"MSFT": [1.5], "IBM": [1.5]}
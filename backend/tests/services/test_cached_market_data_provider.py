@@ -0,0 +1,123 @@
+# backend/tests/services/test_cached_market_data_provider.py
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from backend.schemas.market_data import HistoricalPricePoint, IndexQuote, ETFTicker
+from backend.services.market_data_providers import cache_backends
+from backend.services.market_data_providers.cache_backends import InMemoryCacheBackend, LRUCache, MISSING
+from backend.services.market_data_providers import cached_provider
+from backend.services.market_data_providers.cached_provider import CachedMarketDataProvider
+
+
+def _point(day: date) -> HistoricalPricePoint:
+    return HistoricalPricePoint(
+        date=datetime(day.year, day.month, day.day, tzinfo=timezone.utc), open=1.0, high=1.0, low=1.0, close=1.0,
+        volume=1, adj_high=1.0, adj_low=1.0, adj_open=1.0, adj_close=1.0, adj_volume=1, split_factor=1.0,
+        dividend=0.0, symbol="AAPL", exchange="XNAS", name="Apple", asset_type="Stock", price_currency="usd"
+    )
+
+
+def _index_quote(symbol: str) -> IndexQuote:
+    return IndexQuote(symbol=symbol, name=symbol, price=1.0, change=0.0, percent_change=0.0, timestamp=datetime.now(timezone.utc))
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test the LRU bound, recency refresh and counters."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, ttl=None)
+    cache.set("b", 2, ttl=None)
+    assert cache.get("a") == 1  # "a" is now most recent
+    cache.set("c", 3, ttl=None)  # evicts "b"
+
+    assert cache.get("b") is MISSING
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "size": 2}
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    """Test entries disappear once their TTL has passed."""
+    now = 1000.0
+    monkeypatch.setattr(cache_backends.time, "monotonic", lambda: now)
+    cache = LRUCache(max_entries=10)
+    cache.set("quote", 1, ttl=60)
+    assert cache.get("quote") == 1
+    now += 61
+    assert cache.get("quote") is MISSING
+
+
+@pytest.mark.asyncio
+async def test_quotes_and_lists_are_cached():
+    """Test repeated quote/list requests hit the wrapped provider once; empty results are not cached."""
+    provider = AsyncMock()
+    provider.get_index_quote.side_effect = lambda symbol: _index_quote(symbol)
+    provider.list_etfs.return_value = [ETFTicker(ticker="SPY")]
+    provider.list_bond_countries.return_value = []
+    cached = CachedMarketDataProvider(provider, InMemoryCacheBackend(LRUCache(max_entries=10)))
+
+    for _ in range(3):
+        assert (await cached.get_index_quote("DJI")).symbol == "DJI"
+        assert await cached.list_etfs(10, 0) == [ETFTicker(ticker="SPY")]
+        assert await cached.list_bond_countries() == []
+
+    assert provider.get_index_quote.await_count == 1
+    assert provider.list_etfs.await_count == 1
+    assert provider.list_bond_countries.await_count == 3
+    assert cached.cache_stats()["hits"] == 4
+
+
+@pytest.mark.asyncio
+async def test_bulk_quotes_fetch_only_uncached_symbols():
+    """Test bulk quotes reuse cached symbols and request only the rest."""
+    provider = AsyncMock()
+    provider.get_equity_quotes.side_effect = lambda symbols, exchange: {s: f"quote-{s}" for s in symbols}
+    cached = CachedMarketDataProvider(provider, InMemoryCacheBackend(LRUCache(max_entries=10)))
+
+    await cached.get_equity_quotes(["AAPL", "MSFT"])
+    quotes = await cached.get_equity_quotes(["aapl", "GOOG"])
+
+    assert quotes == {"AAPL": "quote-AAPL", "GOOG": "quote-GOOG"}
+    assert provider.get_equity_quotes.await_args_list[1].args == (["GOOG"], None)
+
+
+@pytest.mark.asyncio
+async def test_historical_sub_range_served_from_cached_range():
+    """Test a closed range is cached and a request inside it is sliced, not refetched."""
+    start = date(2024, 1, 1)
+    days = [start + timedelta(days=i) for i in range(10)]
+    provider = AsyncMock()
+    provider.get_historical_price_data.return_value = [_point(d) for d in days]
+    cached = CachedMarketDataProvider(provider, InMemoryCacheBackend(LRUCache(max_entries=10)))
+
+    full = await cached.get_historical_price_data("AAPL", days[0], days[-1])
+    part = await cached.get_historical_price_data("aapl", days[2], days[4])
+
+    assert len(full) == 10
+    assert [p.date.date() for p in part] == days[2:5]
+    assert provider.get_historical_price_data.await_count == 1
+
+    # A range reaching outside the cached one goes upstream
+    await cached.get_historical_price_data("AAPL", days[0] - timedelta(days=1), days[4])
+    assert provider.get_historical_price_data.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_recent_historical_ranges_expire(monkeypatch):
+    """Test only settled ranges are cached without expiry; one ending yesterday gets a TTL."""
+    now = 1000.0
+    monkeypatch.setattr(cache_backends.time, "monotonic", lambda: now)
+    today = date.today()
+    provider = AsyncMock()
+    provider.get_historical_price_data.side_effect = lambda symbol, from_date, to_date, exchange: [_point(from_date)]
+    cached = CachedMarketDataProvider(provider, InMemoryCacheBackend(LRUCache(max_entries=10)))
+
+    settled = (today - timedelta(days=30), today - timedelta(days=cached_provider.HISTORICAL_SETTLE_DAYS))
+    recent = (today - timedelta(days=30), today - timedelta(days=1))
+    for from_date, to_date in (settled, recent):
+        await cached.get_historical_price_data("AAPL", from_date, to_date)
+    assert provider.get_historical_price_data.await_count == 2
+
+    now += cached_provider.RECENT_HISTORICAL_CACHE_TTL_SECONDS + 1
+    for from_date, to_date in (settled, recent):
+        await cached.get_historical_price_data("AAPL", from_date, to_date)
+    # Only the range ending yesterday was fetched again
+    assert [call.args[2] for call in provider.get_historical_price_data.await_args_list[2:]] == [recent[1]]
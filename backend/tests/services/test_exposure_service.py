@@ -0,0 +1,136 @@
+# backend/tests/services/test_exposure_service.py
+
+import uuid
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import exposure
+from backend.core.exposure import OTHER_HOLDINGS, UNCLASSIFIED_SECTOR, look_through, make_breakdown
+from backend.crud import etf_holdings as crud_etf_holdings
+from backend.crud import position as crud_position
+from backend.schemas.market_data import (
+    ETFAttributes, ETFBasics, ETFHolding, ETFHoldingDetails, ETFOutput, ETFSignature,
+    MarketPrice, MarketPriceStatus, SectorWeight
+)
+from backend.services import accounting_service, exposure_service
+from backend.services.market_data_providers.cache_backends import LRUCache
+from backend.services.market_data_service import MARKET_DATA_PROVIDER, MarketDataService
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+KERNELS = [False] + ([True] if exposure.np is not None else [])
+
+
+class FakeHoldingsProvider:
+    """Serves fixed holdings per symbol; counts calls across instances."""
+    calls = []
+
+    def __init__(self, funds):
+        self.funds = funds
+
+    async def get_etf_holdings(self, ticker, date_from=None, date_to=None):
+        FakeHoldingsProvider.calls.append(ticker)
+        fund = self.funds.get(ticker)
+        if fund is None:
+            return None
+        holdings, sectors = fund
+        return ETFHoldingDetails(
+            basics=ETFBasics(ticker=ticker, name=f"{ticker} Fund", exchange="ARCX"),
+            output=ETFOutput(
+                attributes=ETFAttributes(aum=1e9, expense_ratio=0.1, shares_outstanding=1e7, nav=100.0),
+                signature=ETFSignature(sector_weights=[SectorWeight(sector=s, weight=w) for s, w in sectors]),
+                holdings=[ETFHolding(ticker=t, name=f"{t} Inc", weight=w, shares=0, market_value=0.0) for t, w in holdings]
+            )
+        )
+
+    async def aclose(self):
+        pass
+
+
+def test_breakdown_normalizes_percentages_and_keeps_the_residual():
+    tickers, weights, sectors, sector_weights = make_breakdown([("aapl", 6.0), ("MSFT", 4.0), ("AAPL", 10.0)], [("Technology", 80.0)])
+    assert tickers == ("AAPL", "MSFT", OTHER_HOLDINGS)
+    assert weights == pytest.approx((0.16, 0.04, 0.80))
+    assert sectors == ("Technology", UNCLASSIFIED_SECTOR) and sector_weights == pytest.approx((0.8, 0.2))
+    assert make_breakdown([], [("Technology", 1.0)]) is None
+
+
+@pytest.mark.parametrize("use_numpy", KERNELS)
+def test_look_through_merges_funds_with_direct_positions(use_numpy):
+    breakdowns = {
+        "SPY": make_breakdown([("AAPL", 0.5), ("MSFT", 0.5)], [("Technology", 1.0)]),
+        "QQQ": make_breakdown([("AAPL", 0.25)], [("Technology", 0.5), ("Consumer", 0.5)]),
+    }
+    by_ticker, by_sector = look_through([("SPY", 1000.0), ("QQQ", 400.0), ("AAPL", 300.0), ("XOM", 100.0)], breakdowns, use_numpy=use_numpy)
+    assert by_ticker["AAPL"] == pytest.approx((300.0, 600.0))
+    assert by_ticker["MSFT"] == pytest.approx((0.0, 500.0))
+    assert by_ticker[OTHER_HOLDINGS] == pytest.approx((0.0, 300.0))
+    assert by_ticker["XOM"] == pytest.approx((100.0, 0.0))
+    assert "SPY" not in by_ticker
+    assert by_sector == pytest.approx({"Technology": 1200.0, "Consumer": 200.0, UNCLASSIFIED_SECTOR: 400.0})
+    assert sum(sum(values) for values in by_ticker.values()) == pytest.approx(1800.0)
+
+
+@pytest.mark.asyncio
+async def test_report_expands_etfs_and_caches_holdings(db_session: AsyncSession, monkeypatch):
+    suffix = uuid.uuid4().hex[:4].upper()
+    etf_symbol, stock_symbol = f"EX{suffix}", f"SX{suffix}"
+    creator = await create_test_user(db_session, email=f"exposure_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|exposure_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Exposure Fund")
+    for symbol, quantity in ((etf_symbol, "10"), (stock_symbol, "5")):
+        asset = await create_test_stock_asset_via_crud(db_session, symbol=symbol, name=f"{symbol} Corp")
+        await crud_position.create_position(db=db_session, position_data={
+            "fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal(quantity), "average_cost_basis": Decimal("1")
+        })
+
+    async def fake_quotes(db, asset_ids, valuation_date):
+        return {asset_id: MarketPrice(asset_id=asset_id, price=Decimal("100"), status=MarketPriceStatus.OK, as_of=valuation_date) for asset_id in asset_ids}
+
+    funds = {etf_symbol: ([(stock_symbol, 30.0), ("ZZTOP", 50.0)], [("Technology", 60.0), ("Energy", 40.0)])}
+    FakeHoldingsProvider.calls = []
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", fake_quotes)
+    provider = FakeHoldingsProvider(funds)
+    monkeypatch.setattr(exposure_service, "_breakdowns", LRUCache(100))
+
+    report = await exposure_service.get_club_exposure_report(db_session, club_id=club.id, valuation_date=date.today(), provider=provider)
+    assert report["total_market_value"] == Decimal("1500.00")
+    by_ticker = {row["ticker"]: row for row in report["by_ticker"]}
+    assert by_ticker[stock_symbol]["direct_value"] == Decimal("500.00")
+    assert by_ticker[stock_symbol]["look_through_value"] == Decimal("300.00")
+    assert by_ticker[stock_symbol]["name"] == f"{stock_symbol} Corp" # Asset name wins over the provider's
+    assert by_ticker["ZZTOP"]["total_value"] == Decimal("500.00") and by_ticker["ZZTOP"]["name"] == "ZZTOP Inc"
+    assert by_ticker[OTHER_HOLDINGS]["total_value"] == Decimal("200.00")
+    assert etf_symbol not in by_ticker
+    assert report["by_ticker"][0]["ticker"] == stock_symbol and report["by_ticker"][0]["weight"] == pytest.approx(800 / 1500)
+    assert {row["sector"]: row["value"] for row in report["by_sector"]} == {
+        "Technology": Decimal("600.00"), "Energy": Decimal("400.00"), UNCLASSIFIED_SECTOR: Decimal("500.00")
+    }
+    assert [(etf["symbol"], etf["holdings_count"]) for etf in report["etfs"]] == [(etf_symbol, 2)]
+    assert sorted(FakeHoldingsProvider.calls) == sorted([etf_symbol, stock_symbol])
+
+    # Both answers are stored, the plain stock as an empty entry
+    rows = await crud_etf_holdings.get_etf_holdings_rows(db_session, symbols=[etf_symbol, stock_symbol])
+    assert len(rows[etf_symbol].holdings) == 2 and rows[stock_symbol].holdings == []
+
+    # Warm: no provider calls, from memory and then from the table
+    await exposure_service.get_club_exposure_report(db_session, club_id=club.id, valuation_date=date.today(), provider=provider)
+    monkeypatch.setattr(exposure_service, "_breakdowns", LRUCache(100))
+    again = await exposure_service.get_club_exposure_report(db_session, club_id=club.id, valuation_date=date.today(), provider=provider)
+    assert again["by_ticker"] == report["by_ticker"]
+    assert len(FakeHoldingsProvider.calls) == 2
+
+
+def test_holdings_provider_is_the_app_scoped_one_or_none(monkeypatch):
+    service = MarketDataService(provider=FakeHoldingsProvider({}))
+    monkeypatch.setattr(exposure_service, "ETF_HOLDINGS_PROVIDER", MARKET_DATA_PROVIDER)
+    assert exposure_service.resolve_holdings_provider(service) is service.provider
+    # Unknown providers are reported once at startup instead of failing every report
+    monkeypatch.setattr(exposure_service, "ETF_HOLDINGS_PROVIDER", "no_such_provider")
+    assert exposure_service.resolve_holdings_provider(service) is None
+    assert exposure_service.resolve_holdings_provider(None) is None
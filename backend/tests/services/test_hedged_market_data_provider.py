@@ -0,0 +1,156 @@
+# backend/tests/services/test_hedged_market_data_provider.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.core.single_flight import SingleFlight
+from backend.services.market_data_interface import MarketDataRateLimitError, MarketDataUnavailableError
+from backend.services.market_data_providers import hedged_provider
+from backend.services.market_data_providers.hedged_provider import HedgedMarketDataProvider, LatencyHistogram
+from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+
+
+class ScriptedProvider:
+    """Answers get_equity_quote after `delay` seconds with `answer`, or raises `error`."""
+
+    def __init__(self, answer="quote", delay=0.0, error=None):
+        self.answer = answer
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_equity_quote(self, symbol, exchange=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return self.answer
+
+    async def aclose(self):
+        pass
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.95) is None
+    for _ in range(95):
+        histogram.observe(0.02)
+    for _ in range(5):
+        histogram.observe(2.0)
+    assert 0.01 <= histogram.percentile(0.50) <= 0.025
+    assert histogram.percentile(0.95) <= 0.025
+    assert 1.0 <= histogram.percentile(0.99) <= 2.5
+
+
+def test_latency_histogram_decays():
+    histogram = LatencyHistogram(decay_every=10)
+    for _ in range(10):
+        histogram.observe(0.02)
+    assert histogram.total == 5
+    assert histogram.samples == 10
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(monkeypatch):
+    monkeypatch.setattr(hedged_provider, "MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS", 0.2)
+    primary, secondary = ScriptedProvider("primary"), ScriptedProvider("secondary")
+    provider = HedgedMarketDataProvider([("primary", primary), ("secondary", secondary)])
+
+    assert await provider.hedged_call("get_equity_quote", "AAPL") == ("primary", "primary")
+    assert secondary.calls == 0
+    assert provider.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_after_its_delay(monkeypatch):
+    monkeypatch.setattr(hedged_provider, "MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    primary, secondary = ScriptedProvider("primary", delay=1.0), ScriptedProvider("secondary", delay=0.01)
+    provider = HedgedMarketDataProvider([("primary", primary), ("secondary", secondary)])
+
+    started = asyncio.get_running_loop().time()
+    assert await provider.get_equity_quote("AAPL") == "secondary"
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert provider.hedges == 1
+    assert primary.cancelled == 1 # The losing call is cancelled
+    stats = provider.latency_stats()["providers"]
+    assert stats["secondary"]["hedged_wins"] == 1
+    assert stats["primary"]["latency"]["samples"] == 1 # Recorded as a lower bound
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_observed_p95(monkeypatch):
+    monkeypatch.setattr(hedged_provider, "MARKET_DATA_HEDGE_MIN_SAMPLES", 20)
+    health = hedged_provider.ProviderHealth("primary")
+    assert health.hedge_delay() == hedged_provider.MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS
+    for _ in range(20):
+        health.record_success(0.2)
+    assert 0.1 <= health.hedge_delay() <= 0.25
+
+
+@pytest.mark.asyncio
+async def test_failures_and_empty_answers_fall_through():
+    failing = ScriptedProvider(error=MarketDataUnavailableError())
+    empty = ScriptedProvider(answer=None)
+    good = ScriptedProvider("good")
+    provider = HedgedMarketDataProvider([("failing", failing), ("empty", empty), ("good", good)])
+    assert await provider.hedged_call("get_equity_quote", "AAPL") == ("good", "good")
+
+    only_empty = HedgedMarketDataProvider([("failing", ScriptedProvider(error=MarketDataUnavailableError())), ("empty", ScriptedProvider(answer=None))])
+    assert await only_empty.get_equity_quote("AAPL") is None
+
+    all_failing = HedgedMarketDataProvider([("a", ScriptedProvider(error=MarketDataUnavailableError())), ("b", ScriptedProvider(error=MarketDataRateLimitError()))])
+    with pytest.raises(MarketDataRateLimitError):
+        await all_failing.get_equity_quote("AAPL")
+    assert all_failing.latency_stats()["providers"]["b"]["errors"] == {"rate_limited": 1}
+
+
+@pytest.mark.asyncio
+async def test_degraded_provider_is_routed_around(monkeypatch):
+    monkeypatch.setattr(hedged_provider, "PROVIDER_DEGRADED_COOLDOWN_SECONDS", 60)
+    broken, backup = ScriptedProvider(error=MarketDataUnavailableError()), ScriptedProvider("backup")
+    provider = HedgedMarketDataProvider([("broken", broken), ("backup", backup)])
+
+    for _ in range(hedged_provider.PROVIDER_DEGRADED_MIN_CALLS):
+        assert await provider.get_equity_quote("AAPL") == "backup"
+    assert provider.latency_stats()["providers"]["broken"]["degraded"] is True
+
+    calls_before = broken.calls
+    assert await provider.get_equity_quote("AAPL") == "backup"
+    assert broken.calls == calls_before # Backup is now tried first and answers
+
+
+@pytest.mark.asyncio
+async def test_losing_leg_on_a_shared_provider_keeps_coalesced_callers(monkeypatch):
+    """Test cancelling the losing leg does not fail another request coalesced onto the same upstream call."""
+    monkeypatch.setenv("MARKETSTACK_API_KEY", "test-key")
+    monkeypatch.setattr(hedged_provider, "MARKET_DATA_HEDGE_DEFAULT_DELAY_SECONDS", 0.02)
+    requests = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"data": {
+            "symbol": "AAPL", "date": "2024-03-15T00:00:00+0000", "open": 170.0, "high": 171.0, "low": 169.0,
+            "close": 170.5, "adj_close": 170.5, "volume": 100, "exchange": "XNAS", "name": "Apple"
+        }})
+
+    # Shared like the app-scoped provider: the hedged legs and other requests use the same adapter
+    shared = MarketStackAdapter(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), single_flight=SingleFlight())
+    provider = HedgedMarketDataProvider([("marketstack", shared), ("secondary", ScriptedProvider("secondary", delay=0.05))], close_providers=False)
+
+    hedged = asyncio.ensure_future(provider.hedged_call("get_equity_quote", "AAPL"))
+    await asyncio.sleep(0.01) # The primary leg has started the upstream call
+    follower = asyncio.ensure_future(shared.get_equity_quote("AAPL"))
+    assert await hedged == ("secondary", "secondary")
+    quote = await follower
+    assert quote is not None and quote.price == 170.5
+    assert requests == 1
+    await shared.aclose()
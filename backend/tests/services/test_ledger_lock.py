@@ -0,0 +1,117 @@
+# backend/tests/services/test_ledger_lock.py
+
+import asyncio
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.core import ledger_lock
+from backend.crud import club_membership as crud_membership
+from backend.crud import member_transaction as crud_mem_tx
+from backend.crud import unit_value_history as crud_unit_value
+from backend.models import Club, ClubMembership, MemberTransaction, UnitValueHistory, User
+from backend.models.enums import ClubRole, MemberTransactionType
+from backend.schemas import MemberTransactionCreate
+from backend.services import accounting_service
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+
+CLUBS = 2
+MEMBERS_PER_CLUB = 5
+OPERATIONS = 500
+
+
+@pytest.mark.asyncio
+async def test_lock_is_reentrant_and_released_with_the_transaction(db_session: AsyncSession):
+    club_id = uuid.uuid4()
+    await ledger_lock.lock_club_ledger(db_session, club_id)
+    await ledger_lock.lock_club_ledger(db_session, club_id) # Already held: no second wait
+    assert ledger_lock._local_locks[club_id].locked()
+    await db_session.rollback()
+    assert club_id not in ledger_lock._local_locks or not ledger_lock._local_locks[club_id].locked()
+
+
+@pytest.mark.asyncio
+async def test_parallel_deposits_and_withdrawals_reconcile(async_test_db_url: str, async_engine_test: AsyncEngine):
+    # Committed data and real concurrency: a pooled engine like the app's, not the rolled-back db_session
+    engine = create_async_engine(async_test_db_url, pool_size=20, max_overflow=0, pool_timeout=120)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    user_ids, club_ids = [], []
+    try:
+        async with session_factory() as db:
+            members = []
+            for _ in range(CLUBS):
+                users = [
+                    await create_test_user(db, email=f"ledger_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|ledger_{uuid.uuid4()}")
+                    for _ in range(MEMBERS_PER_CLUB)
+                ]
+                club = await create_test_club_via_crud(db, creator=users[0], name=f"Ledger Club {uuid.uuid4().hex[:6]}")
+                await crud_unit_value.create_unit_value_history(db=db, uvh_data={
+                    "club_id": club.id, "valuation_date": date.today() - timedelta(days=1), "total_club_value": Decimal("0"),
+                    "total_units_outstanding": Decimal("0"), "unit_value": Decimal("10")
+                })
+                for user in users:
+                    await crud_membership.create_club_membership(db=db, membership_data={"user_id": user.id, "club_id": club.id, "role": ClubRole.Member})
+                    members.append((user.id, club.id))
+                user_ids += [user.id for user in users]
+                club_ids.append(club.id)
+            await db.commit()
+
+        rng = random.Random(25)
+        outcomes = {"ok": 0, "rejected": 0}
+
+        async def run(user_id, club_id, tx_type, amount):
+            schema = MemberTransactionCreate(
+                user_id=user_id, club_id=club_id, transaction_type=tx_type, amount=amount, transaction_date=datetime.now(timezone.utc)
+            )
+            process = accounting_service.process_member_deposit if tx_type == MemberTransactionType.DEPOSIT else accounting_service.process_member_withdrawal
+            async with session_factory() as db:
+                try:
+                    await (process(db=db, deposit_in=schema) if tx_type == MemberTransactionType.DEPOSIT else process(db=db, withdrawal_in=schema))
+                    await db.commit()
+                    outcomes["ok"] += 1
+                except HTTPException as e:
+                    assert e.status_code == 400, e.detail # Only overdrafts may be refused
+                    await db.rollback()
+                    outcomes["rejected"] += 1
+
+        # Withdrawals are larger than deposits, so members keep running out of units
+        # return_exceptions: every session has finished before the cleanup below, even on failure
+        errors = [result for result in await asyncio.gather(*(
+            run(*rng.choice(members), *rng.choice([(MemberTransactionType.DEPOSIT, Decimal("100.00")), (MemberTransactionType.WITHDRAWAL, Decimal("150.00"))]))
+            for _ in range(OPERATIONS)
+        ), return_exceptions=True) if result is not None]
+        assert not errors, errors[:3]
+        assert outcomes["ok"] + outcomes["rejected"] == OPERATIONS and outcomes["ok"] > 0
+
+        async with session_factory() as db:
+            ledger = (await db.execute(
+                select(ClubMembership.club_id, func.sum(MemberTransaction.amount * func.sign(MemberTransaction.units_transacted)), func.sum(MemberTransaction.units_transacted))
+                .join(MemberTransaction, MemberTransaction.membership_id == ClubMembership.id)
+                .where(ClubMembership.club_id.in_(club_ids))
+                .group_by(ClubMembership.club_id)
+            )).all()
+            clubs = {club.id: club for club in (await db.execute(select(Club).where(Club.id.in_(club_ids)))).scalars()}
+            assert len(ledger) == CLUBS
+            for club_id, net_cash, net_units in ledger:
+                assert clubs[club_id].bank_account_balance == net_cash >= 0
+                assert clubs[club_id].total_units_outstanding == net_units
+            balances = (await db.execute(select(ClubMembership.unit_balance).where(ClubMembership.club_id.in_(club_ids)))).scalars().all()
+            assert min(balances) >= 0 # No withdrawal redeemed units another one had already taken
+            assert await crud_mem_tx.reconcile_unit_balances(db, club_ids=club_ids) == {"memberships": [], "clubs": []}
+    finally:
+        async with session_factory() as db:
+            membership_ids = select(ClubMembership.id).where(ClubMembership.club_id.in_(club_ids)).scalar_subquery()
+            await db.execute(delete(MemberTransaction).where(MemberTransaction.membership_id.in_(membership_ids)))
+            await db.execute(delete(ClubMembership).where(ClubMembership.club_id.in_(club_ids)))
+            await db.execute(delete(UnitValueHistory).where(UnitValueHistory.club_id.in_(club_ids)))
+            await db.execute(delete(Club).where(Club.id.in_(club_ids)))
+            await db.execute(delete(User).where(User.id.in_(user_ids)))
+            await db.commit()
+        await engine.dispose()
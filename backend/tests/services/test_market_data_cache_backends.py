@@ -0,0 +1,114 @@
+# backend/tests/services/test_market_data_cache_backends.py
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from backend.schemas.market_data import EquityQuote, ETFTicker, HistoricalPricePoint
+from backend.services.market_data_providers.cache_backends import (
+    MISSING, RedisCacheBackend, decode_value, encode_value
+)
+from backend.services.market_data_providers.cached_provider import CachedMarketDataProvider
+
+TIMESTAMP = datetime(2024, 3, 15, tzinfo=timezone.utc)
+
+
+class InMemoryRedis:
+    """Stand-in for redis.asyncio.Redis covering the commands the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+
+    async def get(self, name):
+        return self.data.get(name)
+
+    async def mget(self, names):
+        return [self.data.get(name) for name in names]
+
+    async def set(self, name, value, ex=None):
+        assert isinstance(value, bytes)
+        self.data[name] = value
+        self.expiries[name] = ex
+
+    async def aclose(self):
+        pass
+
+
+class DownRedis(InMemoryRedis):
+    """Stand-in that fails every command like an unreachable server."""
+
+    async def get(self, name):
+        raise RedisConnectionError("connection refused")
+
+    async def mget(self, names):
+        raise RedisConnectionError("connection refused")
+
+    async def set(self, name, value, ex=None):
+        raise RedisConnectionError("connection refused")
+
+
+def _quote(symbol: str) -> EquityQuote:
+    return EquityQuote(
+        symbol=symbol, name=symbol, exchange="XNAS", price=10.0, change=0.0, percent_change=0.0, volume=1,
+        timestamp=TIMESTAMP, open=10.0, high=10.0, low=10.0, adj_open=10.0, adj_close=10.0,
+        asset_type="Stock", price_currency="usd"
+    )
+
+
+def test_encode_decode_round_trip():
+    """Test models, lists and dicts survive serialization and lists are stored column-wise."""
+    points = [
+        HistoricalPricePoint(
+            date=TIMESTAMP, open=float(i), high=1.0, low=1.0, close=1.0, volume=1, adj_high=1.0, adj_low=1.0,
+            adj_open=1.0, adj_close=1.0, adj_volume=1, split_factor=1.0, dividend=0.0, symbol="AAPL",
+            exchange="XNAS", name="Apple", asset_type="Stock", price_currency="usd"
+        )
+        for i in range(50)
+    ]
+    quotes = {"AAPL": _quote("AAPL"), "MSFT": _quote("MSFT")}
+
+    encoded_points = encode_value(points)
+    assert encoded_points[:1] == b"z"  # Large payloads are compressed
+    assert decode_value(encoded_points) == points
+    assert decode_value(encode_value(quotes)) == quotes
+    assert decode_value(encode_value(ETFTicker(ticker="SPY"))) == ETFTicker(ticker="SPY")
+    with pytest.raises(TypeError):
+        encode_value({"not": "a model"})
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_shared_between_providers():
+    """Test two workers' providers share quotes through Redis, namespaced by provider."""
+    redis_client = InMemoryRedis()
+    upstream_a = AsyncMock()
+    upstream_a.get_equity_quote.side_effect = lambda symbol, exchange: _quote(symbol)
+    upstream_b = AsyncMock()
+    worker_a = CachedMarketDataProvider(upstream_a, cache=RedisCacheBackend(redis_client), namespace="marketstack")
+    worker_b = CachedMarketDataProvider(upstream_b, cache=RedisCacheBackend(redis_client), namespace="marketstack")
+
+    await worker_a.get_equity_quote("AAPL")
+    quote = await worker_b.get_equity_quote("AAPL")
+
+    assert quote == _quote("AAPL")
+    upstream_b.get_equity_quote.assert_not_awaited()
+    assert redis_client.expiries == {"marketdata:marketstack:equity_quote:AAPL:": 60}
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_falls_back_to_memory_when_unreachable():
+    """Test an unreachable Redis degrades to the in-process cache instead of failing."""
+    backend = RedisCacheBackend(DownRedis())
+    upstream = AsyncMock()
+    upstream.get_equity_quote.side_effect = lambda symbol, exchange: _quote(symbol)
+    provider = CachedMarketDataProvider(upstream, cache=backend)
+
+    await provider.get_equity_quote("AAPL")
+    await provider.get_equity_quote("AAPL")
+
+    assert upstream.get_equity_quote.await_count == 1
+    stats = provider.cache_stats()
+    assert stats["errors"] == 1
+    assert stats["fallback_active"] is True
+    assert await backend.get_many(["missing"]) == [MISSING]
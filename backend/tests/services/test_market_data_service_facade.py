@@ -0,0 +1,97 @@
+# backend/tests/services/test_market_data_service_facade.py
+import pytest
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from backend.api.dependencies import get_market_data_service
+from backend.core.price_series import PriceSeries, parse_eod_records
+from backend.schemas.market_data import EquityQuote, ForexQuote
+from backend.services.market_data_service import MarketDataService
+from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+from backend.services.market_data_providers.hedged_provider import build_hedged_provider
+
+TIMESTAMP = datetime(2024, 3, 15, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_get_stock_quote_maps_equity_quote():
+    """Test the facade maps the provider's EquityQuote to a StockQuote."""
+    provider = AsyncMock()
+    provider.get_equity_quote.return_value = EquityQuote(
+        symbol="AAPL", name="Apple", exchange="XNAS", price=170.5, change=1.0, percent_change=0.5,
+        volume=1000, timestamp=TIMESTAMP, open=169.0, high=171.0, low=168.0, adj_open=169.0,
+        adj_close=170.5, asset_type="Stock", price_currency="usd"
+    )
+    service = MarketDataService(provider=provider)
+
+    quote = await service.get_stock_quote("AAPL")
+
+    assert quote.symbol == "AAPL"
+    assert quote.price == 170.5
+    provider.get_equity_quote.assert_awaited_once_with("AAPL")
+
+
+@pytest.mark.asyncio
+async def test_get_stock_historical_data_maps_price_series():
+    """Test the facade builds StockHistoricalData from a PriceSeries and defaults the date range."""
+    provider = AsyncMock()
+    provider.get_price_series.return_value = parse_eod_records([
+        {"symbol": "AAPL", "date": "2024-03-15T00:00:00+0000", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5,
+         "volume": 10, "exchange": "XNAS", "name": "Apple"}
+    ])["AAPL"]
+    service = MarketDataService(provider=provider)
+
+    data = await service.get_stock_historical_data("AAPL", to_date=date(2024, 3, 31))
+
+    assert data.exchange == "XNAS"
+    assert data.data[0].date == date(2024, 3, 15)
+    assert data.data[0].close == 1.5
+    provider.get_price_series.assert_awaited_once_with("AAPL", date(2024, 3, 1), date(2024, 3, 31))
+
+    provider.get_price_series.return_value = PriceSeries("AAPL")
+    assert await service.get_stock_historical_data("AAPL") is None
+
+
+@pytest.mark.asyncio
+async def test_get_forex_rate_maps_forex_quote():
+    """Test the facade maps the provider's ForexQuote to a ForexRate."""
+    provider = AsyncMock()
+    provider.get_forex_quote.return_value = ForexQuote(base_currency="EUR", quote_currency="USD", rate=1.09, timestamp=TIMESTAMP)
+    service = MarketDataService(provider=provider)
+
+    rate = await service.get_forex_rate("EUR", "USD")
+
+    assert rate.rate == 1.09
+    provider.get_forex_quote.assert_awaited_once_with("EUR", "USD")
+
+
+@pytest.mark.asyncio
+async def test_market_data_service_dependency_is_app_scoped(monkeypatch):
+    """Test every request gets the same service and closing it closes the pooled client."""
+    monkeypatch.setenv("MARKETSTACK_API_KEY", "test-key")
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+    first = get_market_data_service(request)
+    second = get_market_data_service(request)
+
+    assert first is second
+    assert isinstance(first.provider.provider, MarketStackAdapter)
+    await first.aclose()
+    assert first.provider.provider.client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_hedged_price_provider_shares_the_services_providers(monkeypatch):
+    """Test the NAV price provider reuses the app-scoped providers and leaves closing them to the service."""
+    monkeypatch.setenv("MARKETSTACK_API_KEY", "test-key")
+    service = MarketDataService()
+
+    hedged = build_hedged_provider(["marketstack", "synthetic"], get_provider=service.get_provider)
+
+    assert hedged.providers[0][1] is service.provider
+    assert hedged.providers[1][1] is service.get_provider("synthetic")
+    await hedged.aclose()
+    assert not service.provider.provider.client.is_closed
+    await service.aclose()
+    assert service.provider.provider.client.is_closed
@@ -0,0 +1,276 @@
+# backend/tests/services/test_marketstack_adapter.py
+import asyncio
+import pytest
+from datetime import date, timedelta
+
+import httpx
+from fastapi import HTTPException
+
+from backend.services.market_data_interface import MarketDataProviderError, MarketDataRateLimitError, MarketDataUnavailableError
+from backend.services.market_data_providers import marketstack_adapter
+from backend.services.market_data_providers.marketstack_adapter import MarketStackAdapter
+
+
+def _eod_record(symbol: str, day: str, close: float) -> dict:
+    return {"symbol": symbol, "date": f"{day}T00:00:00+0000", "open": close, "high": close, "low": close,
+            "close": close, "adj_close": close, "volume": 100, "exchange": "XNAS", "name": symbol}
+
+
+def _adapter_with_handler(monkeypatch, handler) -> MarketStackAdapter:
+    """Create a MarketStack adapter whose HTTP client is routed through a MockTransport."""
+    monkeypatch.setenv("MARKETSTACK_API_KEY", "test-key")
+    adapter = MarketStackAdapter()
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return adapter
+
+
+@pytest.mark.asyncio
+async def test_marketstack_get_equity_quotes_chunks_symbols(monkeypatch):
+    """Test bulk quotes are split into provider-sized chunks and merged."""
+    monkeypatch.setattr(marketstack_adapter, "MAX_SYMBOLS_PER_REQUEST", 2)
+    requested_chunks = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/eod/latest")
+        chunk = request.url.params["symbols"].split(",")
+        requested_chunks.append(chunk)
+        # The provider has no data for MISSING
+        return httpx.Response(200, json={"data": [_eod_record(s, "2024-03-15", 10.0 + i) for i, s in enumerate(chunk) if s != "MISSING"]})
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    quotes = await adapter.get_equity_quotes(["aapl", "MSFT", "AAPL", "GOOG", "MISSING"])
+
+    assert sorted(requested_chunks) == [["AAPL", "MSFT"], ["GOOG", "MISSING"]]
+    assert set(quotes) == {"AAPL", "MSFT", "GOOG"}
+    assert quotes["MSFT"].price == 11.0
+
+
+@pytest.mark.asyncio
+async def test_marketstack_get_historical_price_data_bulk_paginates(monkeypatch):
+    """Test bulk history follows limit/offset pagination and groups points by symbol."""
+    records = [
+        _eod_record(symbol, f"2024-03-{day:02d}", float(day))
+        for day in (11, 12, 13) for symbol in ("AAPL", "MSFT")
+    ]
+    monkeypatch.setattr(marketstack_adapter, "MAX_RESULTS_PER_PAGE", 4)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        limit = int(request.url.params["limit"])
+        page = records[offset:offset + limit]
+        return httpx.Response(200, json={"pagination": {"limit": limit, "offset": offset, "count": len(page), "total": len(records)}, "data": page})
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    series = await adapter.get_historical_price_data_bulk(["AAPL", "MSFT"], date(2024, 3, 11), date(2024, 3, 13))
+
+    assert [p.close for p in series["AAPL"]] == [11.0, 12.0, 13.0]
+    assert [p.close for p in series["MSFT"]] == [11.0, 12.0, 13.0]
+
+
+@pytest.mark.asyncio
+async def test_marketstack_concurrent_identical_requests_are_coalesced(monkeypatch):
+    """Test identical concurrent requests share one upstream call and its result."""
+    calls = 0
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return httpx.Response(200, json={"data": [_eod_record("AAPL", "2024-03-15", 10.0)]})
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    tasks = [asyncio.create_task(adapter._make_request("/eod/latest", {"symbols": s})) for s in ["AAPL", "aapl ", "AAPL"] * 10]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(r == results[0] for r in results)
+    assert adapter.single_flight.stats()["coalesced"] == 29
+
+
+@pytest.mark.asyncio
+async def test_marketstack_coalesced_requests_share_errors(monkeypatch):
+    """Test followers get the leader's error instead of issuing their own request."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_MAX_RETRIES", 0)
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(429)
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    results = await asyncio.gather(*(adapter._make_request("/eod/latest", {"symbols": "AAPL"}) for _ in range(5)), return_exceptions=True)
+
+    assert calls == 1
+    assert all(isinstance(r, HTTPException) and r.status_code == 429 for r in results)
+
+
+@pytest.mark.asyncio
+async def test_marketstack_retries_transient_failures(monkeypatch):
+    """Test 5xx responses and timeouts are retried with backoff until a success."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_BACKOFF_BASE_SECONDS", 0.01)
+    responses = iter(["timeout", 503, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        outcome = next(responses)
+        if outcome == "timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if outcome == 503:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"data": [_eod_record("AAPL", "2024-03-15", 10.0)]})
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    quote = await adapter.get_equity_quote("AAPL")
+
+    assert quote.price == 10.0
+
+
+@pytest.mark.asyncio
+async def test_marketstack_honors_retry_after(monkeypatch):
+    """Test a 429 with Retry-After waits for the given time, then succeeds."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_BACKOFF_BASE_SECONDS", 5)
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"data": []})
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    assert await adapter._make_request("/eod/latest", {"symbols": "AAPL"}) == {"data": []}
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_marketstack_errors_propagate_instead_of_empty_results(monkeypatch):
+    """Test exhausted retries raise typed errors rather than returning None/[]."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_MAX_RETRIES", 2)
+    calls = 0
+
+    def failing(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(502)
+
+    adapter = _adapter_with_handler(monkeypatch, failing)
+    with pytest.raises(MarketDataUnavailableError):
+        await adapter.get_historical_price_data("AAPL", date(2024, 3, 1), date(2024, 3, 15))
+    assert calls == 3
+
+    # A Retry-After beyond the call's deadline fails fast as rate limited
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_REQUEST_DEADLINE_SECONDS", 1)
+    adapter = _adapter_with_handler(monkeypatch, lambda request: httpx.Response(429, headers={"Retry-After": "120"}))
+    with pytest.raises(MarketDataRateLimitError):
+        await adapter.get_equity_quotes(["AAPL"])
+
+
+@pytest.mark.asyncio
+async def test_marketstack_client_errors_are_not_truncated_to_partial_results(monkeypatch):
+    """Test a 4xx on a later page or a malformed record fails bulk calls; an unknown single symbol is still None."""
+    start = date(2015, 1, 1)
+    records = [_eod_record("AAPL", (start + timedelta(days=i)).isoformat(), float(i)) for i in range(300)]
+    pages = _paginated_handler(records, page_limit=100)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/tickers/NOPE/eod/latest"):
+            return httpx.Response(404, json={"error": {"code": "not_found"}})
+        if request.url.path.endswith("/eod/latest"):
+            return httpx.Response(200, json={"data": [{"symbol": "AAPL", "date": "not a date"}]})
+        if int(request.url.params.get("offset", "0")) == 200:
+            return httpx.Response(403, json={"error": {"code": "function_access_restricted"}})
+        return pages(request)
+
+    adapter = _adapter_with_handler(monkeypatch, handler)
+    with pytest.raises(MarketDataProviderError) as error:
+        await adapter.get_historical_price_data_bulk(["AAPL"], start, start + timedelta(days=299))
+    assert error.value.status_code == 403
+    with pytest.raises(MarketDataProviderError):
+        await adapter.get_historical_price_data("AAPL", start, start + timedelta(days=299))
+    with pytest.raises(MarketDataProviderError):
+        await adapter.get_equity_quotes(["AAPL"])
+    assert await adapter.get_equity_quote("NOPE") is None
+
+
+@pytest.mark.asyncio
+async def test_marketstack_token_bucket_paces_requests(monkeypatch):
+    """Test requests beyond the burst wait for the bucket, and give up at the deadline."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_CALLS_PER_MINUTE", 60)
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_BURST", 1)
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_REQUEST_DEADLINE_SECONDS", 0.2)
+    adapter = _adapter_with_handler(monkeypatch, lambda request: httpx.Response(200, json={"data": []}))
+
+    await adapter._make_request("/eod/latest", {"symbols": "AAPL"})
+    with pytest.raises(MarketDataRateLimitError):
+        await adapter._make_request("/eod/latest", {"symbols": "MSFT"})
+
+
+def _paginated_handler(records, page_limit, tracker=None):
+    """Serve `records` from /eod honoring limit/offset, capping pages at `page_limit` like the provider."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params["offset"])
+        limit = min(int(request.url.params["limit"]), page_limit)
+        if tracker is not None:
+            tracker["in_flight"] += 1
+            tracker["max_in_flight"] = max(tracker["max_in_flight"], tracker["in_flight"])
+            await asyncio.sleep(0.01)
+            tracker["in_flight"] -= 1
+        page = records[offset:offset + limit]
+        return httpx.Response(200, json={"pagination": {"limit": limit, "offset": offset, "count": len(page), "total": len(records)}, "data": page})
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_marketstack_historical_walks_all_pages(monkeypatch):
+    """Test ranges longer than one page are fetched completely, with bounded concurrency."""
+    monkeypatch.setattr(marketstack_adapter, "MARKETSTACK_PAGE_FAN_OUT", 2)
+    start = date(2015, 1, 1)
+    records = [_eod_record("AAPL", (start + timedelta(days=i)).isoformat(), float(i)) for i in range(1050)]
+    tracker = {"in_flight": 0, "max_in_flight": 0}
+
+    adapter = _adapter_with_handler(monkeypatch, _paginated_handler(records, page_limit=100, tracker=tracker))
+    points = await adapter.get_historical_price_data("AAPL", start, start + timedelta(days=1049))
+
+    assert len(points) == 1050
+    assert [p.close for p in points] == [float(i) for i in range(1050)]
+    assert tracker["max_in_flight"] == 2
+
+
+@pytest.mark.asyncio
+async def test_marketstack_historical_stream_stops_early(monkeypatch):
+    """Test a consumer can stop the stream after the first page without errors."""
+    start = date(2015, 1, 1)
+    records = [_eod_record("AAPL", (start + timedelta(days=i)).isoformat(), float(i)) for i in range(500)]
+    adapter = _adapter_with_handler(monkeypatch, _paginated_handler(records, page_limit=100))
+
+    stream = adapter.iter_historical_price_data("AAPL", start, start + timedelta(days=499))
+    first_points = []
+    async for point in stream:
+        first_points.append(point)
+        if len(first_points) == 100:
+            break
+    await stream.aclose()
+
+    assert [p.close for p in first_points] == [float(i) for i in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_marketstack_price_series_bulk_parses_pages(monkeypatch):
+    """Test bulk price series are filled from all pages, sorted, with empty series for symbols without data."""
+    start = date(2024, 1, 1)
+    records = [
+        _eod_record(symbol, (start + timedelta(days=i)).isoformat(), float(i))
+        for i in range(150) for symbol in ("AAPL", "MSFT")
+    ]
+    adapter = _adapter_with_handler(monkeypatch, _paginated_handler(records, page_limit=100))
+
+    series = await adapter.get_price_series_bulk(["AAPL", "MSFT", "NODATA"], start, start + timedelta(days=149))
+
+    assert len(series["AAPL"]) == 150
+    assert series["MSFT"].close.tolist() == [float(i) for i in range(150)]
+    assert len(series["NODATA"]) == 0
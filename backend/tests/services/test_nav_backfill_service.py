@@ -0,0 +1,99 @@
+# backend/tests/services/test_nav_backfill_service.py
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import asset_price as crud_asset_price
+from backend.crud import club_membership as crud_membership
+from backend.crud import member_transaction as crud_mem_tx
+from backend.crud import transaction as crud_transaction
+from backend.crud import unit_value_history as crud_unit_value
+from backend.models.enums import ClubRole, MemberTransactionType, TransactionType
+from backend.services import nav_backfill_service
+from backend.services.nav_backfill_service import replay_nav_series
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+
+def _at(day: int, hour: int = 14) -> datetime:
+    return datetime(2025, 6, day, hour, tzinfo=timezone.utc)
+
+
+def _tx(day, tx_type, asset_id=None, quantity=None, total=None, fees="0"):
+    return (_at(day), tx_type, asset_id, Decimal(quantity) if quantity else None, Decimal(total) if total else None, Decimal(fees))
+
+
+def test_replay_values_each_weekday_from_the_ledger():
+    stock, option, unpriced = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    club_id = uuid.uuid4()
+    transactions = [
+        _tx(3, TransactionType.BANK_TO_BROKERAGE, total="1800"),
+        _tx(4, TransactionType.BUY_STOCK, stock, "10", "500", fees="1"),
+        _tx(4, TransactionType.BUY_OPTION, option, "1", "520"),
+        _tx(5, TransactionType.BUY_STOCK, unpriced, "1", "10"),
+        _tx(5, TransactionType.DIVIDEND, stock, total="10"),
+        _tx(5, TransactionType.CLUB_EXPENSE, total="5"),
+        _tx(6, TransactionType.CLOSE_OPTION_SELL, option, "1", "1000", fees="1"),
+        _tx(9, TransactionType.ADJUSTMENT, total="999"),
+    ]
+    member_transactions = [
+        (_at(2), MemberTransactionType.DEPOSIT, Decimal("2000"), Decimal("200")),
+        (_at(6, 20), MemberTransactionType.WITHDRAWAL, Decimal("100"), Decimal("-4")),
+    ]
+    prices = [(date(2025, 6, 4), stock, Decimal("55")), (date(2025, 6, 6), stock, Decimal("60"))] # Thursday carries Wednesday's close
+    days = [date(2025, 6, d) for d in (2, 3, 4, 5, 6, 9)]
+
+    rows, replay = replay_nav_series(
+        club_id, transactions, member_transactions, prices, days,
+        options={option: (stock, 50.0, True)} # Call struck at 50: 100 x intrinsic per contract
+    )
+
+    assert [row["valuation_date"] for row in rows] == days
+    assert [row["total_club_value"] for row in rows] == [Decimal(v) for v in ("2000.00", "2000.00", "2029.00", "2024.00", "2473.00", "2473.00")]
+    assert [row["total_units_outstanding"] for row in rows] == [Decimal("200")] * 4 + [Decimal("196")] * 2
+    assert rows[0]["unit_value"] == Decimal("10.00000000")
+    assert rows[-1]["unit_value"] == (Decimal("2473") / Decimal("196")).quantize(Decimal("0.00000001"), rounding=ROUND_HALF_UP)
+    assert (replay.bank_cash, replay.brokerage_cash) == (Decimal("95"), Decimal("1778"))
+    assert replay.quantities[option] == 0 and replay.unpriced == {unpriced} and replay.skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_backfill_stores_series_from_stored_prices(db_session: AsyncSession):
+    creator = await create_test_user(db_session, email=f"navfill_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|navfill_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Backfill Fund")
+    asset = await create_test_stock_asset_via_crud(db_session, symbol=f"BF{uuid.uuid4().hex[:5].upper()}")
+    membership = await crud_membership.create_club_membership(db=db_session, membership_data={"user_id": creator.id, "club_id": club.id, "role": ClubRole.Admin})
+    await crud_mem_tx.create_member_transaction(db=db_session, member_tx_data={
+        "membership_id": membership.id, "transaction_type": MemberTransactionType.DEPOSIT, "amount": Decimal("1000"),
+        "transaction_date": datetime(2025, 1, 2, 15, tzinfo=timezone.utc), "unit_value_used": Decimal("10"), "units_transacted": Decimal("100")
+    })
+    for tx in (
+        {"transaction_type": TransactionType.BANK_TO_BROKERAGE, "fund_id": fund.id, "total_amount": Decimal("1000"), "transaction_date": datetime(2025, 1, 2, 16, tzinfo=timezone.utc)},
+        {"transaction_type": TransactionType.BUY_STOCK, "fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal("10"), "price_per_unit": Decimal("20"),
+         "total_amount": Decimal("200"), "transaction_date": datetime(2025, 1, 3, 15, tzinfo=timezone.utc)},
+    ):
+        await crud_transaction.create_transaction(db=db_session, transaction_data={"club_id": club.id, "fees_commissions": Decimal("0"), **tx})
+    await crud_asset_price.bulk_insert_asset_prices(db_session, price_rows=[
+        {"asset_id": asset.id, "price_date": date(2025, 1, 3), "close_price": Decimal("20"), "source": "test"}, # Before the range: carried in
+        {"asset_id": asset.id, "price_date": date(2025, 1, 8), "close_price": Decimal("30"), "source": "test"},
+    ])
+
+    summary = await nav_backfill_service.backfill_club_nav(db_session, club_id=club.id, start_date=date(2025, 1, 6), end_date=date(2025, 1, 8))
+    assert (summary["days"], summary["rows_written"], summary["transactions"], summary["member_transactions"]) == (3, 3, 2, 1)
+    stored = await crud_unit_value.get_unit_value_history_for_period(db_session, club_id=club.id, start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+    assert [(row.valuation_date.day, row.total_club_value, row.unit_value) for row in stored] == [
+        (6, Decimal("1000.00"), Decimal("10.00000000")), (7, Decimal("1000.00"), Decimal("10.00000000")), (8, Decimal("1100.00"), Decimal("11.00000000"))
+    ]
+
+    # Stored days are kept unless replaced; the default start is the first ledger date
+    summary = await nav_backfill_service.backfill_club_nav(db_session, club_id=club.id, end_date=date(2025, 1, 8))
+    assert (summary["start_date"], summary["days"], summary["rows_written"]) == (date(2025, 1, 2), 5, 2)
+    summary = await nav_backfill_service.backfill_club_nav(db_session, club_id=club.id, end_date=date(2025, 1, 8), replace=True)
+    assert summary["rows_written"] == 5
@@ -0,0 +1,131 @@
+# backend/tests/services/test_nav_batch_service.py
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import club_membership as crud_membership
+from backend.crud import member_transaction as crud_mem_tx
+from backend.crud import position as crud_position
+from backend.crud import unit_value_history as crud_unit_value
+from backend.models.enums import ClubRole, MemberTransactionType
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+from backend.services import accounting_service, nav_batch_service
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+VALUATION_DATE = date(2025, 6, 30)
+
+
+def _session_factory(db_session: AsyncSession, monkeypatch):
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    monkeypatch.setattr(db_session, "commit", db_session.flush) # Keep the test transaction open
+    return session_factory
+
+
+async def _club(db_session: AsyncSession, assets, units: str):
+    creator = await create_test_user(db_session, email=f"navrun_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|navrun_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Batch Fund")
+    for asset, quantity in assets:
+        await crud_position.create_position(db=db_session, position_data={
+            "fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal(quantity), "average_cost_basis": Decimal("1")
+        })
+    membership = await crud_membership.create_club_membership(db=db_session, membership_data={"user_id": creator.id, "club_id": club.id, "role": ClubRole.Admin})
+    await crud_mem_tx.create_member_transaction(db=db_session, member_tx_data={
+        "membership_id": membership.id, "transaction_type": MemberTransactionType.DEPOSIT, "amount": Decimal("100"),
+        "transaction_date": datetime.now(timezone.utc), "unit_value_used": Decimal("10"), "units_transacted": Decimal(units)
+    })
+    return club
+
+
+@pytest.mark.asyncio
+async def test_batch_prices_each_asset_once_and_records_each_club(db_session: AsyncSession, monkeypatch):
+    shared = await create_test_stock_asset_via_crud(db_session, symbol=f"NB{uuid.uuid4().hex[:5].upper()}")
+    unpriced = await create_test_stock_asset_via_crud(db_session, symbol=f"NU{uuid.uuid4().hex[:5].upper()}")
+    club_a = await _club(db_session, [(shared, "10")], units="10")
+    club_b = await _club(db_session, [(shared, "5"), (unpriced, "3")], units="20")
+    club_kept = await _club(db_session, [(shared, "1")], units="1")
+    await crud_unit_value.create_unit_value_history(db=db_session, uvh_data={
+        "club_id": club_kept.id, "valuation_date": VALUATION_DATE, "total_club_value": Decimal("1"),
+        "total_units_outstanding": Decimal("1"), "unit_value": Decimal("1")
+    })
+    missing_club_id = uuid.uuid4()
+
+    requested = []
+
+    async def fake_quotes(db, asset_ids, valuation_date):
+        requested.append(sorted(asset_ids))
+        return {
+            asset_id: MarketPrice(asset_id=asset_id, price=Decimal("20"), status=MarketPriceStatus.OK, as_of=valuation_date)
+            if asset_id == shared.id else MarketPrice(asset_id=asset_id, status=MarketPriceStatus.MISSING)
+            for asset_id in asset_ids
+        }
+
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", fake_quotes)
+    club_ids = [club_a.id, club_b.id, club_kept.id, missing_club_id]
+    session_factory = _session_factory(db_session, monkeypatch)
+    run = await nav_batch_service.run_nav_batch(VALUATION_DATE, club_ids=club_ids, max_concurrency=1, session_factory=session_factory)
+
+    assert requested == [sorted([shared.id, unpriced.id])] # One price request for all clubs
+    assert run["status"] == "finished"
+    assert await nav_batch_service.get_nav_run(run["run_id"], session_factory=session_factory) == run # Stored for any worker
+    assert (run["clubs_total"], run["clubs_done"], run["stored"], run["exists"], run["failed"]) == (4, 4, 2, 1, 1)
+    clubs = run["clubs"]
+    assert clubs[str(club_a.id)]["status"] == "stored" and clubs[str(club_a.id)]["unit_value"] == Decimal("20")
+    assert clubs[str(club_b.id)]["total_club_value"] == Decimal("100.00") and clubs[str(club_b.id)]["unpriced_assets"] == 1
+    assert clubs[str(club_kept.id)]["status"] == "exists"
+    assert clubs[str(missing_club_id)]["status"] == "failed" and "not found" in clubs[str(missing_club_id)]["error"]
+
+    stored = await crud_unit_value.get_latest_unit_value_for_club(db=db_session, club_id=club_b.id)
+    assert (stored.valuation_date, stored.unit_value, stored.total_units_outstanding) == (VALUATION_DATE, Decimal("5"), Decimal("20"))
+    kept = await crud_unit_value.get_latest_unit_value_for_club(db=db_session, club_id=club_kept.id)
+    assert kept.unit_value == Decimal("1")
+
+    # A replace run overwrites the stored NAV
+    run = await nav_batch_service.run_nav_batch(
+        VALUATION_DATE, club_ids=[club_kept.id], replace=True, max_concurrency=1, session_factory=_session_factory(db_session, monkeypatch)
+    )
+    assert run["stored"] == 1
+    await db_session.refresh(kept)
+    assert kept.unit_value == Decimal("20")
+
+
+@pytest.mark.asyncio
+async def test_stopped_run_is_stored_as_failed(db_session: AsyncSession, monkeypatch):
+    asset = await create_test_stock_asset_via_crud(db_session, symbol=f"NS{uuid.uuid4().hex[:5].upper()}")
+    club = await _club(db_session, [(asset, "1")], units="1")
+    pricing = asyncio.Event()
+
+    async def slow_quotes(db, asset_ids, valuation_date):
+        pricing.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", slow_quotes)
+    session_factory = _session_factory(db_session, monkeypatch)
+    run = nav_batch_service.new_nav_run(VALUATION_DATE)
+    task = asyncio.create_task(nav_batch_service.run_nav_batch(
+        VALUATION_DATE, club_ids=[club.id], max_concurrency=1, session_factory=session_factory, run=run
+    ))
+    await pricing.wait()
+    stored = await nav_batch_service.get_nav_run(run["run_id"], session_factory=session_factory)
+    assert stored["status"] == "running" and stored["clubs"][str(club.id)]["status"] == "loaded"
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    stored = await nav_batch_service.get_nav_run(run["run_id"], session_factory=session_factory)
+    assert stored["status"] == "failed" and stored["finished_at"] is not None
+    assert (stored["clubs_done"], stored["failed"]) == (1, 1) and stored["clubs"][str(club.id)]["status"] == "failed"
+    assert await nav_batch_service.get_nav_run(str(uuid.uuid4()), session_factory=session_factory) is None
+    assert await nav_batch_service.get_nav_run("not-a-run", session_factory=session_factory) is None
@@ -0,0 +1,155 @@
+# backend/tests/services/test_option_valuation_service.py
+
+import math
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core import option_pricing
+from backend.crud import asset as crud_asset
+from backend.crud import asset_price as crud_asset_price
+from backend.models.enums import AssetType, Currency, OptionType
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+from backend.services import option_valuation_service
+
+VALUATION_DATE = date(2024, 3, 15)
+
+# --- Pricing kernels ---
+
+def test_black_scholes_matches_reference_values():
+    """ S=100, K=100, T=1, sigma=0.2, r=0.05: call 10.4506, put 5.5735 (textbook values). """
+    prices = option_pricing.black_scholes_prices(
+        [100.0, 100.0], [100.0, 100.0], [1.0, 1.0], [0.2, 0.2], [0.05, 0.05], [True, False], use_numpy=False
+    )
+    assert prices[0] == pytest.approx(10.4506, abs=1e-4)
+    assert prices[1] == pytest.approx(5.5735, abs=1e-4)
+
+
+def test_black_scholes_put_call_parity_with_dividends():
+    spot, strike, years, rate, dividend = 120.0, 110.0, 0.5, 0.03, 0.02
+    call, put = option_pricing.black_scholes_prices(
+        [spot, spot], [strike, strike], [years, years], [0.35, 0.35], [rate, rate], [True, False],
+        dividend_yields=[dividend, dividend], use_numpy=False
+    )
+    parity = spot * math.exp(-dividend * years) - strike * math.exp(-rate * years)
+    assert call - put == pytest.approx(parity, abs=1e-9)
+
+
+def test_fallback_to_intrinsic_value():
+    """ Expired, zero-volatility and unknown-underlying contracts get their intrinsic value. """
+    prices = option_pricing.black_scholes_prices(
+        [120.0, 90.0, None], [100.0, 100.0, 100.0], [0.0, 0.5, 0.5], [0.3, None, 0.3], [0.05] * 3, [True, False, True], use_numpy=False
+    )
+    assert prices == [20.0, 10.0, 0.0]
+    assert option_pricing.model_priced_mask([120.0, 90.0, None], [100.0] * 3, [0.0, 0.5, 0.5], [0.3, None, 0.3]) == [False, False, False]
+
+
+@pytest.mark.skipif(option_pricing.np is None, reason="numpy is not installed")
+def test_numpy_and_python_kernels_agree():
+    spots = [80.0 + i for i in range(50)] + [None]
+    strikes = [100.0] * 51
+    years = [0.1 + i / 100 for i in range(50)] + [0.5]
+    vols = [0.25] * 50 + [0.25]
+    rates = [0.04] * 51
+    is_call = [i % 2 == 0 for i in range(51)]
+    expected = option_pricing.black_scholes_prices(spots, strikes, years, vols, rates, is_call, use_numpy=False)
+    actual = option_pricing.black_scholes_prices(spots, strikes, years, vols, rates, is_call, use_numpy=True)
+    assert actual == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.skipif(option_pricing.np is None, reason="numpy is not installed")
+def test_array_normal_cdf_matches_math_erfc():
+    """ The NumPy kernel's erf/erfc approximation (used without SciPy) is accurate to machine precision, tails included. """
+    xs = [-38.0, -12.5, -5.0, -1.0, -0.66, -0.5, 0.0, 0.3, 0.663, 1.7, 5.66, 9.0, 38.0] + [i / 100 - 8 for i in range(1601)]
+    actual = option_pricing._ndtr_cody(option_pricing.np.array(xs))
+    for x, value in zip(xs, actual.tolist()):
+        expected = 0.5 * math.erfc(-x / math.sqrt(2.0))
+        assert value == pytest.approx(expected, rel=1e-14, abs=1e-300)
+
+
+def test_thousand_contracts_price_in_milliseconds():
+    count = 1000
+    spots = [50.0 + (i % 100) for i in range(count)]
+    strikes = [60.0 + (i % 80) for i in range(count)]
+    years = [(1 + i % 365) / 365.0 for i in range(count)]
+    started = time.perf_counter()
+    prices = option_pricing.black_scholes_prices(spots, strikes, years, [0.3] * count, [0.045] * count, [i % 2 == 0 for i in range(count)])
+    elapsed = time.perf_counter() - started
+    assert len(prices) == count
+    assert elapsed < 0.25 # Typically a few milliseconds; generous bound for slow CI machines
+
+
+# --- Volatility ---
+
+def test_historical_volatility():
+    # Alternating +1% / -1% log returns: daily stdev ~0.01 -> ~15.9% annualized
+    closes = [100.0]
+    for i in range(40):
+        closes.append(closes[-1] * math.exp(0.01 if i % 2 == 0 else -0.01))
+    assert option_valuation_service.historical_volatility(closes) == pytest.approx(0.01 * math.sqrt(252), rel=0.05)
+    assert option_valuation_service.historical_volatility(closes[:5]) is None
+
+
+# --- Service ---
+
+async def _create_option(db_session: AsyncSession, underlying, option_type: OptionType, strike: str, expires: date):
+    return await crud_asset.create_asset(db=db_session, asset_data={
+        "asset_type": AssetType.OPTION,
+        "symbol": f"{underlying.symbol}{uuid.uuid4().hex[:4].upper()}",
+        "currency": Currency.USD,
+        "underlying_asset_id": underlying.id,
+        "option_type": option_type,
+        "strike_price": Decimal(strike),
+        "expiration_date": expires,
+    })
+
+
+@pytest.mark.asyncio
+async def test_value_option_assets(db_session: AsyncSession):
+    """ Contracts are priced per contract, expired ones at intrinsic, unpriced underlyings as missing. """
+    underlying = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"OV{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    orphan = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"OX{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    call = await _create_option(db_session, underlying, OptionType.CALL, "100", VALUATION_DATE + timedelta(days=365))
+    expired_put = await _create_option(db_session, underlying, OptionType.PUT, "130", VALUATION_DATE - timedelta(days=1))
+    unpriced = await _create_option(db_session, orphan, OptionType.CALL, "10", VALUATION_DATE + timedelta(days=30))
+    underlying_quotes = {
+        underlying.id: MarketPrice(asset_id=underlying.id, price=Decimal("100"), status=MarketPriceStatus.STALE, as_of=VALUATION_DATE - timedelta(days=1)),
+        orphan.id: MarketPrice(asset_id=orphan.id, status=MarketPriceStatus.RATE_LIMITED),
+    }
+
+    quotes = await option_valuation_service.value_option_assets(
+        db_session, [call, expired_put, unpriced], underlying_quotes, VALUATION_DATE,
+        volatility_source=option_valuation_service.ConstantVolatilitySource(0.2)
+    )
+
+    expected_call = option_pricing.black_scholes_prices([100.0], [100.0], [1.0], [0.2], [option_valuation_service.OPTION_RISK_FREE_RATE], [True])[0]
+    assert quotes[call.id].price == pytest.approx(Decimal(str(expected_call)) * 100, abs=Decimal("0.01"))
+    assert quotes[call.id].status == MarketPriceStatus.STALE
+    assert quotes[call.id].as_of == VALUATION_DATE - timedelta(days=1)
+    assert quotes[expired_put.id].price == Decimal("3000.0000")
+    assert quotes[expired_put.id].source == "intrinsic"
+    assert quotes[unpriced.id].status == MarketPriceStatus.RATE_LIMITED
+    assert quotes[unpriced.id].price == Decimal("0.0")
+
+
+@pytest.mark.asyncio
+async def test_historical_volatility_source_uses_price_store(db_session: AsyncSession):
+    """ Underlyings with enough stored closes get historical volatility, others the fallback. """
+    with_history = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"HV{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    without_history = await crud_asset.create_asset(db=db_session, asset_data={"asset_type": AssetType.STOCK, "symbol": f"HN{uuid.uuid4().hex[:5].upper()}", "currency": Currency.USD})
+    rows = []
+    close = 100.0
+    for i in range(40):
+        close *= math.exp(0.02 if i % 2 == 0 else -0.02)
+        rows.append({"asset_id": with_history.id, "price_date": VALUATION_DATE - timedelta(days=40 - i), "close_price": Decimal(f"{close:.6f}"), "source": "test"})
+    await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=rows)
+
+    source = option_valuation_service.HistoricalVolatilitySource(lookback_days=60, fallback_volatility=None)
+    volatilities = await source.get_volatilities(db_session, [with_history.id, without_history.id], VALUATION_DATE)
+
+    assert volatilities[with_history.id] == pytest.approx(0.02 * math.sqrt(252), rel=0.05)
+    assert volatilities[without_history.id] is None
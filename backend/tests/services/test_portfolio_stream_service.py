@@ -0,0 +1,134 @@
+# backend/tests/services/test_portfolio_stream_service.py
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import position as crud_position
+from backend.schemas.market_data import MarketPrice, MarketPriceStatus
+from backend.services import accounting_service, portfolio_stream_service
+from backend.services.portfolio_stream_service import PortfolioStreamHub, PortfolioSubscriber
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+
+class FakeQuotes:
+    """Stands in for get_market_price_quotes: fixed price per asset, counts calls."""
+
+    def __init__(self, price="10"):
+        self.price = Decimal(price)
+        self.calls = 0
+
+    async def __call__(self, db, asset_ids, valuation_date):
+        self.calls += 1
+        return {
+            asset_id: MarketPrice(asset_id=asset_id, price=self.price, status=MarketPriceStatus.OK, as_of=valuation_date)
+            for asset_id in asset_ids
+        }
+
+
+def _hub_for(db_session: AsyncSession, monkeypatch, **kwargs) -> PortfolioStreamHub:
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    monkeypatch.setattr(db_session, "commit", db_session.flush) # Keep the test transaction open
+    return PortfolioStreamHub(session_factory=session_factory, **kwargs)
+
+
+async def _club_with_position(db_session: AsyncSession, quantity: str = "3"):
+    creator = await create_test_user(db_session, email=f"stream_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|stream_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Stream Fund")
+    asset = await create_test_stock_asset_via_crud(db_session, symbol=f"ST{uuid.uuid4().hex[:5].upper()}")
+    await crud_position.create_position(db=db_session, position_data={
+        "fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal(quantity), "average_cost_basis": Decimal("5")
+    })
+    return club, asset
+
+
+def test_subscriber_drops_oldest_frame_when_full():
+    subscriber = PortfolioSubscriber(uuid.uuid4(), queue_size=2)
+    for frame in ("a", "b", "c"):
+        subscriber.offer(frame)
+    assert subscriber.dropped == 1
+    assert [subscriber.queue.get_nowait(), subscriber.queue.get_nowait()] == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_of_a_club_share_one_poll(db_session: AsyncSession, monkeypatch):
+    club, asset = await _club_with_position(db_session)
+    fake_quotes = FakeQuotes("10")
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", fake_quotes)
+    hub = _hub_for(db_session, monkeypatch, poll_seconds=3600)
+
+    subscribers = [await hub.subscribe(db_session, club.id) for _ in range(200)]
+    frames = [json.loads(await asyncio.wait_for(s.queue.get(), timeout=2)) for s in subscribers]
+
+    assert fake_quotes.calls == 1
+    assert hub.stats() == {"pollers": 1, "channels": 1, "subscribers": 200}
+    assert frames[0]["total_market_value"] == "30.00"
+    assert frames[0]["positions"][0]["symbol"] == asset.symbol
+    assert frames[0]["positions"][0]["market_value"] == "30.00"
+    assert all(frame == frames[0] for frame in frames)
+
+    # A late subscriber gets the latest frame without another poll
+    late = await hub.subscribe(db_session, club.id)
+    assert json.loads(late.queue.get_nowait())["total_value"] == frames[0]["total_value"]
+    assert fake_quotes.calls == 1
+
+    for subscriber in [*subscribers, late]:
+        hub.unsubscribe(subscriber)
+    assert hub.stats() == {"pollers": 0, "channels": 0, "subscribers": 0}
+    await hub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_frames_are_pushed_only_when_values_change(db_session: AsyncSession, monkeypatch):
+    club, _ = await _club_with_position(db_session)
+    fake_quotes = FakeQuotes("10")
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", fake_quotes)
+    hub = _hub_for(db_session, monkeypatch, poll_seconds=3600)
+    subscriber = await hub.subscribe(db_session, club.id)
+    await asyncio.wait_for(subscriber.queue.get(), timeout=2)
+    poller = next(iter(hub._pollers.values()))
+
+    await poller.poll_once() # Same prices: nothing pushed
+    assert subscriber.queue.empty()
+
+    fake_quotes.price = Decimal("12")
+    await poller.poll_once()
+    assert json.loads(subscriber.queue.get_nowait())["total_market_value"] == "36.00"
+    await hub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sse_events_heartbeat_and_unsubscribe(db_session: AsyncSession, monkeypatch):
+    club, _ = await _club_with_position(db_session)
+    monkeypatch.setattr(accounting_service, "get_market_price_quotes", FakeQuotes("10"))
+    hub = _hub_for(db_session, monkeypatch, poll_seconds=3600)
+    subscriber = await hub.subscribe(db_session, club.id)
+    disconnected = False
+
+    async def is_disconnected():
+        return disconnected
+
+    events = portfolio_stream_service.sse_events(hub, subscriber, is_disconnected, heartbeat_seconds=0.05)
+    assert (await events.__anext__()).startswith("retry:")
+    event = await events.__anext__()
+    assert event.startswith("event: portfolio\ndata: ") and event.endswith("\n\n")
+    assert await events.__anext__() == ": heartbeat\n\n"
+
+    disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await events.__anext__()
+    assert hub.stats()["subscribers"] == 0
+    await hub.aclose()
@@ -0,0 +1,140 @@
+# backend/tests/services/test_price_backfill_service.py
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.price_series import PriceSeries
+from backend.crud import asset_price as crud_asset_price
+from backend.crud import position as crud_position
+from backend.crud import transaction as crud_transaction
+from backend.models.enums import TransactionType
+from backend.services import price_backfill_service
+from backend.services.market_data_interface import MarketDataProviderError
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+
+class FakeBulkProvider:
+    """Returns a close of 100 + day of month for every requested weekday except holidays; records each call."""
+
+    def __init__(self, fail_symbols=(), holidays=()):
+        self.calls = []
+        self.fail_symbols = set(fail_symbols)
+        self.holidays = set(holidays)
+
+    async def get_price_series_bulk(self, symbols, from_date, to_date, exchange=None):
+        self.calls.append((sorted(symbols), from_date, to_date))
+        if self.fail_symbols & set(symbols):
+            raise MarketDataProviderError("upstream down")
+        result = {}
+        for symbol in symbols:
+            series = PriceSeries(symbol)
+            for day in price_backfill_service._weekdays(from_date, to_date):
+                if day in self.holidays:
+                    continue
+                series.append_record({"date": day.isoformat(), "close": 100 + day.day})
+            result[symbol] = series
+        return result
+
+
+async def _setup_traded_and_held_stocks(db_session: AsyncSession):
+    creator = await create_test_user(db_session, email=f"backfill_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|backfill_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Backfill Fund")
+    traded = await create_test_stock_asset_via_crud(db_session, symbol=f"BF{uuid.uuid4().hex[:5].upper()}")
+    held = await create_test_stock_asset_via_crud(db_session, symbol=f"BH{uuid.uuid4().hex[:5].upper()}")
+    unused = await create_test_stock_asset_via_crud(db_session, symbol=f"BU{uuid.uuid4().hex[:5].upper()}")
+    await crud_transaction.create_transaction(db=db_session, transaction_data={
+        "club_id": club.id,
+        "fund_id": fund.id,
+        "asset_id": traded.id,
+        "transaction_type": TransactionType.BUY_STOCK,
+        "transaction_date": datetime(2024, 3, 6, 15, 0, tzinfo=timezone.utc),
+        "quantity": Decimal("10"),
+        "price_per_unit": Decimal("100"),
+    })
+    await crud_position.create_position(db=db_session, position_data={
+        "fund_id": fund.id, "asset_id": held.id, "quantity": Decimal("5"), "average_cost_basis": Decimal("50")
+    })
+    return traded, held, unused
+
+
+def test_find_missing_ranges():
+    """ Weekends do not split gaps; a single missing weekday between stored days is still missing. """
+    stored = {date(2024, 3, 4), date(2024, 3, 5), date(2024, 3, 7), date(2024, 3, 8)}
+    assert price_backfill_service.find_missing_ranges(stored, date(2024, 3, 4), date(2024, 3, 12)) == [
+        (date(2024, 3, 6), date(2024, 3, 6)), (date(2024, 3, 11), date(2024, 3, 12))
+    ]
+    assert price_backfill_service.find_missing_ranges(set(), date(2024, 3, 8), date(2024, 3, 11)) == [
+        (date(2024, 3, 8), date(2024, 3, 11))
+    ]
+    assert price_backfill_service.find_missing_ranges(set(), date(2024, 3, 9), date(2024, 3, 10)) == []
+
+
+@pytest.mark.asyncio
+async def test_find_price_gaps_targets_stocks_in_use(db_session: AsyncSession):
+    """ Traded stocks start at their first transaction, held-only stocks at the start date; unused stocks are ignored. """
+    traded, held, unused = await _setup_traded_and_held_stocks(db_session)
+    await crud_asset_price.bulk_insert_asset_prices(db=db_session, price_rows=[
+        {"asset_id": traded.id, "price_date": date(2024, 3, 7), "close_price": Decimal("1"), "source": "test"},
+    ])
+
+    gaps = await price_backfill_service.find_price_gaps(db_session, start_date=date(2024, 3, 4), end_date=date(2024, 3, 8))
+
+    assert gaps[(date(2024, 3, 4), date(2024, 3, 8))][held.symbol] == [held.id]
+    assert gaps[(date(2024, 3, 6), date(2024, 3, 6))][traded.symbol] == [traded.id]
+    assert gaps[(date(2024, 3, 8), date(2024, 3, 8))][traded.symbol] == [traded.id]
+    assert all(unused.symbol not in by_symbol for by_symbol in gaps.values())
+
+
+@pytest.mark.asyncio
+async def test_backfill_missing_prices_is_resumable(db_session: AsyncSession, monkeypatch):
+    """ Fetched ranges are stored and committed; a second run only retries what failed. """
+    traded, held, _ = await _setup_traded_and_held_stocks(db_session)
+    # Keep the test transaction open: commits become flushes
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    start, end = date(2024, 3, 4), date(2024, 3, 8)
+
+    failing = FakeBulkProvider(fail_symbols={held.symbol})
+    summary = await price_backfill_service.backfill_missing_prices(db_session, failing, start_date=start, end_date=end)
+    assert summary["ranges_failed"] >= 1
+    stored = await crud_asset_price.get_stored_price_dates(db=db_session, asset_ids=[traded.id, held.id], start_date=start, end_date=end)
+    assert {date(2024, 3, 6), date(2024, 3, 7), date(2024, 3, 8)} <= stored[traded.id]
+    assert stored[held.id] == set()
+
+    provider = FakeBulkProvider()
+    summary = await price_backfill_service.backfill_missing_prices(db_session, provider, start_date=start, end_date=end)
+    assert summary["ranges_failed"] == 0
+    # Only the held stock's range is fetched again
+    assert all(traded.symbol not in symbols for symbols, _, _ in provider.calls)
+    prices = await crud_asset_price.get_prices_for_period(db=db_session, asset_ids=[held.id], start_date=start, end_date=end)
+    assert [(p.price_date.day, p.close_price) for p in prices] == [(day, Decimal(100 + day)) for day in range(4, 9)]
+    assert {p.source for p in prices} == {"marketstack"}
+
+    again = await price_backfill_service.backfill_missing_prices(db_session, FakeBulkProvider(), start_date=start, end_date=end)
+    assert again["ranges"] == 0 or again["rows_written"] == 0
+
+
+@pytest.mark.asyncio
+async def test_settled_dates_without_a_price_are_not_requested_again(db_session: AsyncSession, monkeypatch):
+    """ Weekdays the provider has no price for are recorded once settled; unsettled ones are retried. """
+    _, held, _ = await _setup_traded_and_held_stocks(db_session)
+    monkeypatch.setattr(db_session, "commit", db_session.flush)
+    start, end = date(2024, 3, 4), date(2024, 3, 8)
+    # Days up to Wed 6th are settled; Thu 7th is too recent to be recorded
+    monkeypatch.setattr(price_backfill_service, "PRICE_BACKFILL_SETTLE_DAYS", (date.today() - date(2024, 3, 6)).days)
+
+    provider = FakeBulkProvider(holidays={date(2024, 3, 5), date(2024, 3, 7)})
+    summary = await price_backfill_service.backfill_missing_prices(db_session, provider, start_date=start, end_date=end)
+    assert summary["empty_dates"] == 1
+    empty = await crud_asset_price.get_empty_price_dates(db=db_session, asset_ids=[held.id], start_date=start, end_date=end)
+    assert empty[held.id] == {date(2024, 3, 5)}
+
+    gaps = await price_backfill_service.find_price_gaps(db_session, start_date=start, end_date=end)
+    assert [missing_range for missing_range, by_symbol in gaps.items() if held.symbol in by_symbol] == [(date(2024, 3, 7), date(2024, 3, 7))]
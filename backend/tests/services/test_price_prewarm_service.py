@@ -0,0 +1,111 @@
+# backend/tests/services/test_price_prewarm_service.py
+
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import asset as crud_asset
+from backend.crud import asset_price as crud_asset_price
+from backend.crud import position as crud_position
+from backend.services import accounting_service, price_prewarm_service
+from backend.services.market_data_providers.hedged_provider import HedgedMarketDataProvider
+from backend.services.market_data_providers.synthetic_provider import SyntheticMarketDataProvider
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+from backend.tests.crud.test_fund import create_test_fund_via_crud
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud, create_test_option_asset_via_crud
+
+MARKET_TZ = price_prewarm_service.MARKET_TIMEZONE
+
+
+def _market_time(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=MARKET_TZ)
+
+
+def test_refresh_times_follow_the_market_session(monkeypatch):
+    monkeypatch.setattr(price_prewarm_service, "PRICE_PREWARM_INTERVAL_SECONDS", 3600)
+    friday = date(2024, 3, 8)
+    times = price_prewarm_service.refresh_times_for_day(friday)
+    assert times[0] == _market_time(friday, 9, 30)
+    assert times[1] == _market_time(friday, 10, 30)
+    assert times[-2] == _market_time(friday, 15, 30)
+    assert times[-1] == _market_time(friday, 16, 5) # Close + 300s
+    assert price_prewarm_service.refresh_times_for_day(date(2024, 3, 9)) == []
+
+
+def test_next_refresh_time(monkeypatch):
+    monkeypatch.setattr(price_prewarm_service, "PRICE_PREWARM_INTERVAL_SECONDS", 3600)
+    friday, monday = date(2024, 3, 8), date(2024, 3, 11)
+    assert price_prewarm_service.next_refresh_time(_market_time(friday, 7)) == _market_time(friday, 9, 30)
+    assert price_prewarm_service.next_refresh_time(_market_time(friday, 9, 30)) == _market_time(friday, 10, 30)
+    assert price_prewarm_service.next_refresh_time(_market_time(friday, 15, 45)) == _market_time(friday, 16, 5)
+    # After Friday's close the next run is Monday's open
+    assert price_prewarm_service.next_refresh_time(_market_time(friday, 17)) == _market_time(monday, 9, 30)
+    # Aware datetimes in other zones are converted
+    utc_now = _market_time(friday, 7).astimezone(timezone.utc)
+    assert price_prewarm_service.next_refresh_time(utc_now) == _market_time(friday, 9, 30)
+
+
+@pytest.mark.asyncio
+async def test_refresh_stock_prices_warms_held_assets_in_bulk(db_session: AsyncSession, monkeypatch):
+    """ Held stocks and underlyings of held options are refreshed with one bulk request; closed positions are skipped. """
+    creator = await create_test_user(db_session, email=f"prewarm_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|prewarm_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    fund = await create_test_fund_via_crud(db_session, club=club, name="Prewarm Fund")
+    held = await create_test_stock_asset_via_crud(db_session, symbol=f"PH{uuid.uuid4().hex[:5].upper()}")
+    closed = await create_test_stock_asset_via_crud(db_session, symbol=f"PC{uuid.uuid4().hex[:5].upper()}")
+    underlying = await create_test_stock_asset_via_crud(db_session, symbol=f"PU{uuid.uuid4().hex[:5].upper()}")
+    option = await create_test_option_asset_via_crud(db_session, underlying_asset=underlying, symbol=f"PO{uuid.uuid4().hex[:5].upper()}")
+    for asset, quantity in ((held, "5"), (closed, "0"), (option, "2")):
+        await crud_position.create_position(db=db_session, position_data={
+            "fund_id": fund.id, "asset_id": asset.id, "quantity": Decimal(quantity), "average_cost_basis": Decimal("10")
+        })
+
+    held_assets = await crud_asset.get_held_stock_assets(db_session)
+    held_ids = {asset.id for asset in held_assets}
+    assert {held.id, underlying.id} <= held_ids
+    assert closed.id not in held_ids and option.id not in held_ids
+
+    valuation_date = date(2024, 3, 8)
+    synthetic = SyntheticMarketDataProvider(today=valuation_date)
+    monkeypatch.setattr(accounting_service, "_price_provider", HedgedMarketDataProvider([("synthetic", synthetic)]))
+    monkeypatch.setattr(accounting_service, "_price_provider_built", True)
+
+    counts = await accounting_service.refresh_stock_prices(db_session, [held, underlying], valuation_date)
+
+    assert counts == {"assets": 2, "requests": 1, "stored": 2, "failed": 0}
+    assert synthetic.calls == 1
+    stored = await crud_asset_price.get_latest_prices_on_or_before(db=db_session, asset_ids=[held.id, underlying.id], on_date=valuation_date)
+    assert {row.price_date for row in stored.values()} == {valuation_date}
+    assert {row.source for row in stored.values()} == {"synthetic"}
+
+    # Warm store: the read path serves them without another upstream call
+    quotes = await accounting_service.get_market_price_quotes(db_session, [held.id], valuation_date)
+    assert quotes[held.id].price == stored[held.id].close_price
+    assert synthetic.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_prewarmer_keeps_running_after_errors(monkeypatch):
+    runs = []
+
+    async def fake_prewarm():
+        runs.append(1)
+        if len(runs) == 1:
+            raise RuntimeError("database down")
+        return {}
+
+    monkeypatch.setattr(price_prewarm_service, "PRICE_PREWARM_ENABLED", True)
+    monkeypatch.setattr(price_prewarm_service, "prewarm_held_prices", fake_prewarm)
+    monkeypatch.setattr(price_prewarm_service, "next_refresh_time", lambda now: now + timedelta(milliseconds=5))
+
+    task = price_prewarm_service.start_price_prewarmer()
+    await asyncio.sleep(0.1)
+    await price_prewarm_service.stop_price_prewarmer(task)
+
+    assert len(runs) >= 2
+    assert task.cancelled()
@@ -0,0 +1,68 @@
+# backend/tests/services/test_price_series.py
+import pytest
+from datetime import date
+
+from backend.core import price_series
+from backend.core.price_series import PriceSeries, parse_eod_records
+from backend.services.market_data_providers.cache_backends import decode_value, encode_value
+
+
+def _record(symbol: str, day: str, close: float, **extra) -> dict:
+    return {"symbol": symbol, "date": f"{day}T00:00:00+0000", "open": close, "high": close, "low": close,
+            "close": close, "adj_close": close, "volume": 100, "exchange": "XNAS", "name": symbol, **extra}
+
+
+def test_parse_eod_records_builds_columns_per_symbol():
+    """Test records are split by symbol into typed columns with day-ordinal dates."""
+    series = parse_eod_records([
+        _record("AAPL", "2024-03-14", 10.0),
+        _record("msft", "2024-03-14", 20.0, split_factor=None),
+        _record("AAPL", "2024-03-15", 11.0, dividend=0.24),
+    ])
+
+    aapl = series["AAPL"]
+    assert len(aapl) == 2
+    assert aapl.dates.typecode == "i"
+    assert list(aapl.iter_dates()) == [date(2024, 3, 14), date(2024, 3, 15)]
+    assert aapl.close.tolist() == [10.0, 11.0]
+    assert aapl.dividend.tolist() == [0.0, 0.24]
+    assert aapl.volume.typecode == "q"
+    assert series["MSFT"].split_factor.tolist() == [1.0]
+    assert aapl.exchange == "XNAS"
+
+
+def test_price_series_sort_slice_and_points():
+    """Test out-of-order pages are sorted, date slicing, and model conversion at the edge."""
+    series = parse_eod_records([_record("AAPL", f"2024-03-{d:02d}", float(d)) for d in (13, 11, 12, 14)])["AAPL"]
+    series.sort()
+
+    assert series.close.tolist() == [11.0, 12.0, 13.0, 14.0]
+    sliced = series.between(date(2024, 3, 12), date(2024, 3, 13))
+    assert sliced.close.tolist() == [12.0, 13.0]
+
+    points = sliced.to_points()
+    assert [p.date.date() for p in points] == [date(2024, 3, 12), date(2024, 3, 13)]
+    assert PriceSeries.from_points("AAPL", points).close.tolist() == [12.0, 13.0]
+
+
+def test_price_series_cache_round_trip():
+    """Test a series survives the Redis cache codec."""
+    series = parse_eod_records([_record("AAPL", "2024-03-15", 10.5)])["AAPL"]
+    decoded = decode_value(encode_value(series))
+
+    assert decoded.symbol == "AAPL"
+    assert decoded.dates.tolist() == series.dates.tolist()
+    assert decoded.close.tolist() == [10.5]
+
+
+def test_to_numpy_requires_numpy(monkeypatch):
+    """Test NumPy views are optional."""
+    series = parse_eod_records([_record("AAPL", "2024-03-15", 10.5)])["AAPL"]
+    if price_series.np is None:
+        with pytest.raises(RuntimeError):
+            series.to_numpy()
+    else:
+        assert series.to_numpy()["close"].tolist() == [10.5]
+    monkeypatch.setattr(price_series, "np", None)
+    with pytest.raises(RuntimeError):
+        series.to_numpy()
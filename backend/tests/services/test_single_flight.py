@@ -0,0 +1,134 @@
+# backend/tests/services/test_single_flight.py
+import asyncio
+import pytest
+
+from fastapi import HTTPException
+
+from backend.core.single_flight import RedisSingleFlight, SingleFlight
+
+
+class InMemoryRedis:
+    """Stand-in for redis.asyncio.Redis covering the commands RedisSingleFlight uses (expiry ignored)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, name, value, nx=False, px=None):
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        return True
+
+    async def get(self, name):
+        return self.data.get(name)
+
+    async def delete(self, name):
+        self.data.pop(name, None)
+
+    async def exists(self, name):
+        return int(name in self.data)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_runs_once_per_key():
+    """Test concurrent callers with one key share a single execution; other keys run separately."""
+    group = SingleFlight()
+    executions = []
+
+    async def work(key):
+        executions.append(key)
+        await asyncio.sleep(0.02)
+        return key * 2
+
+    results = await asyncio.gather(*(group.do(k, lambda k=k: work(k)) for k in [1, 1, 1, 2]))
+
+    assert results == [2, 2, 2, 4]
+    assert sorted(executions) == [1, 2]
+    assert group.stats() == {"executed": 2, "coalesced": 2, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_redis_single_flight_coalesces_across_workers():
+    """Test a second worker waits for the first worker's published result."""
+    redis_client = InMemoryRedis()
+    worker_a = RedisSingleFlight(redis_client, poll_interval=0.01)
+    worker_b = RedisSingleFlight(redis_client, poll_interval=0.01)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"data": [1, 2, 3]}
+
+    results = await asyncio.gather(worker_a.do("key", fetch), worker_b.do("key", fetch))
+
+    assert results == [{"data": [1, 2, 3]}] * 2
+    assert calls == 1
+    assert worker_a.coalesced + worker_b.coalesced == 1
+    assert not [k for k in redis_client.data if ":lock:" in k]
+
+
+@pytest.mark.asyncio
+async def test_redis_single_flight_shares_http_errors():
+    """Test an HTTPException raised by the lock holder is re-raised in the waiting worker."""
+    redis_client = InMemoryRedis()
+    worker_a = RedisSingleFlight(redis_client, poll_interval=0.01)
+    worker_b = RedisSingleFlight(redis_client, poll_interval=0.01)
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded")
+
+    results = await asyncio.gather(worker_a.do("key", fetch), worker_b.do("key", fetch), return_exceptions=True)
+
+    assert [r.status_code for r in results] == [429, 429]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    """Test the caller that started a call can be cancelled while a coalesced follower still gets the result."""
+    group = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "quote"
+
+    leader = asyncio.ensure_future(group.do("AAPL", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(group.do("AAPL", fetch))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await follower == "quote"
+    assert leader.cancelled()
+    assert calls == 1 and group.stats() == {"executed": 1, "coalesced": 1, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_the_last_caller_leaves():
+    """Test the shared call stops once nobody waits for it, and the next caller starts a new one."""
+    group = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.ensure_future(group.do("key", fetch)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+    async def quick():
+        return 1
+
+    assert await group.do("key", quick) == 1
+    assert group.stats() == {"executed": 2, "coalesced": 1, "in_flight": 0}
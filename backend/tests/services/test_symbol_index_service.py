@@ -0,0 +1,123 @@
+# backend/tests/services/test_symbol_index_service.py
+
+import time
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.core.symbol_index import SymbolIndex
+from backend.crud import symbol_index as crud_symbol_index
+from backend.schemas.market_data import CompanyProfile, StockExchangeInfo
+from backend.services import symbol_index_service
+from backend.services.market_data_service import MARKET_DATA_PROVIDER, MarketDataService
+from backend.tests.crud.test_asset import create_test_stock_asset_via_crud
+
+TICKERS = [
+    ("AAPL", "Apple Inc", "XNAS", "equity", None),
+    ("AAPB", "GraniteShares 2x Long AAPL Daily", "XNAS", "etf", None),
+    ("AAL", "American Airlines Group Inc", "XNAS", "equity", None),
+    ("MSFT", "Microsoft Corporation", "XNAS", "equity", None),
+    ("MSFT", "Microsoft Corporation", "XFRA", "equity", None), # Second listing
+    ("APLE", "Apple Hospitality REIT Inc", "XNYS", "equity", None),
+]
+
+
+class FakeTickerProvider:
+    def __init__(self, tickers):
+        self.tickers = tickers
+
+    async def iter_ticker_list(self):
+        for symbol, name, mic in self.tickers:
+            yield CompanyProfile(symbol=symbol, name=name, stock_exchange_info=StockExchangeInfo(name="Exchange", acronym="EX", mic=mic))
+
+
+def _symbols(results):
+    return [result["symbol"] for result in results]
+
+
+def test_prefix_name_and_fuzzy_matches():
+    index = SymbolIndex(TICKERS)
+    assert len(index) == 5 # One entry per symbol
+
+    assert _symbols(index.search("aa")) == ["AAL", "AAPB", "AAPL"]
+    assert index.search("AAPL")[0] == {
+        "symbol": "AAPL", "name": "Apple Inc", "exchange_mic": "XNAS", "asset_type": "equity", "asset_id": None, "match": "exact"
+    }
+    assert set(_symbols(index.search("apple"))) == {"AAPL", "APLE"}
+    assert _symbols(index.search("apple hosp")) == ["APLE"]
+    assert _symbols(index.search("micro"))[0] == "MSFT"
+    # One edit away: typo in a symbol and in a name word
+    assert "MSFT" in _symbols(index.search("MSFY"))
+    assert "MSFT" in _symbols(index.search("microsfot"))
+    assert index.search("") == []
+
+
+def test_known_assets_rank_first():
+    index = SymbolIndex(TICKERS + [("AAPB", None, None, "equity", "asset-1")])
+    results = index.search("aa")
+    assert results[0]["symbol"] == "AAPB" and results[0]["asset_id"] == "asset-1"
+    assert results[0]["name"] == "GraniteShares 2x Long AAPL Daily" # Name kept from the ticker list
+    # Exact symbol match still comes first
+    assert _symbols(index.search("AAL"))[0] == "AAL"
+    # Assets created after the build are passed in separately
+    assert index.search("aa", asset_symbols={"AAL": "asset-2"})[0]["symbol"] == "AAL"
+
+
+def test_known_assets_are_found_in_a_large_ticker_list():
+    # 17,576 tickers AAA..ZZZ whose names all start with "Amber" sort ahead of the assets
+    tickers = [(f"{chr(65 + i // 676)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}", f"Amber {i} Corp", "XNAS", "equity", None) for i in range(17_576)]
+    index = SymbolIndex(tickers + [("AMZN", "Amazon.com Inc", "XNAS", "equity", "asset-1"), ("ZZZZ", "Amberley Holdings", "XNYS", "equity", "asset-2")])
+    assert index.search("A")[0]["symbol"] == "AMZN"
+    assert index.search("amber")[0]["symbol"] == "ZZZZ"
+    # Assets created after the build, too
+    assert index.search("B", asset_symbols={"BZZ": "asset-3"})[0]["symbol"] == "BZZ"
+
+
+def test_search_is_sub_millisecond_on_a_large_list():
+    entries = [(f"{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i // 676 % 26)}{i // 17576}", f"Company {i} Holdings", "XNAS", "equity", None) for i in range(100_000)]
+    index = SymbolIndex(entries)
+    for query in ("AB", "company 12", "ABCD"):
+        index.search(query)
+        started = time.perf_counter()
+        for _ in range(100):
+            index.search(query)
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+
+@pytest.mark.asyncio
+async def test_refresh_downloads_ticker_list_and_ranks_assets_first(db_session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(db_session, "commit", db_session.flush) # Keep the test transaction open
+    monkeypatch.setattr(symbol_index_service, "_index", None)
+    suffix = uuid.uuid4().hex[:4].upper()
+    asset = await create_test_stock_asset_via_crud(db_session, symbol=f"ZQB{suffix}", name="Zq Beta Corp")
+
+    counts = await symbol_index_service.refresh_symbol_index(db_session, FakeTickerProvider([
+        (f"ZQA{suffix}", "Zq Alpha Inc", "XNAS"),
+        (f"ZQB{suffix}", "Zq Beta Corporation", "XNAS"),
+        (f"ZQC{suffix}", "Zq Gamma Inc", "XNYS"),
+    ]), "marketstack")
+    assert counts["downloaded"] == 3 and counts["written"] == 3
+
+    results = await symbol_index_service.search_symbols(db_session, "zq")
+    assert results[0]["symbol"] == asset.symbol and results[0]["asset_id"] == str(asset.id)
+    assert {f"ZQA{suffix}", f"ZQC{suffix}"} <= set(_symbols(results))
+
+    # A later download drops delisted tickers; an empty one changes nothing
+    counts = await symbol_index_service.refresh_symbol_index(db_session, FakeTickerProvider([(f"ZQA{suffix}", "Zq Alpha Inc", "XNAS")]), "marketstack")
+    assert counts["deleted"] >= 2
+    assert await symbol_index_service.refresh_symbol_index(db_session, FakeTickerProvider([]), "marketstack") == {"downloaded": 0, "written": 0, "deleted": 0}
+    rows = await crud_symbol_index.get_symbol_index_rows(db_session)
+    assert [row[0] for row in rows if row[0].endswith(suffix)] == [f"ZQA{suffix}"]
+    results = await symbol_index_service.search_symbols(db_session, "zq")
+    assert f"ZQC{suffix}" not in _symbols(results)
+    assert asset.symbol in _symbols(results) # Assets stay searchable
+
+
+def test_refresher_uses_the_app_scoped_provider_or_none(monkeypatch):
+    service = MarketDataService(provider=FakeTickerProvider([]))
+    monkeypatch.setattr(symbol_index_service, "SYMBOL_INDEX_PROVIDER", MARKET_DATA_PROVIDER)
+    assert symbol_index_service.resolve_symbol_index_provider(service) is service.provider
+    monkeypatch.setattr(symbol_index_service, "SYMBOL_INDEX_PROVIDER", "no_such_provider")
+    assert symbol_index_service.resolve_symbol_index_provider(service) is None
+    assert symbol_index_service.resolve_symbol_index_provider(None) is None
@@ -0,0 +1,130 @@
+# backend/tests/services/test_synthetic_market_data_provider.py
+
+from datetime import date
+
+import pytest
+
+from backend.services import market_data_service
+from backend.services.market_data_interface import MarketDataRateLimitError, MarketDataUnavailableError
+from backend.services.market_data_providers.registry import create_provider
+from backend.services.market_data_providers.synthetic_provider import SyntheticMarketDataProvider
+
+TODAY = date(2024, 6, 14) # A Friday
+
+
+def _provider(**kwargs) -> SyntheticMarketDataProvider:
+    return SyntheticMarketDataProvider(seed=7, today=TODAY, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_history_is_reproducible_whatever_was_generated_before():
+    first = await _provider().get_price_series("AAPL", date(2024, 1, 1), date(2024, 3, 31))
+    other = _provider()
+    await other.get_price_series("AAPL", date(2023, 1, 1), date(2024, 6, 14)) # Generates further ahead first
+    second = await other.get_price_series("aapl", date(2024, 1, 1), date(2024, 3, 31))
+
+    assert len(first) > 50
+    assert list(first.dates) == list(second.dates)
+    assert list(first.close) == list(second.close)
+    assert all(date.fromordinal(d).weekday() < 5 for d in first.dates)
+    assert all(low <= close <= high for low, close, high in zip(first.low, first.close, first.high))
+
+
+@pytest.mark.asyncio
+async def test_seeds_and_symbols_give_different_walks():
+    aapl = await _provider().get_price_series("AAPL", date(2024, 1, 1), date(2024, 1, 31))
+    msft = await _provider().get_price_series("MSFT", date(2024, 1, 1), date(2024, 1, 31))
+    reseeded = await SyntheticMarketDataProvider(seed=8, today=TODAY).get_price_series("AAPL", date(2024, 1, 1), date(2024, 1, 31))
+    assert list(aapl.close) != list(msft.close)
+    assert list(aapl.close) != list(reseeded.close)
+
+
+@pytest.mark.asyncio
+async def test_quote_is_last_bar_and_history_stops_at_today():
+    provider = _provider()
+    quote = await provider.get_equity_quote("AAPL")
+    history = await provider.get_historical_price_data("AAPL", date(2024, 6, 1), date(2024, 7, 31))
+
+    assert history[-1].date.date() == TODAY
+    assert quote.timestamp.date() == TODAY
+    assert quote.adj_close == history[-1].adj_close
+    assert quote.change == pytest.approx(history[-1].close - history[-2].close, abs=1e-4)
+
+    quotes = await provider.get_equity_quotes(["AAPL", "msft", "AAPL"])
+    assert set(quotes) == {"AAPL", "MSFT"}
+
+
+@pytest.mark.asyncio
+async def test_raw_prices_reflect_splits_and_dividends_match_history():
+    provider = _provider()
+    # Find a symbol that split within the window
+    for i in range(200):
+        symbol = f"SYN{i}"
+        splits = await provider.get_stock_split_data(symbol, date(2010, 1, 1), TODAY)
+        if splits:
+            break
+    else:
+        pytest.fail("No synthetic split generated")
+    split = splits[0]
+    series = await provider.get_price_series(symbol, date(split.date.year - 1, 1, 1), TODAY)
+    index = [date.fromordinal(d) for d in series.dates].index(split.date)
+
+    assert series.split_factor[index] == split.split_factor
+    assert split.stock_split == f"{int(split.split_factor)}:1"
+    # Raw prices drop by the split factor; adjusted prices do not jump
+    before, after = index - 1, index
+    raw_ratio = (series.close[before] / series.adj_close[before]) / (series.close[after] / series.adj_close[after])
+    assert raw_ratio == pytest.approx(split.split_factor, rel=1e-3)
+    assert series.close[-1] == series.adj_close[-1]
+
+    dividends = await provider.get_dividend_data(symbol, date(split.date.year - 1, 1, 1), TODAY)
+    paid = {date.fromordinal(d): amount for d, amount in zip(series.dates, series.dividend) if amount}
+    assert {d.date.date(): d.dividend for d in dividends} == paid
+
+
+@pytest.mark.asyncio
+async def test_injected_faults_are_reproducible():
+    async def outcomes(provider):
+        results = []
+        for _ in range(200):
+            try:
+                await provider.get_equity_quote("AAPL")
+                results.append("ok")
+            except MarketDataRateLimitError:
+                results.append("429")
+            except MarketDataUnavailableError:
+                results.append("error")
+        return results
+
+    first = await outcomes(_provider(error_rate=0.1, rate_limit_rate=0.2))
+    second = await outcomes(_provider(error_rate=0.1, rate_limit_rate=0.2))
+    assert first == second
+    assert 20 < first.count("429") < 70
+    assert 5 < first.count("error") < 40
+    assert await outcomes(_provider()) == ["ok"] * 200
+
+
+@pytest.mark.asyncio
+async def test_injected_latency(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("backend.services.market_data_providers.synthetic_provider.asyncio.sleep", fake_sleep)
+    provider = _provider(latency_ms=50, latency_jitter_ms=20)
+    for _ in range(20):
+        await provider.get_price_series("AAPL", date(2024, 6, 1), TODAY)
+    assert len(sleeps) == 20
+    assert all(0.05 <= s <= 0.07 for s in sleeps)
+
+
+def test_selected_by_environment(monkeypatch):
+    monkeypatch.setattr(market_data_service, "MARKET_DATA_PROVIDER", "synthetic")
+    monkeypatch.setattr(market_data_service, "MARKET_DATA_CACHE_ENABLED", False)
+    assert isinstance(market_data_service.MarketDataService().provider, SyntheticMarketDataProvider)
+    assert isinstance(create_provider("synthetic"), SyntheticMarketDataProvider)
+
+    monkeypatch.setattr(market_data_service, "MARKET_DATA_PROVIDER", "nonexistent")
+    with pytest.raises(ValueError):
+        market_data_service.MarketDataService()
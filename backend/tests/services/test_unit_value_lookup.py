@@ -0,0 +1,56 @@
+# backend/tests/services/test_unit_value_lookup.py
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.crud import club_membership as crud_membership
+from backend.crud import unit_value_history as crud_unit_value
+from backend.models.enums import ClubRole, MemberTransactionType
+from backend.schemas import MemberTransactionCreate
+from backend.services import accounting_service
+from backend.tests.crud.test_user import create_test_user
+from backend.tests.crud.test_club import create_test_club_via_crud
+
+HISTORY = [(date(2025, 1, 31), Decimal("10")), (date(2025, 2, 28), Decimal("11")), (date(2025, 3, 31), Decimal("12.5"))]
+
+
+async def _club_with_history(db_session: AsyncSession):
+    creator = await create_test_user(db_session, email=f"asof_{uuid.uuid4()}@example.com", auth0_sub=f"auth0|asof_{uuid.uuid4()}")
+    club = await create_test_club_via_crud(db_session, creator=creator)
+    for valuation_date, unit_value in HISTORY:
+        await crud_unit_value.create_unit_value_history(db=db_session, uvh_data={
+            "club_id": club.id, "valuation_date": valuation_date, "total_club_value": unit_value * 100,
+            "total_units_outstanding": Decimal("100"), "unit_value": unit_value
+        })
+    return creator, club
+
+
+@pytest.mark.asyncio
+async def test_as_of_lookup_returns_the_latest_value_on_or_before_a_date(db_session: AsyncSession):
+    _, club = await _club_with_history(db_session)
+    assert await crud_unit_value.get_unit_value_as_of(db_session, club_id=club.id, on_date=date(2025, 1, 30)) is None
+    assert await crud_unit_value.get_unit_value_as_of(db_session, club_id=club.id, on_date=date(2025, 1, 31)) == (date(2025, 1, 31), Decimal("10"))
+    assert await crud_unit_value.get_unit_value_as_of(db_session, club_id=club.id, on_date=date(2025, 3, 30)) == (date(2025, 2, 28), Decimal("11"))
+    assert await crud_unit_value.get_unit_value_as_of(db_session, club_id=club.id, on_date=date(2026, 1, 1)) == (date(2025, 3, 31), Decimal("12.5"))
+
+
+@pytest.mark.asyncio
+async def test_back_dated_deposit_uses_the_unit_value_of_its_date(db_session: AsyncSession):
+    creator, club = await _club_with_history(db_session)
+    await crud_membership.create_club_membership(db=db_session, membership_data={"user_id": creator.id, "club_id": club.id, "role": ClubRole.Admin})
+
+    deposit = await accounting_service.process_member_deposit(db=db_session, deposit_in=MemberTransactionCreate(
+        user_id=creator.id, club_id=club.id, transaction_type=MemberTransactionType.DEPOSIT,
+        amount=Decimal("110.00"), transaction_date=datetime(2025, 3, 3, 15, tzinfo=timezone.utc)
+    ))
+    assert deposit.unit_value_used == Decimal("11") and deposit.units_transacted == Decimal("10")
+
+    early = await accounting_service.process_member_deposit(db=db_session, deposit_in=MemberTransactionCreate(
+        user_id=creator.id, club_id=club.id, transaction_type=MemberTransactionType.DEPOSIT,
+        amount=Decimal("100.00"), transaction_date=datetime(2024, 12, 1, 15, tzinfo=timezone.utc)
+    ))
+    assert early.unit_value_used == accounting_service.INITIAL_UNIT_VALUE